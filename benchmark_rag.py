@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Offline retrieval benchmark: recall@k and latency percentiles per vector store.
+
+Example:
+    python benchmark_rag.py --sizes 1000 10000 --dim 384 --stores exact int8 --json results.json
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add the mentor_ai directory to Python path
+sys.path.insert(0, str(Path(__file__).parent / "mentor_ai"))
+
+try:
+    from mentor_ai.cursor.modules.retrieval.benchmark import STORE_FACTORIES, run_benchmark, format_results
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    print("Make sure you have installed all dependencies:")
+    print("pip install -r requirements.txt")
+    sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Corpus sizes (chunks)")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--stores", nargs="+", choices=list(STORE_FACTORIES), help="Store configurations (default: all)")
+    parser.add_argument("--top-k", type=int, default=10, help="Results per query and k of recall@k")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per corpus")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        sizes=args.sizes,
+        dim=args.dim,
+        stores=args.stores,
+        top_k=args.top_k,
+        num_queries=args.queries,
+        seed=args.seed,
+    )
+    print(format_results(results))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump([result.to_dict() for result in results], f, indent=2)
+        print(f"✅ Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Session serialization benchmark: JSONResponse vs. ORJSONResponse time and payload size per history length.
+
+Example:
+    python benchmark_serialization.py --history 10 100 1000 5000 --json results.json
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add the mentor_ai directory to Python path
+sys.path.insert(0, str(Path(__file__).parent / "mentor_ai"))
+
+try:
+    from mentor_ai.app.benchmark import run_benchmark, format_results
+except ImportError as e:
+    print(f"❌ Import error: {e}")
+    print("Make sure you have installed all dependencies:")
+    print("pip install -r requirements.txt")
+    sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, nargs="+", default=[10, 100, 1000, 5000],
+                        help="History lengths (messages per session)")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per serializer (best is reported)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmark(history_lengths=args.history, repeats=args.repeats, seed=args.seed)
+    print(format_results(results))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump([result.to_dict() for result in results], f, indent=2)
+        print(f"✅ Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
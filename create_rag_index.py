@@ -13,11 +13,12 @@ sys.path.insert(0, str(Path(__file__).parent / "mentor_ai"))
 
 # Set environment variables for RAG
 os.environ["REG_ENABLED"] = "true"
-os.environ["EMBEDDINGS_PROVIDER"] = "openai"
-os.environ["EMBEDDINGS_MODEL"] = "text-embedding-3-small"
+os.environ.setdefault("EMBEDDINGS_PROVIDER", "openai")
+os.environ.setdefault("EMBEDDINGS_MODEL", "text-embedding-3-small")
 
 try:
     from mentor_ai.cursor.modules.retrieval.ingest import DocumentIngester
+    from mentor_ai.cursor.modules.retrieval.index_versions import new_version_name, staging_dir, publish_version
     from mentor_ai.app.config import settings
 except ImportError as e:
     print(f"❌ Import error: {e}")
@@ -52,10 +53,20 @@ def main():
         # Initialize ingester
         ingester = DocumentIngester()
         
-        # Ingest corpus
-        ingester.ingest_corpus(corpus_path, index_path)
+        # Build a new index version next to the live one
+        version = new_version_name()
+        build_path = staging_dir(index_path, version)
+        ingester.ingest_corpus(corpus_path, str(build_path))
         
-        logger.info("✅ RAG index created successfully!")
+        # Publish it; running servers pick it up via POST /api/rag/reload or the index watcher
+        stats = ingester.vector_store.get_stats()
+        publish_version(index_path, build_path, version, {
+            "total_documents": stats["total_documents"],
+            "store_type": stats["store_type"],
+            "embeddings_provider": ingester.embedding_provider.name
+        })
+        
+        logger.info(f"✅ RAG index version {version} created successfully!")
         return True
         
     except Exception as e:
@@ -0,0 +1,34 @@
+"""
+X-Admin-Token check for the operational endpoints (RAG index admin, metrics).
+"""
+
+import secrets
+from typing import Callable
+
+from fastapi import HTTPException, Request
+
+from mentor_ai.app.config import settings
+
+
+def admin_token_dependency(setting: str, disabled_detail: str) -> Callable[[Request], None]:
+    """
+    FastAPI dependency that compares the X-Admin-Token header with a token setting.
+
+    The setting is read on every request; an empty token disables the endpoints.
+
+    Args:
+        setting: Name of the Settings field holding the token
+        disabled_detail: 403 detail while the token is empty
+
+    Returns:
+        The dependency (raises 403 while disabled, 401 on a wrong token)
+    """
+    def require_token(request: Request) -> None:
+        expected = getattr(settings, setting)
+        if not expected:
+            raise HTTPException(status_code=403, detail=disabled_detail)
+        token = request.headers.get("X-Admin-Token", "")
+        # Constant-time comparison; bytes so non-ASCII headers cannot raise
+        if not secrets.compare_digest(token.encode("utf-8"), expected.encode("utf-8")):
+            raise HTTPException(status_code=401, detail="Invalid admin token")
+    return require_token
@@ -0,0 +1,145 @@
+"""
+Session serialization benchmark.
+
+Builds seeded synthetic session documents (as loaded from MongoDB: ObjectId,
+datetimes, prompt_context, plan) with a growing history and compares the
+previous serialization path of the session endpoints (recursive
+to_serializable + JSONResponse) with ORJSONResponse, plus the payload size
+raw, gzip and brotli compressed.
+"""
+
+import json
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from bson import ObjectId
+
+from .responses import BROTLI_AVAILABLE, compress, dumps
+
+_WORDS = (
+    "goal plan habit feedback delegation career health focus team manager "
+    "progress review week skill mentor energy priority routine growth coach"
+).split()
+
+
+@dataclass
+class SerializationResult:
+    """Measurements for one history length."""
+    history_length: int
+    json_ms: float  # to_serializable + JSONResponse rendering
+    orjson_ms: float  # ORJSONResponse rendering
+    speedup: float
+    raw_kb: float
+    gzip_kb: float
+    brotli_kb: Optional[float]  # None if Brotli is not installed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def to_serializable(obj: Any) -> Any:
+    """Previous conversion of session documents before JSONResponse."""
+    if isinstance(obj, dict):
+        return {k: to_serializable(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [to_serializable(i) for i in obj]
+    elif isinstance(obj, ObjectId):
+        return str(obj)
+    elif isinstance(obj, datetime):
+        return obj.isoformat()
+    else:
+        return obj
+
+
+def json_render(content: Any) -> bytes:
+    """JSONResponse.render of the converted content."""
+    return json.dumps(
+        to_serializable(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def make_session(history_length: int, seed: int = 0) -> Dict[str, Any]:
+    """Session document with history_length messages."""
+    rng = random.Random(seed)
+    started = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    def sentence(words: int) -> str:
+        return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": sentence(rng.randint(8, 60)),
+         "timestamp": started + timedelta(minutes=i)}
+        for i in range(history_length)
+    ]
+    return {
+        "_id": ObjectId(b"session0000\x00"),
+        "session_id": "benchmark-session",
+        "user_id": "benchmark-user",
+        "created_at": started,
+        "updated_at": started + timedelta(minutes=history_length),
+        "current_node": "week1_chat",
+        "current_week": 1,
+        "message_count": history_length,
+        "history": history,
+        "prompt_context": {
+            "running_summary": sentence(80),
+            "recent_messages": history[-5:],
+            "important_facts": [{"fact": sentence(10), "week": 1, "importance_score": 0.9}],
+            "weekly_summaries": {},
+        },
+        "plan": {f"week_{week}_topic": sentence(6) for week in range(1, 13)},
+        "usage": {"prompt_tokens": 1200 * history_length, "completion_tokens": 300 * history_length},
+    }
+
+
+def _best_ms(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run_benchmark(history_lengths: Sequence[int] = (10, 100, 1000), repeats: int = 20,
+                  seed: int = 0) -> List[SerializationResult]:
+    """
+    Measure serialization time (best of repeats) and payload size per history length.
+
+    Args:
+        history_lengths: Number of history messages of each session
+        repeats: Timed runs per path
+        seed: Random seed for session generation
+
+    Returns:
+        One result per history length
+    """
+    results = []
+    for length in history_lengths:
+        content = {"session_id": "benchmark-session", "state": make_session(length, seed=seed)}
+        body = dumps(content)
+        json_ms = _best_ms(lambda: json_render(content), repeats)
+        orjson_ms = _best_ms(lambda: dumps(content), repeats)
+        results.append(SerializationResult(
+            history_length=length,
+            json_ms=round(json_ms, 3),
+            orjson_ms=round(orjson_ms, 3),
+            speedup=round(json_ms / orjson_ms, 1) if orjson_ms else 0.0,
+            raw_kb=round(len(body) / 1024, 1),
+            gzip_kb=round(len(compress(body, "gzip")) / 1024, 1),
+            brotli_kb=round(len(compress(body, "br")) / 1024, 1) if BROTLI_AVAILABLE else None,
+        ))
+    return results
+
+
+def format_results(results: Sequence[SerializationResult]) -> str:
+    """Render results as a fixed-width table."""
+    columns = list(SerializationResult.__dataclass_fields__)
+    rows = [[str(value) for value in result.to_dict().values()] for result in results]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    lines = ["  ".join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines += ["  ".join(value.ljust(width) for value, width in zip(row, widths)) for row in rows]
+    return "\n".join(lines)
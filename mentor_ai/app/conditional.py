@@ -0,0 +1,81 @@
+"""
+Conditional GET for the session read endpoints.
+
+Every write to a session increments its version field (see MongoDBManager),
+and the read endpoints send it as a weak ETag. A request whose If-None-Match
+names the current version gets 304 Not Modified from the version lookup alone
+(MongoDBManager.get_session_version, served from an in-process cache), without
+fetching or serializing the session document.
+
+The ETags are weak because CompressionMiddleware may change the body bytes.
+"""
+
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+
+from mentor_ai.app.storage.mongodb import mongodb_manager
+
+
+def session_etag(version: int) -> str:
+    """Weak ETag of a session version."""
+    return f'W/"{version}"'
+
+
+def etag_headers(session: Dict) -> Dict[str, str]:
+    """ETag and Cache-Control headers for a response built from a session document."""
+    return {"ETag": session_etag(session.get("version", 0)), "Cache-Control": "private, no-cache"}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header with an ETag.
+
+    Args:
+        if_none_match: Header value (comma-separated ETags or "*")
+        etag: Current ETag
+
+    Returns:
+        True if any listed ETag matches
+    """
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+async def not_modified(request: Request, session_id: str, user_id: str) -> Optional[Response]:
+    """
+    304 response if the request's If-None-Match names the session's current version.
+
+    Args:
+        request: Incoming request
+        session_id: Session ID
+        user_id: Authenticated user ID
+
+    Returns:
+        The 304 response, or None if the full response has to be built
+        (no If-None-Match, changed or unknown session)
+
+    Raises:
+        HTTPException: 403 if the session belongs to another user
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    found = await mongodb_manager.get_session_version(session_id)
+    if found is None:
+        # Unknown session: the full read answers 404
+        return None
+    version, owner = found
+    if owner != user_id:
+        raise HTTPException(status_code=403, detail="Access denied to this session")
+    headers = etag_headers({"version": version})
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return None
@@ -9,6 +9,7 @@ class Settings:
     
     # OpenAI Configuration
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")  # Empty = api.openai.com
     
     # MongoDB Configuration
     MONGODB_URI: str = os.getenv("MONGODB_URI", "mongodb://localhost:27017/mentor_ai")
@@ -23,23 +24,125 @@ class Settings:
     PORT: int = int(os.getenv("PORT", 8000))
     
     # LLM Configuration
-    LLM_MODEL: str = "gpt-4"
+    LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt-4")
     LLM_TEMPERATURE: float = 0.7
     LLM_MAX_TOKENS: int = 2000
     
+    # Per-node generation profiles (cursor/core/model_routing.py): extraction,
+    # classification and summary calls use LLM_FAST_MODEL
+    LLM_FAST_MODEL: str = os.getenv("LLM_FAST_MODEL", "gpt-4o-mini")
+    LLM_ROUTING_ENABLED: bool = os.getenv("LLM_ROUTING_ENABLED", "True").lower() == "true"
+    # Learn max_tokens per node from observed completion lengths (p99 + 25%)
+    LLM_ADAPTIVE_MAX_TOKENS: bool = os.getenv("LLM_ADAPTIVE_MAX_TOKENS", "True").lower() == "true"
+    # Structured output constraint sent with node calls: "auto" (by model), "json_schema", "json_object" or "none".
+    # The original gpt-4 accepts neither json_schema nor json_object, so with the default LLM_MODEL=gpt-4 "auto"
+    # constrains only the LLM_FAST_MODEL nodes (extraction, classification, summaries); conversation and plan
+    # nodes are then only validated after the call. Set LLM_MODEL to gpt-4o or newer to constrain them too
+    LLM_RESPONSE_FORMAT: str = os.getenv("LLM_RESPONSE_FORMAT", "auto")
+    
+    # LLM transport: retries with jittered backoff, hedged requests, circuit breaker
+    LLM_REQUEST_TIMEOUT: float = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+    LLM_MAX_ATTEMPTS: int = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+    LLM_RETRY_BASE_DELAY: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+    LLM_RETRY_MAX_DELAY: float = float(os.getenv("LLM_RETRY_MAX_DELAY", "8.0"))
+    # Send a second request when an attempt exceeds the node's p95 latency (LLM_HEDGE_QUANTILE)
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "False").lower() == "true"
+    LLM_HEDGE_QUANTILE: float = float(os.getenv("LLM_HEDGE_QUANTILE", "95"))
+    LLM_HEDGE_MIN_DELAY: float = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0"))
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    LLM_CIRCUIT_RECOVERY_SECONDS: float = float(os.getenv("LLM_CIRCUIT_RECOVERY_SECONDS", "30"))
+    
+    # LLM admission control: concurrency limit, rate limits (0 = learn from provider headers),
+    # per-user fair queues; calls that would queue longer than LLM_ADMISSION_MAX_WAIT get 429
+    LLM_ADMISSION_ENABLED: bool = os.getenv("LLM_ADMISSION_ENABLED", "True").lower() == "true"
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_RATE_LIMIT_RPM: float = float(os.getenv("LLM_RATE_LIMIT_RPM", "0"))
+    LLM_RATE_LIMIT_TPM: float = float(os.getenv("LLM_RATE_LIMIT_TPM", "0"))
+    LLM_ADMISSION_MAX_WAIT: float = float(os.getenv("LLM_ADMISSION_MAX_WAIT", "20"))
+    
+    # Chat turn runtime: "legacy" (GraphProcessor, one node per request) or "langgraph"
+    # (root_graph compiled into a StateGraph, checkpointed per step in MongoDB)
+    GRAPH_RUNTIME: str = os.getenv("GRAPH_RUNTIME", "legacy")
+    # Checkpoints kept per session with the langgraph runtime; older ones and their blobs are deleted
+    CHECKPOINT_KEEP_LAST: int = int(os.getenv("CHECKPOINT_KEEP_LAST", "10"))
+    
+    # LLM response cache for nodes with cache_ttl: "memory" (LRU) or "none"
+    LLM_CACHE_BACKEND: str = os.getenv("LLM_CACHE_BACKEND", "memory")
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+    
+    # Response compression for bodies of at least RESPONSE_COMPRESSION_MIN_SIZE bytes:
+    # brotli if the Brotli package is installed and accepted by the client, else gzip
+    RESPONSE_COMPRESSION_ENABLED: bool = os.getenv("RESPONSE_COMPRESSION_ENABLED", "True").lower() == "true"
+    RESPONSE_COMPRESSION_MIN_SIZE: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+    RESPONSE_GZIP_LEVEL: int = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+    RESPONSE_BROTLI_QUALITY: int = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
+    
+    # Session version cache for conditional GETs (ETag / If-None-Match -> 304).
+    # With several workers, a change made by another worker is seen after at most the TTL; 0 disables
+    SESSION_VERSION_CACHE_TTL_SECONDS: float = float(os.getenv("SESSION_VERSION_CACHE_TTL_SECONDS", "2"))
+    SESSION_VERSION_CACHE_MAX_ENTRIES: int = int(os.getenv("SESSION_VERSION_CACHE_MAX_ENTRIES", "10000"))
+    
+    # Metrics (GET /metrics, Prometheus text format)
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")  # Required X-Admin-Token of GET /metrics; empty disables it
+    
+    # Tracing: "none", "file" (TRACING_FILE_PATH), "otlp" (TRACING_OTLP_ENDPOINT) or "console"
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "none")
+    TRACING_FILE_PATH: str = os.getenv("TRACING_FILE_PATH", "traces.jsonl")
+    TRACING_OTLP_ENDPOINT: str = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    TRACING_SERVICE_NAME: str = os.getenv("TRACING_SERVICE_NAME", "mentor-ai")
+    TRACING_SAMPLE_RATIO: float = float(os.getenv("TRACING_SAMPLE_RATIO", "1.0"))
+    
     # RAG Configuration
     REG_ENABLED: bool = os.getenv("REG_ENABLED", "False").lower() == "true"
+    # Embeddings provider: "openai" (EMBEDDINGS_MODEL) or "hashing" (local, offline, EMBEDDINGS_DIMENSION)
     EMBEDDINGS_PROVIDER: str = os.getenv("EMBEDDINGS_PROVIDER", "openai")
     EMBEDDINGS_MODEL: str = os.getenv("EMBEDDINGS_MODEL", "text-embedding-3-small")
+    EMBEDDINGS_DIMENSION: int = int(os.getenv("EMBEDDINGS_DIMENSION", "384"))
     # Fix RAG paths to work both locally and in Railway
     RAG_INDEX_PATH: str = os.getenv("RAG_INDEX_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "RAG", "index"))
     RAG_CORPUS_PATH: str = os.getenv("RAG_CORPUS_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "RAG", "corpus"))
     
+    # Retrieval mode: "hybrid" (BM25 + vector), "vector" or "lexical"
+    RETRIEVAL_MODE: str = os.getenv("RETRIEVAL_MODE", "hybrid")
+    HYBRID_ALPHA: float = float(os.getenv("HYBRID_ALPHA", "0.7"))  # Weight of the vector score
+    
+    # Embedding storage for scoring: "float32", "float16" or "int8" (quantized modes
+    # re-score the top RETRIEVE_TOP_K * EMBEDDINGS_RERANK_FACTOR candidates exactly)
+    EMBEDDINGS_STORAGE: str = os.getenv("EMBEDDINGS_STORAGE", "float32")
+    EMBEDDINGS_RERANK_FACTOR: int = int(os.getenv("EMBEDDINGS_RERANK_FACTOR", "4"))
+    
+    # Vector store: "simple" (one matrix) or "sharded" (fixed-size shards scanned in parallel)
+    VECTOR_STORE_TYPE: str = os.getenv("VECTOR_STORE_TYPE", "simple")
+    VECTOR_STORE_SHARD_SIZE: int = int(os.getenv("VECTOR_STORE_SHARD_SIZE", "4096"))
+    VECTOR_STORE_SEARCH_WORKERS: int = int(os.getenv("VECTOR_STORE_SEARCH_WORKERS", "0"))  # 0 = one per CPU (max 8)
+    
     # RAG Limits
     RETRIEVE_TOP_K: int = int(os.getenv("RETRIEVE_TOP_K", "5"))
     MAX_CHARS_PER_CHUNK: int = int(os.getenv("MAX_CHARS_PER_CHUNK", "1000"))
+    # Ingest chunk size unit: "chars" (MAX_CHARS_PER_CHUNK) or "tokens" (MAX_TOKENS_PER_CHUNK)
+    CHUNK_SIZE_UNIT: str = os.getenv("CHUNK_SIZE_UNIT", "chars")
+    MAX_TOKENS_PER_CHUNK: int = int(os.getenv("MAX_TOKENS_PER_CHUNK", "256"))
+    # Ingest-time near-duplicate chunk removal (MinHash estimated Jaccard similarity)
+    INGEST_DEDUP_ENABLED: bool = os.getenv("INGEST_DEDUP_ENABLED", "True").lower() == "true"
+    INGEST_DEDUP_THRESHOLD: float = float(os.getenv("INGEST_DEDUP_THRESHOLD", "0.85"))
     MAX_CONTEXT_CHARS: int = int(os.getenv("MAX_CONTEXT_CHARS", "3000"))
     
+    # Max-marginal-relevance diversification of retrieved chunks
+    MMR_ENABLED: bool = os.getenv("MMR_ENABLED", "True").lower() == "true"
+    MMR_LAMBDA: float = float(os.getenv("MMR_LAMBDA", "0.7"))  # 1.0 = relevance only
+    MMR_FETCH_FACTOR: int = int(os.getenv("MMR_FETCH_FACTOR", "3"))  # Candidates per query = factor * top_k
+    
+    # RAG Prefetch (speculative retrieval once onboarding goals are known)
+    RAG_PREFETCH_ENABLED: bool = os.getenv("RAG_PREFETCH_ENABLED", "True").lower() == "true"
+    # How long generate_plan waits for a running prefetch when retrieve_reg was skipped; on timeout the
+    # plan is generated without retrieved chunks. retrieve_reg itself always waits for a running prefetch
+    RAG_PREFETCH_WAIT_SECONDS: float = float(os.getenv("RAG_PREFETCH_WAIT_SECONDS", "0.5"))
+    
+    # RAG index hot reload (versioned index directories under RAG_INDEX_PATH)
+    RAG_ADMIN_TOKEN: str = os.getenv("RAG_ADMIN_TOKEN", "")  # Required by POST /api/rag/reload; empty disables it
+    RAG_INDEX_WATCH_ENABLED: bool = os.getenv("RAG_INDEX_WATCH_ENABLED", "False").lower() == "true"
+    RAG_INDEX_WATCH_INTERVAL_SECONDS: float = float(os.getenv("RAG_INDEX_WATCH_INTERVAL_SECONDS", "30"))
+    
     # PDF Processing
     PDF_MAX_PAGES: int = int(os.getenv("PDF_MAX_PAGES", "100"))
     PDF_EXTRACTOR: str = os.getenv("PDF_EXTRACTOR", "pdfminer")
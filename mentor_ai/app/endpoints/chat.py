@@ -1,7 +1,17 @@
+import math
+import asyncio
 from fastapi import APIRouter, HTTPException, Path, Depends, Request
 from mentor_ai.app.storage.mongodb import mongodb_manager
 from mentor_ai.app.models import ChatRequest, ChatResponse
+from mentor_ai.app.conditional import etag_headers, not_modified
+from mentor_ai.app.responses import ORJSONResponse
 from mentor_ai.cursor.core import GraphProcessor
+from mentor_ai.cursor.core.metrics import observe_stage
+from mentor_ai.cursor.core.tracing import tracer
+from mentor_ai.cursor.core.llm_transport import LLMUnavailableError
+from mentor_ai.cursor.core.admission import AdmissionRejected, Priority, admission_context
+from mentor_ai.cursor.core import state_graph
+from mentor_ai.cursor.core.session_state import SessionState
 import firebase_admin
 from firebase_admin import auth
 
@@ -14,7 +24,8 @@ async def get_current_user(request: Request):
         raise HTTPException(status_code=401, detail="Missing auth token")
     id_token = auth_header.split(" ")[1]
     try:
-        decoded_token = auth.verify_id_token(id_token)
+        with tracer.start_span("auth.verify_id_token"):
+            decoded_token = auth.verify_id_token(id_token)
         return decoded_token["uid"]  # Return Firebase user ID
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid auth token")
@@ -35,6 +46,9 @@ async def chat_with_session(
     if state.get("user_id") != user_id:
         raise HTTPException(status_code=403, detail="Access denied to this session")
     
+    # Tracks the fields this turn changes, which are all that is written back
+    state = SessionState(state)
+    
     # Ensure history exists for frontend compatibility
     if "history" not in state or not isinstance(state["history"], list):
         state["history"] = []
@@ -57,33 +71,56 @@ async def chat_with_session(
 
     # Add user message to state BEFORE processing
     if user_message and not any(msg.get("content") == user_message for msg in updated_state.get("history", [])):
-        updated_state["history"].append({"role": "user", "content": user_message})
+        updated_state.mutable("history", list).append({"role": "user", "content": user_message})
 
-    # Process exactly one node per request with memory management
+    # Process exactly one node per request with memory management. The LLM call
+    # blocks, so run it in a worker thread to keep serving other requests
     try:
-        reply, updated_state, next_node = GraphProcessor.process_node(
-            node_id=next_node,
-            user_message=user_message,
-            current_state=updated_state
-        )
+        with admission_context(user_id, Priority.INTERACTIVE):
+            if state_graph.session_graph is not None:
+                reply, result, next_node = await state_graph.session_graph.run_turn(
+                    session_id, user_message, updated_state
+                )
+            else:
+                reply, result, next_node = await asyncio.to_thread(
+                    GraphProcessor.process_node,
+                    node_id=next_node,
+                    user_message=user_message,
+                    current_state=updated_state
+                )
+    except AdmissionRejected as e:
+        # Too many LLM calls queued: shed load instead of waiting past the deadline
+        raise HTTPException(status_code=429, detail=str(e),
+                            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))})
+    except LLMUnavailableError as e:
+        # Provider outage: tell the client when to retry instead of a generic 500
+        raise HTTPException(status_code=503, detail=f"LLM temporarily unavailable: {e}",
+                            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"LLM processing error: {e}")
 
+    updated_state = result if isinstance(result, SessionState) else updated_state.merge(result)
+
     # Add assistant reply to history for frontend compatibility
     if reply and not any(msg.get("content") == reply for msg in updated_state.get("history", [])):
-        updated_state["history"].append({"role": "assistant", "content": reply})
+        updated_state.mutable("history", list).append({"role": "assistant", "content": reply})
 
     updated_state["current_node"] = next_node
-    await mongodb_manager.update_session(session_id, updated_state)
+    with observe_stage(node_id, "mongo_write"):
+        await mongodb_manager.update_session(session_id, updated_state.changes())
 
     return ChatResponse(reply=reply, session_id=session_id)
 
 @router.get("/chat/{session_id}/memory-stats")
 async def get_memory_stats(
+    request: Request,
     session_id: str = Path(..., description="Session ID"),
     user_id: str = Depends(get_current_user)
 ):
     """Get memory statistics for a session"""
+    unchanged = await not_modified(request, session_id, user_id)
+    if unchanged:
+        return unchanged
     # Get current state from MongoDB
     state = await mongodb_manager.get_session(session_id)
     if not state:
@@ -97,10 +134,10 @@ async def get_memory_stats(
     from mentor_ai.cursor.core.graph_processor import GraphProcessor
     memory_stats = GraphProcessor.get_memory_stats(state)
     
-    return {
+    return ORJSONResponse({
         "session_id": session_id,
         "memory_stats": memory_stats
-    }
+    }, headers=etag_headers(state))
 
 @router.post("/chat/{session_id}/memory-control")
 async def control_memory_usage(
@@ -118,6 +155,9 @@ async def control_memory_usage(
     if state.get("user_id") != user_id:
         raise HTTPException(status_code=403, detail="Access denied to this session")
     
+    # Tracks the fields this turn changes (see chat_with_session)
+    state = SessionState(state)
+    
     # Ensure history exists for frontend compatibility
     if "history" not in state or not isinstance(state["history"], list):
         state["history"] = []
@@ -143,27 +183,40 @@ async def control_memory_usage(
 
     # Add user message to state BEFORE processing
     if user_message and not any(msg.get("content") == user_message for msg in updated_state.get("history", [])):
-        updated_state["history"].append({"role": "user", "content": user_message})
+        updated_state.mutable("history", list).append({"role": "user", "content": user_message})
 
-    # Process with memory control
+    # Process with memory control (in a worker thread, see chat_with_session)
     try:
-        reply, updated_state, next_node = GraphProcessor.process_node_with_memory_control(
-            node_id=next_node,
-            user_message=user_message,
-            current_state=updated_state,
-            use_memory=use_memory
-        )
+        with admission_context(user_id, Priority.INTERACTIVE):
+            reply, result, next_node = await asyncio.to_thread(
+                GraphProcessor.process_node_with_memory_control,
+                node_id=next_node,
+                user_message=user_message,
+                current_state=updated_state,
+                use_memory=use_memory
+            )
+    except AdmissionRejected as e:
+        # Too many LLM calls queued: shed load instead of waiting past the deadline
+        raise HTTPException(status_code=429, detail=str(e),
+                            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))})
+    except LLMUnavailableError as e:
+        # Provider outage: tell the client when to retry instead of a generic 500
+        raise HTTPException(status_code=503, detail=f"LLM temporarily unavailable: {e}",
+                            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"LLM processing error: {e}")
 
+    updated_state = result if isinstance(result, SessionState) else updated_state.merge(result)
+
     # Ensure history is updated for frontend compatibility
     if user_message and not any(msg.get("content") == user_message for msg in updated_state.get("history", [])):
-        updated_state["history"].append({"role": "user", "content": user_message})
+        updated_state.mutable("history", list).append({"role": "user", "content": user_message})
     if reply and not any(msg.get("content") == reply for msg in updated_state.get("history", [])):
-        updated_state["history"].append({"role": "assistant", "content": reply})
+        updated_state.mutable("history", list).append({"role": "assistant", "content": reply})
 
     updated_state["current_node"] = next_node
-    await mongodb_manager.update_session(session_id, updated_state)
+    with observe_stage(node_id, "mongo_write"):
+        await mongodb_manager.update_session(session_id, updated_state.changes())
 
     return {
         "reply": reply,
@@ -3,12 +3,14 @@ from pydantic import BaseModel
 from typing import List, Optional
 from mentor_ai.cursor.modules.retrieval.retriever import RegRetriever
 from mentor_ai.app.config import settings
+from mentor_ai.app.admin import admin_token_dependency
 import firebase_admin
 from firebase_admin import auth
 import time
 import sys
 import os
 import random
+import asyncio
 import traceback
 import logging
 
@@ -109,6 +111,38 @@ async def rag_status():
         "status": "operational" if settings.REG_ENABLED else "disabled"
     }
 
+# Allow admin operations only with the configured X-Admin-Token header
+require_admin_token = admin_token_dependency("RAG_ADMIN_TOKEN", "RAG admin endpoints are disabled")
+
+@router.get("/rag/index", dependencies=[Depends(require_admin_token)])
+async def rag_index_info():
+    """Get the live and published RAG index versions"""
+    from mentor_ai.cursor.modules.retrieval.index_versions import read_manifest, resolve_index_path
+    from mentor_ai.cursor.modules.retrieval.prefetch import retrieval_prefetcher
+    
+    path, version = resolve_index_path(settings.RAG_INDEX_PATH)
+    return {
+        "loaded_version": retrieval_prefetcher.index_version,
+        "published_version": version,
+        "manifest": read_manifest(path)
+    }
+
+@router.post("/rag/reload", dependencies=[Depends(require_admin_token)])
+async def reload_rag_index():
+    """Load the published RAG index version and swap it into the live retriever"""
+    from mentor_ai.cursor.modules.retrieval.prefetch import retrieval_prefetcher
+    
+    try:
+        # Loading is blocking I/O; requests keep using the old index meanwhile
+        result = await asyncio.to_thread(retrieval_prefetcher.reload_index, settings.RAG_INDEX_PATH)
+    except (ValueError, FileNotFoundError) as e:
+        raise HTTPException(status_code=409, detail=f"Index reload failed: {str(e)}")
+    except Exception as e:
+        logger.error(f"Index reload failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Index reload failed: {str(e)}")
+    
+    return {"status": "reloaded", **result}
+
 @router.get("/rag/debug")
 async def rag_debug():
     """Debug endpoint to check index files and paths"""
@@ -132,17 +166,21 @@ async def rag_debug():
     try:
         if os.path.exists("RAG"):
             debug_info["directory_contents"]["rag"] = os.listdir("RAG")
-            if os.path.exists("RAG/index"):
-                debug_info["directory_contents"]["rag_index"] = os.listdir("RAG/index")
+            if os.path.exists(settings.RAG_INDEX_PATH):
+                debug_info["directory_contents"]["rag_index"] = os.listdir(settings.RAG_INDEX_PATH)
         else:
             debug_info["directory_contents"]["rag"] = "RAG directory not found"
     except Exception as e:
         debug_info["directory_contents"]["rag_error"] = str(e)
     
-    # Check specific index files
-    index_files = ["chunks.json", "embeddings.npy", "metadata.json"]
+    # Check specific index files in the live version (CURRENT), or the flat legacy index
+    from mentor_ai.cursor.modules.retrieval.index_versions import MANIFEST_FILENAME, resolve_index_path
+    index_dir, version = resolve_index_path(settings.RAG_INDEX_PATH)
+    debug_info["index_version"] = version
+    debug_info["index_version_path"] = str(index_dir)
+    index_files = ["chunks.bin", "chunks_meta.npz", "chunks_strings.json", "chunks.json", "embeddings.npy", "bm25.npz", "filter_index.npz", "metadata.json", MANIFEST_FILENAME]
     for filename in index_files:
-        file_path = f"RAG/index/{filename}"
+        file_path = str(index_dir / filename)
         try:
             if os.path.exists(file_path):
                 file_size = os.path.getsize(file_path)
@@ -308,7 +346,9 @@ async def test_agent_with_rag():
         # Test retrieve_reg node
         if "retrieve_reg" in root_graph:
             try:
-                reply, updated_state, next_node = GraphProcessor.process_node(
+                # Worker thread: admission may block for LLM_ADMISSION_MAX_WAIT at TEST priority
+                reply, updated_state, next_node = await asyncio.to_thread(
+                    GraphProcessor.process_node,
                     "retrieve_reg",
                     "I want to improve my leadership and team management skills",
                     test_state
@@ -382,7 +422,9 @@ async def test_plan_generation_with_rag():
         # Test generate_plan node
         if "generate_plan" in root_graph:
             try:
-                reply, updated_state, next_node = GraphProcessor.process_node(
+                # Worker thread: admission may block for LLM_ADMISSION_MAX_WAIT at TEST priority
+                reply, updated_state, next_node = await asyncio.to_thread(
+                    GraphProcessor.process_node,
                     "generate_plan",
                     "Generate my 12-week plan using the coaching knowledge from the retrieved chunks",
                     test_state
@@ -450,7 +492,9 @@ async def test_chat_with_rag():
         
         # Step 1: Process through retrieve_reg node
         print("Processing retrieve_reg node...")
-        reply1, state1, next1 = GraphProcessor.process_node(
+        # Worker threads: admission may block for LLM_ADMISSION_MAX_WAIT at TEST priority
+        reply1, state1, next1 = await asyncio.to_thread(
+            GraphProcessor.process_node,
             "retrieve_reg",
             test_message,
             current_state
@@ -461,7 +505,8 @@ async def test_chat_with_rag():
         
         # Step 2: Process through generate_plan node
         print("Processing generate_plan node...")
-        reply2, state2, next2 = GraphProcessor.process_node(
+        reply2, state2, next2 = await asyncio.to_thread(
+            GraphProcessor.process_node,
             "generate_plan",
             test_message,
             state1
@@ -1,36 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
 from uuid import uuid4
 from mentor_ai.app.storage.mongodb import mongodb_manager
+from mentor_ai.cursor.core.tracing import tracer
 from mentor_ai.app.models import SessionResponse
 from fastapi import Path
-from fastapi.responses import JSONResponse
-import json
-from bson import ObjectId
-from datetime import datetime
+from mentor_ai.app.responses import ORJSONResponse
+from mentor_ai.app.conditional import etag_headers, not_modified
 import firebase_admin
 from firebase_admin import auth
 from fastapi import Request
 
-class EnhancedJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
-
-def to_serializable(obj):
-    if isinstance(obj, dict):
-        return {k: to_serializable(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [to_serializable(i) for i in obj]
-    elif isinstance(obj, ObjectId):
-        return str(obj)
-    elif isinstance(obj, datetime):
-        return obj.isoformat()
-    else:
-        return obj
-
 async def get_current_user(request: Request):
     """Extract user ID from Firebase ID token"""
     auth_header = request.headers.get("Authorization")
@@ -38,7 +17,8 @@ async def get_current_user(request: Request):
         raise HTTPException(status_code=401, detail="Missing auth token")
     id_token = auth_header.split(" ")[1]
     try:
-        decoded_token = auth.verify_id_token(id_token)
+        with tracer.start_span("auth.verify_id_token"):
+            decoded_token = auth.verify_id_token(id_token)
         return decoded_token["uid"]  # Return Firebase user ID
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid auth token")
@@ -65,10 +45,14 @@ async def create_session(user_id: str = Depends(get_current_user)):
 
 @router.get("/goal/{session_id}")
 async def get_user_goal(
+    request: Request,
     session_id: str = Path(..., description="Session ID"),
     user_id: str = Depends(get_current_user)
 ):
     """Get the user's main goal for the session (career_goal, self_growth_area, relation_issues, lost_skills)"""
+    unchanged = await not_modified(request, session_id, user_id)
+    if unchanged:
+        return unchanged
     state = await mongodb_manager.get_session(session_id)
     if not state:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -85,14 +69,18 @@ async def get_user_goal(
         words = goal.split()[:4]  # Берем только первые 4 слова
         goal = " ".join(words)
     
-    return JSONResponse({"session_id": session_id, "goal": goal})
+    return ORJSONResponse({"session_id": session_id, "goal": goal}, headers=etag_headers(state))
 
 @router.get("/topics/{session_id}")
 async def get_user_topics(
+    request: Request,
     session_id: str = Path(..., description="Session ID"),
     user_id: str = Depends(get_current_user)
 ):
     """Get the user's 12-week plan topics for the session"""
+    unchanged = await not_modified(request, session_id, user_id)
+    if unchanged:
+        return unchanged
     state = await mongodb_manager.get_session(session_id)
     if not state:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -102,10 +90,11 @@ async def get_user_topics(
         raise HTTPException(status_code=403, detail="Access denied to this session")
     
     topics = state.get("plan") or state.get("topics")
-    return JSONResponse({"session_id": session_id, "topics": topics}) 
+    return ORJSONResponse({"session_id": session_id, "topics": topics}, headers=etag_headers(state))
 
 @router.get("/state/{session_id}")
 async def get_full_state(
+    request: Request,
     session_id: str = Path(..., description="Session ID"),
     user_id: str = Depends(get_current_user)
 ):
@@ -113,8 +102,11 @@ async def get_full_state(
     Get the full internal state for a given session.
     This endpoint is intended for debugging and integration purposes.
     Returns the entire state object stored in MongoDB for the session.
-    If the session is not found, returns 404.
+    If the session is not found, returns 404; 304 if If-None-Match names its current version.
     """
+    unchanged = await not_modified(request, session_id, user_id)
+    if unchanged:
+        return unchanged
     state = await mongodb_manager.get_session(session_id)
     if not state:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -123,7 +115,8 @@ async def get_full_state(
     if state.get("user_id") != user_id:
         raise HTTPException(status_code=403, detail="Access denied to this session")
     
-    return JSONResponse({"session_id": session_id, "state": to_serializable(state)})
+    # datetime and ObjectId are serialized by orjson, no conversion pass needed
+    return ORJSONResponse({"session_id": session_id, "state": state}, headers=etag_headers(state))
 
 @router.get("/user/session")
 async def get_user_session(user_id: str = Depends(get_current_user)):
@@ -131,4 +124,4 @@ async def get_user_session(user_id: str = Depends(get_current_user)):
     session = await mongodb_manager.get_user_session(user_id)
     if not session:
         raise HTTPException(status_code=404, detail="No session found for user")
-    return JSONResponse({"session": to_serializable(session)}) 
\ No newline at end of file
+    return ORJSONResponse({"session": session}) 
\ No newline at end of file
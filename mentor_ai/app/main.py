@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 import os
 import logging
@@ -6,6 +7,10 @@ from dotenv import load_dotenv
 from mentor_ai.app.storage.mongodb import mongodb_manager
 from mentor_ai.app.endpoints import session_router, chat_router
 from mentor_ai.app.endpoints.rag_test import router as rag_test_router
+from mentor_ai.app.config import settings
+from mentor_ai.app.admin import admin_token_dependency
+from mentor_ai.app.responses import CompressionMiddleware, ORJSONResponse
+from mentor_ai.cursor.core.tracing import TracingMiddleware, configure_tracing, tracer
 import firebase_admin
 from firebase_admin import credentials
 import json
@@ -28,7 +33,8 @@ if firebase_json and not firebase_admin._apps:
 app = FastAPI(
     title="Mentor AI",
     description="A conversational AI agent that helps users create personalized goals and topics",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -40,6 +46,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (session state with long history)
+if settings.RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE,
+        gzip_level=settings.RESPONSE_GZIP_LEVEL,
+        brotli_quality=settings.RESPONSE_BROTLI_QUALITY
+    )
+
+# Server span per request; a no-op unless TRACING_EXPORTER is set
+app.add_middleware(TracingMiddleware)
+
 app.include_router(session_router)
 app.include_router(chat_router)
 app.include_router(rag_test_router, prefix="/api")
@@ -54,11 +72,41 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "mentor_ai"}
 
+# Allow metrics scrapes only with the configured X-Admin-Token header
+require_metrics_token = admin_token_dependency("METRICS_TOKEN", "Metrics are disabled")
+
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    """Prometheus metrics: per-node stage latency, LLM tokens and cost"""
+    from mentor_ai.cursor.core.metrics import registry
+    return Response(content=registry.render(), media_type=registry.CONTENT_TYPE)
+
+# Polls the versioned RAG index and hot-swaps new versions when enabled
+index_watcher = None
+
 @app.on_event("startup")
 async def startup_event():
     """Connect to MongoDB on startup"""
+    global index_watcher
     try:
+        configure_tracing()
         await mongodb_manager.connect()
+        if settings.GRAPH_RUNTIME == "langgraph":
+            from mentor_ai.app.storage.checkpointer import AsyncMongoDBSaver
+            from mentor_ai.cursor.core.state_graph import configure_session_graph
+            checkpointer = AsyncMongoDBSaver(mongodb_manager.db, keep_last=settings.CHECKPOINT_KEEP_LAST)
+            await checkpointer.setup()
+            configure_session_graph(checkpointer)
+            logger.info("Chat turns run through the LangGraph session graph")
+        if settings.REG_ENABLED and settings.RAG_INDEX_WATCH_ENABLED:
+            from mentor_ai.cursor.modules.retrieval.index_versions import IndexWatcher
+            from mentor_ai.cursor.modules.retrieval.prefetch import retrieval_prefetcher
+            index_watcher = IndexWatcher(
+                settings.RAG_INDEX_PATH,
+                lambda version: retrieval_prefetcher.reload_index(settings.RAG_INDEX_PATH),
+                settings.RAG_INDEX_WATCH_INTERVAL_SECONDS
+            )
+            index_watcher.start()
         logger.info("✅ Application started successfully")
     except Exception as e:
         logger.error(f"❌ Failed to start application: {e}")
@@ -68,6 +116,9 @@ async def startup_event():
 async def shutdown_event():
     """Disconnect from MongoDB on shutdown"""
     await mongodb_manager.disconnect()
+    if index_watcher is not None:
+        index_watcher.stop()
+    tracer.shutdown()
     logger.info("Application shutdown complete")
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+"""
+JSON responses and compression.
+
+ORJSONResponse serializes with orjson, which handles datetime natively and
+ObjectId through a default hook, so session documents go out as loaded from
+MongoDB without a recursive conversion pass. It is the app's default response
+class.
+
+CompressionMiddleware compresses responses of at least minimum_size bytes
+with brotli (if the Brotli package is installed and the client accepts it)
+or gzip. Streaming responses are passed through unchanged.
+"""
+
+import gzip
+import logging
+from collections.abc import Mapping
+from typing import Any, Optional
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# weekly_summaries may be keyed by week number
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+# Content types worth compressing
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+
+def orjson_default(obj: Any) -> Any:
+    """Types orjson does not serialize natively."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Mapping):
+        # SessionState and other mappings
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize like ORJSONResponse does."""
+    return orjson.dumps(content, default=orjson_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson (datetime, ObjectId and non-str keys supported)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    """
+    Compress a response body.
+
+    Args:
+        body: Uncompressed body
+        encoding: "br" or "gzip"
+        gzip_level: gzip compression level (1-9)
+        brotli_quality: brotli quality (0-11); low values are much faster
+
+    Returns:
+        Compressed body
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported encoding the client accepts: br, then gzip."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(name.strip())
+    if BROTLI_AVAILABLE and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """Compresses complete responses above a size threshold (ASGI middleware)."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        """
+        Args:
+            app: Wrapped ASGI app
+            minimum_size: Smallest body (bytes) that is compressed
+            gzip_level: gzip compression level
+            brotli_quality: brotli quality
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            if (message.get("more_body", False) or len(body) < self.minimum_size
+                    or "content-encoding" in headers
+                    or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)):
+                # Streamed, small, already encoded or binary: send as is
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,308 @@
+"""
+Async MongoDB checkpointer for the LangGraph session graph.
+
+Checkpoints are stored incrementally, like the Postgres saver does it:
+
+- checkpoints: one document per step with the checkpoint (without channel
+  values), its metadata and its channel versions
+- checkpoint_blobs: one document per (channel, version); a step writes blobs
+  only for the channels it changed (new_versions), so a turn that updates
+  history and current_node does not rewrite the plan or the prompt context
+- checkpoint_writes: pending writes of each task, so an interrupted step
+  resumes without re-running the tasks that finished
+
+history and prompt_context change every turn, so each step still stores a
+full copy of them. With keep_last, only the newest keep_last checkpoints of
+a thread are kept: older checkpoints and their writes are deleted after each
+put, and so are blobs older than every version the kept checkpoints use.
+
+Values are serialized with the saver's serde (JsonPlusSerializer).
+
+The sync API (get_tuple, list, put, put_writes) runs the async methods on the
+event loop the saver is used from, like LangGraph's AsyncPostgresSaver: it is
+meant for worker threads and raises InvalidStateError on the loop itself.
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+)
+from langgraph.checkpoint.serde.types import TASKS
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from mentor_ai.cursor.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncMongoDBSaver(BaseCheckpointSaver):
+    """LangGraph checkpoint saver on motor collections."""
+
+    def __init__(self, db, prefix: str = "checkpoint", serde: Optional[SerializerProtocol] = None,
+                 keep_last: Optional[int] = None):
+        """
+        Args:
+            db: motor database
+            prefix: Collection name prefix (<prefix>s, <prefix>_blobs, <prefix>_writes)
+            serde: Serializer (defaults to JsonPlusSerializer)
+            keep_last: Checkpoints kept per thread (None keeps all)
+        """
+        super().__init__(serde=serde)
+        self.checkpoints = db[f"{prefix}s"]
+        self.blobs = db[f"{prefix}_blobs"]
+        self.writes = db[f"{prefix}_writes"]
+        self.keep_last = max(1, keep_last) if keep_last is not None else None
+        # Loop the motor client is used from; the sync API submits to it
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def setup(self) -> None:
+        """Create the indexes the queries rely on."""
+        self._bind_loop()
+        await self.checkpoints.create_index(
+            [("thread_id", ASCENDING), ("checkpoint_ns", ASCENDING), ("checkpoint_id", DESCENDING)], unique=True
+        )
+        await self.blobs.create_index(
+            [("thread_id", ASCENDING), ("checkpoint_ns", ASCENDING), ("channel", ASCENDING), ("version", ASCENDING)],
+            unique=True
+        )
+        await self.writes.create_index(
+            [("thread_id", ASCENDING), ("checkpoint_ns", ASCENDING), ("checkpoint_id", ASCENDING),
+             ("task_id", ASCENDING), ("idx", ASCENDING)],
+            unique=True
+        )
+
+    # Sync API: runs the async methods on the saver's event loop
+
+    def _bind_loop(self) -> None:
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+
+    def _run_sync(self, coro: Awaitable[T]) -> T:
+        """Run coro on the saver's loop from another thread (or on a new loop if it has none)."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not None and running is self.loop:
+            coro.close()
+            raise asyncio.InvalidStateError(
+                "Synchronous calls to AsyncMongoDBSaver are only allowed from a different thread; "
+                "use the async methods (e.g. ainvoke) on the event loop"
+            )
+        if self.loop is not None and self.loop.is_running():
+            return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+        return asyncio.run(coro)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self._run_sync(self.aget_tuple(config))
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        async def collect() -> List[CheckpointTuple]:
+            return [item async for item in self.alist(config, filter=filter, before=before, limit=limit)]
+        yield from self._run_sync(collect())
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        return self._run_sync(self.aput(config, checkpoint, metadata, new_versions))
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str) -> None:
+        self._run_sync(self.aput_writes(config, writes, task_id))
+
+    # Async API
+
+    @tracer.trace("mongodb.checkpoint_get", {"db.system": "mongodb", "db.operation": "find"})
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Checkpoint with the config's checkpoint_id, or the thread's latest."""
+        self._bind_loop()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            query["checkpoint_id"] = checkpoint_id
+        doc = await self.checkpoints.find_one(query, sort=[("checkpoint_id", DESCENDING)])
+        if doc is None:
+            return None
+        return await self._load_tuple(doc)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None,
+                    limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        """Checkpoints newest first, filtered by thread, metadata and `before`."""
+        self._bind_loop()
+        query: Dict[str, Any] = {}
+        if config:
+            query["thread_id"] = config["configurable"]["thread_id"]
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                query["checkpoint_ns"] = checkpoint_ns
+            if checkpoint_id := get_checkpoint_id(config):
+                query["checkpoint_id"] = checkpoint_id
+        if before and (before_id := get_checkpoint_id(before)):
+            query["checkpoint_id"] = {"$lt": before_id}
+
+        returned = 0
+        async for doc in self.checkpoints.find(query).sort("checkpoint_id", DESCENDING):
+            if limit is not None and returned >= limit:
+                break
+            # Metadata is stored serialized, so its filter is applied here
+            if filter:
+                metadata = self.serde.loads_typed((doc["metadata_type"], doc["metadata"]))
+                if not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+            returned += 1
+            yield await self._load_tuple(doc)
+
+    @tracer.trace("mongodb.checkpoint_put", {"db.system": "mongodb", "db.operation": "update_one"})
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        """Store a checkpoint and the blobs of the channels changed since its parent."""
+        self._bind_loop()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_checkpoint_id = config["configurable"].get("checkpoint_id")
+
+        stored = checkpoint.copy()
+        stored.pop("pending_sends", None)
+        channel_values = stored.pop("channel_values", {})
+
+        blob_updates = []
+        for channel, version in new_versions.items():
+            if channel in channel_values:
+                value_type, value = self.serde.dumps_typed(channel_values[channel])
+            else:
+                value_type, value = "empty", None
+            blob_updates.append(UpdateOne(
+                {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "channel": channel, "version": version},
+                {"$set": {"type": value_type, "blob": value}},
+                upsert=True
+            ))
+        if blob_updates:
+            await self.blobs.bulk_write(blob_updates, ordered=False)
+
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(stored)
+        metadata_type, metadata_blob = self.serde.dumps_typed(metadata)
+        await self.checkpoints.update_one(
+            {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]},
+            {"$set": {
+                "parent_checkpoint_id": parent_checkpoint_id,
+                "type": checkpoint_type,
+                "checkpoint": checkpoint_blob,
+                "metadata_type": metadata_type,
+                "metadata": metadata_blob,
+                "channel_versions": [[channel, version] for channel, version in checkpoint["channel_versions"].items()],
+            }},
+            upsert=True
+        )
+        if self.keep_last is not None:
+            await self._prune(thread_id, checkpoint_ns)
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                 "checkpoint_id": checkpoint["id"]}}
+
+    @tracer.trace("mongodb.checkpoint_prune", {"db.system": "mongodb", "db.operation": "delete_many"})
+    async def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        """Delete checkpoints beyond keep_last, their writes and the blobs no kept checkpoint can use."""
+        scope = {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}
+        cursor = self.checkpoints.find(scope, {"checkpoint_id": 1, "channel_versions": 1})
+        docs = [doc async for doc in cursor.sort("checkpoint_id", DESCENDING)]
+        kept, stale = docs[:self.keep_last], docs[self.keep_last:]
+        if not stale:
+            return
+
+        stale_ids = [doc["checkpoint_id"] for doc in stale]
+        await self.checkpoints.delete_many({**scope, "checkpoint_id": {"$in": stale_ids}})
+        await self.writes.delete_many({**scope, "checkpoint_id": {"$in": stale_ids}})
+
+        # Versions only grow: a blob older than the oldest version any kept checkpoint
+        # references is unreachable. Newer blobs (e.g. of a put in progress) are left alone
+        oldest_kept: Dict[str, Any] = {}
+        for doc in kept:
+            for channel, version in doc.get("channel_versions", []):
+                if channel not in oldest_kept or version < oldest_kept[channel]:
+                    oldest_kept[channel] = version
+        if oldest_kept:
+            await self.blobs.delete_many({**scope, "$or": [
+                {"channel": channel, "version": {"$lt": version}} for channel, version in oldest_kept.items()
+            ]})
+        logger.debug(f"Pruned {len(stale_ids)} checkpoints of thread {thread_id}")
+
+    @tracer.trace("mongodb.checkpoint_put_writes", {"db.system": "mongodb", "db.operation": "bulk_write"})
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str) -> None:
+        """Store the pending writes of one task."""
+        self._bind_loop()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        updates = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, blob = self.serde.dumps_typed(value)
+            updates.append(UpdateOne(
+                {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id,
+                 "task_id": task_id, "idx": WRITES_IDX_MAP.get(channel, idx)},
+                {"$set": {"channel": channel, "type": value_type, "blob": blob}},
+                upsert=True
+            ))
+        if updates:
+            await self.writes.bulk_write(updates, ordered=False)
+
+    async def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Dict[str, Any]]:
+        cursor = self.writes.find(
+            {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}
+        ).sort([("task_id", ASCENDING), ("idx", ASCENDING)])
+        return [doc async for doc in cursor]
+
+    async def _load_tuple(self, doc: Dict[str, Any]) -> CheckpointTuple:
+        thread_id = doc["thread_id"]
+        checkpoint_ns = doc["checkpoint_ns"]
+        checkpoint_id = doc["checkpoint_id"]
+        parent_checkpoint_id = doc.get("parent_checkpoint_id")
+
+        checkpoint = self.serde.loads_typed((doc["type"], doc["checkpoint"]))
+        versions = [(channel, version) for channel, version in doc.get("channel_versions", [])]
+        channel_values = {}
+        if versions:
+            cursor = self.blobs.find({
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "$or": [{"channel": channel, "version": version} for channel, version in versions],
+            })
+            async for blob in cursor:
+                if blob["type"] != "empty":
+                    channel_values[blob["channel"]] = self.serde.loads_typed((blob["type"], blob["blob"]))
+
+        pending_sends = []
+        if parent_checkpoint_id:
+            pending_sends = [
+                self.serde.loads_typed((write["type"], write["blob"]))
+                for write in await self._load_writes(thread_id, checkpoint_ns, parent_checkpoint_id)
+                if write["channel"] == TASKS
+            ]
+        pending_writes = [
+            (write["task_id"], write["channel"], self.serde.loads_typed((write["type"], write["blob"])))
+            for write in await self._load_writes(thread_id, checkpoint_ns, checkpoint_id)
+        ]
+
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                     "checkpoint_id": checkpoint_id}},
+            checkpoint={**checkpoint, "channel_values": channel_values, "pending_sends": pending_sends},
+            metadata=self.serde.loads_typed((doc["metadata_type"], doc["metadata"])),
+            parent_config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                            "checkpoint_id": parent_checkpoint_id}}
+            if parent_checkpoint_id else None,
+            pending_writes=pending_writes,
+        )
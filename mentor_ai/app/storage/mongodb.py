@@ -1,12 +1,62 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import logging
+import time
+from collections import OrderedDict
 from datetime import datetime
 from mentor_ai.app.config import settings
 from mentor_ai.app.models import MongoDBDocument, SessionState
+from mentor_ai.cursor.core.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
+
+class SessionVersionCache:
+    """
+    In-process LRU of session_id -> (version, user_id) with a TTL.
+
+    Writes through MongoDBManager invalidate their entry; writes from other
+    processes are seen once the entry expires, so ttl_seconds bounds how long
+    a conditional GET may answer 304 for a session changed elsewhere.
+    """
+
+    def __init__(self, ttl_seconds: float = 2.0, max_entries: int = 10000):
+        """
+        Args:
+            ttl_seconds: Lifetime of an entry; 0 disables the cache
+            max_entries: Entries kept before the least recently used is evicted
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, int, Optional[str]]]" = OrderedDict()
+
+    def get(self, session_id: str) -> Optional[Tuple[int, Optional[str]]]:
+        """(version, user_id) of a session, or None if not cached or expired."""
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        expires_at, version, user_id = entry
+        if expires_at <= time.monotonic():
+            del self._entries[session_id]
+            return None
+        self._entries.move_to_end(session_id)
+        return version, user_id
+
+    def set(self, session_id: str, version: int, user_id: Optional[str]) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[session_id] = (time.monotonic() + self.ttl_seconds, version, user_id)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, session_id: str) -> None:
+        self._entries.pop(session_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
 class MongoDBManager:
     """MongoDB connection and operations manager (async, motor)"""
     
@@ -14,6 +64,11 @@ class MongoDBManager:
         self.client: Optional[AsyncIOMotorClient] = None
         self.db = None
         self.sessions_collection = None
+        # Session versions for conditional GETs (ETag / If-None-Match)
+        self.version_cache = SessionVersionCache(
+            ttl_seconds=settings.SESSION_VERSION_CACHE_TTL_SECONDS,
+            max_entries=settings.SESSION_VERSION_CACHE_MAX_ENTRIES,
+        )
         
     async def connect(self):
         """Connect to MongoDB (async motor)"""
@@ -36,28 +91,65 @@ class MongoDBManager:
 
 
 
+    @tracer.trace("mongodb.get_session", {"db.system": "mongodb", "db.operation": "find_one"})
     async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get session by ID (async motor)"""
         try:
             session = await self.sessions_collection.find_one({"session_id": session_id})
+            if session:
+                self.version_cache.set(session_id, session.get("version", 0), session.get("user_id"))
             return session
         except Exception as e:
             logger.error(f"Failed to get session {session_id}: {e}")
             return None
 
+    @tracer.trace("mongodb.get_session_version", {"db.system": "mongodb", "db.operation": "find_one"})
+    async def get_session_version(self, session_id: str) -> Optional[Tuple[int, Optional[str]]]:
+        """
+        Get the version and owner of a session without loading the document.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            (version, user_id) from the version cache or a projected find_one;
+            None if the session does not exist or the lookup failed.
+            Sessions created before versioning have version 0.
+        """
+        cached = self.version_cache.get(session_id)
+        if cached is not None:
+            return cached
+        try:
+            doc = await self.sessions_collection.find_one(
+                {"session_id": session_id}, {"_id": 0, "version": 1, "user_id": 1}
+            )
+        except Exception as e:
+            logger.error(f"Failed to get version of session {session_id}: {e}")
+            return None
+        if not doc:
+            return None
+        version, user_id = doc.get("version", 0), doc.get("user_id")
+        self.version_cache.set(session_id, version, user_id)
+        return version, user_id
+
+    @tracer.trace("mongodb.update_session", {"db.system": "mongodb", "db.operation": "update_one"})
     async def update_session(self, session_id: str, update_data: Dict[str, Any]) -> bool:
         """Update session data (async motor)"""
         try:
             update_data["updated_at"] = datetime.utcnow()
+            # The version only moves through $inc (a loaded one would conflict with it)
+            update_data.pop("version", None)
             result = await self.sessions_collection.update_one(
                 {"session_id": session_id},
-                {"$set": update_data}
+                {"$set": update_data, "$inc": {"version": 1}}
             )
+            self.version_cache.invalidate(session_id)
             return result.modified_count > 0
         except Exception as e:
             logger.error(f"Failed to update session {session_id}: {e}")
             return False
 
+    @tracer.trace("mongodb.save_plan", {"db.system": "mongodb", "db.operation": "update_one"})
     async def save_plan(self, session_id: str, goals: list, topics: list, summary: str) -> bool:
         """Save generated plan to session (async motor)"""
         try:
@@ -70,14 +162,16 @@ class MongoDBManager:
             }
             result = await self.sessions_collection.update_one(
                 {"session_id": session_id},
-                {"$set": update_data}
+                {"$set": update_data, "$inc": {"version": 1}}
             )
+            self.version_cache.invalidate(session_id)
             logger.info(f"Saved plan for session: {session_id}")
             return result.modified_count > 0
         except Exception as e:
             logger.error(f"Failed to save plan for session {session_id}: {e}")
             return False
 
+    @tracer.trace("mongodb.get_user_session", {"db.system": "mongodb", "db.operation": "find_one"})
     async def get_user_session(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get session by user ID (async motor)"""
         try:
@@ -87,6 +181,7 @@ class MongoDBManager:
             logger.error(f"Failed to get session for user {user_id}: {e}")
             return None
 
+    @tracer.trace("mongodb.create_session", {"db.system": "mongodb", "db.operation": "insert_one"})
     async def create_session(self, session_id: str, user_id: str) -> bool:
         """Create a new session document with user ID (async motor)"""
         try:
@@ -118,6 +213,8 @@ class MongoDBManager:
                 "current_week": 1,
                 # Explicitly start from the first node
                 "current_node": "collect_basic_info",
+                # Incremented by every update; session ETags are built from it
+                "version": 1,
                 "created_at": datetime.utcnow(),
                 "updated_at": datetime.utcnow()
             }
@@ -0,0 +1,354 @@
+"""
+Admission control for LLM calls.
+
+Every completion request waits for admission before it is sent:
+
+- at most LLM_MAX_CONCURRENCY requests are in flight
+- token buckets for requests and tokens per minute keep us under the
+  provider's rate limits; they start from LLM_RATE_LIMIT_RPM/TPM (0 = not
+  limited) and follow the x-ratelimit-* headers of every provider response
+- waiting requests are ordered by priority (interactive chat turns, then
+  background summaries, then test endpoints and scripts) and round-robin
+  between users within a priority, so one user's burst cannot starve others
+- a request whose estimated queue wait exceeds its deadline is rejected
+  right away with AdmissionRejected (HTTP 429 with Retry-After), and one that
+  is still queued at its deadline is rejected then
+
+The endpoint sets the caller's user and priority with admission_context();
+LLMClient.call_llm passes admission_controller.admit() to LLMTransport, which
+holds it around every provider request: each retry and hedge is admitted and
+charged separately.
+"""
+
+import os
+import time
+import logging
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Callable, Deque, Dict, Iterator, Mapping, Optional
+
+from .metrics import LLM_ADMISSION_REJECTIONS, LLM_ADMISSION_WAIT, LLM_IN_FLIGHT, LLM_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Admission priority; lower values are served first."""
+    INTERACTIVE = 0  # Chat turns a user is waiting for
+    BACKGROUND = 1  # Memory summaries
+    TEST = 2  # Test endpoints, scripts and anything without an admission context
+
+
+class AdmissionRejected(Exception):
+    """The request would wait longer than its deadline for an LLM slot."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after  # Seconds after which a retry is likely to be admitted
+
+
+@dataclass
+class AdmissionContext:
+    user_id: str = "anonymous"
+    priority: Priority = Priority.TEST
+
+
+_current_context: contextvars.ContextVar[AdmissionContext] = contextvars.ContextVar(
+    "llm_admission_context", default=AdmissionContext()
+)
+
+
+@contextmanager
+def admission_context(user_id: Optional[str] = None, priority: Priority = Priority.INTERACTIVE) -> Iterator[None]:
+    """
+    Set the user and priority of the LLM calls made inside the block.
+
+    Context variables are copied into asyncio.to_thread workers, so set this in
+    the endpoint around the call that processes the turn.
+    """
+    token = _current_context.set(AdmissionContext(user_id or "anonymous", priority))
+    try:
+        yield
+    finally:
+        _current_context.reset(token)
+
+
+def current_admission_context() -> AdmissionContext:
+    return _current_context.get()
+
+
+class TokenBucket:
+    """Continuously refilling bucket; a capacity of 0 means unlimited."""
+
+    def __init__(self, capacity: float = 0.0, per_seconds: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            capacity: Amount available per per_seconds (0 = unlimited)
+            per_seconds: Refill period of the full capacity
+            clock: Time source (tests)
+        """
+        self.capacity = float(capacity)
+        self.per_seconds = per_seconds
+        self._clock = clock
+        self.level = float(capacity)
+        self._updated_at = clock()
+
+    @property
+    def limited(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        if self.limited:
+            rate = self.capacity / self.per_seconds
+            self.level = min(self.capacity, self.level + (now - self._updated_at) * rate)
+        self._updated_at = now
+
+    def _clamp(self, amount: float) -> float:
+        # A request larger than the whole bucket would never fit
+        return min(amount, self.capacity)
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount is available."""
+        if not self.limited:
+            return 0.0
+        self._refill()
+        missing = self._clamp(amount) - self.level
+        return max(0.0, missing * self.per_seconds / self.capacity)
+
+    def try_consume(self, amount: float) -> bool:
+        if not self.limited:
+            return True
+        self._refill()
+        amount = self._clamp(amount)
+        if self.level < amount:
+            return False
+        self.level -= amount
+        return True
+
+    def update(self, limit: Optional[float] = None, remaining: Optional[float] = None) -> None:
+        """Adopt the provider's limit and remaining allowance."""
+        self._refill()
+        if limit:
+            if not self.limited:
+                self.level = float(limit)
+            self.capacity = float(limit)
+        if remaining is not None and self.limited:
+            self.level = min(self.level, float(remaining), self.capacity)
+
+
+@dataclass
+class _Waiter:
+    user_id: str
+    priority: Priority
+    tokens: float
+    enqueued_at: float
+    granted: bool = False
+
+
+@dataclass
+class Ticket:
+    """An admitted request; pass back to release()."""
+    priority: Priority
+    tokens: float
+    waited: float
+    released: bool = field(default=False, repr=False)
+
+
+class AdmissionController:
+    """Concurrency limit, rate-limit token buckets and per-user fair queues for LLM calls."""
+
+    def __init__(self, max_concurrency: int = 8, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 max_queue_wait: float = 20.0, enabled: bool = True, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_concurrency: Requests in flight at once (0 = unlimited)
+            requests_per_minute: Initial request rate limit (0 = until the provider reports one)
+            tokens_per_minute: Initial token rate limit (0 = until the provider reports one)
+            max_queue_wait: Default deadline in seconds for waiting in the queue
+            enabled: If False, admit() does nothing
+            clock: Time source (tests)
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue_wait = max_queue_wait
+        self.enabled = enabled
+        self.requests = TokenBucket(requests_per_minute, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock)
+        self._clock = clock
+        self._active = 0
+        # priority -> user -> FIFO of waiters; user order rotates for round-robin
+        self._queues: Dict[Priority, "OrderedDict[str, Deque[_Waiter]]"] = {p: OrderedDict() for p in Priority}
+        self._cond = threading.Condition()
+        # Smoothed duration of admitted requests, for the wait estimate
+        self._avg_request_seconds = 2.0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Controller configured from LLM_MAX_CONCURRENCY, LLM_RATE_LIMIT_* and LLM_ADMISSION_*."""
+        return cls(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            requests_per_minute=float(os.getenv("LLM_RATE_LIMIT_RPM", "0")),
+            tokens_per_minute=float(os.getenv("LLM_RATE_LIMIT_TPM", "0")),
+            max_queue_wait=float(os.getenv("LLM_ADMISSION_MAX_WAIT", "20")),
+            enabled=os.getenv("LLM_ADMISSION_ENABLED", "True").lower() == "true",
+        )
+
+    @contextmanager
+    def admit(self, tokens: float, priority: Optional[Priority] = None, user_id: Optional[str] = None,
+              deadline: Optional[float] = None) -> Iterator[Optional[Ticket]]:
+        """
+        Hold an LLM slot for the duration of the block.
+
+        Args:
+            tokens: Estimated tokens of the request (prompt + max_tokens)
+            priority: Overrides the admission context's priority
+            user_id: Overrides the admission context's user
+            deadline: Longest acceptable queue wait in seconds (default max_queue_wait)
+
+        Raises:
+            AdmissionRejected: The wait would exceed, or exceeded, the deadline
+        """
+        if not self.enabled:
+            yield None
+            return
+        ticket = self.acquire(tokens, priority, user_id, deadline)
+        started = time.perf_counter()
+        try:
+            yield ticket
+        finally:
+            self.release(ticket, time.perf_counter() - started)
+
+    def acquire(self, tokens: float, priority: Optional[Priority] = None, user_id: Optional[str] = None,
+                deadline: Optional[float] = None) -> Ticket:
+        context = current_admission_context()
+        priority = Priority(context.priority if priority is None else priority)
+        user_id = user_id or context.user_id
+        deadline = self.max_queue_wait if deadline is None else deadline
+
+        with self._cond:
+            now = self._clock()
+            waiter = _Waiter(user_id, priority, tokens, now)
+            self._queues[priority].setdefault(user_id, deque()).append(waiter)
+            self._dispatch()
+            if not waiter.granted:
+                estimate = self._estimate_wait(waiter)
+                if estimate > deadline:
+                    self._remove(waiter)
+                    self._reject(priority, "queue_full", estimate)
+            while not waiter.granted:
+                remaining = deadline - (self._clock() - now)
+                if remaining <= 0:
+                    self._remove(waiter)
+                    self._reject(priority, "deadline", self._estimate_wait(waiter))
+                # Wake up for releases, and periodically for bucket refills
+                self._cond.wait(min(remaining, 0.05))
+                self._dispatch()
+            self._update_depth()
+
+        waited = self._clock() - now
+        LLM_ADMISSION_WAIT.observe(waited, priority=priority.name.lower())
+        return Ticket(priority, tokens, waited)
+
+    def release(self, ticket: Ticket, duration: Optional[float] = None) -> None:
+        with self._cond:
+            if ticket.released:
+                return
+            ticket.released = True
+            self._active -= 1
+            if duration is not None:
+                self._avg_request_seconds = 0.9 * self._avg_request_seconds + 0.1 * duration
+            LLM_IN_FLIGHT.set(self._active)
+            self._dispatch()
+            self._cond.notify_all()
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Follow the provider's x-ratelimit-* response headers."""
+
+        def number(name: str) -> Optional[float]:
+            try:
+                return float(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        with self._cond:
+            self.requests.update(number("x-ratelimit-limit-requests"), number("x-ratelimit-remaining-requests"))
+            self.tokens.update(number("x-ratelimit-limit-tokens"), number("x-ratelimit-remaining-tokens"))
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            return {
+                "in_flight": self._active,
+                "queued": {p.name.lower(): sum(len(q) for q in self._queues[p].values()) for p in Priority},
+                "requests_available": self.requests.level if self.requests.limited else None,
+                "tokens_available": self.tokens.level if self.tokens.limited else None,
+            }
+
+    # Everything below runs with self._cond held
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        for priority in Priority:
+            users = self._queues[priority]
+            if users:
+                return users[next(iter(users))][0]
+        return None
+
+    def _dispatch(self) -> None:
+        """Admit waiters in priority / round-robin order while there is capacity."""
+        while not self.max_concurrency or self._active < self.max_concurrency:
+            waiter = self._next_waiter()
+            if waiter is None:
+                break
+            if self.requests.wait_time(1) > 0 or self.tokens.wait_time(waiter.tokens) > 0:
+                break  # Head of the line waits for the buckets to refill
+            self.requests.try_consume(1)
+            self.tokens.try_consume(waiter.tokens)
+            users = self._queues[waiter.priority]
+            queue = users.pop(waiter.user_id)
+            queue.popleft()
+            if queue:
+                users[waiter.user_id] = queue  # Back of the round-robin
+            waiter.granted = True
+            self._active += 1
+            LLM_IN_FLIGHT.set(self._active)
+            self._cond.notify_all()
+        self._update_depth()
+
+    def _remove(self, waiter: _Waiter) -> None:
+        users = self._queues[waiter.priority]
+        queue = users.get(waiter.user_id)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del users[waiter.user_id]
+        self._update_depth()
+
+    def _estimate_wait(self, waiter: _Waiter) -> float:
+        """Rough queue wait: rate-limit refill for everything ahead plus concurrency turns."""
+        ahead = [w for p in Priority if p <= waiter.priority
+                 for queue in self._queues[p].values() for w in queue if w is not waiter]
+        rate_wait = max(self.requests.wait_time(len(ahead) + 1),
+                        self.tokens.wait_time(sum(w.tokens for w in ahead) + waiter.tokens))
+        concurrency_wait = 0.0
+        if self.max_concurrency and self._active + len(ahead) >= self.max_concurrency:
+            turns = (self._active + len(ahead)) // self.max_concurrency
+            concurrency_wait = turns * self._avg_request_seconds
+        return max(rate_wait, concurrency_wait)
+
+    def _reject(self, priority: Priority, reason: str, retry_after: float) -> None:
+        LLM_ADMISSION_REJECTIONS.inc(priority=priority.name.lower(), reason=reason)
+        logger.warning(f"LLM request rejected ({reason}), estimated wait {retry_after:.1f}s")
+        raise AdmissionRejected(f"LLM capacity exhausted, retry in {retry_after:.0f}s", retry_after=retry_after)
+
+    def _update_depth(self) -> None:
+        for priority in Priority:
+            LLM_QUEUE_DEPTH.set(sum(len(q) for q in self._queues[priority].values()),
+                                priority=priority.name.lower())
+
+
+admission_controller = AdmissionController.from_env()
@@ -4,9 +4,26 @@ from .root_graph import Node, root_graph
 from .prompting import generate_llm_prompt
 from .llm_client import llm_client
 from .state_manager import StateManager
+from .output_schema import node_json_schema
+from .metrics import instrument_turn, accumulate_session_usage
 
 logger = logging.getLogger(__name__)
 
+# Nodes after which the plan's retrieval inputs (goals, skills, passions) are known
+RAG_PREFETCH_NODES = {"improve_obstacles", "change_obstacles", "find_obstacles", "lost_skills"}
+
+def _get_settings():
+    """Import app settings lazily to avoid circular imports"""
+    try:
+        from mentor_ai.app.config import settings
+    except ImportError:
+        # Fallback for local testing
+        import sys
+        import os
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+        from app.config import settings
+    return settings
+
 class GraphProcessor:
     """Processes graph nodes by coordinating LLM calls and state updates"""
     
@@ -34,39 +51,57 @@ class GraphProcessor:
             node = root_graph[node_id]
             logger.info(f"Processing node: {node_id}")
             
-            # Check if node has an executor (non-LLM node)
-            if node.executor:
-                logger.info(f"Executing non-LLM node: {node_id}")
-                llm_data = node.executor(user_message, current_state)
-                logger.debug(f"Executor result: {llm_data}")
-            else:
-                # Generate prompt for LLM
-                prompt = generate_llm_prompt(node, current_state, user_message)
-                logger.debug(f"Generated prompt: {prompt[:200]}...")
+            with instrument_turn(node_id, current_state.get("session_id")) as turn:
+                # Check if node has an executor (non-LLM node)
+                if node.executor:
+                    logger.info(f"Executing non-LLM node: {node_id}")
+                    with turn.stage("executor"):
+                        llm_data = node.executor(user_message, current_state)
+                    logger.debug(f"Executor result: {llm_data}")
+                else:
+                    # Pick up the speculative retrieval started during onboarding
+                    if node.node_id == "generate_plan":
+                        with turn.stage("prefetch_wait"):
+                            current_state = GraphProcessor._attach_prefetched_chunks(current_state)
+                    
+                    # Generate prompt for LLM
+                    with turn.stage("prompt_build"):
+                        prompt = generate_llm_prompt(node, current_state, user_message)
+                    logger.debug(f"Generated prompt: {prompt[:200]}...")
+                    
+                    # Call LLM
+                    with turn.stage("llm_call"):
+                        llm_response = llm_client.call_llm(prompt, cache_ttl=node.cache_ttl, node_id=node.node_id,
+                                                          json_schema=node_json_schema(node))
+                    logger.debug(f"LLM response: {llm_response}")
+                    
+                    # Parse LLM response
+                    with turn.stage("parse"):
+                        llm_data = StateManager.parse_llm_response(llm_response, node)
+                    logger.debug(f"Parsed LLM data: {llm_data}")
                 
-                # Call LLM
-                llm_response = llm_client.call_llm(prompt)
-                logger.debug(f"LLM response: {llm_response}")
+                # Update state with memory management (may call the LLM for summaries)
+                with turn.stage("state_update"):
+                    updated_state = StateManager.update_state_with_memory(
+                        current_state, llm_data, node, 
+                        user_message=user_message, 
+                        assistant_reply=llm_data.get("reply", "")
+                    )
+                logger.info(f"State updated with memory for session: {current_state.get('session_id')}")
                 
-                # Parse LLM response
-                llm_data = StateManager.parse_llm_response(llm_response, node)
-                logger.debug(f"Parsed LLM data: {llm_data}")
-            
-            # Update state with memory management
-            updated_state = StateManager.update_state_with_memory(
-                current_state, llm_data, node, 
-                user_message=user_message, 
-                assistant_reply=llm_data.get("reply", "")
-            )
-            logger.info(f"State updated with memory for session: {current_state.get('session_id')}")
-            
-            # Log memory statistics for monitoring
-            memory_stats = StateManager.get_memory_stats(updated_state)
-            logger.info(f"Memory stats: {memory_stats}")
-            
-            # Determine next node
-            next_node = StateManager.get_next_node(llm_data, node, updated_state)
-            logger.info(f"Next node: {next_node}")
+                # Log memory statistics for monitoring
+                memory_stats = StateManager.get_memory_stats(updated_state)
+                logger.info(f"Memory stats: {memory_stats}")
+                
+                # Determine next node
+                next_node = StateManager.get_next_node(llm_data, node, updated_state)
+                turn.span.set_attribute("graph.next_node", next_node)
+                logger.info(f"Next node: {next_node}")
+                
+                GraphProcessor._schedule_retrieval_prefetch(node, updated_state, next_node)
+                
+                usage = accumulate_session_usage(updated_state, turn.usage)
+                logger.info(f"Turn usage for node {node_id}: {turn.usage.to_dict()}, session total: {usage}")
             
             return llm_data["reply"], updated_state, next_node
             
@@ -105,49 +140,68 @@ class GraphProcessor:
             node = root_graph[node_id]
             logger.info(f"Processing node: {node_id} (memory: {use_memory})")
             
-            # Check if node has an executor (non-LLM node)
-            if node.executor:
-                logger.info(f"Executing non-LLM node: {node_id}")
-                llm_data = node.executor(user_message, current_state)
-                logger.debug(f"Executor result: {llm_data}")
-            else:
-                # Generate prompt for LLM (with or without memory optimization)
+            with instrument_turn(node_id, current_state.get("session_id")) as turn:
+                # Check if node has an executor (non-LLM node)
+                if node.executor:
+                    logger.info(f"Executing non-LLM node: {node_id}")
+                    with turn.stage("executor"):
+                        llm_data = node.executor(user_message, current_state)
+                    logger.debug(f"Executor result: {llm_data}")
+                else:
+                    # Pick up the speculative retrieval started during onboarding
+                    if node.node_id == "generate_plan":
+                        with turn.stage("prefetch_wait"):
+                            current_state = GraphProcessor._attach_prefetched_chunks(current_state)
+                    
+                    # Generate prompt for LLM (with or without memory optimization)
+                    with turn.stage("prompt_build"):
+                        if use_memory:
+                            prompt = generate_llm_prompt(node, current_state, user_message)
+                        else:
+                            # Use fallback method for backward compatibility
+                            from .prompting import generate_llm_prompt_with_history
+                            prompt = generate_llm_prompt_with_history(node, current_state, user_message)
+                    
+                    logger.debug(f"Generated prompt: {prompt[:200]}...")
+                    
+                    # Call LLM
+                    with turn.stage("llm_call"):
+                        llm_response = llm_client.call_llm(prompt, cache_ttl=node.cache_ttl, node_id=node.node_id,
+                                                          json_schema=node_json_schema(node))
+                    logger.debug(f"LLM response: {llm_response}")
+                    
+                    # Parse LLM response
+                    with turn.stage("parse"):
+                        llm_data = StateManager.parse_llm_response(llm_response, node)
+                    logger.debug(f"Parsed LLM data: {llm_data}")
+                
+                # Update state (with or without memory management)
                 if use_memory:
-                    prompt = generate_llm_prompt(node, current_state, user_message)
+                    with turn.stage("state_update"):
+                        updated_state = StateManager.update_state_with_memory(
+                            current_state, llm_data, node, 
+                            user_message=user_message, 
+                            assistant_reply=llm_data.get("reply", "")
+                        )
+                    logger.info(f"State updated with memory for session: {current_state.get('session_id')}")
+                    
+                    # Log memory statistics for monitoring
+                    memory_stats = StateManager.get_memory_stats(updated_state)
+                    logger.info(f"Memory stats: {memory_stats}")
                 else:
-                    # Use fallback method for backward compatibility
-                    from .prompting import generate_llm_prompt_with_history
-                    prompt = generate_llm_prompt_with_history(node, current_state, user_message)
+                    with turn.stage("state_update"):
+                        updated_state = StateManager.update_state(current_state, llm_data, node)
+                    logger.info(f"State updated without memory for session: {current_state.get('session_id')}")
                 
-                logger.debug(f"Generated prompt: {prompt[:200]}...")
+                # Determine next node
+                next_node = StateManager.get_next_node(llm_data, node, updated_state)
+                turn.span.set_attribute("graph.next_node", next_node)
+                logger.info(f"Next node: {next_node}")
                 
-                # Call LLM
-                llm_response = llm_client.call_llm(prompt)
-                logger.debug(f"LLM response: {llm_response}")
+                GraphProcessor._schedule_retrieval_prefetch(node, updated_state, next_node)
                 
-                # Parse LLM response
-                llm_data = StateManager.parse_llm_response(llm_response, node)
-                logger.debug(f"Parsed LLM data: {llm_data}")
-            
-            # Update state (with or without memory management)
-            if use_memory:
-                updated_state = StateManager.update_state_with_memory(
-                    current_state, llm_data, node, 
-                    user_message=user_message, 
-                    assistant_reply=llm_data.get("reply", "")
-                )
-                logger.info(f"State updated with memory for session: {current_state.get('session_id')}")
-                
-                # Log memory statistics for monitoring
-                memory_stats = StateManager.get_memory_stats(updated_state)
-                logger.info(f"Memory stats: {memory_stats}")
-            else:
-                updated_state = StateManager.update_state(current_state, llm_data, node)
-                logger.info(f"State updated without memory for session: {current_state.get('session_id')}")
-            
-            # Determine next node
-            next_node = StateManager.get_next_node(llm_data, node, updated_state)
-            logger.info(f"Next node: {next_node}")
+                usage = accumulate_session_usage(updated_state, turn.usage)
+                logger.info(f"Turn usage for node {node_id}: {turn.usage.to_dict()}, session total: {usage}")
             
             return llm_data["reply"], updated_state, next_node
             
@@ -155,6 +209,60 @@ class GraphProcessor:
             logger.error(f"Error processing node {node_id}: {e}")
             raise
     
+    @staticmethod
+    def _schedule_retrieval_prefetch(node: Node, updated_state: Dict[str, Any], next_node: str) -> None:
+        """
+        Start RAG retrieval in the background once the onboarding goals are collected,
+        so that generate_plan does not wait for it on the critical path.
+        """
+        if node.node_id not in RAG_PREFETCH_NODES or next_node not in ("retrieve_reg", "generate_plan"):
+            return
+        
+        try:
+            settings = _get_settings()
+            if not (settings.REG_ENABLED and settings.RAG_PREFETCH_ENABLED):
+                return
+            
+            from ..modules.retrieval.prefetch import retrieval_prefetcher
+            retrieval_prefetcher.schedule(updated_state.get("session_id"), updated_state, settings.RAG_INDEX_PATH)
+        except Exception as e:
+            # Prefetch is an optimization only, never fail the turn because of it
+            logger.error(f"Failed to schedule RAG prefetch: {e}")
+    
+    @staticmethod
+    def _attach_prefetched_chunks(current_state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fill retrieved_chunks from the session's prefetched retrieval if not already present
+        
+        Args:
+            current_state: Current session state
+            
+        Returns:
+            State with retrieved_chunks set when a matching prefetch exists
+        """
+        if current_state.get("retrieved_chunks"):
+            return current_state
+        
+        try:
+            settings = _get_settings()
+            if not (settings.REG_ENABLED and settings.RAG_PREFETCH_ENABLED):
+                return current_state
+            
+            from ..modules.retrieval.prefetch import retrieval_prefetcher
+            session_id = current_state.get("session_id")
+            result = retrieval_prefetcher.get(session_id, current_state, timeout=settings.RAG_PREFETCH_WAIT_SECONDS)
+            if result is None:
+                return current_state
+            
+            retrieval_prefetcher.discard(session_id)
+            state = current_state.copy()
+            state["retrieved_chunks"] = result.to_snippets(max_chars=settings.MAX_CONTEXT_CHARS)
+            logger.info(f"Attached {len(state['retrieved_chunks'])} prefetched snippets for session {session_id}")
+            return state
+        except Exception as e:
+            logger.error(f"Failed to attach prefetched RAG chunks: {e}")
+            return current_state
+    
     @staticmethod
     def get_memory_stats(current_state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -0,0 +1,155 @@
+"""
+Exact-match LLM response cache with single-flight deduplication.
+
+Responses are keyed by a hash of the model, the request parameters and the
+prompt. Caching is opt-in per node (Node.cache_ttl); single-flight applies to
+every call, so concurrent identical requests (double submissions, client
+retries while the first call is still running) share one completion.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(model: str, params: Dict[str, Any], prompt: str) -> str:
+    """
+    Cache key of one completion request.
+
+    Args:
+        model: Model name
+        params: Every other request parameter that affects the output
+            (temperature, max_tokens, system prompt, ...)
+        prompt: User prompt
+    """
+    params_hash = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return f"{model}:{params_hash[:16]}:{prompt_hash}"
+
+
+class ResponseCache(ABC):
+    """Storage for cached completions."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Cached response, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float) -> None:
+        """Store a response for ttl seconds."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop all entries."""
+
+
+class InMemoryResponseCache(ResponseCache):
+    """Thread-safe LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers wait and share its outcome."""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], str]) -> Tuple[str, bool]:
+        """
+        Call fn unless an identical call is in flight.
+
+        Returns:
+            (result, shared) where shared is True if another caller's result was reused
+
+        Raises:
+            Whatever fn raised, in the leader and in every waiter
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+def create_response_cache(backend: Optional[str] = None) -> Optional[ResponseCache]:
+    """
+    Build the cache named by LLM_CACHE_BACKEND ("memory" or "none").
+
+    Args:
+        backend: Overrides LLM_CACHE_BACKEND
+    """
+    backend = (backend or os.getenv("LLM_CACHE_BACKEND", "memory")).lower()
+    if backend in ("", "none"):
+        return None
+    if backend == "memory":
+        return InMemoryResponseCache(max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")))
+    raise ValueError(f"Unknown LLM cache backend: {backend}. Expected 'memory' or 'none'")
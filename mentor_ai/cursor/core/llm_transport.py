@@ -0,0 +1,363 @@
+"""
+Resilient transport for LLM requests: retries, hedging and a circuit breaker.
+
+LLMTransport.call runs one completion function with:
+
+- retries with full-jitter exponential backoff for retryable errors
+  (timeouts, connection errors, 408/409/429/5xx); a Retry-After header on
+  429 raises the delay, up to max_delay
+- optional hedging: if an attempt takes longer than the node's recent p95
+  latency, a second identical request is sent and whichever returns first
+  wins (the slower one is left to finish and its result is discarded)
+- a circuit breaker that fails fast with LLMUnavailableError after
+  consecutive provider failures, and lets one probe through after the
+  recovery timeout
+- admission per provider request: with an admit hook, every attempt and
+  every hedge holds its own admission slot (and rate-limit tokens) while it
+  runs; backoff sleeps hold none. A hedge is only sent if a slot is free
+  right away
+
+The OpenAI client's own retries are disabled so that attempts are not
+multiplied (see LLMClient._ensure_initialized).
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, ContextManager, Deque, Dict, Optional, TypeVar
+
+import numpy as np
+
+from .admission import AdmissionRejected
+from .metrics import LLM_CIRCUIT_REJECTIONS, LLM_CIRCUIT_STATE, record_llm_hedge, record_llm_retry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# admit(hedged) -> context manager held around one provider request
+AdmitHook = Callable[[bool], ContextManager]
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class LLMUnavailableError(ValueError):
+    """The LLM provider could not be reached: circuit open or retries exhausted."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after  # Seconds until a retry is worthwhile
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for timeouts, connection errors, 408/409/429 and 5xx responses."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    try:
+        import openai
+    except ImportError:
+        return False
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def is_provider_response(error: BaseException) -> bool:
+    """True if the error is an HTTP error response from the provider (as opposed to a local error)."""
+    try:
+        import openai
+    except ImportError:
+        return False
+    return isinstance(error, openai.APIStatusError)
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Retry-After header of an HTTP error response, in seconds."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """Attempts and backoff for retryable errors."""
+    max_attempts: int = 3
+    base_delay: float = 0.5  # Seconds; attempt n waits up to base_delay * 2 ** (n - 1)
+    max_delay: float = 8.0
+
+    def delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Full-jitter backoff before the attempt after `attempt` (1-based)."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        retry_after = retry_after_seconds(error) if error is not None else None
+        if retry_after is not None:
+            delay = max(delay, min(self.max_delay, retry_after))
+        return delay
+
+
+@dataclass
+class HedgePolicy:
+    """When to send a second request for a slow attempt."""
+    enabled: bool = False
+    quantile: float = 95.0  # Latency percentile after which the hedge is sent
+    min_samples: int = 20  # Observed latencies needed before hedging a key
+    min_delay: float = 1.0  # Never hedge earlier than this (seconds)
+    window: int = 200
+
+
+class LatencyTracker:
+    """Recent successful attempt latencies per key (node)."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, key: str, q: float, min_samples: int) -> Optional[float]:
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+        if len(samples) < min_samples:
+            return None
+        return float(np.percentile(samples, q))
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open probe after recovery_timeout."""
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit (0 = never open)
+            recovery_timeout: Seconds the circuit stays open before a probe is allowed
+            clock: Time source (tests)
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        LLM_CIRCUIT_STATE.set(0)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            logger.warning(f"LLM circuit breaker {self._state} -> {state}")
+        self._state = state
+        LLM_CIRCUIT_STATE.set(self._STATE_VALUES[state])
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; counts a rejection if not."""
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+                self._set_state(self.HALF_OPEN)
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+        LLM_CIRCUIT_REJECTIONS.inc()
+        return False
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through."""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self.recovery_timeout - (self._clock() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            self._set_state(self.CLOSED)
+
+    def cancel_probe(self) -> None:
+        """The allowed request was never sent (not admitted); let another probe through."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or (
+                    self.failure_threshold and self._failures >= self.failure_threshold):
+                self._opened_at = self._clock()
+                self._set_state(self.OPEN)
+
+
+class LLMTransport:
+    """Runs LLM requests with retries, hedging and a circuit breaker."""
+
+    def __init__(self, retry: Optional[RetryPolicy] = None, hedge: Optional[HedgePolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None, sleep: Callable[[float], None] = time.sleep):
+        self.retry = retry or RetryPolicy()
+        self.hedge = hedge or HedgePolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = LatencyTracker(self.hedge.window)
+        self._sleep = sleep
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LLMTransport":
+        """Transport configured from the LLM_* retry, hedging and circuit breaker settings."""
+        return cls(
+            retry=RetryPolicy(
+                max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "3")),
+                base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")),
+                max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "8.0")),
+            ),
+            hedge=HedgePolicy(
+                enabled=os.getenv("LLM_HEDGE_ENABLED", "False").lower() == "true",
+                quantile=float(os.getenv("LLM_HEDGE_QUANTILE", "95")),
+                min_delay=float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0")),
+            ),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5")),
+                recovery_timeout=float(os.getenv("LLM_CIRCUIT_RECOVERY_SECONDS", "30")),
+            ),
+        )
+
+    def call(self, fn: Callable[[], T], key: Optional[str] = None, admit: Optional[AdmitHook] = None) -> T:
+        """
+        Run fn until it succeeds, a non-retryable error occurs or attempts run out.
+
+        Args:
+            fn: One complete request (raises the client's exceptions)
+            key: Latency key for hedging, usually the node id
+            admit: Admission hook held around every request sent (see AdmitHook);
+                called with hedged=True for hedges
+
+        Raises:
+            LLMUnavailableError: Circuit open, or retryable errors on every attempt
+            AdmissionRejected: An attempt was not admitted in time
+            Exception: The first non-retryable error raised by fn
+        """
+        key = key or "default"
+        for attempt in range(1, self.retry.max_attempts + 1):
+            if not self.breaker.allow():
+                retry_after = self.breaker.retry_after()
+                raise LLMUnavailableError(
+                    f"LLM provider circuit is open, retry in {retry_after:.0f}s", retry_after=retry_after
+                )
+            try:
+                result = self._attempt(fn, key, admit)
+            except AdmissionRejected:
+                # Never reached the provider
+                self.breaker.cancel_probe()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    if is_provider_response(e):
+                        # The provider answered (e.g. 400); not a reason to open the circuit
+                        self.breaker.record_success()
+                    else:
+                        # Local error (e.g. missing API key): says nothing about the provider
+                        self.breaker.cancel_probe()
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.retry.max_attempts:
+                    raise LLMUnavailableError(
+                        f"LLM provider unavailable after {attempt} attempts: {e}",
+                        retry_after=self.breaker.retry_after() or self.retry.base_delay,
+                    ) from e
+                delay = self.retry.delay(attempt, e)
+                logger.warning(f"LLM attempt {attempt} failed ({type(e).__name__}: {e}), retrying in {delay:.2f}s")
+                record_llm_retry(type(e).__name__)
+                self._sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+        raise AssertionError("unreachable")
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds after which a hedge is sent for key, or None to not hedge."""
+        if not self.hedge.enabled:
+            return None
+        latency = self.latencies.percentile(key, self.hedge.quantile, self.hedge.min_samples)
+        if latency is None:
+            return None
+        return max(self.hedge.min_delay, latency)
+
+    def _timed(self, fn: Callable[[], T], key: str, admit: Optional[AdmitHook] = None, hedged: bool = False) -> T:
+        if admit is None:
+            started = time.perf_counter()
+            result = fn()
+        else:
+            with admit(hedged):
+                # Latency of the request itself, without the admission wait
+                started = time.perf_counter()
+                result = fn()
+        self.latencies.observe(key, time.perf_counter() - started)
+        return result
+
+    def _submit(self, fn: Callable[[], T], key: str, admit: Optional[AdmitHook] = None, hedged: bool = False):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+        # Each attempt runs in its own copy of the caller's context (turn metrics, spans, admission)
+        return self._executor.submit(contextvars.copy_context().run, self._timed, fn, key, admit, hedged)
+
+    def _attempt(self, fn: Callable[[], T], key: str, admit: Optional[AdmitHook] = None) -> T:
+        delay = self.hedge_delay(key)
+        if delay is None:
+            return self._timed(fn, key, admit)
+
+        primary = self._submit(fn, key, admit)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        logger.info(f"LLM attempt for {key} slower than {delay:.2f}s, sending hedged request")
+        record_llm_hedge("sent")
+        hedged = self._submit(fn, key, admit, hedged=True)
+        pending = {primary, hedged}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    record_llm_hedge("won" if future is hedged else "lost")
+                    return future.result()
+                if future is hedged and isinstance(future.exception(), AdmissionRejected):
+                    # No free slot for the hedge: keep waiting for the original
+                    record_llm_hedge("not_admitted")
+                    continue
+                error = future.exception()
+        raise error
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
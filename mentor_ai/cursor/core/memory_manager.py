@@ -2,6 +2,8 @@ import logging
 from typing import Dict, Any, List
 from datetime import datetime, timezone
 from .llm_client import llm_client
+from .model_routing import SUMMARY_NODE
+from .session_state import SessionState
 
 logger = logging.getLogger(__name__)
 
@@ -14,47 +16,42 @@ class MemoryManager:
         Update prompt_context with new message while preserving history
         
         Args:
-            state: Current session state
+            state: Current session state (not modified)
             new_message: New message to add ({"role": "user"|"assistant", "content": str})
             
         Returns:
             Updated state with new prompt_context
         """
-        updated_state = state.copy()
-        
-        # Initialize prompt_context if not exists
-        if "prompt_context" not in updated_state:
-            updated_state["prompt_context"] = {
-                "running_summary": None,
-                "recent_messages": [],
-                "important_facts": [],
-                "weekly_summaries": {}
-            }
-        
-        # Add message to recent_messages
-        recent = updated_state["prompt_context"].get("recent_messages", [])
-        recent.append(new_message)
+        updated_state = SessionState.copy_of(state)
+        MemoryManager.record_message(updated_state, new_message)
+        return updated_state
+    
+    @staticmethod
+    def record_message(state: SessionState, new_message: dict) -> None:
+        """
+        Add a message to prompt_context in place (see update_prompt_context)
         
-        # Keep only last 5 messages
+        Args:
+            state: Session state to update
+            new_message: New message to add ({"role": "user"|"assistant", "content": str})
+        """
+        prompt_context = state.mutable("prompt_context", MemoryManager.initialize_prompt_context)
+        
+        # Add message to recent_messages, keep only last 5 messages
+        recent = prompt_context.setdefault("recent_messages", [])
+        recent.append(new_message)
         if len(recent) > 5:
-            recent = recent[-5:]
+            del recent[:-5]
         
         # Increment message counter
-        message_count = updated_state.get("message_count", 0) + 1
+        message_count = state.get("message_count", 0) + 1
         
         # Update running summary every 20 messages
         if message_count % 20 == 0:
-            running_summary = MemoryManager._create_running_summary(
-                updated_state.get("history", [])
-            )
-            updated_state["prompt_context"]["running_summary"] = running_summary
-            logger.info(f"Updated running summary for session {updated_state.get('session_id', 'unknown')}")
-        
-        # Update prompt_context
-        updated_state["prompt_context"]["recent_messages"] = recent
-        updated_state["message_count"] = message_count
+            prompt_context["running_summary"] = MemoryManager._create_running_summary(state.get("history", []))
+            logger.info(f"Updated running summary for session {state.get('session_id', 'unknown')}")
         
-        return updated_state
+        state["message_count"] = message_count
     
     @staticmethod
     def evaluate_important_facts(state: Dict[str, Any], message: dict) -> List[dict]:
@@ -104,7 +101,7 @@ class MemoryManager:
         
         try:
             # Try to create summary using LLM
-            summary_response = llm_client.call_llm(summary_prompt)
+            summary_response = llm_client.call_llm(summary_prompt, node_id=SUMMARY_NODE)
             summary = summary_response.strip()
             logger.info(f"Created weekly summary for week {week_number}, session {session_id}")
         except Exception as e:
@@ -160,7 +157,7 @@ class MemoryManager:
         """
         
         try:
-            summary_response = llm_client.call_llm(summary_prompt)
+            summary_response = llm_client.call_llm(summary_prompt, node_id=SUMMARY_NODE)
             return summary_response.strip()
         except Exception as e:
             logger.error(f"Failed to create running summary: {e}")
@@ -281,32 +278,37 @@ class MemoryManager:
         Add important fact to prompt_context
         
         Args:
-            state: Current session state
+            state: Current session state (not modified)
             fact: Fact to add ({"fact": str, "week": int, "importance_score": float})
             
         Returns:
             Updated state with new fact
         """
-        updated_state = state.copy()
+        updated_state = SessionState.copy_of(state)
+        MemoryManager.record_important_fact(updated_state, fact)
+        return updated_state
+    
+    @staticmethod
+    def record_important_fact(state: SessionState, fact: dict) -> None:
+        """
+        Add important fact to prompt_context in place (see add_important_fact)
         
-        # Initialize prompt_context if not exists
-        if "prompt_context" not in updated_state:
-            updated_state["prompt_context"] = MemoryManager.initialize_prompt_context()
+        Args:
+            state: Session state to update
+            fact: Fact to add ({"fact": str, "week": int, "importance_score": float})
+        """
+        prompt_context = state.mutable("prompt_context", MemoryManager.initialize_prompt_context)
         
         # Add fact with timestamp
-        fact_with_timestamp = {
+        facts = prompt_context.setdefault("important_facts", [])
+        facts.append({
             **fact,
             "timestamp": datetime.now(timezone.utc).isoformat()
-        }
-        
-        updated_state["prompt_context"]["important_facts"].append(fact_with_timestamp)
+        })
         
         # Keep only last 20 facts to prevent bloat
-        if len(updated_state["prompt_context"]["important_facts"]) > 20:
-            updated_state["prompt_context"]["important_facts"] = \
-                updated_state["prompt_context"]["important_facts"][-20:]
-        
-        return updated_state
+        if len(facts) > 20:
+            del facts[:-20]
     
     @staticmethod
     def get_memory_stats(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,437 @@
+"""
+Per-node instrumentation of chat turns, exported in the Prometheus text format.
+
+GraphProcessor wraps each turn in instrument_turn() and times its stages
+(prompt build, LLM call, parsing, state update); the chat endpoint adds the
+Mongo write. LLMClient reports response.usage through record_llm_usage(),
+which attributes tokens and cost to the node of the running turn and adds
+them to the turn's usage, which GraphProcessor accumulates into the
+session's state["usage"]. Turns and stages are also traced as spans (see
+tracing.py), with the node id and token usage as span attributes.
+
+Metrics (rendered by GET /metrics):
+    mentor_node_stage_seconds{node,stage}        histogram
+    mentor_node_turns_total{node,status}         counter
+    mentor_llm_calls_total{node,model}           counter
+    mentor_llm_tokens_total{node,model,type}     counter (type: prompt | completion)
+    mentor_llm_cost_usd_total{node,model}        counter
+    mentor_llm_cache_total{node,result}          counter (result: hit | miss | shared)
+    mentor_llm_truncations_total{node,model}     counter (finish_reason "length")
+    mentor_llm_output_validation_total{node,result} counter (result: ok | repaired | fallback)
+    mentor_llm_retries_total{node,reason}        counter (reason: exception type)
+    mentor_llm_hedges_total{node,result}         counter (result: sent | won | lost)
+    mentor_llm_circuit_state                     gauge (0 closed, 1 half-open, 2 open)
+    mentor_llm_circuit_rejections_total          counter (calls failed fast while open)
+    mentor_llm_admission_wait_seconds{priority}  histogram of queue wait before an LLM call
+    mentor_llm_admission_rejections_total{priority,reason} counter (reason: queue_full | deadline)
+    mentor_llm_queue_depth{priority}             gauge
+    mentor_llm_in_flight                         gauge
+    mentor_session_cost_usd                      histogram of session totals after each turn
+"""
+
+import os
+import math
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .tracing import NOOP_SPAN, Span, tracer
+
+# Seconds; LLM calls dominate, so the upper buckets go to a minute
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COST_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# USD per 1K (prompt, completion) tokens; LLM_PRICE_PROMPT_PER_1K / LLM_PRICE_COMPLETION_PER_1K override
+MODEL_PRICES_PER_1K: Dict[str, Tuple[float, float]] = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+# Label value used when something is recorded outside of a graph turn
+NO_NODE = "none"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing value per label combination."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be increased")
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge:
+    """Value that can go up and down, per label combination."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Bucketed observations with sum and count per label combination."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> (per-bucket counts, sum)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._series[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            counts, _ = self._series.get(key, ([0], 0.0))
+            return sum(counts)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together."""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Drop all recorded values (tests)."""
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+registry = MetricsRegistry()
+
+NODE_STAGE_SECONDS = registry.histogram(
+    "mentor_node_stage_seconds", "Time spent in each stage of a chat turn", ["node", "stage"]
+)
+NODE_TURNS = registry.counter("mentor_node_turns_total", "Chat turns processed per node", ["node", "status"])
+LLM_CALLS = registry.counter("mentor_llm_calls_total", "LLM completions requested", ["node", "model"])
+LLM_TOKENS = registry.counter("mentor_llm_tokens_total", "LLM tokens used", ["node", "model", "type"])
+LLM_COST = registry.counter("mentor_llm_cost_usd_total", "Estimated LLM cost in USD", ["node", "model"])
+LLM_CACHE = registry.counter(
+    "mentor_llm_cache_total", "LLM calls by response cache outcome (hit, miss, shared in-flight)", ["node", "result"]
+)
+LLM_TRUNCATIONS = registry.counter(
+    "mentor_llm_truncations_total", "LLM completions cut off at max_tokens", ["node", "model"]
+)
+LLM_OUTPUT_VALIDATION = registry.counter(
+    "mentor_llm_output_validation_total", "LLM responses by schema validation outcome", ["node", "result"]
+)
+LLM_RETRIES = registry.counter("mentor_llm_retries_total", "LLM attempts retried after an error", ["node", "reason"])
+LLM_HEDGES = registry.counter(
+    "mentor_llm_hedges_total", "Hedged LLM requests (sent, won or lost against the first attempt)", ["node", "result"]
+)
+LLM_CIRCUIT_STATE = registry.gauge("mentor_llm_circuit_state", "LLM circuit breaker state: 0 closed, 1 half-open, 2 open")
+LLM_CIRCUIT_REJECTIONS = registry.counter(
+    "mentor_llm_circuit_rejections_total", "LLM calls failed fast by the open circuit breaker"
+)
+LLM_ADMISSION_WAIT = registry.histogram(
+    "mentor_llm_admission_wait_seconds", "Time LLM calls waited for admission", ["priority"]
+)
+LLM_ADMISSION_REJECTIONS = registry.counter(
+    "mentor_llm_admission_rejections_total", "LLM calls rejected by admission control", ["priority", "reason"]
+)
+LLM_QUEUE_DEPTH = registry.gauge("mentor_llm_queue_depth", "LLM calls waiting for admission", ["priority"])
+LLM_IN_FLIGHT = registry.gauge("mentor_llm_in_flight", "LLM calls in flight")
+SESSION_COST = registry.histogram(
+    "mentor_session_cost_usd", "Accumulated LLM cost of a session after each turn", buckets=COST_BUCKETS
+)
+
+
+@dataclass
+class TurnUsage:
+    """LLM usage of one chat turn (node call plus any summaries it triggered)."""
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+class TurnMetrics:
+    """Stage timer and usage accumulator for one node turn."""
+
+    def __init__(self, node_id: str, span: Span = NOOP_SPAN):
+        self.node_id = node_id
+        self.usage = TurnUsage()
+        self.span = span
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Observe the duration of the enclosed block as stage `name`, in a child span."""
+        with tracer.start_span(f"graph.{name}", {"graph.node_id": self.node_id}), observe_stage(self.node_id, name):
+            yield
+
+
+_current_turn: contextvars.ContextVar[Optional[TurnMetrics]] = contextvars.ContextVar(
+    "mentor_current_turn", default=None
+)
+
+
+@contextmanager
+def observe_stage(node_id: str, stage: str) -> Iterator[None]:
+    """Time the enclosed block into mentor_node_stage_seconds{node, stage}."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        NODE_STAGE_SECONDS.observe(time.perf_counter() - started, node=node_id, stage=stage)
+
+
+@contextmanager
+def instrument_turn(node_id: str, session_id: Optional[str] = None) -> Iterator[TurnMetrics]:
+    """
+    Instrument one node turn: total duration, outcome and LLM usage.
+
+    Args:
+        node_id: Node being processed
+        session_id: Session the turn belongs to (span attribute only)
+
+    Yields:
+        TurnMetrics to time stages with and read the turn's usage from
+    """
+    with tracer.start_span("graph.node", {"graph.node_id": node_id, "session.id": session_id}) as span:
+        turn = TurnMetrics(node_id, span)
+        token = _current_turn.set(turn)
+        status = "error"
+        try:
+            with observe_stage(node_id, "total"):
+                yield turn
+            status = "ok"
+        finally:
+            _current_turn.reset(token)
+            NODE_TURNS.inc(node=node_id, status=status)
+            span.set_attributes({
+                "llm.calls": turn.usage.llm_calls,
+                "llm.prompt_tokens": turn.usage.prompt_tokens,
+                "llm.completion_tokens": turn.usage.completion_tokens,
+                "llm.cost_usd": round(turn.usage.cost_usd, 6),
+            })
+
+
+def model_prices(model: str) -> Tuple[float, float]:
+    """USD per 1K (prompt, completion) tokens for a model, with env overrides."""
+    # Dated snapshots ("gpt-4o-2024-08-06") are priced like their base model
+    base = max((name for name in MODEL_PRICES_PER_1K if model == name or model.startswith(f"{name}-")),
+               key=len, default=None)
+    prompt_price, completion_price = MODEL_PRICES_PER_1K.get(base, (0.0, 0.0))
+    prompt_override = os.getenv("LLM_PRICE_PROMPT_PER_1K")
+    completion_override = os.getenv("LLM_PRICE_COMPLETION_PER_1K")
+    return (
+        float(prompt_override) if prompt_override else prompt_price,
+        float(completion_override) if completion_override else completion_price,
+    )
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = model_prices(model)
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000.0
+
+
+def record_llm_usage(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Record one LLM completion against the node of the running turn.
+
+    Args:
+        model: Model name used for pricing
+        prompt_tokens: usage.prompt_tokens
+        completion_tokens: usage.completion_tokens
+
+    Returns:
+        Estimated cost in USD
+    """
+    turn = _current_turn.get()
+    node_id = turn.node_id if turn else NO_NODE
+    cost = estimate_cost(model, prompt_tokens, completion_tokens)
+
+    LLM_CALLS.inc(node=node_id, model=model)
+    LLM_TOKENS.inc(prompt_tokens, node=node_id, model=model, type="prompt")
+    LLM_TOKENS.inc(completion_tokens, node=node_id, model=model, type="completion")
+    LLM_COST.inc(cost, node=node_id, model=model)
+
+    if turn is not None:
+        turn.usage.llm_calls += 1
+        turn.usage.prompt_tokens += prompt_tokens
+        turn.usage.completion_tokens += completion_tokens
+        turn.usage.cost_usd += cost
+    return cost
+
+
+def record_llm_cache_result(result: str) -> None:
+    """Count a cache hit, miss or shared in-flight call against the running node."""
+    turn = _current_turn.get()
+    LLM_CACHE.inc(node=turn.node_id if turn else NO_NODE, result=result)
+
+
+def record_llm_truncation(model: str) -> None:
+    """Count a completion that hit max_tokens against the running node."""
+    turn = _current_turn.get()
+    LLM_TRUNCATIONS.inc(node=turn.node_id if turn else NO_NODE, model=model)
+
+
+def record_llm_retry(reason: str) -> None:
+    """Count a retried LLM attempt against the running node."""
+    turn = _current_turn.get()
+    LLM_RETRIES.inc(node=turn.node_id if turn else NO_NODE, reason=reason)
+
+
+def record_llm_hedge(result: str) -> None:
+    """Count a hedged request (sent, or not_admitted without a free slot) and which attempt returned first (won = the hedge, lost = the original)."""
+    turn = _current_turn.get()
+    LLM_HEDGES.inc(node=turn.node_id if turn else NO_NODE, result=result)
+
+
+def record_output_validation(node_id: str, result: str) -> None:
+    """Count how a node's response passed schema validation (ok, repaired or fallback)."""
+    LLM_OUTPUT_VALIDATION.inc(node=node_id, result=result)
+
+
+def accumulate_session_usage(state: Dict, usage: TurnUsage) -> Dict:
+    """
+    Add a turn's usage to state["usage"] (running per-session totals).
+
+    Args:
+        state: Session state, updated in place
+        usage: Usage of the finished turn
+
+    Returns:
+        The updated totals
+    """
+    totals = dict(state.get("usage") or {})
+    for field_name, value in usage.to_dict().items():
+        totals[field_name] = totals.get(field_name, 0) + value
+    totals["cost_usd"] = round(totals.get("cost_usd", 0.0), 6)
+    state["usage"] = totals
+    SESSION_COST.observe(totals["cost_usd"])
+    return totals
@@ -0,0 +1,172 @@
+"""
+Per-node model routing and generation profiles.
+
+Each node maps to a profile (model, temperature, token budget). Extraction and
+classification nodes use the fast model (LLM_FAST_MODEL) with a small budget,
+conversation nodes the default model (LLM_MODEL), and generate_plan gets a
+budget large enough for all twelve topics. Memory summaries are routed as
+the "summary" pseudo-node.
+
+With LLM_ADAPTIVE_MAX_TOKENS, max_tokens is learned per node from the
+completion lengths observed: the p99 of recent outputs plus headroom, within
+the profile's bounds. A truncated completion (finish_reason "length") counts
+as twice its budget, so the next calls get more room.
+"""
+
+import os
+import math
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Deque, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Pseudo-node used by MemoryManager summary calls
+SUMMARY_NODE = "summary"
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """Model and sampling parameters for one kind of node."""
+    name: str
+    model: str
+    temperature: float
+    max_tokens: int  # Budget until enough outputs have been observed
+    min_tokens: int = 64  # Lower bound of the learned budget
+    max_tokens_limit: int = 4096  # Upper bound of the learned budget
+
+
+def default_profiles() -> Dict[str, GenerationProfile]:
+    """Profiles with models taken from LLM_MODEL and LLM_FAST_MODEL."""
+    model = os.getenv("LLM_MODEL", "gpt-4")
+    fast_model = os.getenv("LLM_FAST_MODEL", "gpt-4o-mini")
+    return {
+        "extraction": GenerationProfile("extraction", fast_model, 0.2, 300, max_tokens_limit=600),
+        "classification": GenerationProfile("classification", fast_model, 0.0, 200, max_tokens_limit=400),
+        "conversation": GenerationProfile("conversation", model, 0.7, 500, max_tokens_limit=1000),
+        # 12 topics plus an onboarding summary did not fit in 500 tokens
+        "plan": GenerationProfile("plan", model, 0.7, 1500, min_tokens=600, max_tokens_limit=3000),
+        "summary": GenerationProfile("summary", fast_model, 0.3, 400, max_tokens_limit=800),
+    }
+
+
+# Node id -> profile name; nodes not listed use DEFAULT_PROFILE
+NODE_PROFILES: Dict[str, str] = {
+    "collect_basic_info": "extraction",
+    "classify_category": "classification",
+    "generate_plan": "plan",
+    SUMMARY_NODE: "summary",
+}
+DEFAULT_PROFILE = "conversation"
+
+
+class OutputLengthTracker:
+    """Recent completion lengths per node."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[int]] = {}
+        self._truncations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, node_id: str, completion_tokens: int, max_tokens: int, truncated: bool) -> None:
+        """
+        Record one completion.
+
+        Args:
+            node_id: Node (or pseudo-node) the completion was for
+            completion_tokens: usage.completion_tokens
+            max_tokens: Budget the request was sent with
+            truncated: True if finish_reason was "length"
+        """
+        # A truncated output's real length is unknown but at least the budget
+        sample = max_tokens * 2 if truncated else completion_tokens
+        with self._lock:
+            self._samples.setdefault(node_id, deque(maxlen=self.window)).append(sample)
+            if truncated:
+                self._truncations[node_id] = self._truncations.get(node_id, 0) + 1
+
+    def percentile(self, node_id: str, q: float, min_samples: int) -> Optional[float]:
+        """q-th percentile of recent lengths, or None with fewer than min_samples."""
+        with self._lock:
+            samples = list(self._samples.get(node_id, ()))
+        if len(samples) < min_samples:
+            return None
+        return float(np.percentile(samples, q))
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            nodes = {node_id: list(samples) for node_id, samples in self._samples.items()}
+            truncations = dict(self._truncations)
+        return {
+            node_id: {
+                "samples": len(samples),
+                "p50": float(np.percentile(samples, 50)),
+                "p99": float(np.percentile(samples, 99)),
+                "truncations": truncations.get(node_id, 0),
+            }
+            for node_id, samples in nodes.items()
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._truncations.clear()
+
+
+class ModelRouter:
+    """Chooses the generation profile for each LLM call."""
+
+    def __init__(self, profiles: Optional[Dict[str, GenerationProfile]] = None,
+                 node_profiles: Optional[Dict[str, str]] = None, enabled: Optional[bool] = None,
+                 adaptive: Optional[bool] = None, min_samples: int = 20, headroom: float = 1.25):
+        """
+        Args:
+            profiles: Profiles by name (defaults to default_profiles())
+            node_profiles: Node id -> profile name (defaults to NODE_PROFILES)
+            enabled: Route per node (LLM_ROUTING_ENABLED); if off, every node
+                uses the conversation profile
+            adaptive: Learn max_tokens per node (LLM_ADAPTIVE_MAX_TOKENS)
+            min_samples: Observed outputs needed before the budget is learned
+            headroom: Multiplier on the observed p99 length
+        """
+        self.profiles = profiles or default_profiles()
+        self.node_profiles = dict(NODE_PROFILES if node_profiles is None else node_profiles)
+        self.enabled = enabled if enabled is not None else os.getenv("LLM_ROUTING_ENABLED", "True").lower() == "true"
+        self.adaptive = adaptive if adaptive is not None else os.getenv("LLM_ADAPTIVE_MAX_TOKENS", "True").lower() == "true"
+        self.min_samples = min_samples
+        self.headroom = headroom
+        self.lengths = OutputLengthTracker()
+
+    def base_profile(self, node_id: Optional[str]) -> GenerationProfile:
+        """Static profile of a node, before any learning."""
+        name = self.node_profiles.get(node_id, DEFAULT_PROFILE) if self.enabled else DEFAULT_PROFILE
+        return self.profiles[name]
+
+    def profile_for(self, node_id: Optional[str]) -> GenerationProfile:
+        """Profile for the next call of a node, with the learned max_tokens applied."""
+        profile = self.base_profile(node_id)
+        if not self.adaptive or node_id is None:
+            return profile
+        p99 = self.lengths.percentile(node_id, 99, self.min_samples)
+        if p99 is None:
+            return profile
+        learned = int(math.ceil(p99 * self.headroom))
+        return replace(profile, max_tokens=max(profile.min_tokens, min(profile.max_tokens_limit, learned)))
+
+    def observe(self, node_id: Optional[str], profile: GenerationProfile, completion_tokens: int,
+                finish_reason: Optional[str]) -> None:
+        """Record a completion's length for max_tokens learning."""
+        if node_id is None:
+            return
+        truncated = finish_reason == "length"
+        if truncated:
+            logger.warning(f"LLM output truncated at {profile.max_tokens} tokens for node {node_id}")
+        self.lengths.observe(node_id, completion_tokens, profile.max_tokens, truncated)
+
+
+model_router = ModelRouter()
@@ -0,0 +1,160 @@
+"""
+Per-node output schemas and validators.
+
+Every LLM node gets a pydantic model derived from Node.outputs ("state."
+prefixes stripped; reply required, other fields optional). A response without
+next stays on the current node (StateManager.get_next_node). The hand-written
+models in types.py take precedence for the nodes that have one.
+Models are built once per node and cached, so validation is a single
+pydantic-core pass over the raw response (model_validate_json).
+
+The model's JSON schema is sent with the request as a structured-output
+constraint (response_format) when the model supports it, see response_format().
+The original gpt-4 (the default LLM_MODEL) supports none, so its nodes are
+only validated after the call.
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Dict, Optional, Set, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, ConfigDict, ValidationError, create_model
+
+from .root_graph import Node
+from .types import ClassifyCategoryResponse, CollectBasicInfoResponse
+
+logger = logging.getLogger(__name__)
+
+# Fields every LLM node must return; a missing next means "stay on this node"
+REQUIRED_FIELDS = ("reply",)
+
+# Hand-written response models; all other nodes derive theirs from Node.outputs
+RESPONSE_MODELS: Dict[str, Type[BaseModel]] = {
+    "collect_basic_info": CollectBasicInfoResponse,
+    "classify_category": ClassifyCategoryResponse,
+}
+
+# Model name prefixes by the strongest response_format they accept
+JSON_SCHEMA_MODELS = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+JSON_OBJECT_MODELS = ("gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-3.5-turbo")
+
+# Models already warned about in "auto" mode
+_unconstrained_models: Set[str] = set()
+
+
+def _field_type(spec: Any) -> Any:
+    """Python type of one Node.outputs entry; a string value is a documented default for a str field."""
+    if isinstance(spec, str):
+        return str
+    if get_origin(spec) is Union:
+        return Union[tuple(_field_type(arg) for arg in get_args(spec))]
+    return spec
+
+
+def output_fields(node: Node) -> Dict[str, Any]:
+    """Field name -> type of the JSON object the node's LLM call returns."""
+    return {key.split("state.", 1)[-1]: _field_type(spec) for key, spec in node.outputs.items()}
+
+
+def _derive_model(node: Node) -> Type[BaseModel]:
+    fields: Dict[str, Tuple[Any, Any]] = {}
+    for name, field_type in output_fields(node).items():
+        if name in REQUIRED_FIELDS:
+            fields[name] = (field_type, ...)
+        else:
+            fields[name] = (Optional[field_type], None)
+    model_name = "".join(part.capitalize() for part in node.node_id.split("_")) + "Output"
+    # Extra keys are kept: several prompts ask for more than Node.outputs lists
+    return create_model(model_name, __config__=ConfigDict(extra="allow"), **fields)
+
+
+class NodeOutputValidator:
+    """Compiled response model and JSON schema of one node."""
+
+    def __init__(self, node: Node):
+        self.node_id = node.node_id
+        self.hand_written = node.node_id in RESPONSE_MODELS
+        self.model = RESPONSE_MODELS.get(node.node_id) or _derive_model(node)
+        self.json_schema = self.model.model_json_schema()
+        self.required = tuple(name for name in REQUIRED_FIELDS if name in self.model.model_fields)
+
+    def validate_json(self, raw: str) -> Dict[str, Any]:
+        """
+        Parse and validate a raw response.
+
+        Raises:
+            ValidationError: Invalid JSON or a field of the wrong type
+        """
+        return self._dump(self.model.model_validate_json(raw))
+
+    def validate_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate an already parsed response."""
+        return self._dump(self.model.model_validate(data))
+
+    def _dump(self, validated: BaseModel) -> Dict[str, Any]:
+        # Derived models return only what the LLM sent, like the raw dict did before
+        return validated.model_dump(exclude_unset=not self.hand_written)
+
+
+_validators: Dict[str, NodeOutputValidator] = {}
+_validators_lock = threading.Lock()
+
+
+def get_validator(node: Node) -> NodeOutputValidator:
+    """Cached validator of a node (built on first use)."""
+    validator = _validators.get(node.node_id)
+    if validator is None:
+        with _validators_lock:
+            validator = _validators.get(node.node_id)
+            if validator is None:
+                validator = _validators[node.node_id] = NodeOutputValidator(node)
+    return validator
+
+
+def node_json_schema(node: Node) -> Dict[str, Any]:
+    """JSON schema of the node's response."""
+    return get_validator(node).json_schema
+
+
+def is_json_syntax_error(error: ValidationError) -> bool:
+    """True if the response was not parseable JSON (as opposed to a wrong field)."""
+    return any(item["type"] == "json_invalid" for item in error.errors())
+
+
+def response_format(model: str, json_schema: Optional[Dict[str, Any]], name: str,
+                    mode: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    response_format request parameter for a model.
+
+    Args:
+        model: Model the request goes to
+        json_schema: Schema of the expected response (None = no constraint)
+        name: Schema name (node id)
+        mode: "auto", "json_schema", "json_object" or "none" (defaults to
+            LLM_RESPONSE_FORMAT); "auto" picks the strongest mode the model supports
+
+    Returns:
+        The parameter, or None to send no response_format
+    """
+    if json_schema is None:
+        return None
+    mode = (mode or os.getenv("LLM_RESPONSE_FORMAT", "auto")).lower()
+    if mode == "auto":
+        if model.startswith(JSON_SCHEMA_MODELS):
+            mode = "json_schema"
+        elif model.startswith(JSON_OBJECT_MODELS):
+            mode = "json_object"
+        else:
+            mode = "none"
+            if model not in _unconstrained_models:
+                _unconstrained_models.add(model)
+                logger.warning(f"{model} accepts no response_format; its responses are only validated after the call")
+    if mode == "json_schema":
+        # Not strict: strict mode cannot express free-form objects such as plan
+        return {"type": "json_schema", "json_schema": {"name": name, "schema": json_schema, "strict": False}}
+    if mode == "json_object":
+        return {"type": "json_object"}
+    if mode == "none":
+        return None
+    raise ValueError(f"Unknown LLM response format: {mode}. Expected 'auto', 'json_schema', 'json_object' or 'none'")
@@ -681,7 +681,7 @@ CRITICAL JSON RULES:
 6. All strings must be properly quoted with double quotes
 7. All fields must be present and non-empty
 8. next must always be "week5_chat"
-9. Example of correct format: {"key": "value", "array": [{"role": "user", "content": "text"}]}
+9. Example of correct format: {{"key": "value", "array": [{{"role": "user", "content": "text"}}]}}
 '''
     elif node.node_id == "week6_chat":
         # Get week 6 topic from plan
@@ -731,7 +731,7 @@ CRITICAL JSON RULES:
 6. All strings must be properly quoted with double quotes
 7. All fields must be present and non-empty
 8. next must always be "week6_chat"
-9. Example of correct format: {"key": "value", "array": [{"role": "user", "content": "text"}]}
+9. Example of correct format: {{"key": "value", "array": [{{"role": "user", "content": "text"}}]}}
 '''
     elif node.node_id == "week7_chat":
         # Get week 7 topic from plan
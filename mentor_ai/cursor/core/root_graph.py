@@ -2,12 +2,13 @@ from typing import Callable, Dict, Any, Optional
 
 # Node structure for the graph
 class Node:
-    def __init__(self, node_id: str, system_prompt: str, outputs: Dict[str, Any], next_node: Optional[Callable] = None, executor: Optional[Callable] = None):
+    def __init__(self, node_id: str, system_prompt: str, outputs: Dict[str, Any], next_node: Optional[Callable] = None, executor: Optional[Callable] = None, cache_ttl: Optional[float] = None):
         self.node_id = node_id
         self.system_prompt = system_prompt
         self.outputs = outputs  # Expected outputs from LLM
         self.next_node = next_node  # Function to determine next node
         self.executor = executor  # Optional executor function for non-LLM nodes
+        self.cache_ttl = cache_ttl  # Seconds to reuse the LLM response for an identical prompt (None = never)
 
 # First node: collect_basic_info
 def get_collect_basic_info_node():
@@ -37,7 +38,9 @@ def get_classify_category_node():
             "career_change": "improve_intro", 
             "career_find": "improve_intro",
             "no_goal": "lost_intro"
-        }.get(state.get("goal_type"), "classify_category")
+        }.get(state.get("goal_type"), "classify_category"),
+        # Classification of the same conversation does not change
+        cache_ttl=3600
     )
 
 def get_improve_intro_node():
@@ -195,7 +198,9 @@ def get_generate_plan_node():
             "onboarding_chat_summary": str,
             "next": "week1_chat"
         },
-        next_node=lambda state: "week1_chat"
+        next_node=lambda state: "week1_chat",
+        # Resubmitting the same onboarding gets the same plan instead of a second expensive call
+        cache_ttl=600
     )
 
 def get_retrieve_reg_node():
@@ -223,20 +228,30 @@ def get_retrieve_reg_node():
         
         try:
             # Import here to avoid circular imports
-            from ..modules.retrieval.retriever import RegRetriever
-            
-            print(f"🔍 Initializing RAG retriever...")
-            print(f"   Index path: {settings.RAG_INDEX_PATH}")
-            print(f"   Corpus path: {settings.RAG_CORPUS_PATH}")
-            
-            # Initialize retriever
-            retriever = RegRetriever()
-            retriever.initialize(settings.RAG_INDEX_PATH)
+            from ..modules.retrieval.prefetch import retrieval_prefetcher
             
-            print(f"🔍 Retrieving relevant documents...")
+            # Reuse the speculative retrieval started when the goals were collected. A prefetch
+            # still running is waited for: retrieving again would redo the same work from scratch.
+            # Prefetched results are built from the state only and ignore user_message
+            session_id = current_state.get("session_id")
+            result = None
+            if settings.RAG_PREFETCH_ENABLED:
+                result = retrieval_prefetcher.get(session_id, current_state, timeout=None)
             
-            # Retrieve relevant documents
-            result = retriever.retrieve(current_state, user_message)
+            if result is not None:
+                retrieval_prefetcher.discard(session_id)
+            else:
+                print(f"🔍 Initializing RAG retriever...")
+                print(f"   Index path: {settings.RAG_INDEX_PATH}")
+                print(f"   Corpus path: {settings.RAG_CORPUS_PATH}")
+                
+                # Shared retriever keeps the loaded index between requests
+                retriever = retrieval_prefetcher.get_retriever(settings.RAG_INDEX_PATH)
+                
+                print(f"🔍 Retrieving relevant documents...")
+                
+                # Retrieve relevant documents
+                result = retriever.retrieve(current_state, user_message)
             
             print(f"🔍 Retrieved {len(result.chunks)} chunks")
             
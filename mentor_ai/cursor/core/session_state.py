@@ -0,0 +1,214 @@
+"""
+Copy-on-write session state.
+
+SessionState is a mutable mapping over the session document with one slot per
+known field (unknown fields go to an extra dict), so the existing dict-style
+code keeps working. Two things differ from a plain dict:
+
+- copy() is cheap: the copy shares every value with the original, and dict or
+  list values are only copied when one side asks to change them through
+  mutable(). Values read with state[key] are shared and must not be changed
+  in place.
+- Every changed field is recorded; changes() returns just those fields, which
+  is what the chat endpoint writes to MongoDB instead of the whole session.
+"""
+
+import copy
+from collections.abc import Mapping, MutableMapping
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Set
+
+# Fields of the session document (see MongoDBManager.create_session and StateManager)
+SESSION_FIELDS = (
+    "session_id", "user_id", "created_at", "updated_at", "current_node", "phase", "history",
+    "prompt_context", "message_count", "current_week", "usage", "user_name", "user_age", "goal_type",
+    "goals", "skills", "interests", "passions", "activities", "exciting_topics", "content_consumption",
+    "negative_qualities", "lost_skills", "obstacles", "job_circumstances", "background_circumstances",
+    "career_change_circumstances", "onboarding_chat_summary", "plan", "retrieved_chunks",
+)
+_FIELDS = frozenset(SESSION_FIELDS)
+
+_CONTAINERS = (dict, list)
+_MISSING = object()
+
+
+def _own(value: Any) -> Any:
+    """Private copy of a container: the container and its dict/list values (prompt_context's lists)."""
+    if isinstance(value, dict):
+        return {key: item.copy() if isinstance(item, _CONTAINERS) else item for key, item in value.items()}
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+class SessionState(MutableMapping):
+    """Session fields with copy-on-write containers and changed-field tracking."""
+
+    __slots__ = SESSION_FIELDS + ("_extra", "_dirty", "_shared")
+
+    session_id: str
+    user_id: str
+    created_at: datetime
+    updated_at: datetime
+    current_node: str
+    phase: str
+    history: List[Dict[str, Any]]
+    prompt_context: Dict[str, Any]
+    message_count: int
+    current_week: int
+    usage: Dict[str, Any]
+    user_name: Optional[str]
+    user_age: Any
+    goal_type: Optional[str]
+    goals: Any
+    skills: List[str]
+    interests: List[str]
+    passions: List[str]
+    activities: List[str]
+    exciting_topics: List[str]
+    content_consumption: List[str]
+    negative_qualities: List[str]
+    lost_skills: Any
+    obstacles: Any
+    job_circumstances: Dict[str, Any]
+    background_circumstances: Dict[str, Any]
+    career_change_circumstances: Dict[str, Any]
+    onboarding_chat_summary: str
+    plan: Dict[str, Any]
+    retrieved_chunks: List[Any]
+
+    def __init__(self, data: Optional[Mapping] = None):
+        """
+        Args:
+            data: Session document; its containers stay shared with it until changed
+        """
+        self._extra: Dict[str, Any] = {}
+        self._dirty: Set[str] = set()
+        self._shared: Set[str] = set()
+        for key, value in (data or {}).items():
+            self._store(key, value)
+            if isinstance(value, _CONTAINERS):
+                self._shared.add(key)
+
+    @classmethod
+    def copy_of(cls, state: Mapping) -> "SessionState":
+        """Copy-on-write copy of a SessionState or of a plain session dict."""
+        return state.copy() if isinstance(state, SessionState) else cls(state)
+
+    def _store(self, key: str, value: Any) -> None:
+        if key in _FIELDS:
+            setattr(self, key, value)
+        else:
+            self._extra[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        current = self.get(key, _MISSING)
+        if isinstance(value, _CONTAINERS):
+            if current is value:
+                # Changed in place by the caller; still shared if it was
+                self._dirty.add(key)
+                return
+        elif current is not _MISSING and current == value:
+            return
+        self._store(key, value)
+        self._shared.discard(key)
+        self._dirty.add(key)
+
+    def __delitem__(self, key: str) -> None:
+        if key in _FIELDS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        else:
+            del self._extra[key]
+        self._shared.discard(key)
+        self._dirty.add(key)
+
+    def __contains__(self, key: object) -> bool:
+        if key in _FIELDS:
+            return hasattr(self, key)
+        return key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for key in SESSION_FIELDS:
+            if hasattr(self, key):
+                yield key
+        yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for key in SESSION_FIELDS if hasattr(self, key)) + len(self._extra)
+
+    def __repr__(self) -> str:
+        return f"SessionState({self.to_dict()!r})"
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "SessionState":
+        clone = SessionState()
+        for key, value in self.items():
+            clone._store(key, copy.deepcopy(value, memo))
+        clone._dirty = set(self._dirty)
+        return clone
+
+    def copy(self) -> "SessionState":
+        """Copy sharing all values; containers are copied by whichever side changes them first."""
+        clone = SessionState.__new__(SessionState)
+        for key in SESSION_FIELDS:
+            if hasattr(self, key):
+                setattr(clone, key, getattr(self, key))
+        clone._extra = dict(self._extra)
+        clone._dirty = set(self._dirty)
+        self._shared = {key for key, value in self.items() if isinstance(value, _CONTAINERS)}
+        clone._shared = set(self._shared)
+        return clone
+
+    def mutable(self, key: str, default: Callable[[], Any] = dict) -> Any:
+        """
+        Container of a field that may be changed in place; marks the field changed.
+
+        Args:
+            key: Field name
+            default: Factory for the value if the field is not set
+
+        Returns:
+            A container owned by this state (copied first if it was shared)
+        """
+        if key not in self:
+            self[key] = default()
+            return self[key]
+        value = self[key]
+        if key in self._shared:
+            value = _own(value)
+            self._store(key, value)
+            self._shared.discard(key)
+        self._dirty.add(key)
+        return value
+
+    def merge(self, values: Mapping) -> "SessionState":
+        """Set the fields of values that are new or differ (by equality); returns self."""
+        for key, value in values.items():
+            if key not in self or self[key] != value:
+                self[key] = value
+        return self
+
+    @property
+    def dirty(self) -> FrozenSet[str]:
+        """Fields changed since the state was loaded (or since mark_clean)."""
+        return frozenset(self._dirty)
+
+    def changes(self) -> Dict[str, Any]:
+        """Changed fields and their values, for a $set update."""
+        return {key: self[key] for key in self._dirty if key in self}
+
+    def mark_clean(self) -> None:
+        self._dirty.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
@@ -0,0 +1,180 @@
+"""
+root_graph compiled into a LangGraph StateGraph.
+
+Each session field is a graph channel, each root_graph node a graph node that
+runs GraphProcessor.process_node and returns only the fields it changed. With
+a checkpointer (app/storage/checkpointer.py) every step is checkpointed under
+the session id as thread id, and only the changed channels get new versions,
+so a step stores the diff of the session instead of the whole document.
+
+A turn enters the graph at the session's current_node. Steps without a reply
+(retrieve_reg) continue straight to their next node within the same turn;
+any other step ends the turn.
+"""
+
+import asyncio
+import logging
+from typing import Annotated, Any, Dict, Optional, Tuple, TypedDict
+
+from langgraph.graph import END, START, StateGraph
+
+from .graph_processor import GraphProcessor
+from .root_graph import root_graph
+from .session_state import SESSION_FIELDS, SessionState
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NODE = "collect_basic_info"
+
+# Mongo bookkeeping fields, not part of the graph state
+EXCLUDED_FIELDS = ("_id", "created_at", "updated_at")
+
+# Session fields kept as graph channels
+SESSION_CHANNELS = tuple(field for field in SESSION_FIELDS if field not in EXCLUDED_FIELDS)
+
+
+def _merge(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {**(left or {}), **(right or {})}
+
+
+# total=False: a step returns only the channels it changed
+GraphState = TypedDict("GraphState", {
+    **{name: Any for name in SESSION_CHANNELS},
+    "extra": Annotated[dict, _merge],  # Session fields not listed in SESSION_CHANNELS
+    "turn": dict,  # user_message, reply, next_node and steps of the running turn
+}, total=False)
+
+
+def to_graph_state(session: Dict[str, Any]) -> Dict[str, Any]:
+    """Session document -> graph channel values."""
+    state: Dict[str, Any] = {}
+    extra: Dict[str, Any] = {}
+    for key, value in session.items():
+        if key in EXCLUDED_FIELDS:
+            continue
+        if key in SESSION_CHANNELS:
+            state[key] = value
+        else:
+            extra[key] = value
+    if extra:
+        state["extra"] = extra
+    return state
+
+
+def from_graph_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Graph channel values -> session document fields."""
+    session = {key: value for key, value in state.items() if key in SESSION_CHANNELS}
+    session.update(state.get("extra") or {})
+    return session
+
+
+def session_changes(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of after that are new or differ from before."""
+    return {key: value for key, value in after.items()
+            if key not in EXCLUDED_FIELDS and (key not in before or before[key] != value)}
+
+
+def _make_step(node_id: str):
+    async def step(state: Dict[str, Any]) -> Dict[str, Any]:
+        turn = state.get("turn") or {}
+        # Nodes get None for channels never written; those fields are left out, as in the document
+        before = {key: value for key, value in from_graph_state(state).items() if value is not None}
+        # Copy-on-write: the checkpointed values are not changed by the step
+        session = SessionState(before)
+        # Only the first step of a turn answers the user's message
+        user_message = turn.get("user_message", "") if not turn.get("steps") else ""
+        reply, updated, next_node = await asyncio.to_thread(
+            GraphProcessor.process_node, node_id=node_id, user_message=user_message, current_state=session
+        )
+        if reply and not any(msg.get("content") == reply for msg in updated.get("history", [])):
+            updated["history"] = [*updated.get("history", []), {"role": "assistant", "content": reply}]
+        updated["current_node"] = next_node
+
+        changes = to_graph_state(session_changes(before, updated))
+        changes["turn"] = {**turn, "reply": reply, "next_node": next_node, "steps": turn.get("steps", 0) + 1}
+        logger.info(f"Graph step {node_id} -> {next_node}, changed: {sorted(changes)}")
+        return changes
+    return step
+
+
+def graph_node_name(node_id: str) -> str:
+    """Graph node of a root_graph node (lost_skills is also a session field, so ids are suffixed)."""
+    return f"{node_id}_step"
+
+
+def _entry(state: Dict[str, Any]) -> str:
+    node_id = state.get("current_node") or DEFAULT_NODE
+    if node_id not in root_graph:
+        raise ValueError(f"Unknown node: {node_id}")
+    return graph_node_name(node_id)
+
+
+def _after_step(state: Dict[str, Any]) -> str:
+    turn = state.get("turn") or {}
+    next_node = turn.get("next_node")
+    # A step without a reply (retrieve_reg) hands over to its next node in the same turn
+    if not turn.get("reply") and next_node in root_graph:
+        return graph_node_name(next_node)
+    return END
+
+
+def build_session_graph() -> StateGraph:
+    """StateGraph with one node per root_graph node."""
+    graph = StateGraph(GraphState)
+    steps = [graph_node_name(node_id) for node_id in root_graph]
+    for node_id in root_graph:
+        graph.add_node(graph_node_name(node_id), _make_step(node_id))
+        graph.add_conditional_edges(graph_node_name(node_id), _after_step, [*steps, END])
+    graph.add_conditional_edges(START, _entry, steps)
+    return graph
+
+
+def compile_session_graph(checkpointer=None):
+    """Compiled session graph, checkpointed per step if a checkpointer is given."""
+    return build_session_graph().compile(checkpointer=checkpointer)
+
+
+class SessionGraphRunner:
+    """Runs chat turns through the compiled session graph."""
+
+    def __init__(self, checkpointer=None):
+        self.graph = compile_session_graph(checkpointer)
+        self.checkpointer = checkpointer
+
+    async def run_turn(self, session_id: str, user_message: str,
+                       session: Dict[str, Any]) -> Tuple[str, Dict[str, Any], str]:
+        """
+        Run one turn of a session.
+
+        Args:
+            session_id: Session (graph thread) id
+            user_message: Message of the user
+            session: Session document as loaded from MongoDB
+
+        Returns:
+            (reply, updated_session, next_node)
+        """
+        config = {"configurable": {"thread_id": session_id}}
+        graph_input = to_graph_state(session)
+        if self.checkpointer is not None:
+            snapshot = await self.graph.aget_state(config)
+            if snapshot.values:
+                # Resume from the checkpoint; only fields changed outside the graph are written
+                checkpointed = from_graph_state(snapshot.values)
+                graph_input = to_graph_state(session_changes(checkpointed, from_graph_state(graph_input)))
+        graph_input["turn"] = {"user_message": user_message, "reply": None, "next_node": None, "steps": 0}
+
+        result = await self.graph.ainvoke(graph_input, config)
+        turn = result.get("turn") or {}
+        return turn.get("reply"), from_graph_state(result), turn.get("next_node")
+
+
+# Set at startup when GRAPH_RUNTIME is "langgraph" (see app/main.py)
+session_graph: Optional[SessionGraphRunner] = None
+
+
+def configure_session_graph(checkpointer=None) -> SessionGraphRunner:
+    """Create the runner the chat endpoint uses."""
+    global session_graph
+    session_graph = SessionGraphRunner(checkpointer)
+    return session_graph
@@ -1,9 +1,12 @@
 import json
 from typing import Dict, Any, Optional
 from datetime import datetime, timezone
-from .types import CollectBasicInfoResponse, ClassifyCategoryResponse
+from pydantic import ValidationError
 from .root_graph import Node
+from .output_schema import get_validator, is_json_syntax_error
+from .metrics import record_output_validation
 from .memory_manager import MemoryManager
+from .session_state import SessionState
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,41 +18,67 @@ class StateManager:
     def parse_llm_response(llm_response: str, node: Node) -> Dict[str, Any]:
         """
         Parse LLM response and return structured data
+        
+        The response is validated against the node's output model (see
+        output_schema.py). Invalid JSON is repaired with _fix_json_response;
+        optional fields of the wrong type are dropped. Only a response without
+        a usable reply falls back to _get_fallback_response; one without next
+        stays on the current node (see get_next_node).
         """
+        validator = get_validator(node)
         try:
-            # Parse JSON response
-            response_data = json.loads(llm_response)
-            
-            # Validate response based on node type
-            if node.node_id == "collect_basic_info":
-                validated_response = CollectBasicInfoResponse(**response_data)
-                return validated_response.model_dump()
-            elif node.node_id == "classify_category":
-                validated_response = ClassifyCategoryResponse(**response_data)
-                return validated_response.model_dump()
-            else:
-                # For other nodes, return raw data for now
-                return response_data
-                
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {e}")
+            llm_data = validator.validate_json(llm_response)
+            record_output_validation(node.node_id, "ok")
+            return llm_data
+        except ValidationError as e:
+            error = e
+        except Exception as e:
+            raise ValueError(f"Error parsing LLM response: {e}")
+        
+        if is_json_syntax_error(error):
+            logger.error(f"JSON decode error: {error}")
             logger.error(f"Raw LLM response: {llm_response}")
             
             # Try to fix common JSON issues
             fixed_response = StateManager._fix_json_response(llm_response)
-            if fixed_response:
-                try:
-                    response_data = json.loads(fixed_response)
-                    logger.info("Successfully fixed JSON response")
-                    return response_data
-                except json.JSONDecodeError as e2:
-                    logger.error(f"Failed to fix JSON: {e2}")
-            
-            # If all else fails, return a fallback response
-            logger.warning("Using fallback response due to JSON parsing failure")
-            return StateManager._get_fallback_response(node)
-        except Exception as e:
-            raise ValueError(f"Error parsing LLM response: {e}")
+            try:
+                response_data = json.loads(fixed_response) if fixed_response else None
+            except json.JSONDecodeError as e2:
+                logger.error(f"Failed to fix JSON: {e2}")
+                response_data = None
+            if not isinstance(response_data, dict):
+                # If all else fails, return a fallback response
+                logger.warning("Using fallback response due to JSON parsing failure")
+                record_output_validation(node.node_id, "fallback")
+                return StateManager._get_fallback_response(node)
+            logger.info("Successfully fixed JSON response")
+        else:
+            response_data = json.loads(llm_response)
+            logger.warning(f"LLM response for {node.node_id} does not match its schema: {error}")
+        
+        return StateManager._validate_repaired(response_data, node)
+    
+    @staticmethod
+    def _validate_repaired(response_data: Dict[str, Any], node: Node) -> Dict[str, Any]:
+        """Validate a parsed response, dropping optional fields that fail validation"""
+        validator = get_validator(node)
+        try:
+            llm_data = validator.validate_data(response_data)
+        except ValidationError as e:
+            invalid = {item["loc"][0] for item in e.errors() if item["loc"]}
+            if invalid & set(validator.required) or not invalid:
+                logger.warning(f"Using fallback response, invalid fields for {node.node_id}: {sorted(map(str, invalid))}")
+                record_output_validation(node.node_id, "fallback")
+                return StateManager._get_fallback_response(node)
+            logger.warning(f"Dropping invalid fields for {node.node_id}: {sorted(map(str, invalid))}")
+            response_data = {key: value for key, value in response_data.items() if key not in invalid}
+            try:
+                llm_data = validator.validate_data(response_data)
+            except ValidationError:
+                record_output_validation(node.node_id, "fallback")
+                return StateManager._get_fallback_response(node)
+        record_output_validation(node.node_id, "repaired")
+        return llm_data
     
     @staticmethod
     def _handle_week_transition(updated_state: Dict[str, Any], target_week: int, llm_data: Dict[str, Any]) -> tuple[bool, Dict[str, Any]]:
@@ -75,12 +104,8 @@ class StateManager:
                 weekly_summary = MemoryManager.create_weekly_summary(session_id, updated_state, current_week)
                 
                 # Store weekly summary in prompt_context
-                if "prompt_context" not in updated_state:
-                    updated_state["prompt_context"] = {}
-                if "weekly_summaries" not in updated_state["prompt_context"]:
-                    updated_state["prompt_context"]["weekly_summaries"] = {}
-                
-                updated_state["prompt_context"]["weekly_summaries"][f"week_{current_week}"] = weekly_summary
+                prompt_context = updated_state.mutable("prompt_context")
+                prompt_context.setdefault("weekly_summaries", {})[f"week_{current_week}"] = weekly_summary
                 print(f"📊 Created weekly summary for week {current_week}")
             
             # Clear history when transitioning to a new week
@@ -191,7 +216,7 @@ class StateManager:
         """
         Update current state with data from LLM response
         """
-        updated_state = current_state.copy()
+        updated_state = SessionState.copy_of(current_state)
         
         # Update state based on node type
         if node.node_id == "collect_basic_info":
@@ -372,21 +397,19 @@ class StateManager:
         if "current_week" not in updated_state:
             updated_state["current_week"] = 1
         
-        # Add messages to memory if provided
+        # Add messages to memory if provided (in place: updated_state is already this turn's copy)
         if user_message:
-            new_message = {"role": "user", "content": user_message}
-            updated_state = MemoryManager.update_prompt_context(updated_state, new_message)
+            MemoryManager.record_message(updated_state, {"role": "user", "content": user_message})
             
         if assistant_reply:
-            new_message = {"role": "assistant", "content": assistant_reply}
-            updated_state = MemoryManager.update_prompt_context(updated_state, new_message)
+            MemoryManager.record_message(updated_state, {"role": "assistant", "content": assistant_reply})
         
         # Evaluate important facts from user message
         if user_message:
             user_msg_dict = {"role": "user", "content": user_message}
             important_facts = MemoryManager.evaluate_important_facts(updated_state, user_msg_dict)
             for fact in important_facts:
-                updated_state = MemoryManager.add_important_fact(updated_state, fact)
+                MemoryManager.record_important_fact(updated_state, fact)
         
         # Check for week transition and create weekly summary if needed
         updated_state = StateManager._handle_week_transition_in_memory(updated_state, node)
@@ -428,10 +451,9 @@ class StateManager:
                 )
                 
                 # Store weekly summary in prompt_context
-                if "prompt_context" not in state:
-                    state["prompt_context"] = MemoryManager.initialize_prompt_context()
-                
-                state["prompt_context"]["weekly_summaries"][f"week_{current_week}"] = weekly_summary
+                state = SessionState.copy_of(state)
+                prompt_context = state.mutable("prompt_context", MemoryManager.initialize_prompt_context)
+                prompt_context.setdefault("weekly_summaries", {})[f"week_{current_week}"] = weekly_summary
                 state["current_week"] = new_week
                 
                 logger.info(f"Created weekly summary for week {current_week}, session {session_id}")
@@ -459,7 +481,8 @@ class StateManager:
             "important_facts_count": len(prompt_context.get("important_facts", [])),
             "weekly_summaries_count": len(prompt_context.get("weekly_summaries", {})),
             "history_count": len(state.get("history", [])),
-            "estimated_tokens": MemoryManager.get_token_estimate(state)
+            "estimated_tokens": MemoryManager.get_token_estimate(state),
+            "usage": state.get("usage", {})
         }
         
         return stats
@@ -483,4 +506,4 @@ class StateManager:
             if age is None or age == "":
                 return "collect_basic_info"
             # Если есть имя и возраст (или возраст == 'unknown'), идём дальше
-        return llm_data.get("next", current_node.node_id) 
\ No newline at end of file
+        return llm_data.get("next") or current_node.node_id 
\ No newline at end of file
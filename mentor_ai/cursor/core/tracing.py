@@ -0,0 +1,594 @@
+"""
+Lightweight OpenTelemetry-style tracing of chat turns.
+
+Spans form one trace per HTTP request: the FastAPI request (TracingMiddleware),
+Firebase auth, MongoDB calls, the graph node and its stages, the LLM call and
+retrieval. Trace ids follow W3C Trace Context: an incoming `traceparent`
+header continues the caller's trace and every traced response carries one.
+
+Finished spans go to an exporter selected with TRACING_EXPORTER:
+    none     tracing disabled (default); spans are no-ops
+    file     JSON lines at TRACING_FILE_PATH, one span per line
+    otlp     OTLP/HTTP JSON to a local collector at TRACING_OTLP_ENDPOINT
+    console  JSON lines on the log
+
+Dissect the slowest turns recorded by the file exporter with:
+    python -m mentor_ai.cursor.core.tracing traces.jsonl --top 5
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import inspect
+import logging
+import argparse
+import functools
+import threading
+import contextvars
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds and status codes
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+STATUS_CODES = {"UNSET": 0, "OK": 1, "ERROR": 2}
+
+
+class SpanContext(NamedTuple):
+    """Identifiers propagated from a span to its children."""
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[SpanContext]:
+    """
+    Parse a W3C traceparent header ("00-<trace id>-<span id>-<flags>").
+
+    Returns:
+        The remote parent context, or None if the header is missing or invalid
+    """
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff":
+        return None
+    trace_id, span_id, flags = parts[1].lower(), parts[2].lower(), parts[3]
+    try:
+        if len(trace_id) != 32 or len(span_id) != 16 or int(trace_id, 16) == 0 or int(span_id, 16) == 0:
+            return None
+        sampled = bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+    return SpanContext(trace_id, span_id, sampled)
+
+
+def format_traceparent(context: SpanContext) -> str:
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+
+class Span:
+    """A timed operation with attributes; ended by Tracer.start_span()."""
+
+    def __init__(self, name: str, context: SpanContext, parent_id: Optional[str] = None,
+                 kind: str = "internal", attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "UNSET"
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    @property
+    def is_recording(self) -> bool:
+        return self.context.sampled and self.end_ns is None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def update_name(self, name: str) -> None:
+        self.name = name
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.is_recording and value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def set_status(self, status: str, message: str = "") -> None:
+        self.status = status
+        self.status_message = message
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.set_attributes({"exception.type": type(exc).__name__, "exception.message": str(exc)[:500]})
+        self.set_status("ERROR", str(exc)[:200])
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_id,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "status_message": self.status_message,
+            "attributes": self.attributes,
+        }
+
+
+class _NonRecordingSpan(Span):
+    """Span returned while tracing is disabled; every call is a no-op."""
+
+    def __init__(self):
+        super().__init__("", SpanContext("0" * 32, "0" * 16, sampled=False))
+
+    def update_name(self, name: str) -> None:
+        pass
+
+    def set_status(self, status: str, message: str = "") -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NonRecordingSpan()
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("mentor_current_span", default=None)
+
+
+class SpanExporter(ABC):
+    """Receives batches of finished spans."""
+
+    @abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        """Export spans; exceptions are logged by the caller and the batch is dropped."""
+
+    def shutdown(self) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps finished spans in a list (tests, debugging)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends spans as JSON lines to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class ConsoleSpanExporter(SpanExporter):
+    """Logs spans as JSON lines."""
+
+    def export(self, spans: List[Span]) -> None:
+        for span in spans:
+            logger.info(f"span {json.dumps(span.to_dict(), default=str)}")
+
+
+class OTLPHttpSpanExporter(SpanExporter):
+    """Posts spans as OTLP/HTTP JSON to a collector (e.g. the OpenTelemetry Collector or Jaeger)."""
+
+    def __init__(self, endpoint: str = "http://localhost:4318/v1/traces", service_name: str = "mentor-ai",
+                 timeout: float = 5.0):
+        import httpx
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._client = httpx.Client(timeout=timeout)
+
+    def export(self, spans: List[Span]) -> None:
+        response = self._client.post(self.endpoint, json=self.to_otlp(spans))
+        response.raise_for_status()
+
+    def to_otlp(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "mentor_ai"},
+                    "spans": [self._otlp_span(span) for span in spans],
+                }],
+            }]
+        }
+
+    @staticmethod
+    def _otlp_span(span: Span) -> Dict[str, Any]:
+        data = {
+            "traceId": span.context.trace_id,
+            "spanId": span.context.span_id,
+            "name": span.name,
+            "kind": SPAN_KINDS.get(span.kind, 1),
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _otlp_attributes(span.attributes),
+            "status": {"code": STATUS_CODES[span.status], "message": span.status_message},
+        }
+        if span.parent_id:
+            data["parentSpanId"] = span.parent_id
+        return data
+
+    def shutdown(self) -> None:
+        self._client.close()
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    result = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        result.append({"key": key, "value": typed})
+    return result
+
+
+class BatchSpanProcessor:
+    """
+    Buffers finished spans and exports them from a background thread, so
+    exporting (file or network I/O) never runs on the request path.
+    """
+
+    def __init__(self, exporter: SpanExporter, max_batch_size: int = 256, schedule_delay: float = 2.0,
+                 max_queue_size: int = 8192):
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.schedule_delay = schedule_delay
+        self._queue: deque = deque(maxlen=max_queue_size)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._worker: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            if self._stopped:
+                return
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(span)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._worker.start()
+            if len(self._queue) >= self.max_batch_size:
+                self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.wait(self.schedule_delay)
+            self._wake.clear()
+            self._export_pending()
+
+    def _export_pending(self) -> None:
+        while True:
+            with self._lock:
+                batch = [self._queue.popleft() for _ in range(min(self.max_batch_size, len(self._queue)))]
+            if not batch:
+                return
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                logger.warning(f"Failed to export {len(batch)} spans: {e}")
+
+    def force_flush(self) -> None:
+        self._export_pending()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._stopped = True
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+        self._export_pending()
+        self.exporter.shutdown()
+
+
+class SimpleSpanProcessor:
+    """Exports every span synchronously as it ends (tests, debugging)."""
+
+    def __init__(self, exporter: SpanExporter):
+        self.exporter = exporter
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self.exporter.export([span])
+        except Exception as e:
+            logger.warning(f"Failed to export span {span.name}: {e}")
+
+    def force_flush(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the configured processor."""
+
+    def __init__(self, service_name: str = "mentor-ai"):
+        self.service_name = service_name
+        self.sample_ratio = 1.0
+        self._processor = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._processor is not None
+
+    def configure(self, exporter: Optional[SpanExporter], batch: bool = True, sample_ratio: float = 1.0) -> None:
+        """
+        Replace the exporter; None disables tracing.
+
+        Args:
+            exporter: Destination of finished spans
+            batch: Export from a background thread (False exports synchronously)
+            sample_ratio: Fraction of new traces recorded; continued traces
+                follow the caller's sampled flag
+        """
+        self.shutdown()
+        self.sample_ratio = sample_ratio
+        if exporter is not None:
+            self._processor = BatchSpanProcessor(exporter) if batch else SimpleSpanProcessor(exporter)
+
+    @contextmanager
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "internal",
+                   parent: Optional[SpanContext] = None) -> Iterator[Span]:
+        """
+        Run the enclosed block in a new span, child of `parent` or the current span.
+
+        Exceptions are recorded on the span and re-raised.
+        """
+        processor = self._processor
+        if processor is None:
+            yield NOOP_SPAN
+            return
+
+        if parent is None:
+            current = _current_span.get()
+            parent = current.context if current is not None and current is not NOOP_SPAN else None
+        if parent is not None:
+            context = SpanContext(parent.trace_id, _new_span_id(), parent.sampled)
+            parent_id = parent.span_id
+        else:
+            context = SpanContext(_new_trace_id(), _new_span_id(), random.random() < self.sample_ratio)
+            parent_id = None
+
+        span = Span(name, context, parent_id, kind, attributes if context.sampled else None)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            if context.sampled:
+                processor.on_end(span)
+
+    def current_span(self) -> Span:
+        return _current_span.get() or NOOP_SPAN
+
+    def trace(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+              result_attributes: Optional[Callable[[Any], Dict[str, Any]]] = None):
+        """
+        Decorator running a function or coroutine function in a span.
+
+        Args:
+            name: Span name
+            attributes: Static span attributes
+            result_attributes: Maps the return value to extra attributes
+        """
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.start_span(name, attributes) as span:
+                        result = await func(*args, **kwargs)
+                        if result_attributes is not None and span.is_recording:
+                            span.set_attributes(result_attributes(result))
+                        return result
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.start_span(name, attributes) as span:
+                    result = func(*args, **kwargs)
+                    if result_attributes is not None and span.is_recording:
+                        span.set_attributes(result_attributes(result))
+                    return result
+            return wrapper
+        return decorator
+
+    def force_flush(self) -> None:
+        if self._processor is not None:
+            self._processor.force_flush()
+
+    def shutdown(self) -> None:
+        processor, self._processor = self._processor, None
+        if processor is not None:
+            processor.shutdown()
+
+
+def create_exporter(exporter: Optional[str] = None) -> Optional[SpanExporter]:
+    """
+    Build the exporter named by TRACING_EXPORTER ("none", "file", "otlp" or "console").
+    """
+    exporter = (exporter or os.getenv("TRACING_EXPORTER", "none")).lower()
+    if exporter in ("", "none"):
+        return None
+    if exporter == "file":
+        return FileSpanExporter(os.getenv("TRACING_FILE_PATH", "traces.jsonl"))
+    if exporter == "otlp":
+        return OTLPHttpSpanExporter(
+            endpoint=os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"),
+            service_name=tracer.service_name,
+        )
+    if exporter == "console":
+        return ConsoleSpanExporter()
+    raise ValueError(f"Unknown tracing exporter: {exporter}. Expected 'none', 'file', 'otlp' or 'console'")
+
+
+def configure_tracing() -> None:
+    """Configure the global tracer from TRACING_* environment variables."""
+    tracer.configure(create_exporter(), sample_ratio=float(os.getenv("TRACING_SAMPLE_RATIO", "1.0")))
+    if tracer.enabled:
+        logger.info(f"Tracing enabled: exporter={os.getenv('TRACING_EXPORTER')}, sample_ratio={tracer.sample_ratio}")
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per HTTP request."""
+
+    def __init__(self, app, excluded_paths=("/", "/health", "/metrics")):
+        self.app = app
+        self.excluded_paths = set(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled or scope.get("path") in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        parent = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        method = scope.get("method", "GET")
+        attributes = {"http.method": method, "http.target": scope.get("path", "")}
+
+        with tracer.start_span(f"{method} {scope.get('path', '')}", attributes, kind="server", parent=parent) as span:
+            async def send_with_traceparent(message):
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    span.set_attribute("http.status_code", status)
+                    if status >= 500:
+                        span.set_status("ERROR", f"HTTP {status}")
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"traceparent", format_traceparent(span.context).encode("latin-1"))
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_traceparent)
+            finally:
+                # The router stores the matched route in the scope; use its template as the name
+                route = scope.get("route")
+                if route is not None and getattr(route, "path", None):
+                    span.update_name(f"{method} {route.path}")
+                    span.set_attribute("http.route", route.path)
+
+
+tracer = Tracer(service_name=os.getenv("TRACING_SERVICE_NAME", "mentor-ai"))
+
+
+def load_spans(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Spans from a FileSpanExporter file, grouped by trace id."""
+    traces: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                span = json.loads(line)
+                traces[span["trace_id"]].append(span)
+    return traces
+
+
+def format_trace(spans: List[Dict[str, Any]]) -> str:
+    """Render one trace as an indented span tree with durations and offsets."""
+    by_parent: Dict[Optional[str], List[Dict[str, Any]]] = defaultdict(list)
+    ids = {span["span_id"] for span in spans}
+    for span in spans:
+        # Spans whose parent was not recorded (e.g. a remote caller) are shown as roots
+        parent = span.get("parent_span_id") if span.get("parent_span_id") in ids else None
+        by_parent[parent].append(span)
+    start = min(span["start_time_unix_nano"] for span in spans)
+
+    lines = []
+
+    def walk(parent_id: Optional[str], depth: int) -> None:
+        for span in sorted(by_parent.get(parent_id, []), key=lambda s: s["start_time_unix_nano"]):
+            offset_ms = (span["start_time_unix_nano"] - start) / 1e6
+            details = ", ".join(f"{key}={value}" for key, value in span["attributes"].items()
+                                if not key.startswith("http.") and not key.startswith("exception."))
+            error = " ERROR" if span["status"] == "ERROR" else ""
+            lines.append(f"{'  ' * depth}{span['name']}  {span['duration_ms']:.1f} ms  (+{offset_ms:.1f} ms)"
+                         f"{error}{'  ' + details if details else ''}")
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Show the slowest traces recorded by the file exporter")
+    parser.add_argument("path", help="JSON lines file written with TRACING_EXPORTER=file")
+    parser.add_argument("--top", type=int, default=5, help="Number of traces to show")
+    parser.add_argument("--name", help="Only traces whose root span name contains this text")
+    args = parser.parse_args(argv)
+
+    traces = load_spans(args.path)
+
+    def root_duration(spans):
+        roots = [span for span in spans if not span.get("parent_span_id")] or spans
+        return max(span["duration_ms"] for span in roots)
+
+    def root_name(spans):
+        roots = [span for span in spans if not span.get("parent_span_id")] or spans
+        return roots[0]["name"]
+
+    selected = [spans for spans in traces.values() if not args.name or args.name in root_name(spans)]
+    for spans in sorted(selected, key=root_duration, reverse=True)[:args.top]:
+        sys.stdout.write(f"trace {spans[0]['trace_id']}  {root_duration(spans):.1f} ms\n")
+        sys.stdout.write(format_trace(spans) + "\n\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,16 @@ from .schemas import DocumentChunk, RetrievalResult
 from .retriever import RegRetriever
 from .vector_store import VectorStore
 from .simple_store import SimpleVectorStore
+from .sharded_store import ShardedVectorStore, create_vector_store
+from .bm25 import BM25Index
+from .chunk_store import ChunkStore
+from .quantization import QuantizedEmbeddings
+from .chunking import SentenceChunker
+from .dedup import NearDuplicateDetector
+from .filters import MetadataFilterIndex
+from .embeddings import EmbeddingProvider, HashingEmbeddingProvider, OpenAIEmbeddingProvider, create_embedding_provider
 from .pdf_reader import PDFReader
+from .prefetch import RetrievalPrefetcher, retrieval_prefetcher
 
 __all__ = [
     "DocumentChunk",
@@ -15,5 +24,19 @@ __all__ = [
     "RegRetriever",
     "VectorStore",
     "SimpleVectorStore",
-    "PDFReader"
+    "ShardedVectorStore",
+    "create_vector_store",
+    "BM25Index",
+    "ChunkStore",
+    "QuantizedEmbeddings",
+    "SentenceChunker",
+    "NearDuplicateDetector",
+    "MetadataFilterIndex",
+    "EmbeddingProvider",
+    "HashingEmbeddingProvider",
+    "OpenAIEmbeddingProvider",
+    "create_embedding_provider",
+    "PDFReader",
+    "RetrievalPrefetcher",
+    "retrieval_prefetcher"
 ]
@@ -0,0 +1,261 @@
+"""
+Offline retrieval benchmark.
+
+Builds seeded synthetic corpora (clustered embeddings plus filler text for
+the lexical index), runs them through VectorStore configurations and reports
+build/save/load time, memory, index size on disk, query latency percentiles
+and recall@k against exact brute-force search. Nothing calls an embeddings
+API, so results are reproducible and runnable without network access.
+"""
+
+import time
+import logging
+import tempfile
+import tracemalloc
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .schemas import DocumentChunk
+from .vector_store import VectorStore
+from .simple_store import SimpleVectorStore
+from .sharded_store import ShardedVectorStore
+
+logger = logging.getLogger(__name__)
+
+# Store configurations compared by default; "exact" is the reference
+STORE_FACTORIES: Dict[str, Callable[[], VectorStore]] = {
+    "exact": lambda: SimpleVectorStore(storage="float32"),
+    "sharded": lambda: ShardedVectorStore(storage="float32"),
+    "float16": lambda: SimpleVectorStore(storage="float16"),
+    "int8": lambda: SimpleVectorStore(storage="int8"),
+    # Quantized scores only, no exact re-rank: the raw approximation error
+    "int8-no-rerank": lambda: SimpleVectorStore(storage="int8", rerank_factor=1),
+}
+
+_VOCABULARY = (
+    "goal plan habit feedback delegation career health focus team manager "
+    "progress review week skill mentor energy priority routine growth coach"
+).split()
+
+
+@dataclass
+class SyntheticCorpus:
+    """Chunks, their embeddings and held-out queries for one benchmark run."""
+    chunks: List[DocumentChunk]
+    embeddings: np.ndarray
+    queries: np.ndarray
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of one store configuration on one corpus."""
+    store: str
+    num_docs: int
+    dim: int
+    build_seconds: float
+    build_peak_mb: float
+    save_seconds: float
+    index_mb: float
+    load_seconds: float
+    load_peak_mb: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    recall_at_k: float
+
+    def to_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+def make_corpus(num_docs: int, dim: int, num_queries: int = 200, num_clusters: int = 32,
+                seed: int = 0) -> SyntheticCorpus:
+    """
+    Generate a deterministic synthetic corpus.
+
+    Embeddings are drawn around random cluster centers so nearest neighbours
+    are meaningful; queries are perturbed copies of random documents.
+
+    Args:
+        num_docs: Number of chunks
+        dim: Embedding dimension
+        num_queries: Number of queries
+        num_clusters: Number of embedding clusters
+        seed: Random seed
+    """
+    rng = np.random.RandomState(seed)
+    centers = rng.randn(num_clusters, dim).astype(np.float32)
+    assignments = rng.randint(0, num_clusters, size=num_docs)
+    embeddings = centers[assignments] + 0.5 * rng.randn(num_docs, dim).astype(np.float32)
+
+    sources = rng.randint(0, len(embeddings), size=num_queries)
+    queries = embeddings[sources] + 0.3 * rng.randn(num_queries, dim).astype(np.float32)
+
+    words = rng.randint(0, len(_VOCABULARY), size=(num_docs, 12))
+    chunks = [
+        DocumentChunk(
+            id=f"bench_{i}",
+            content=" ".join(_VOCABULARY[w] for w in words[i]),
+            title=f"Synthetic {assignments[i]}",
+            source="synthetic.pdf",
+            chunk_index=i,
+            start_char=0,
+            end_char=0,
+            metadata={"topic": f"cluster_{assignments[i]}"},
+        )
+        for i in range(num_docs)
+    ]
+    return SyntheticCorpus(chunks=chunks, embeddings=embeddings, queries=queries.astype(np.float32))
+
+
+def exact_neighbours(corpus: SyntheticCorpus, k: int) -> np.ndarray:
+    """(num_queries, k) row ids of the true top-k by cosine similarity."""
+    docs = corpus.embeddings / np.linalg.norm(corpus.embeddings, axis=1, keepdims=True)
+    queries = corpus.queries / np.linalg.norm(corpus.queries, axis=1, keepdims=True)
+    similarities = queries.astype(np.float64) @ docs.T.astype(np.float64)
+    return np.argsort(-similarities, axis=1)[:, :k]
+
+
+def recall_at_k(retrieved: Sequence[Sequence[int]], truth: np.ndarray) -> float:
+    """Mean fraction of the true top-k found in each query's results."""
+    k = truth.shape[1]
+    hits = [len(set(rows[:k]) & set(true_rows.tolist())) for rows, true_rows in zip(retrieved, truth)]
+    return float(np.mean(hits) / k) if hits else 0.0
+
+
+def _megabytes(num_bytes: float) -> float:
+    return round(num_bytes / (1024 * 1024), 2)
+
+
+def _directory_bytes(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def _measure(fn: Callable[[], None]):
+    """Run fn; return (seconds, peak traced allocation in bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        fn()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def benchmark_store(name: str, factory: Callable[[], VectorStore], corpus: SyntheticCorpus,
+                    truth: np.ndarray, top_k: int = 10, batch_size: int = 64,
+                    warmup_queries: int = 5) -> BenchmarkResult:
+    """
+    Build, save, reload and query one store configuration.
+
+    Args:
+        name: Configuration label
+        factory: Creates an empty store
+        corpus: Corpus from make_corpus()
+        truth: Exact neighbours from exact_neighbours()
+        top_k: Results per query
+        batch_size: Chunks per add_documents() call, as at ingest time
+        warmup_queries: Untimed queries before latency is measured
+    """
+    store = factory()
+    embeddings = corpus.embeddings.tolist()
+
+    def build():
+        for start in range(0, len(corpus.chunks), batch_size):
+            store.add_documents(corpus.chunks[start:start + batch_size], embeddings[start:start + batch_size])
+
+    build_seconds, build_peak = _measure(build)
+
+    with tempfile.TemporaryDirectory(prefix="rag-bench-") as index_dir:
+        save_start = time.perf_counter()
+        store.save(index_dir)
+        save_seconds = time.perf_counter() - save_start
+        index_bytes = _directory_bytes(Path(index_dir))
+
+        loaded = factory()
+        load_seconds, load_peak = _measure(lambda: loaded.load(index_dir))
+
+        row_by_id = {chunk.id: i for i, chunk in enumerate(corpus.chunks)}
+        queries = corpus.queries.tolist()
+        for query in queries[:warmup_queries]:
+            loaded.search(query, top_k=top_k)
+
+        latencies = []
+        retrieved = []
+        for query in queries:
+            start = time.perf_counter()
+            results = loaded.search(query, top_k=top_k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            retrieved.append([row_by_id[chunk.id] for chunk in results])
+
+        # Loaded stores may hold memory maps into index_dir
+        loaded.clear()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return BenchmarkResult(
+        store=name,
+        num_docs=len(corpus.chunks),
+        dim=corpus.embeddings.shape[1],
+        build_seconds=round(build_seconds, 3),
+        build_peak_mb=_megabytes(build_peak),
+        save_seconds=round(save_seconds, 3),
+        index_mb=_megabytes(index_bytes),
+        load_seconds=round(load_seconds, 3),
+        load_peak_mb=_megabytes(load_peak),
+        p50_ms=round(float(p50), 3),
+        p95_ms=round(float(p95), 3),
+        p99_ms=round(float(p99), 3),
+        recall_at_k=round(recall_at_k(retrieved, truth), 4),
+    )
+
+
+def run_benchmark(sizes: Sequence[int], dim: int = 384, stores: Optional[Sequence[str]] = None,
+                  top_k: int = 10, num_queries: int = 200, seed: int = 0) -> List[BenchmarkResult]:
+    """
+    Benchmark every store configuration on a corpus of each size.
+
+    Args:
+        sizes: Corpus sizes (number of chunks)
+        dim: Embedding dimension
+        stores: Names from STORE_FACTORIES (defaults to all)
+        top_k: Results per query, also the k of recall@k
+        num_queries: Queries per corpus
+        seed: Random seed for corpus generation
+
+    Returns:
+        One result per (size, store)
+    """
+    stores = list(stores or STORE_FACTORIES)
+    unknown = [name for name in stores if name not in STORE_FACTORIES]
+    if unknown:
+        raise ValueError(f"Unknown store configurations: {unknown}. Expected some of {list(STORE_FACTORIES)}")
+
+    # Stores log every query at INFO; keep the timings clean
+    retrieval_logger = logging.getLogger(__name__.rsplit(".", 1)[0])
+    previous_level = retrieval_logger.level
+    retrieval_logger.setLevel(logging.WARNING)
+    try:
+        results = []
+        for size in sizes:
+            corpus = make_corpus(size, dim, num_queries=num_queries, seed=seed)
+            truth = exact_neighbours(corpus, top_k)
+            for name in stores:
+                result = benchmark_store(name, STORE_FACTORIES[name], corpus, truth, top_k=top_k)
+                results.append(result)
+        return results
+    finally:
+        retrieval_logger.setLevel(previous_level)
+
+
+def format_results(results: Sequence[BenchmarkResult]) -> str:
+    """Render results as a fixed-width table."""
+    columns = list(BenchmarkResult.__dataclass_fields__)
+    rows = [[str(value) for value in result.to_dict().values()] for result in results]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    lines = ["  ".join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines += ["  ".join(value.ljust(width) for value, width in zip(row, widths)) for row in rows]
+    return "\n".join(lines)
@@ -0,0 +1,183 @@
+"""
+Lexical BM25 index over chunk contents.
+
+Built incrementally while documents are added at ingest time and persisted
+next to embeddings.npy, so retrieval keeps working (lexical-only) when no
+embeddings can be computed for the query.
+"""
+
+import re
+import logging
+from collections import Counter
+from itertools import chain
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BM25_FILENAME = "bm25.npz"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Small English stopword list; coaching queries are short, so dropping the
+# most frequent function words is enough to keep postings lists lean.
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have he her his i if in into is it its
+me my not of on or our she so that the their them then there these they this to
+was we were what when which who will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords and single characters."""
+    return [
+        token for token in _TOKEN_RE.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+class BM25Index:
+    """Okapi BM25 inverted index stored as CSR-style postings arrays."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._vocab: Dict[str, int] = {}
+        # Build-time postings (one list per term)
+        self._post_docs: List[List[int]] = []
+        self._post_tfs: List[List[int]] = []
+        self._doc_lengths: List[int] = []
+        # Query-time arrays, rebuilt lazily after additions
+        self._offsets: Optional[np.ndarray] = None
+        self._doc_ids: Optional[np.ndarray] = None
+        self._term_freqs: Optional[np.ndarray] = None
+        self._idf: Optional[np.ndarray] = None
+        self._length_norm: Optional[np.ndarray] = None
+
+    @property
+    def num_documents(self) -> int:
+        return len(self._doc_lengths)
+
+    def add_documents(self, texts: List[str]) -> None:
+        """Index texts; document ids continue from the current count."""
+        self._ensure_postings_lists()
+
+        for text in texts:
+            doc_id = len(self._doc_lengths)
+            counts = Counter(tokenize(text))
+            self._doc_lengths.append(sum(counts.values()))
+
+            for term, tf in counts.items():
+                term_id = self._vocab.get(term)
+                if term_id is None:
+                    term_id = len(self._vocab)
+                    self._vocab[term] = term_id
+                    self._post_docs.append([])
+                    self._post_tfs.append([])
+                self._post_docs[term_id].append(doc_id)
+                self._post_tfs[term_id].append(tf)
+
+        self._offsets = None
+
+    def score(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query (zeros if no term matches)."""
+        self._finalize()
+        scores = np.zeros(self.num_documents, dtype=np.float32)
+
+        for term in set(tokenize(query)):
+            term_id = self._vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self._offsets[term_id], self._offsets[term_id + 1]
+            docs = self._doc_ids[start:end]
+            tf = self._term_freqs[start:end]
+            scores[docs] += self._idf[term_id] * tf * (self.k1 + 1) / (tf + self._length_norm[docs])
+
+        return scores
+
+    def search(self, query: str, top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (doc indices, scores) of the best matching documents."""
+        scores = self.score(query)
+        matched = np.flatnonzero(scores > 0)
+        if matched.size == 0:
+            return matched, scores[matched]
+
+        k = min(top_k, matched.size)
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+    def clear(self) -> None:
+        """Remove all documents."""
+        self._vocab = {}
+        self._post_docs, self._post_tfs = [], []
+        self._doc_lengths = []
+        self._offsets = None
+
+    def save(self, path: str) -> None:
+        """Persist the index as bm25.npz inside the given directory."""
+        self._finalize()
+        terms = sorted(self._vocab, key=self._vocab.get)
+        np.savez(
+            Path(path) / BM25_FILENAME,
+            terms=np.array(terms, dtype=str),
+            offsets=self._offsets,
+            doc_ids=self._doc_ids,
+            term_freqs=self._term_freqs,
+            doc_lengths=np.asarray(self._doc_lengths, dtype=np.int32),
+            params=np.array([self.k1, self.b], dtype=np.float64),
+        )
+
+    def load(self, path: str) -> bool:
+        """Load bm25.npz from the directory. Returns False if it does not exist."""
+        index_file = Path(path) / BM25_FILENAME
+        if not index_file.exists():
+            return False
+
+        with np.load(index_file, allow_pickle=False) as data:
+            self.k1, self.b = (float(v) for v in data["params"])
+            self._vocab = {term: i for i, term in enumerate(data["terms"].tolist())}
+            self._offsets = data["offsets"]
+            self._doc_ids = data["doc_ids"]
+            self._term_freqs = data["term_freqs"]
+            self._doc_lengths = data["doc_lengths"].tolist()
+
+        self._post_docs, self._post_tfs = [], []
+        self._compute_weights()
+        logger.info(f"Loaded BM25 index: {self.num_documents} documents, {len(self._vocab)} terms")
+        return True
+
+    def _finalize(self) -> None:
+        """Pack build-time postings into contiguous arrays."""
+        if self._offsets is not None:
+            return
+
+        lengths = [len(docs) for docs in self._post_docs]
+        total = sum(lengths)
+        self._offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        self._offsets[1:] = np.cumsum(lengths)
+        self._doc_ids = np.fromiter(chain.from_iterable(self._post_docs), dtype=np.int32, count=total)
+        self._term_freqs = np.fromiter(chain.from_iterable(self._post_tfs), dtype=np.float32, count=total)
+        self._compute_weights()
+
+    def _compute_weights(self) -> None:
+        """Precompute idf per term and the length normalization per document."""
+        num_docs = self.num_documents
+        doc_freqs = np.diff(self._offsets).astype(np.float32)
+        self._idf = np.log1p((num_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+
+        doc_lengths = np.asarray(self._doc_lengths, dtype=np.float32)
+        avg_length = doc_lengths.mean() if num_docs else 1.0
+        avg_length = avg_length or 1.0
+        self._length_norm = (self.k1 * (1 - self.b + self.b * doc_lengths / avg_length)).astype(np.float32)
+
+    def _ensure_postings_lists(self) -> None:
+        """Unpack loaded arrays back into lists so more documents can be added."""
+        if self._post_docs or self._offsets is None or not self._vocab:
+            return
+        for term_id in range(len(self._vocab)):
+            start, end = self._offsets[term_id], self._offsets[term_id + 1]
+            self._post_docs.append(self._doc_ids[start:end].tolist())
+            self._post_tfs.append(self._term_freqs[start:end].astype(int).tolist())
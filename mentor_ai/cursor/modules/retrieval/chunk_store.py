@@ -0,0 +1,195 @@
+"""
+Compact binary chunk storage with lazy per-hit materialization.
+
+Layout inside the index directory:
+    chunks.bin          UTF-8 blob: all chunk contents followed by all chunk ids
+    chunks_meta.npz     offsets into the blob plus per-chunk numeric columns and
+                        references into the string table
+    chunks_strings.json de-duplicated titles, sources and metadata JSON
+
+Loading reads only the offsets/columns and the (small) string table; the text
+blob is memory-mapped and DocumentChunk objects are built only for the rows
+that are actually returned by a search.
+"""
+
+import json
+import mmap
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Union
+
+import numpy as np
+
+from .schemas import DocumentChunk
+
+logger = logging.getLogger(__name__)
+
+BLOB_FILENAME = "chunks.bin"
+COLUMNS_FILENAME = "chunks_meta.npz"
+STRINGS_FILENAME = "chunks_strings.json"
+
+# Scores written into chunk.metadata by searches; never persisted
+SEARCH_SCORE_KEYS = frozenset({"similarity_score", "bm25_score", "hybrid_score", "rrf_score", "mmr_score"})
+
+
+def write_chunk_store(path: Union[str, Path], chunks: Sequence[DocumentChunk]) -> None:
+    """
+    Write chunks in the binary layout.
+
+    Args:
+        path: Index directory
+        chunks: Chunks to store, in index order
+    """
+    path = Path(path)
+    strings: List[str] = []
+    string_refs: Dict[str, int] = {}
+
+    def ref(value: str) -> int:
+        if value not in string_refs:
+            string_refs[value] = len(strings)
+            strings.append(value)
+        return string_refs[value]
+
+    count = len(chunks)
+    content_offsets = np.zeros(count + 1, dtype=np.int64)
+    id_offsets = np.zeros(count + 1, dtype=np.int64)
+    chunk_index = np.zeros(count, dtype=np.int32)
+    start_char = np.zeros(count, dtype=np.int64)
+    end_char = np.zeros(count, dtype=np.int64)
+    created_at = np.zeros(count, dtype=np.float64)
+    title_ref = np.zeros(count, dtype=np.int32)
+    source_ref = np.zeros(count, dtype=np.int32)
+    metadata_ref = np.zeros(count, dtype=np.int32)
+
+    encoded_ids = []
+    with open(path / BLOB_FILENAME, "wb") as blob:
+        position = 0
+        for i, chunk in enumerate(chunks):
+            data = chunk.content.encode("utf-8")
+            blob.write(data)
+            position += len(data)
+            content_offsets[i + 1] = position
+
+            chunk_index[i] = chunk.chunk_index
+            start_char[i] = chunk.start_char
+            end_char[i] = chunk.end_char
+            created_at[i] = chunk.created_at.timestamp()
+            title_ref[i] = ref(chunk.title)
+            source_ref[i] = ref(chunk.source)
+            # Per-search scores are not part of the stored chunk
+            metadata = {k: v for k, v in chunk.metadata.items() if k not in SEARCH_SCORE_KEYS}
+            metadata_ref[i] = ref(json.dumps(metadata, ensure_ascii=False, sort_keys=True, default=str))
+            encoded_ids.append(chunk.id.encode("utf-8"))
+
+        # Ids follow the contents in the same blob
+        id_offsets[0] = position
+        for i, data in enumerate(encoded_ids):
+            blob.write(data)
+            position += len(data)
+            id_offsets[i + 1] = position
+
+    np.savez(
+        path / COLUMNS_FILENAME,
+        content_offsets=content_offsets,
+        id_offsets=id_offsets,
+        chunk_index=chunk_index,
+        start_char=start_char,
+        end_char=end_char,
+        created_at=created_at,
+        title_ref=title_ref,
+        source_ref=source_ref,
+        metadata_ref=metadata_ref,
+    )
+
+    with open(path / STRINGS_FILENAME, "w", encoding="utf-8") as f:
+        json.dump(strings, f, ensure_ascii=False)
+
+    logger.info(f"Wrote binary chunk store with {count} chunks ({position} bytes of text)")
+
+
+def chunk_store_exists(path: Union[str, Path]) -> bool:
+    """Check whether a binary chunk store is present in the directory."""
+    path = Path(path)
+    return all((path / name).exists() for name in (BLOB_FILENAME, COLUMNS_FILENAME, STRINGS_FILENAME))
+
+
+class ChunkStore(Sequence):
+    """Read-only, lazily materialized sequence of DocumentChunk."""
+
+    def __init__(self, path: Union[str, Path]):
+        path = Path(path)
+        with np.load(path / COLUMNS_FILENAME, allow_pickle=False) as data:
+            self._content_offsets = data["content_offsets"]
+            self._id_offsets = data["id_offsets"]
+            self._chunk_index = data["chunk_index"]
+            self._start_char = data["start_char"]
+            self._end_char = data["end_char"]
+            self._created_at = data["created_at"]
+            self._title_ref = data["title_ref"]
+            self._source_ref = data["source_ref"]
+            self._metadata_ref = data["metadata_ref"]
+
+        with open(path / STRINGS_FILENAME, "r", encoding="utf-8") as f:
+            self._strings: List[str] = json.load(f)
+
+        self._file = open(path / BLOB_FILENAME, "rb")
+        size = self._id_offsets[-1]
+        # mmap cannot map an empty file
+        self._blob = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self._chunk_index)
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[DocumentChunk, List[DocumentChunk]]:
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        idx = int(idx)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("chunk index out of range")
+        return self._materialize(idx)
+
+    def __iter__(self) -> Iterator[DocumentChunk]:
+        for i in range(len(self)):
+            yield self._materialize(i)
+
+    def content(self, idx: int) -> str:
+        """Return only the text of a chunk without building the model."""
+        return self._slice(self._content_offsets, idx)
+
+    def chunk_id(self, idx: int) -> str:
+        """Return only the id of a chunk without building the model."""
+        return self._slice(self._id_offsets, idx)
+    
+    def iter_contents(self) -> Iterator[str]:
+        """Iterate over chunk texts without building models."""
+        for i in range(len(self)):
+            yield self.content(i)
+
+    def close(self) -> None:
+        """Release the memory map and file handle."""
+        if isinstance(self._blob, mmap.mmap):
+            self._blob.close()
+        self._file.close()
+
+    def _slice(self, offsets: np.ndarray, idx: int) -> str:
+        return bytes(self._blob[offsets[idx]:offsets[idx + 1]]).decode("utf-8")
+
+    def _materialize(self, idx: int) -> DocumentChunk:
+        metadata: Dict[str, Any] = json.loads(self._strings[self._metadata_ref[idx]])
+        # Stored rows were validated when written; skip pydantic validation here
+        chunk = DocumentChunk.model_construct(
+            id=self.chunk_id(idx),
+            content=self.content(idx),
+            title=self._strings[self._title_ref[idx]],
+            source=self._strings[self._source_ref[idx]],
+            chunk_index=int(self._chunk_index[idx]),
+            start_char=int(self._start_char[idx]),
+            end_char=int(self._end_char[idx]),
+            metadata=metadata,
+            created_at=datetime.fromtimestamp(float(self._created_at[idx])),
+        )
+        chunk._store_row = idx
+        return chunk
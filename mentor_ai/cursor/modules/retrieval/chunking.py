@@ -0,0 +1,194 @@
+"""
+Streaming, sentence-aware text chunking.
+
+Text arrives as an iterable of segments (file blocks, pages, ...). Sentences
+are cut as soon as their end is seen, and chunks are yielded as soon as they
+are full, so memory is bounded by one chunk plus one unfinished sentence
+regardless of document size.
+
+Every span carries offsets into the original text: for a chunk,
+``text[chunk.start:chunk.end] == chunk.text``, which makes the offsets usable
+for highlighting.
+"""
+
+import re
+import logging
+from collections import deque
+from typing import Callable, Deque, Iterable, Iterator, NamedTuple, Optional
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by
+# whitespace, or a blank line between paragraphs
+_SENTENCE_END_RE = re.compile(r"""[.!?]+["')\]]*\s+|\n\s*\n""")
+# Words with their surrounding whitespace; consecutive matches tile the text
+_WORD_RE = re.compile(r"\s*\S+\s*")
+# Rough tokenizer used when tiktoken is not installed
+_APPROX_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# Text without any sentence end is force-split after this many characters
+MAX_SENTENCE_CHARS = 4000
+
+CHUNK_UNITS = ("chars", "tokens")
+
+
+class TextSpan(NamedTuple):
+    """A piece of text and its [start, end) character offsets in the source."""
+    start: int
+    end: int
+    text: str
+
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken (cl100k_base) if available, else approximately."""
+    global _encoding
+    if TIKTOKEN_AVAILABLE:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text))
+    return len(_APPROX_TOKEN_RE.findall(text))
+
+
+def iter_sentences(segments: Iterable[str], max_sentence_chars: int = MAX_SENTENCE_CHARS) -> Iterator[TextSpan]:
+    """
+    Split streamed text into sentences.
+
+    Spans keep their punctuation and trailing whitespace, so consecutive spans
+    tile the input exactly.
+
+    Args:
+        segments: Consecutive pieces of one document
+        max_sentence_chars: Force a split (at whitespace if possible) when no
+            sentence end appears within this many characters
+
+    Yields:
+        Sentence spans in document order
+    """
+    buffer = ""
+    offset = 0  # Position of buffer[0] in the document
+
+    for segment in segments:
+        if not segment:
+            continue
+        buffer += segment
+        position = 0
+
+        for match in _SENTENCE_END_RE.finditer(buffer):
+            # A match touching the end may continue in the next segment
+            if match.end() == len(buffer):
+                break
+            if buffer[position:match.end()].strip():
+                yield TextSpan(offset + position, offset + match.end(), buffer[position:match.end()])
+                position = match.end()
+
+        while len(buffer) - position > max_sentence_chars:
+            cut = buffer.rfind(" ", position + 1, position + max_sentence_chars + 1)
+            cut = cut + 1 if cut > position else position + max_sentence_chars
+            yield TextSpan(offset + position, offset + cut, buffer[position:cut])
+            position = cut
+
+        buffer = buffer[position:]
+        offset += position
+
+    if buffer.strip():
+        yield TextSpan(offset, offset + len(buffer), buffer)
+
+
+class SentenceChunker:
+    """Packs whole sentences into chunks of a maximum size with sentence overlap."""
+
+    def __init__(self, chunk_size: int = 1000, overlap: Optional[int] = None, unit: str = "chars",
+                 length_function: Optional[Callable[[str], int]] = None):
+        """
+        Args:
+            chunk_size: Maximum chunk size in `unit`
+            overlap: Size of the trailing sentences repeated at the start of the
+                next chunk (defaults to 25% of chunk_size)
+            unit: "chars" or "tokens"
+            length_function: Custom size measure, overrides `unit`
+        """
+        if unit not in CHUNK_UNITS:
+            raise ValueError(f"Unknown chunk unit: {unit}. Expected one of {CHUNK_UNITS}")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+
+        self.chunk_size = chunk_size
+        self.overlap = chunk_size // 4 if overlap is None else overlap
+        self.unit = unit
+        self.length = length_function or (count_tokens if unit == "tokens" else len)
+
+    def chunk(self, segments: Iterable[str]) -> Iterator[TextSpan]:
+        """
+        Yield chunks of the streamed text.
+
+        Args:
+            segments: Consecutive pieces of one document
+
+        Yields:
+            Chunk spans with whitespace trimmed and true source offsets
+        """
+        window: Deque[TextSpan] = deque()
+        sizes: Deque[int] = deque()
+        window_size = 0
+
+        for sentence in self._iter_pieces(iter_sentences(segments)):
+            size = self.length(sentence.text)
+
+            if window and window_size + size > self.chunk_size:
+                chunk = self._make_chunk(window)
+                if chunk:
+                    yield chunk
+                # Keep trailing whole sentences as overlap
+                while window and (window_size > self.overlap or window_size + size > self.chunk_size):
+                    window.popleft()
+                    window_size -= sizes.popleft()
+
+            window.append(sentence)
+            sizes.append(size)
+            window_size += size
+
+        if window:
+            chunk = self._make_chunk(window)
+            if chunk:
+                yield chunk
+
+    def _iter_pieces(self, sentences: Iterable[TextSpan]) -> Iterator[TextSpan]:
+        """Split sentences larger than chunk_size at word boundaries."""
+        for sentence in sentences:
+            if self.length(sentence.text) <= self.chunk_size:
+                yield sentence
+                continue
+
+            text = sentence.text
+            piece_start, piece_size = 0, 0
+            for match in _WORD_RE.finditer(text):
+                word_size = self.length(match.group())
+                if piece_size and piece_size + word_size > self.chunk_size:
+                    yield TextSpan(sentence.start + piece_start, sentence.start + match.start(),
+                                   text[piece_start:match.start()])
+                    piece_start, piece_size = match.start(), 0
+                piece_size += word_size
+
+            if piece_start < len(text):
+                yield TextSpan(sentence.start + piece_start, sentence.end, text[piece_start:])
+
+    @staticmethod
+    def _make_chunk(window: Iterable[TextSpan]) -> Optional[TextSpan]:
+        """Join consecutive sentences and trim surrounding whitespace."""
+        window = list(window)
+        raw = "".join(sentence.text for sentence in window)
+        stripped = raw.lstrip()
+        start = window[0].start + len(raw) - len(stripped)
+        stripped = stripped.rstrip()
+        if not stripped:
+            return None
+        return TextSpan(start, start + len(stripped), stripped)
@@ -0,0 +1,133 @@
+"""
+Near-duplicate detection for chunks at ingest time.
+
+Each text gets a MinHash signature over word shingles; locality-sensitive
+hashing (LSH) bands find candidate pairs in O(1) per chunk, and a candidate
+is a duplicate when the estimated Jaccard similarity reaches the threshold.
+"""
+
+import re
+import zlib
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Mersenne prime for the universal hash family h(x) = (a * x + b) mod p
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+
+def _choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) with bands * rows == num_perm whose LSH S-curve
+    threshold (1 / bands) ** (1 / rows) is closest to the target.
+    """
+    best = (num_perm, 1)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class NearDuplicateDetector:
+    """Streaming MinHash/LSH near-duplicate filter."""
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity at or above which a text is a duplicate
+            num_perm: Number of MinHash permutations (signature length)
+            shingle_size: Words per shingle
+            seed: Seed for the hash permutations
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _choose_bands(num_perm, threshold)
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_MERSENNE_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE_PRIME), size=num_perm).astype(np.uint64)
+
+        self._signatures: List[np.ndarray] = []
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+        self.num_duplicates = 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of the text's word shingles, or None if it has no words."""
+        words = _WORD_RE.findall(text.lower())
+        if not words:
+            return None
+
+        size = min(self.shingle_size, len(words))
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+        # (num_perm, num_shingles) permuted hashes; minimum per permutation
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def find_duplicate(self, text: str) -> Optional[int]:
+        """Return the position of an indexed near-duplicate of the text, if any."""
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        return self._find(signature)
+
+    def add(self, text: str) -> bool:
+        """
+        Register the text unless it near-duplicates one already added.
+
+        Returns:
+            True if the text is new and was kept, False if it is a duplicate
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return True
+
+        if self._find(signature) is not None:
+            self.num_duplicates += 1
+            return False
+
+        position = len(self._signatures)
+        self._signatures.append(signature)
+        for band, key in self._band_keys(signature):
+            self._buckets[(band, key)].append(position)
+        return True
+
+    def clear(self) -> None:
+        """Forget all added texts."""
+        self._signatures = []
+        self._buckets = defaultdict(list)
+        self.num_duplicates = 0
+
+    def _find(self, signature: np.ndarray) -> Optional[int]:
+        checked = set()
+        for band, key in self._band_keys(signature):
+            for position in self._buckets.get((band, key), ()):
+                if position in checked:
+                    continue
+                checked.add(position)
+                if np.mean(self._signatures[position] == signature) >= self.threshold:
+                    return position
+        return None
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
@@ -0,0 +1,223 @@
+"""
+Embedding providers used by DocumentIngester and RegRetriever.
+
+    openai   OpenAI embeddings API (EMBEDDINGS_MODEL), one request per batch
+    hashing  Local, deterministic character n-gram feature hashing; no network,
+             no model download, suitable for CI and offline index builds
+
+Selected with EMBEDDINGS_PROVIDER. An index must be queried with the provider
+it was built with; create_rag_index.py records it in the version manifest.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+OPENAI_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+DEFAULT_HASHING_DIMENSION = 384
+
+# Multiplier of the polynomial rolling hash over UTF-8 bytes
+_HASH_BASE = np.uint64(1099511628211)
+
+
+class EmbeddingProvider(ABC):
+    """Turns texts into fixed-size embedding vectors."""
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """Identifier recorded with an index, e.g. "openai:text-embedding-3-small"."""
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """Length of the returned vectors."""
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One vector per text, in input order
+
+        Raises:
+            Exception: If the embeddings cannot be computed; callers decide on a fallback
+        """
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """Async embed; the default runs embed() in a worker thread."""
+        return await asyncio.to_thread(self.embed, texts)
+
+    def zero_vectors(self, count: int) -> List[List[float]]:
+        """Fallback vectors; vector and hybrid search treat them as "no embedding"."""
+        return [[0.0] * self.dimension for _ in range(count)]
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """OpenAI embeddings API with reused sync and async clients."""
+
+    def __init__(self, model: str = "text-embedding-3-small", api_key: Optional[str] = None):
+        self.model = model
+        self.api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY", "")
+        self._client = None
+        self._async_client = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return f"openai:{self.model}"
+
+    @property
+    def dimension(self) -> int:
+        return OPENAI_DIMENSIONS.get(self.model, 1536)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        response = self._get_client().embeddings.create(model=self.model, input=texts)
+        # The API may return items out of order; restore input order
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        response = await self._get_async_client().embeddings.create(model=self.model, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = self._make_client(async_client=False)
+            return self._client
+
+    def _get_async_client(self):
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = self._make_client(async_client=True)
+            return self._async_client
+
+    def _make_client(self, async_client: bool):
+        if not self.api_key:
+            raise ValueError("OPENAI_API_KEY is not set; cannot compute OpenAI embeddings")
+        import openai
+        base_url = os.getenv("OPENAI_BASE_URL") or None
+        client_class = openai.AsyncOpenAI if async_client else openai.OpenAI
+        return client_class(api_key=self.api_key, base_url=base_url)
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Signed feature hashing of character n-grams.
+
+    Each n-gram of the lowercased, whitespace-normalized text is hashed to a
+    bucket and a sign; the vector is the L2-normalized sum. This is a sparse
+    random projection of the n-gram count vector, so texts sharing many
+    n-grams get a high cosine similarity. A whole batch is hashed with NumPy
+    in one pass over the concatenated bytes.
+    """
+
+    def __init__(self, dimension: int = DEFAULT_HASHING_DIMENSION, ngram_range: Tuple[int, int] = (3, 5),
+                 seed: int = 0):
+        """
+        Args:
+            dimension: Vector length (number of hash buckets)
+            ngram_range: Inclusive range of byte n-gram lengths
+            seed: Changes the hash function (and therefore every vector)
+        """
+        if dimension <= 0:
+            raise ValueError("dimension must be positive")
+        if not 1 <= ngram_range[0] <= ngram_range[1]:
+            raise ValueError("ngram_range must be (min, max) with 1 <= min <= max")
+        self._dimension = dimension
+        self.ngram_range = ngram_range
+        self.seed = seed
+
+    @property
+    def name(self) -> str:
+        low, high = self.ngram_range
+        return f"hashing:{self._dimension}:{low}-{high}:{self.seed}"
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """Embed texts into a (len(texts), dimension) float32 array."""
+        vectors = np.zeros((len(texts), self._dimension), dtype=np.float32)
+        if not texts:
+            return vectors
+
+        # Pad each text with spaces so word starts and ends form their own n-grams
+        encoded = [f" {' '.join(text.lower().split())} ".encode("utf-8") for text in texts]
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+        lengths = np.array([len(e) for e in encoded], dtype=np.int64)
+        ends = np.cumsum(lengths)
+        text_ids = np.repeat(np.arange(len(texts)), lengths)
+
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            count = len(data) - n + 1
+            if count <= 0:
+                continue
+            # Rolling hash of every n-gram start position (uint64 wraps around)
+            hashes = np.full(count, np.uint64(self.seed * 2654435761 + n), dtype=np.uint64)
+            for j in range(n):
+                hashes = hashes * _HASH_BASE + data[j:j + count]
+            # Mix high bits down so bucket and sign use independent bits
+            hashes ^= hashes >> np.uint64(29)
+            hashes *= np.uint64(0xBF58476D1CE4E5B9)
+            hashes ^= hashes >> np.uint64(32)
+
+            # Drop n-grams that run across a text boundary
+            starts = np.arange(count)
+            owner = text_ids[:count]
+            valid = starts + n <= ends[owner]
+            hashes, owner = hashes[valid], owner[valid]
+
+            buckets = (hashes % np.uint64(self._dimension)).astype(np.int64)
+            signs = np.where(hashes >> np.uint64(63), -1.0, 1.0)
+            vectors += np.bincount(
+                owner * self._dimension + buckets, weights=signs, minlength=len(texts) * self._dimension
+            ).reshape(len(texts), self._dimension).astype(np.float32)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+def create_embedding_provider(provider: Optional[str] = None, model: Optional[str] = None,
+                              dimension: Optional[int] = None) -> EmbeddingProvider:
+    """
+    Build the configured embedding provider.
+
+    Args:
+        provider: "openai" or "hashing" (defaults to EMBEDDINGS_PROVIDER)
+        model: OpenAI model name (defaults to EMBEDDINGS_MODEL)
+        dimension: Hashing provider vector length (defaults to EMBEDDINGS_DIMENSION)
+    """
+    provider = (provider or os.getenv("EMBEDDINGS_PROVIDER", "openai")).lower()
+    if provider == "openai":
+        return OpenAIEmbeddingProvider(model=model or os.getenv("EMBEDDINGS_MODEL", "text-embedding-3-small"))
+    if provider in ("hashing", "local"):
+        return HashingEmbeddingProvider(
+            dimension=dimension or int(os.getenv("EMBEDDINGS_DIMENSION", str(DEFAULT_HASHING_DIMENSION)))
+        )
+    raise ValueError(f"Unknown embeddings provider: {provider}. Expected 'openai' or 'hashing'")
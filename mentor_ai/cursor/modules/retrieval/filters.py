@@ -0,0 +1,179 @@
+"""
+Metadata filters for vector store search.
+
+Filters are MongoDB-style dicts over chunk fields (title, source) and the
+top-level keys of chunk.metadata (file_type, topic, audience, goal_type, ...):
+
+    {"goal_type": "career"}
+    {"audience": {"$in": ["managers", "creatives"]}}
+    {"$and": [{"topic": "feedback"}, {"file_type": {"$ne": ".pdf"}}]}
+    {"$or": [{"topic": "feedback"}, {"topic": "delegation"}]}
+
+A chunk matches a value if the field equals it or, for list-valued fields,
+contains it. MetadataFilterIndex precomputes the sorted row ids of every
+(field, value) pair, so evaluating a filter touches only those postings and
+the search then scans only the eligible rows.
+"""
+
+import json
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .schemas import DocumentChunk
+
+logger = logging.getLogger(__name__)
+
+FILTER_INDEX_FILENAME = "filter_index.npz"
+
+# Chunk attributes indexed in addition to the metadata keys
+CHUNK_FIELDS = ("title", "source")
+
+MetadataFilter = Dict[str, Any]
+
+_Key = Tuple[str, Union[str, int, float, bool]]
+
+
+def _indexable_values(value: Any) -> List[Any]:
+    """Scalar values a field can be matched on; nested objects are not indexed."""
+    values = value if isinstance(value, (list, tuple, set)) else [value]
+    return [v for v in values if isinstance(v, (str, int, float, bool))]
+
+
+class MetadataFilterIndex:
+    """Inverted index from (field, value) to the sorted row ids holding it."""
+
+    def __init__(self):
+        self.num_rows = 0
+        # Build-time postings
+        self._postings: Dict[_Key, List[int]] = defaultdict(list)
+        # Query-time arrays, packed lazily after additions
+        self._arrays: Optional[Dict[_Key, np.ndarray]] = None
+
+    def add_documents(self, chunks: Iterable[DocumentChunk]) -> None:
+        """Index chunks; row ids continue from the current count."""
+        self._ensure_postings()
+        for chunk in chunks:
+            row = self.num_rows
+            fields = {name: getattr(chunk, name) for name in CHUNK_FIELDS}
+            # Chunk attributes win over metadata keys of the same name
+            fields = {**chunk.metadata, **fields}
+            for field, value in fields.items():
+                for item in set(_indexable_values(value)):
+                    self._postings[(field, item)].append(row)
+            self.num_rows += 1
+        self._arrays = None
+
+    def evaluate(self, metadata_filter: MetadataFilter) -> np.ndarray:
+        """
+        Return the sorted row ids matching the filter.
+
+        Raises:
+            ValueError: If the filter uses an unsupported operator
+        """
+        return np.flatnonzero(self._mask(metadata_filter)).astype(np.int64)
+
+    def values(self, field: str) -> List[Any]:
+        """Distinct indexed values of a field."""
+        self._finalize()
+        return sorted((value for name, value in self._arrays if name == field), key=str)
+
+    def clear(self) -> None:
+        """Remove all rows."""
+        self.num_rows = 0
+        self._postings = defaultdict(list)
+        self._arrays = None
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Persist as filter_index.npz inside the given directory (CSR layout)."""
+        self._finalize()
+        keys = list(self._arrays)
+        lengths = [len(self._arrays[key]) for key in keys]
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(lengths)
+        rows = np.concatenate([self._arrays[key] for key in keys]) if keys else np.zeros(0, dtype=np.int64)
+        np.savez(
+            Path(path) / FILTER_INDEX_FILENAME,
+            keys=np.array([json.dumps(list(key)) for key in keys], dtype=str),
+            offsets=offsets,
+            rows=rows.astype(np.int32),
+            num_rows=np.array([self.num_rows], dtype=np.int64),
+        )
+
+    def load(self, path: Union[str, Path]) -> bool:
+        """Load filter_index.npz from the directory. Returns False if it does not exist."""
+        index_file = Path(path) / FILTER_INDEX_FILENAME
+        if not index_file.exists():
+            return False
+
+        with np.load(index_file, allow_pickle=False) as data:
+            keys = [tuple(json.loads(key)) for key in data["keys"].tolist()]
+            offsets = data["offsets"]
+            rows = data["rows"].astype(np.int64)
+            self.num_rows = int(data["num_rows"][0])
+
+        self._arrays = {key: rows[offsets[i]:offsets[i + 1]] for i, key in enumerate(keys)}
+        self._postings = defaultdict(list)
+        logger.info(f"Loaded metadata filter index: {self.num_rows} rows, {len(keys)} field values")
+        return True
+
+    def _mask(self, metadata_filter: MetadataFilter) -> np.ndarray:
+        """Boolean row mask of a (sub)filter; conditions in one dict are ANDed."""
+        if not isinstance(metadata_filter, dict):
+            raise ValueError(f"Filter must be a dict, got {type(metadata_filter).__name__}")
+
+        mask = np.ones(self.num_rows, dtype=bool)
+        for field, condition in metadata_filter.items():
+            if field == "$and":
+                for sub_filter in condition:
+                    mask &= self._mask(sub_filter)
+            elif field == "$or":
+                any_mask = np.zeros(self.num_rows, dtype=bool)
+                for sub_filter in condition:
+                    any_mask |= self._mask(sub_filter)
+                mask &= any_mask
+            elif field.startswith("$"):
+                raise ValueError(f"Unsupported filter operator: {field}")
+            else:
+                mask &= self._field_mask(field, condition)
+        return mask
+
+    def _field_mask(self, field: str, condition: Any) -> np.ndarray:
+        if not isinstance(condition, dict):
+            return self._values_mask(field, [condition])
+
+        mask = np.ones(self.num_rows, dtype=bool)
+        for operator, operand in condition.items():
+            if operator == "$eq":
+                mask &= self._values_mask(field, [operand])
+            elif operator == "$in":
+                mask &= self._values_mask(field, list(operand))
+            elif operator == "$ne":
+                mask &= ~self._values_mask(field, [operand])
+            elif operator == "$nin":
+                mask &= ~self._values_mask(field, list(operand))
+            else:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+        return mask
+
+    def _values_mask(self, field: str, values: List[Any]) -> np.ndarray:
+        self._finalize()
+        mask = np.zeros(self.num_rows, dtype=bool)
+        for value in values:
+            rows = self._arrays.get((field, value))
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+    def _finalize(self) -> None:
+        """Pack build-time postings into arrays."""
+        if self._arrays is None:
+            self._arrays = {key: np.asarray(rows, dtype=np.int64) for key, rows in self._postings.items()}
+
+    def _ensure_postings(self) -> None:
+        """Unpack loaded arrays back into lists so more rows can be added."""
+        if self._arrays is not None and not self._postings:
+            self._postings = defaultdict(list, {key: rows.tolist() for key, rows in self._arrays.items()})
@@ -0,0 +1,208 @@
+"""
+Versioned index directories and hot reload support.
+
+Layout under the index root (RAG_INDEX_PATH):
+
+    CURRENT                 name of the live version (replaced atomically)
+    versions/<version>/     one complete index per version
+        manifest.json       version, creation time, document count, file sizes and checksums
+
+An index root without CURRENT is a legacy flat index and is used as is.
+Publishing writes the new version completely before CURRENT is switched,
+so a reader never sees a half-written index.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILENAME = "CURRENT"
+VERSIONS_DIRNAME = "versions"
+MANIFEST_FILENAME = "manifest.json"
+LEGACY_VERSION = "legacy"
+
+PathLike = Union[str, Path]
+
+
+def new_version_name() -> str:
+    """Sortable UTC timestamp version name."""
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+
+
+def staging_dir(index_root: PathLike, version: str) -> Path:
+    """Directory to build a version in before publish_version() moves it into place."""
+    path = Path(index_root) / VERSIONS_DIRNAME / f".staging-{version}"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def current_version(index_root: PathLike) -> Optional[str]:
+    """Name of the live version, or None for a legacy flat index."""
+    current_file = Path(index_root) / CURRENT_FILENAME
+    if not current_file.exists():
+        return None
+    version = current_file.read_text(encoding="utf-8").strip()
+    return version or None
+
+
+def resolve_index_path(index_root: PathLike) -> Tuple[Path, str]:
+    """
+    Return the directory of the live index and its version.
+
+    Args:
+        index_root: RAG_INDEX_PATH
+
+    Returns:
+        (path, version); a legacy flat index resolves to (index_root, "legacy")
+    """
+    version = current_version(index_root)
+    if version is None:
+        return Path(index_root), LEGACY_VERSION
+    return Path(index_root) / VERSIONS_DIRNAME / version, version
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_manifest(version_dir: PathLike, version: str, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Describe every file of a built index in manifest.json."""
+    version_dir = Path(version_dir)
+    files = {
+        path.name: {"size": path.stat().st_size, "sha256": _sha256(path)}
+        for path in sorted(version_dir.iterdir())
+        if path.is_file() and path.name != MANIFEST_FILENAME
+    }
+    manifest = {
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "files": files,
+        **(extra or {}),
+    }
+    with open(version_dir / MANIFEST_FILENAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(version_dir: PathLike) -> Optional[Dict[str, Any]]:
+    """Load manifest.json, or None if the directory has none."""
+    manifest_file = Path(version_dir) / MANIFEST_FILENAME
+    if not manifest_file.exists():
+        return None
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_manifest(version_dir: PathLike, check_hashes: bool = False) -> None:
+    """
+    Check that all files listed in the manifest are present and complete.
+
+    Raises:
+        ValueError: If the manifest is missing or a file does not match it
+    """
+    version_dir = Path(version_dir)
+    manifest = read_manifest(version_dir)
+    if manifest is None:
+        raise ValueError(f"No {MANIFEST_FILENAME} in {version_dir}")
+
+    for name, info in manifest.get("files", {}).items():
+        path = version_dir / name
+        if not path.exists():
+            raise ValueError(f"Index file missing: {path}")
+        if path.stat().st_size != info["size"]:
+            raise ValueError(f"Index file size mismatch: {path}")
+        if check_hashes and _sha256(path) != info["sha256"]:
+            raise ValueError(f"Index file checksum mismatch: {path}")
+
+
+def publish_version(index_root: PathLike, built_dir: PathLike, version: str,
+                    extra: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    Make a fully built index the live version.
+
+    Writes the manifest, moves the directory to versions/<version> and then
+    atomically replaces CURRENT.
+
+    Args:
+        index_root: RAG_INDEX_PATH
+        built_dir: Directory holding the complete index (e.g. from staging_dir())
+        version: Version name
+        extra: Additional manifest fields (document count, store type, ...)
+
+    Returns:
+        Path of the published version directory
+    """
+    index_root = Path(index_root)
+    version_dir = index_root / VERSIONS_DIRNAME / version
+    if version_dir.exists():
+        raise ValueError(f"Index version already exists: {version}")
+
+    write_manifest(built_dir, version, extra)
+    version_dir.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(built_dir, version_dir)
+
+    # Write-then-rename so readers see either the old or the new name
+    tmp_file = index_root / f".{CURRENT_FILENAME}.tmp"
+    tmp_file.write_text(version, encoding="utf-8")
+    os.replace(tmp_file, index_root / CURRENT_FILENAME)
+
+    logger.info(f"Published index version {version} at {version_dir}")
+    return version_dir
+
+
+class IndexWatcher:
+    """Polls CURRENT and calls back when the live version changes."""
+
+    def __init__(self, index_root: PathLike, on_change: Callable[[str], Any], interval_seconds: float = 30.0):
+        self.index_root = Path(index_root)
+        self.on_change = on_change
+        self.interval_seconds = interval_seconds
+        self._last_version = current_version(self.index_root)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start polling on a daemon thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="rag-index-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {self.index_root / CURRENT_FILENAME} every {self.interval_seconds}s")
+
+    def stop(self) -> None:
+        """Stop polling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds + 1)
+            self._thread = None
+
+    def check(self) -> bool:
+        """Run one poll; returns True if a change was handled."""
+        version = current_version(self.index_root)
+        if version is None or version == self._last_version:
+            return False
+
+        logger.info(f"Index version changed: {self._last_version} -> {version}")
+        try:
+            self.on_change(version)
+        except Exception as e:
+            # Keep the old version live and retry on the next poll
+            logger.error(f"Reloading index version {version} failed: {e}")
+            return False
+        self._last_version = version
+        return True
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.check()
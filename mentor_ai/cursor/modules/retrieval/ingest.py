@@ -6,29 +6,45 @@ import os
 import json
 import logging
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 from pathlib import Path
-import openai
 
 from .pdf_reader import PDFReader
 from .vector_store import VectorStore
-from .simple_store import SimpleVectorStore
+from .sharded_store import create_vector_store
 from .schemas import DocumentChunk
+from .chunking import SentenceChunker, iter_sentences
+from .dedup import NearDuplicateDetector
+from .embeddings import EmbeddingProvider, create_embedding_provider
 # from ...app.config import settings  # Will import directly in functions
 
 logger = logging.getLogger(__name__)
 
+# Characters read from a text file per segment
+READ_BLOCK_CHARS = 64 * 1024
+# Chunks embedded and added to the store at a time
+INDEX_BATCH_SIZE = 64
+
 
 class DocumentIngester:
     """Handles document ingestion and indexing."""
     
-    def __init__(self, vector_store: Optional[VectorStore] = None):
+    def __init__(self, vector_store: Optional[VectorStore] = None,
+                 embedding_provider: Optional[EmbeddingProvider] = None):
         import sys
         import os
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
         from app.config import settings
-        self.vector_store = vector_store or SimpleVectorStore()
+        self.vector_store = vector_store or create_vector_store()
+        self.embedding_provider = embedding_provider or create_embedding_provider(
+            settings.EMBEDDINGS_PROVIDER, settings.EMBEDDINGS_MODEL, settings.EMBEDDINGS_DIMENSION
+        )
         self.pdf_reader = PDFReader(max_pages=settings.PDF_MAX_PAGES)
+        # Drops near-identical chunks (boilerplate, repeated passages) before embedding
+        self.deduplicator = (
+            NearDuplicateDetector(threshold=settings.INGEST_DEDUP_THRESHOLD)
+            if settings.INGEST_DEDUP_ENABLED else None
+        )
         
     def ingest_corpus(self, corpus_path: str, index_path: str) -> None:
         """
@@ -43,6 +59,8 @@ class DocumentIngester:
         
         # Clear existing index
         self.vector_store.clear()
+        if self.deduplicator is not None:
+            self.deduplicator.clear()
         
         # Process PDF files
         pdf_path = Path(corpus_path) / "pdf"
@@ -61,6 +79,8 @@ class DocumentIngester:
         stats = self.vector_store.get_stats()
         
         logger.info(f"Ingestion completed in {total_time:.2f}s. Indexed {stats['total_documents']} documents.")
+        if self.deduplicator is not None:
+            logger.info(f"Skipped {self.deduplicator.num_duplicates} near-duplicate chunks")
     
     def _process_pdf_files(self, pdf_dir: Path) -> None:
         """Process all PDF files in the directory."""
@@ -86,16 +106,11 @@ class DocumentIngester:
         # Get metadata
         metadata = self._get_document_metadata(pdf_file)
         
-        # Create chunks
-        chunks = self._create_chunks(text, pdf_file.name, str(pdf_file), metadata)
-        
-        # Get embeddings
-        embeddings = self._get_embeddings([chunk.content for chunk in chunks])
-        
-        # Add to vector store
-        self.vector_store.add_documents(chunks, embeddings)
+        # Chunk, embed and index
+        chunks = self._iter_chunks([text], pdf_file.name, str(pdf_file), metadata)
+        num_chunks = self._index_chunks(chunks)
         
-        logger.info(f"Processed {pdf_file.name}: {len(chunks)} chunks")
+        logger.info(f"Processed {pdf_file.name}: {num_chunks} chunks")
     
     def _process_text_files(self, txt_dir: Path) -> None:
         """Process all text files in the directory."""
@@ -112,31 +127,60 @@ class DocumentIngester:
         """Process a single text file."""
         logger.info(f"Processing text file: {txt_file.name}")
         
-        # Read text
+        # Get metadata
+        metadata = self._get_document_metadata(txt_file)
+        
+        # Stream the file through the chunker block by block
         try:
-            with open(txt_file, 'r', encoding='utf-8') as f:
-                text = f.read()
+            segments = self._read_text_blocks(txt_file)
+            chunks = self._iter_chunks(segments, txt_file.name, str(txt_file), metadata)
+            num_chunks = self._index_chunks(chunks)
         except Exception as e:
             logger.error(f"Error reading text file {txt_file}: {e}")
             return
         
-        if not text.strip():
+        if not num_chunks:
             logger.warning(f"Empty text file: {txt_file.name}")
             return
         
-        # Get metadata
-        metadata = self._get_document_metadata(txt_file)
-        
-        # Create chunks
-        chunks = self._create_chunks(text, txt_file.name, str(txt_file), metadata)
-        
-        # Get embeddings
-        embeddings = self._get_embeddings([chunk.content for chunk in chunks])
-        
-        # Add to vector store
-        self.vector_store.add_documents(chunks, embeddings)
+        logger.info(f"Processed {txt_file.name}: {num_chunks} chunks")
+    
+    @staticmethod
+    def _read_text_blocks(txt_file: Path) -> Iterator[str]:
+        """Yield a text file in fixed-size blocks."""
+        with open(txt_file, 'r', encoding='utf-8') as f:
+            while True:
+                block = f.read(READ_BLOCK_CHARS)
+                if not block:
+                    return
+                yield block
+    
+    def _index_chunks(self, chunks: Iterable[DocumentChunk]) -> int:
+        """
+        Embed chunks and add them to the vector store in batches.
         
-        logger.info(f"Processed {txt_file.name}: {len(chunks)} chunks")
+        Args:
+            chunks: Chunks in document order, possibly a generator
+            
+        Returns:
+            Number of chunks indexed
+        """
+        total = 0
+        batch: List[DocumentChunk] = []
+        for chunk in chunks:
+            # Near-duplicates are dropped before they cost an embedding call
+            if self.deduplicator is not None and not self.deduplicator.add(chunk.content):
+                logger.debug(f"Skipping near-duplicate chunk {chunk.id}")
+                continue
+            batch.append(chunk)
+            if len(batch) >= INDEX_BATCH_SIZE:
+                self.vector_store.add_documents(batch, self._get_embeddings([c.content for c in batch]))
+                total += len(batch)
+                batch = []
+        if batch:
+            self.vector_store.add_documents(batch, self._get_embeddings([c.content for c in batch]))
+            total += len(batch)
+        return total
     
     def _get_document_metadata(self, file_path: Path) -> Dict[str, Any]:
         """Get metadata for a document."""
@@ -164,98 +208,53 @@ class DocumentIngester:
     
     def _create_chunks(self, text: str, title: str, source: str, metadata: Dict[str, Any]) -> List[DocumentChunk]:
         """Create document chunks from text."""
-        import sys
-        import os
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
-        from app.config import settings
-        chunks = []
-        
-        # Split text into sentences
-        sentences = self._split_into_sentences(text)
-        
-        # Create chunks with overlap
-        chunk_size = settings.MAX_CHARS_PER_CHUNK
-        overlap = chunk_size // 4  # 25% overlap
-        
-        current_chunk = ""
-        start_char = 0
-        
-        for i, sentence in enumerate(sentences):
-            # Check if adding this sentence would exceed chunk size
-            if len(current_chunk) + len(sentence) > chunk_size and current_chunk:
-                # Create chunk
-                chunk = DocumentChunk(
-                    id=f"{source}_{len(chunks)}",
-                    content=current_chunk.strip(),
-                    title=title,
-                    source=source,
-                    chunk_index=len(chunks),
-                    start_char=start_char,
-                    end_char=start_char + len(current_chunk),
-                    metadata=metadata
-                )
-                chunks.append(chunk)
-                
-                # Start new chunk with overlap
-                overlap_start = max(0, len(current_chunk) - overlap)
-                current_chunk = current_chunk[overlap_start:] + " " + sentence
-                start_char = start_char + overlap_start
-            else:
-                current_chunk += " " + sentence
+        return list(self._iter_chunks([text], title, source, metadata))
+    
+    def _iter_chunks(self, segments: Iterable[str], title: str, source: str,
+                     metadata: Dict[str, Any]) -> Iterator[DocumentChunk]:
+        """
+        Lazily chunk streamed text on sentence boundaries.
         
-        # Add final chunk
-        if current_chunk.strip():
-            chunk = DocumentChunk(
-                id=f"{source}_{len(chunks)}",
-                content=current_chunk.strip(),
+        Args:
+            segments: Consecutive pieces of the document text
+            title: Document title
+            source: Document source path
+            metadata: Metadata attached to every chunk
+            
+        Yields:
+            Chunks whose start_char/end_char index into the full document text
+        """
+        for chunk_index, span in enumerate(self._get_chunker().chunk(segments)):
+            yield DocumentChunk(
+                id=f"{source}_{chunk_index}",
+                content=span.text,
                 title=title,
                 source=source,
-                chunk_index=len(chunks),
-                start_char=start_char,
-                end_char=start_char + len(current_chunk),
+                chunk_index=chunk_index,
+                start_char=span.start,
+                end_char=span.end,
                 metadata=metadata
             )
-            chunks.append(chunk)
-        
-        return chunks
-    
-    def _split_into_sentences(self, text: str) -> List[str]:
-        """Split text into sentences."""
-        # Simple sentence splitting
-        import re
-        
-        # Split on sentence endings
-        sentences = re.split(r'[.!?]+', text)
-        
-        # Clean up sentences
-        cleaned_sentences = []
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if sentence and len(sentence) > 10:  # Minimum sentence length
-                cleaned_sentences.append(sentence)
-        
-        return cleaned_sentences
     
-    def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Get embeddings for a list of texts."""
+    def _get_chunker(self) -> SentenceChunker:
+        """Build the chunker from settings (characters or tokens per chunk)."""
         import sys
         import os
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
         from app.config import settings
-        embeddings = []
-        
-        for text in texts:
-            try:
-                from openai import OpenAI
-                client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-                response = client.embeddings.create(
-                    model=settings.EMBEDDINGS_MODEL,
-                    input=text
-                )
-                embeddings.append(response.data[0].embedding)
-            except Exception as e:
-                logger.error(f"Error getting embedding: {e}")
-                # Return zero vector as fallback
-                embeddings.append([0.0] * 1536)
-        
-        return embeddings
+        if settings.CHUNK_SIZE_UNIT == "tokens":
+            return SentenceChunker(chunk_size=settings.MAX_TOKENS_PER_CHUNK, unit="tokens")
+        return SentenceChunker(chunk_size=settings.MAX_CHARS_PER_CHUNK, unit="chars")
+    
+    def _split_into_sentences(self, text: str) -> List[str]:
+        """Split text into sentences, keeping their punctuation."""
+        return [sentence.text.strip() for sentence in iter_sentences([text])]
+    
+    def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Get embeddings for a list of texts in one provider call."""
+        try:
+            return self.embedding_provider.embed(texts)
+        except Exception as e:
+            logger.error(f"Error getting embeddings: {e}")
+            # Return zero vectors as fallback
+            return self.embedding_provider.zero_vectors(len(texts))
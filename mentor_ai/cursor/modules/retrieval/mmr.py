@@ -0,0 +1,59 @@
+"""
+Maximal marginal relevance (MMR) selection.
+
+Greedily picks the candidate maximizing
+    lambda * relevance - (1 - lambda) * max similarity to already selected
+so near-identical chunks do not fill the limited context window.
+"""
+
+from typing import List
+
+import numpy as np
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows as float32; zero rows stay zero."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def mmr_select(relevance: np.ndarray, embeddings: np.ndarray, k: int, lambda_mult: float = 0.7) -> List[int]:
+    """
+    Select up to k candidates by maximal marginal relevance.
+
+    Args:
+        relevance: (num_candidates,) relevance of each candidate to the query
+        embeddings: (num_candidates, dim) row-normalized candidate embeddings
+        k: Number of candidates to select
+        lambda_mult: 1.0 ranks purely by relevance, 0.0 purely by diversity
+
+    Returns:
+        Indices of the selected candidates in selection order
+    """
+    relevance = np.asarray(relevance, dtype=np.float32)
+    num_candidates = relevance.shape[0]
+    k = min(k, num_candidates)
+    if k <= 0:
+        return []
+
+    # Candidate pools are small (a few times top_k), so the full
+    # pairwise similarity matrix is cheap and keeps each step vectorized
+    similarity = embeddings @ embeddings.T
+    max_similarity = np.full(num_candidates, -np.inf, dtype=np.float32)
+    available = np.ones(num_candidates, dtype=bool)
+
+    selected = [int(np.argmax(relevance))]
+    available[selected[0]] = False
+    max_similarity = np.maximum(max_similarity, similarity[selected[0]])
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        max_similarity = np.maximum(max_similarity, similarity[best])
+
+    return selected
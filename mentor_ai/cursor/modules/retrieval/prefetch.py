@@ -0,0 +1,202 @@
+"""
+Speculative background retrieval for the plan generation step.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, Optional, Tuple
+
+from .retriever import RegRetriever
+from .schemas import RetrievalResult
+from .sharded_store import create_vector_store
+from .index_versions import read_manifest, resolve_index_path, verify_manifest
+
+logger = logging.getLogger(__name__)
+
+
+class _PrefetchEntry:
+    """Pending or completed prefetch for a single session."""
+
+    def __init__(self, key: Tuple[str, ...], future: Future):
+        self.key = key
+        self.future = future
+        self.created_at = time.time()
+
+
+class RetrievalPrefetcher:
+    """
+    Runs RAG retrieval in the background as soon as the onboarding goals are known.
+
+    Results are cached per session and keyed by the queries that
+    RegRetriever._generate_queries derives from the state, so a cached result
+    is only reused while the goals/skills/passions it was built from are unchanged.
+    Prefetching starts before the next user message exists, so prefetched
+    results are built from the state alone and ignore that message.
+    """
+
+    def __init__(self, retriever: Optional[RegRetriever] = None, max_workers: int = 2, ttl_seconds: float = 900.0):
+        self._retriever = retriever or RegRetriever()
+        self._retriever_lock = threading.Lock()
+        # Serializes reloads; readers only ever take _retriever_lock briefly
+        self._reload_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rag-prefetch")
+        self._entries: Dict[str, _PrefetchEntry] = {}
+        self._lock = threading.Lock()
+        self.ttl_seconds = ttl_seconds
+
+    def get_retriever(self, index_path: str) -> RegRetriever:
+        """
+        Return the shared retriever, loading the index on first use.
+
+        Args:
+            index_path: Path to the vector store index
+        """
+        with self._retriever_lock:
+            # initialize() is a no-op once the index has been loaded
+            self._retriever.initialize(index_path)
+            return self._retriever
+
+    def reload_index(self, index_path: str) -> Dict[str, Any]:
+        """
+        Load the live index version in the background and swap it in.
+        
+        The new index is loaded into a fresh retriever without holding the
+        retriever lock; the swap itself is a single reference assignment, so
+        requests keep running on the old retriever until they finish and new
+        requests pick up the new one. On failure the old index stays live.
+        
+        Args:
+            index_path: Index root (RAG_INDEX_PATH)
+            
+        Returns:
+            Dict with the loaded version, previous version and document count
+            
+        Raises:
+            ValueError: If the version's files do not match its manifest
+            FileNotFoundError: If the index directory does not exist
+        """
+        with self._reload_lock:
+            version_path, version = resolve_index_path(index_path)
+            if read_manifest(version_path) is not None:
+                verify_manifest(version_path)
+            
+            store = create_vector_store()
+            store.load(str(version_path))
+            retriever = RegRetriever(vector_store=store)
+            retriever.index_version = version
+            retriever._is_initialized = True
+            
+            with self._retriever_lock:
+                previous = self._retriever
+                self._retriever = retriever
+        
+        total_documents = store.get_stats()["total_documents"]
+        logger.info(f"Swapped RAG index {previous.index_version} -> {version} ({total_documents} documents)")
+        return {
+            "version": version,
+            "previous_version": previous.index_version,
+            "total_documents": total_documents,
+        }
+    
+    @property
+    def index_version(self) -> Optional[str]:
+        """Version of the index behind the shared retriever (None until loaded)."""
+        return self._retriever.index_version
+    
+    def make_key(self, state: Dict[str, Any]) -> Tuple[str, ...]:
+        """Build the cache key from the state-derived retrieval queries (without a user message)."""
+        return tuple(self._retriever._generate_queries(state, ""))
+
+    def schedule(self, session_id: str, state: Dict[str, Any], index_path: str) -> bool:
+        """
+        Start background retrieval for a session unless an equivalent one exists.
+
+        Args:
+            session_id: Session identifier
+            state: Session state with collected goals
+            index_path: Path to the vector store index
+
+        Returns:
+            True if a new prefetch was started
+        """
+        if not session_id:
+            return False
+
+        snapshot = dict(state)
+        key = self.make_key(snapshot)
+
+        with self._lock:
+            self._evict_expired()
+            entry = self._entries.get(session_id)
+            if entry is not None and entry.key == key:
+                return False
+
+            # Run in a copy of the caller's context so the retrieval joins the turn's trace
+            future = self._executor.submit(contextvars.copy_context().run, self._run, snapshot, index_path)
+            self._entries[session_id] = _PrefetchEntry(key, future)
+
+        logger.info(f"Scheduled RAG prefetch for session {session_id}: {list(key)}")
+        return True
+
+    def get(self, session_id: str, state: Dict[str, Any],
+            timeout: Optional[float] = 0.0) -> Optional[RetrievalResult]:
+        """
+        Return the prefetched result for a session if it matches the current state.
+
+        Waits up to ``timeout`` seconds for a prefetch that is still running
+        (None waits until it finishes). Returns None on a miss, a stale key,
+        a failure or a timeout.
+        """
+        with self._lock:
+            entry = self._entries.get(session_id)
+
+        if entry is None:
+            return None
+
+        if entry.key != self.make_key(state):
+            logger.info(f"RAG prefetch for session {session_id} is stale, ignoring")
+            self.discard(session_id)
+            return None
+
+        try:
+            result = entry.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            logger.info(f"RAG prefetch for session {session_id} not ready after {timeout}s")
+            return None
+        except Exception as e:
+            logger.error(f"RAG prefetch for session {session_id} failed: {e}")
+            self.discard(session_id)
+            return None
+
+        logger.info(f"Using prefetched RAG result for session {session_id} ({len(result.chunks)} chunks)")
+        return result
+
+    def discard(self, session_id: str) -> None:
+        """Forget any prefetch for a session."""
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def clear(self) -> None:
+        """Forget all prefetches."""
+        with self._lock:
+            self._entries.clear()
+
+    def _run(self, state: Dict[str, Any], index_path: str) -> RetrievalResult:
+        """Worker body: batched multi-query retrieval on the worker thread's own loop."""
+        retriever = self.get_retriever(index_path)
+        return asyncio.run(retriever.aretrieve(state, ""))
+
+    def _evict_expired(self) -> None:
+        """Drop entries older than the TTL. Caller must hold the lock."""
+        now = time.time()
+        expired = [sid for sid, entry in self._entries.items() if now - entry.created_at > self.ttl_seconds]
+        for sid in expired:
+            del self._entries[sid]
+
+
+# Global prefetcher instance shared by the graph nodes
+retrieval_prefetcher = RetrievalPrefetcher()
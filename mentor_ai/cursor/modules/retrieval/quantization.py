@@ -0,0 +1,135 @@
+"""
+Quantized embedding matrices for approximate cosine scoring.
+
+Rows are normalized before quantization, so a dot product with a normalized
+query is the cosine similarity:
+    float16  half precision copy of each row (2 bytes per value)
+    int8     per-row scale * int8 codes (1 byte per value + 4 bytes per row)
+
+Scores are approximate; SimpleVectorStore re-ranks the best candidates with
+the exact float32 rows.
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STORAGE_MODES = ("float32", "float16", "int8")
+QUANTIZED_FILENAME = "embeddings_{mode}.npz"
+
+# Rows converted to float32 per matmul; small enough to stay in cache
+SCORE_BLOCK_ROWS = 256
+
+
+def validate_storage_mode(mode: str) -> str:
+    """Return the normalized storage mode or raise ValueError."""
+    mode = (mode or "float32").lower()
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown embeddings storage mode: {mode}. Expected one of {STORAGE_MODES}")
+    return mode
+
+
+class QuantizedEmbeddings:
+    """Row-normalized embeddings stored as float16 or scaled int8."""
+
+    def __init__(self, codes: np.ndarray, scales: Optional[np.ndarray] = None):
+        self.codes = codes
+        self.scales = scales
+
+    @property
+    def mode(self) -> str:
+        return "int8" if self.codes.dtype == np.int8 else "float16"
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    @classmethod
+    def from_embeddings(cls, embeddings: np.ndarray, mode: str) -> "QuantizedEmbeddings":
+        """
+        Quantize raw embeddings block by block (no full float32 copy).
+
+        Args:
+            embeddings: (num_docs, dim) array of any float dtype, may be memory-mapped
+            mode: "float16" or "int8"
+        """
+        if mode not in ("float16", "int8"):
+            raise ValueError(f"Cannot quantize to {mode}")
+
+        num_docs, dim = embeddings.shape
+        codes = np.empty((num_docs, dim), dtype=np.float16 if mode == "float16" else np.int8)
+        scales = np.empty(num_docs, dtype=np.float32) if mode == "int8" else None
+
+        for start in range(0, num_docs, SCORE_BLOCK_ROWS):
+            block = np.asarray(embeddings[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            block = block / norms
+
+            if mode == "float16":
+                codes[start:start + len(block)] = block
+            else:
+                # Symmetric per-row scale keeps the largest component at +-127
+                row_max = np.abs(block).max(axis=1)
+                row_scale = np.where(row_max > 0, row_max / 127.0, 1.0).astype(np.float32)
+                codes[start:start + len(block)] = np.round(block / row_scale[:, None])
+                scales[start:start + len(block)] = row_scale
+
+        return cls(codes, scales)
+
+    def scores(self, queries: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Approximate cosine similarities.
+
+        Args:
+            queries: (dim, num_queries) float32 array of normalized queries
+            rows: Row ids to score (e.g. from a metadata filter); None scores all
+
+        Returns:
+            (num_scored, num_queries) float32 similarity matrix
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        num_scored = self.codes.shape[0] if rows is None else len(rows)
+        out = np.empty((num_scored, queries.shape[1]), dtype=np.float32)
+        buffer = np.empty((min(SCORE_BLOCK_ROWS, num_scored), self.codes.shape[1]), dtype=np.float32)
+
+        # numpy has no BLAS kernels for int8/float16; widen small blocks into a
+        # reused float32 buffer and let BLAS do the product
+        for start in range(0, num_scored, SCORE_BLOCK_ROWS):
+            if rows is None:
+                block = self.codes[start:start + SCORE_BLOCK_ROWS]
+            else:
+                block = self.codes[rows[start:start + SCORE_BLOCK_ROWS]]
+            count = block.shape[0]
+            np.copyto(buffer[:count], block, casting="unsafe")
+            np.matmul(buffer[:count], queries, out=out[start:start + count])
+
+        if self.scales is not None:
+            out *= (self.scales if rows is None else self.scales[rows])[:, None]
+        return out
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Persist as embeddings_<mode>.npz inside the index directory."""
+        arrays = {"codes": self.codes}
+        if self.scales is not None:
+            arrays["scales"] = self.scales
+        np.savez(Path(path) / QUANTIZED_FILENAME.format(mode=self.mode), **arrays)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mode: str) -> Optional["QuantizedEmbeddings"]:
+        """Load a saved quantized matrix, or None if the index has none for this mode."""
+        quantized_file = Path(path) / QUANTIZED_FILENAME.format(mode=mode)
+        if not quantized_file.exists():
+            return None
+        with np.load(quantized_file, allow_pickle=False) as data:
+            codes = data["codes"]
+            scales = data["scales"] if "scales" in data.files else None
+        logger.info(f"Loaded {mode} embeddings: {codes.shape}")
+        return cls(codes, scales)
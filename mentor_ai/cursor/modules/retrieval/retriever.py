@@ -2,33 +2,59 @@
 Main retriever class for RAG functionality.
 """
 
+import asyncio
 import logging
+import os
 import time
-from typing import List, Dict, Any, Optional
-import openai
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 
 # from ..core.llm_client import llm_client  # Not needed for embeddings
 from .vector_store import VectorStore
-from .simple_store import SimpleVectorStore
+from .sharded_store import create_vector_store
 from .schemas import DocumentChunk, RetrievalResult
+from .mmr import mmr_select, normalize_rows
+from .index_versions import resolve_index_path
+from .embeddings import EmbeddingProvider, create_embedding_provider
+from ...core.tracing import tracer
 # from ...app.config import settings  # Will import directly in functions
 
 logger = logging.getLogger(__name__)
 
+# Standard reciprocal-rank-fusion constant (Cormack et al.)
+RRF_K = 60
+
+
+def _result_span_attributes(result: RetrievalResult) -> Dict[str, Any]:
+    return {"retrieval.chunk_count": result.total_results, "retrieval.search_time_ms": round(result.search_time_ms, 2)}
+
 
 class RegRetriever:
     """Main retriever for coaching knowledge base."""
     
-    def __init__(self, vector_store: Optional[VectorStore] = None):
-        self.vector_store = vector_store or SimpleVectorStore()
+    def __init__(self, vector_store: Optional[VectorStore] = None,
+                 embedding_provider: Optional[EmbeddingProvider] = None):
+        self.vector_store = vector_store or create_vector_store()
+        self._embedding_provider = embedding_provider
         self._is_initialized = False
+        self.index_version: Optional[str] = None
+    
+    @property
+    def embedding_provider(self) -> EmbeddingProvider:
+        """Query embedding provider, created from EMBEDDINGS_PROVIDER on first use."""
+        if self._embedding_provider is None:
+            from dotenv import load_dotenv
+            load_dotenv()
+            self._embedding_provider = create_embedding_provider()
+        return self._embedding_provider
         
     def initialize(self, index_path: str) -> None:
         """
         Initialize the retriever by loading the vector store.
         
         Args:
-            index_path: Path to the vector store index
+            index_path: Path to the vector store index; for a versioned index
+                root the version named in CURRENT is loaded
         """
         try:
             if not self._is_initialized:
@@ -39,9 +65,11 @@ class RegRetriever:
                 
                 if os.path.exists(index_path):
                     logger.info(f"Index path exists. Contents: {os.listdir(index_path)}")
-                    self.vector_store.load(index_path)
+                    version_path, version = resolve_index_path(index_path)
+                    self.vector_store.load(str(version_path))
+                    self.index_version = version
                     self._is_initialized = True
-                    logger.info(f"Successfully initialized retriever with index from {index_path}")
+                    logger.info(f"Successfully initialized retriever with index version {version} from {version_path}")
                 else:
                     logger.error(f"Index path does not exist: {index_path}")
                     self._is_initialized = True  # Mark as initialized to avoid repeated warnings
@@ -54,13 +82,17 @@ class RegRetriever:
             logger.error(f"Full traceback: {traceback.format_exc()}")
             self._is_initialized = True  # Mark as initialized to avoid repeated warnings
     
-    def retrieve(self, state: Dict[str, Any], user_message: str = "") -> RetrievalResult:
+    @tracer.trace("retrieval.retrieve", result_attributes=_result_span_attributes)
+    def retrieve(self, state: Dict[str, Any], user_message: str = "",
+                 metadata_filter: Optional[Dict[str, Any]] = None) -> RetrievalResult:
         """
         Retrieve relevant documents based on user state and message.
         
         Args:
             state: Current user state from the graph
             user_message: Current user message (optional)
+            metadata_filter: Only retrieve chunks matching this filter, e.g.
+                {"goal_type": "career"} (see filters.py)
             
         Returns:
             RetrievalResult with relevant document chunks
@@ -80,6 +112,8 @@ class RegRetriever:
             OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
         
         settings = LocalSettings()
+        mode, _ = self._get_search_mode()
+        fetch_k = self._get_fetch_k(settings.RETRIEVE_TOP_K)
         
         start_time = time.time()
         
@@ -97,16 +131,20 @@ class RegRetriever:
         
         # Search for relevant documents
         all_chunks = []
+        query_embeddings = []
         for query in queries:
             try:
                 # Get embedding for query using the same method as search()
-                query_embedding = self._get_embedding(query)
+                query_embedding = None if mode == "lexical" else self._get_embedding(query)
                 logger.debug(f"Generated embedding for query: {query}")
+                query_embeddings.append(query_embedding)
                 
                 # Search vector store
-                chunks = self.vector_store.search(
-                    query_embedding, 
-                    top_k=settings.RETRIEVE_TOP_K
+                chunks = self._search_query(
+                    query,
+                    query_embedding,
+                    fetch_k,
+                    metadata_filter
                 )
                 all_chunks.extend(chunks)
                 
@@ -117,9 +155,9 @@ class RegRetriever:
                 import traceback
                 logger.error(f"Full traceback: {traceback.format_exc()}")
         
-        # Remove duplicates and limit results
+        # Remove duplicates, diversify and limit results
         unique_chunks = self._deduplicate_chunks(all_chunks)
-        limited_chunks = unique_chunks[:settings.RETRIEVE_TOP_K]
+        limited_chunks = self._diversify(unique_chunks, query_embeddings, settings.RETRIEVE_TOP_K)
         
         search_time = (time.time() - start_time) * 1000  # Convert to milliseconds
         
@@ -133,6 +171,202 @@ class RegRetriever:
         logger.info(f"Retrieval completed: {len(limited_chunks)} chunks in {search_time:.2f}ms")
         return result
     
+    @tracer.trace("retrieval.aretrieve", result_attributes=_result_span_attributes)
+    async def aretrieve(self, state: Dict[str, Any], user_message: str = "",
+                        metadata_filter: Optional[Dict[str, Any]] = None) -> RetrievalResult:
+        """
+        Async variant of retrieve() for multi-query retrieval.
+        
+        All generated queries are embedded in one batched request and searched
+        in a single vectorized pass (in hybrid mode the BM25 side is scored per
+        query); the per-query rankings are merged with
+        reciprocal-rank fusion so no single query dominates the result.
+        
+        Args:
+            state: Current user state from the graph
+            user_message: Current user message (optional)
+            metadata_filter: Only retrieve chunks matching this filter, e.g.
+                {"goal_type": "career"} (see filters.py)
+            
+        Returns:
+            RetrievalResult with relevant document chunks
+        """
+        from dotenv import load_dotenv
+        load_dotenv()
+        top_k = int(os.getenv("RETRIEVE_TOP_K", "5"))
+        fetch_k = self._get_fetch_k(top_k)
+        
+        start_time = time.time()
+        
+        queries = self._generate_queries(state, user_message)
+        if not queries:
+            logger.warning("No search queries generated from state")
+            return RetrievalResult(
+                chunks=[],
+                query="",
+                total_results=0,
+                search_time_ms=0.0
+            )
+        
+        ranked_lists: List[List[DocumentChunk]] = []
+        query_embeddings: List[Optional[List[float]]] = []
+        try:
+            mode, alpha = self._get_search_mode()
+            if mode == "lexical":
+                query_embeddings = [None] * len(queries)
+            else:
+                query_embeddings = await self._aget_embeddings(queries)
+            
+            # Search is CPU-bound numpy work, keep it off the event loop
+            if mode == "vector" and all(embedding and any(embedding) for embedding in query_embeddings):
+                ranked_lists = await asyncio.to_thread(
+                    self.vector_store.search_batch, query_embeddings, fetch_k, metadata_filter
+                )
+            elif mode == "hybrid":
+                # One similarity pass for all queries, BM25 and fusion per query
+                ranked_lists = await asyncio.to_thread(
+                    self.vector_store.hybrid_search_batch, queries, query_embeddings, fetch_k, alpha,
+                    metadata_filter
+                )
+            else:
+                ranked_lists = await asyncio.to_thread(
+                    lambda: [self._search_query(query, embedding, fetch_k, metadata_filter)
+                             for query, embedding in zip(queries, query_embeddings)]
+                )
+        except Exception as e:
+            logger.error(f"Error in batched search for queries {queries}: {e}")
+            import traceback
+            logger.error(f"Full traceback: {traceback.format_exc()}")
+        
+        fused_chunks = self._reciprocal_rank_fusion(ranked_lists)
+        unique_chunks = self._deduplicate_chunks(fused_chunks)
+        limited_chunks = self._diversify(unique_chunks, query_embeddings, top_k)
+        
+        search_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+        
+        result = RetrievalResult(
+            chunks=limited_chunks,
+            query="; ".join(queries),
+            total_results=len(limited_chunks),
+            search_time_ms=search_time,
+            metadata={"fusion": "rrf", "num_queries": len(queries)}
+        )
+        
+        logger.info(f"Async retrieval completed: {len(limited_chunks)} chunks in {search_time:.2f}ms")
+        return result
+    
+    def _get_search_mode(self) -> Tuple[str, float]:
+        """
+        Read the retrieval mode and hybrid weight from the environment.
+        
+        Returns:
+            (mode, alpha) where mode is 'hybrid', 'vector' or 'lexical' and
+            alpha is the weight of the vector score in hybrid mode
+        """
+        mode = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+        if mode not in ("hybrid", "vector", "lexical"):
+            logger.warning(f"Unknown RETRIEVAL_MODE '{mode}', using hybrid")
+            mode = "hybrid"
+        alpha = float(os.getenv("HYBRID_ALPHA", "0.7"))
+        return mode, alpha
+    
+    def _get_fetch_k(self, top_k: int) -> int:
+        """
+        Number of results to fetch per query.
+        
+        With MMR enabled each query fetches MMR_FETCH_FACTOR * top_k candidates
+        so the diversification stage has something to choose from.
+        """
+        if os.getenv("MMR_ENABLED", "True").lower() != "true":
+            return top_k
+        return top_k * max(1, int(os.getenv("MMR_FETCH_FACTOR", "3")))
+    
+    def _diversify(self, candidates: List[DocumentChunk], query_embeddings: List[Optional[List[float]]],
+                   top_k: int) -> List[DocumentChunk]:
+        """
+        Pick top_k candidates with maximal marginal relevance.
+        
+        Relevance is the best cosine similarity to any query embedding, so no
+        single query dominates; without usable query embeddings the incoming
+        order is used as relevance. Falls back to the first top_k candidates
+        when MMR is disabled or the store cannot provide chunk embeddings.
+        
+        Args:
+            candidates: Deduplicated candidates, best first
+            query_embeddings: Embeddings of the search queries (may contain None)
+            top_k: Number of chunks to keep
+            
+        Returns:
+            Selected chunks in MMR order
+        """
+        if os.getenv("MMR_ENABLED", "True").lower() != "true" or len(candidates) <= 1:
+            return candidates[:top_k]
+        
+        embeddings = self.vector_store.get_embeddings(candidates)
+        if embeddings is None:
+            return candidates[:top_k]
+        
+        queries = [embedding for embedding in query_embeddings if embedding and any(embedding)]
+        if queries and len(queries[0]) == embeddings.shape[1]:
+            relevance = (embeddings @ normalize_rows(np.asarray(queries)).T).max(axis=1)
+        else:
+            relevance = np.linspace(1.0, 0.0, len(candidates), endpoint=False, dtype=np.float32)
+        
+        lambda_mult = float(os.getenv("MMR_LAMBDA", "0.7"))
+        selected = mmr_select(relevance, embeddings, top_k, lambda_mult)
+        
+        results = []
+        for idx in selected:
+            chunk = candidates[idx]
+            chunk.metadata["mmr_score"] = float(relevance[idx])
+            results.append(chunk)
+        
+        logger.debug(f"MMR selected {len(results)} of {len(candidates)} candidates (lambda={lambda_mult})")
+        return results
+    
+    def _search_query(self, query: str, query_embedding: Optional[List[float]], top_k: int,
+                      metadata_filter: Optional[Dict[str, Any]] = None) -> List[DocumentChunk]:
+        """
+        Search a single query according to the configured retrieval mode.
+        
+        A missing or zero query embedding (no API key, embedding failure)
+        degrades to lexical-only search instead of ranking against a zero vector.
+        """
+        mode, alpha = self._get_search_mode()
+        has_embedding = bool(query_embedding) and any(query_embedding)
+        
+        if mode == "vector" and has_embedding:
+            return self.vector_store.search(query_embedding, top_k=top_k, metadata_filter=metadata_filter)
+        if mode == "lexical" or not has_embedding:
+            return self.vector_store.hybrid_search(query, None, top_k=top_k, alpha=0.0,
+                                                   metadata_filter=metadata_filter)
+        return self.vector_store.hybrid_search(query, query_embedding, top_k=top_k, alpha=alpha,
+                                               metadata_filter=metadata_filter)
+    
+    def _reciprocal_rank_fusion(self, ranked_lists: List[List[DocumentChunk]], k: int = RRF_K) -> List[DocumentChunk]:
+        """
+        Merge several ranked result lists with reciprocal-rank fusion.
+        
+        Args:
+            ranked_lists: One ranked list of chunks per query
+            k: RRF smoothing constant
+            
+        Returns:
+            Chunks ordered by fused score, best first
+        """
+        scores: Dict[str, float] = {}
+        chunks_by_id: Dict[str, DocumentChunk] = {}
+        
+        for ranked in ranked_lists:
+            for rank, chunk in enumerate(ranked, start=1):
+                scores[chunk.id] = scores.get(chunk.id, 0.0) + 1.0 / (k + rank)
+                chunks_by_id.setdefault(chunk.id, chunk)
+        
+        fused = sorted(chunks_by_id.values(), key=lambda chunk: scores[chunk.id], reverse=True)
+        for chunk in fused:
+            chunk.metadata["rrf_score"] = scores[chunk.id]
+        return fused
+    
     def _generate_queries(self, state: Dict[str, Any], user_message: str) -> List[str]:
         """
         Generate search queries from user state.
@@ -195,39 +429,29 @@ class RegRetriever:
         
         return queries[:3]  # Limit to 3 queries to avoid overwhelming
     
+    @tracer.trace("retrieval.embed_query")
     def _get_embedding(self, text: str) -> List[float]:
         """
-        Get embedding for text, with fallback to zero vector if API key unavailable
+        Get embedding for text, with fallback to zero vector if the provider fails
+        (e.g. no OpenAI API key); hybrid search then degrades to lexical-only
         """
         try:
-            # Import settings directly to avoid import issues
-            import os
-            from dotenv import load_dotenv
-            
-            # Load environment variables
-            load_dotenv()
-            
-            # Check if OpenAI API key is available
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                print("No OpenAI API key found, returning zero vector")
-                # Return zero vector as fallback
-                return [0.0] * 1536  # OpenAI text-embedding-3-small dimension
-            
-            # Try to get real embedding
-            import openai
-            client = openai.OpenAI(api_key=api_key)
-            
-            response = client.embeddings.create(
-                model="text-embedding-3-small",
-                input=text
-            )
-            return response.data[0].embedding
-            
+            return self.embedding_provider.embed([text])[0]
+        except Exception as e:
+            logger.warning(f"Error getting embedding: {e}, returning zero vector")
+            return self.embedding_provider.zero_vectors(1)[0]
+    
+    @tracer.trace("retrieval.embed_queries")
+    async def _aget_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Get embeddings for several texts in one request, with the same
+        zero-vector fallback as _get_embedding
+        """
+        try:
+            return await self.embedding_provider.aembed(texts)
         except Exception as e:
-            print(f"Error getting embedding: {e}, returning zero vector")
-            # Return zero vector as fallback
-            return [0.0] * 1536  # OpenAI text-embedding-3-small dimension
+            logger.warning(f"Error getting embeddings: {e}, returning zero vectors")
+            return self.embedding_provider.zero_vectors(len(texts))
     
     def _deduplicate_chunks(self, chunks: List[DocumentChunk]) -> List[DocumentChunk]:
         """
@@ -252,13 +476,15 @@ class RegRetriever:
         
         return unique_chunks
     
-    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def search(self, query: str, top_k: int = 5,
+               metadata_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Simple search method for testing RAG functionality.
         
         Args:
             query: Search query string
             top_k: Number of results to return
+            metadata_filter: Only return chunks matching this filter
             
         Returns:
             List of dictionaries with search results
@@ -272,12 +498,14 @@ class RegRetriever:
                 self.initialize(index_path)
             
             # Get embedding for query
-            query_embedding = self._get_embedding(query)
+            mode, _ = self._get_search_mode()
+            query_embedding = None if mode == "lexical" else self._get_embedding(query)
             logger.info(f"Generated embedding for query: {query}")
             
             # Search vector store
-            logger.info(f"Searching with query embedding (first 5 values): {query_embedding[:5]}")
-            chunks = self.vector_store.search(query_embedding, top_k=top_k)
+            if query_embedding is not None:
+                logger.info(f"Searching with query embedding (first 5 values): {query_embedding[:5]}")
+            chunks = self._search_query(query, query_embedding, top_k, metadata_filter)
             logger.info(f"Vector store returned {len(chunks)} chunks")
             
             # Log the titles of returned chunks
@@ -2,7 +2,7 @@
 Pydantic schemas for retrieval module.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -19,6 +19,8 @@ class DocumentChunk(BaseModel):
     end_char: int = Field(..., description="Ending character position in original document")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
     created_at: datetime = Field(default_factory=datetime.now, description="Creation timestamp")
+    # Row of the chunk in the vector store that returned it (not serialized)
+    _store_row: Optional[int] = PrivateAttr(default=None)
     
     class Config:
         json_encoders = {
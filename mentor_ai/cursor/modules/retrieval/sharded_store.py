@@ -0,0 +1,382 @@
+"""
+Sharded vector store with a parallel shard scan.
+
+Embeddings are appended into fixed-capacity float32 shards instead of one
+matrix rebuilt on every add, so ingest is linear in the number of chunks.
+A search scores every shard on a shared thread pool (NumPy releases the GIL
+inside the matrix product and the partial sort), keeps each shard's top-k and
+merges them. Chunks, the BM25 index, the metadata filter index and the
+on-disk format are shared with SimpleVectorStore, so either store can load an
+index saved by the other.
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .schemas import DocumentChunk
+from .vector_store import VectorStore
+from .simple_store import SimpleVectorStore
+from .quantization import QuantizedEmbeddings
+from .mmr import normalize_rows
+from .filters import MetadataFilter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARD_SIZE = 4096
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Process-wide scan pool, shared by all sharded stores (including reloaded ones)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vector-shard")
+        return _executor
+
+
+class EmbeddingShard:
+    """Fixed-capacity block of embedding rows starting at a global row id."""
+
+    def __init__(self, start: int, vectors: np.ndarray, size: Optional[int] = None,
+                 quantized: Optional[QuantizedEmbeddings] = None):
+        """
+        Args:
+            start: Global row id of the first row
+            vectors: (capacity, dim) float32 array, may be a view of a loaded matrix
+            size: Number of filled rows (defaults to the full capacity)
+            quantized: Quantized copy of the filled rows, if already available
+        """
+        self.start = start
+        self.vectors = vectors
+        self.size = len(vectors) if size is None else size
+        self._quantized = quantized
+        self._normalized: Optional[np.ndarray] = None
+        self._normalized_size = 0
+
+    @classmethod
+    def allocate(cls, start: int, capacity: int, dim: int) -> "EmbeddingShard":
+        return cls(start, np.empty((capacity, dim), dtype=np.float32), size=0)
+
+    @property
+    def capacity(self) -> int:
+        return self.vectors.shape[0]
+
+    @property
+    def end(self) -> int:
+        return self.start + self.size
+
+    def append(self, rows: np.ndarray) -> int:
+        """Copy as many rows as fit; returns how many were taken."""
+        count = min(self.capacity - self.size, len(rows))
+        self.vectors[self.size:self.size + count] = rows[:count]
+        self.size += count
+        return count
+
+    def normalized(self) -> np.ndarray:
+        """Row-normalized filled rows; only rows added since the last call are normalized."""
+        if self._normalized is None:
+            self._normalized = np.empty(self.vectors.shape, dtype=np.float32)
+        if self._normalized_size < self.size:
+            self._normalized[self._normalized_size:self.size] = normalize_rows(
+                self.vectors[self._normalized_size:self.size]
+            )
+            self._normalized_size = self.size
+        return self._normalized[:self.size]
+
+    def quantized(self, mode: str) -> QuantizedEmbeddings:
+        """Quantized filled rows, rebuilt when the shard has grown."""
+        if self._quantized is None or len(self._quantized) != self.size:
+            self._quantized = QuantizedEmbeddings.from_embeddings(self.vectors[:self.size], mode)
+        return self._quantized
+
+
+class ShardedVectorStore(SimpleVectorStore):
+    """SimpleVectorStore variant keeping embeddings in shards scanned in parallel."""
+
+    def __init__(self, shard_size: Optional[int] = None, max_workers: Optional[int] = None,
+                 storage: Optional[str] = None, rerank_factor: Optional[int] = None):
+        """
+        Args:
+            shard_size: Rows per shard (defaults to VECTOR_STORE_SHARD_SIZE)
+            max_workers: Scan threads (defaults to VECTOR_STORE_SEARCH_WORKERS, 0 = one per CPU up to 8)
+            storage: Embedding storage for scoring, see SimpleVectorStore
+            rerank_factor: Quantized-mode re-rank factor, see SimpleVectorStore
+        """
+        super().__init__(storage=storage, rerank_factor=rerank_factor)
+        self.shard_size = max(1, shard_size or int(os.getenv("VECTOR_STORE_SHARD_SIZE", str(DEFAULT_SHARD_SIZE))))
+        self.max_workers = max_workers or int(os.getenv("VECTOR_STORE_SEARCH_WORKERS", "0")) or min(8, os.cpu_count() or 1)
+        # Embeddings live here; the inherited self.embeddings stays empty
+        self.shards: List[EmbeddingShard] = []
+
+    def add_documents(self, chunks: List[DocumentChunk], embeddings: List[List[float]]) -> None:
+        """Add document chunks with their embeddings; appends into the last shard."""
+        if len(chunks) != len(embeddings):
+            raise ValueError("Number of chunks must match number of embeddings")
+        if not chunks:
+            return
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2:
+            raise ValueError(f"Embeddings must be a 2D array, got shape {vectors.shape}")
+        if self.shards and vectors.shape[1] != self._embedding_dimension():
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match the store ({self._embedding_dimension()})"
+            )
+
+        # Loaded chunk stores are read-only; switch to an in-memory list to append
+        if not isinstance(self.chunks, list):
+            self.chunks = list(self.chunks)
+        self.chunks.extend(chunks)
+        for row, chunk in enumerate(chunks, start=len(self.chunks) - len(chunks)):
+            chunk._store_row = row
+
+        offset = 0
+        while offset < len(vectors):
+            if not self.shards or self.shards[-1].size == self.shards[-1].capacity:
+                self.shards.append(EmbeddingShard.allocate(self._num_embeddings(), self.shard_size, vectors.shape[1]))
+            offset += self.shards[-1].append(vectors[offset:])
+
+        # Keep the lexical and filter indexes in step with the chunks
+        self.bm25.add_documents([chunk.content for chunk in chunks])
+        self.filter_index.add_documents(chunks)
+
+        logger.info(f"Added {len(chunks)} documents to sharded store. Total: {len(self.chunks)} in {len(self.shards)} shards")
+
+    def search(self, query_embedding: List[float], top_k: int = 5,
+               metadata_filter: Optional[MetadataFilter] = None) -> List[DocumentChunk]:
+        """Search for similar documents; shards are scanned in parallel."""
+        return self.search_batch([query_embedding], top_k=top_k, metadata_filter=metadata_filter)[0]
+
+    def search_batch(self, query_embeddings: List[List[float]], top_k: int = 5,
+                     metadata_filter: Optional[MetadataFilter] = None) -> List[List[DocumentChunk]]:
+        """
+        Search for several queries in one parallel scan.
+
+        Each returned chunk carries the best similarity it reached among the
+        queries it was returned for in metadata["similarity_score"].
+        """
+        if not query_embeddings:
+            return []
+        if not self.chunks or not self.shards:
+            logger.warning("Vector store is empty. Returning empty results.")
+            return [[] for _ in query_embeddings]
+
+        rows = self._filter_rows(metadata_filter)
+        if rows is not None and rows.size == 0:
+            return [[] for _ in query_embeddings]
+
+        top_rows, top_scores = self._top_k(_normalize_queries(query_embeddings), top_k, rows)
+
+        best_scores: Dict[int, float] = {}
+        for row, score in zip(top_rows.ravel().tolist(), top_scores.ravel().tolist()):
+            best_scores[row] = max(score, best_scores.get(row, -np.inf))
+
+        results = []
+        for column in range(top_rows.shape[1]):
+            hits = []
+            for row in top_rows[:, column].tolist():
+                chunk = self._chunk_at(row)
+                chunk.metadata["similarity_score"] = float(best_scores[row])
+                hits.append(chunk)
+            results.append(hits)
+
+        logger.debug(f"Sharded search over {len(self.shards)} shards returned {top_rows.shape[0]} results per query")
+        return results
+
+    def get_embeddings(self, chunks: List[DocumentChunk]) -> Optional[np.ndarray]:
+        """Return row-normalized float32 embeddings of the given chunks."""
+        if not chunks or not self.shards:
+            return None
+        rows = self._lookup_rows(chunks)
+        if rows is None:
+            return None
+        return normalize_rows(self._gather(np.asarray(rows, dtype=np.int64)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics about the vector store."""
+        stats = super().get_stats()
+        stats["num_shards"] = len(self.shards)
+        stats["shard_size"] = self.shard_size
+        return stats
+
+    def clear(self) -> None:
+        """Clear all data from the store."""
+        super().clear()
+        self.shards = []
+
+    def _num_embeddings(self) -> int:
+        return self.shards[-1].end if self.shards else 0
+
+    def _embedding_dimension(self) -> int:
+        return self.shards[0].vectors.shape[1] if self.shards else 0
+
+    def _save_embeddings(self, path: Path) -> None:
+        """Write the shards as one embeddings.npy (same format as SimpleVectorStore)."""
+        if not self.shards:
+            return
+
+        matrix = np.lib.format.open_memmap(
+            path / "embeddings.npy", mode="w+", dtype=np.float32,
+            shape=(self._num_embeddings(), self._embedding_dimension())
+        )
+        for shard in self.shards:
+            matrix[shard.start:shard.end] = shard.vectors[:shard.size]
+        matrix.flush()
+        del matrix
+
+        if self.storage != "float32":
+            parts = [shard.quantized(self.storage) for shard in self.shards]
+            scales = [part.scales for part in parts if part.scales is not None]
+            QuantizedEmbeddings(
+                np.concatenate([part.codes for part in parts]),
+                np.concatenate(scales) if scales else None
+            ).save(path)
+
+    def load(self, path: str) -> None:
+        """Load the vector store from disk; shards are views of the loaded matrix."""
+        super().load(path)
+        self.shards = []
+
+        embeddings = self._embeddings_array
+        if embeddings is None or not len(embeddings):
+            return
+
+        quantized = self._quantized
+        for start in range(0, len(embeddings), self.shard_size):
+            end = min(start + self.shard_size, len(embeddings))
+            shard_quantized = None
+            if quantized is not None:
+                shard_quantized = QuantizedEmbeddings(
+                    quantized.codes[start:end],
+                    quantized.scales[start:end] if quantized.scales is not None else None
+                )
+            self.shards.append(EmbeddingShard(start, embeddings[start:end], quantized=shard_quantized))
+
+        # The shards own the rows now; drop the monolithic references
+        self.embeddings = []
+        self._embeddings_array = None
+        self._quantized = None
+        logger.info(f"Split {self._num_embeddings()} embeddings into {len(self.shards)} shards")
+
+    def _cosine_similarities(self, queries: np.ndarray, top_k: int,
+                             rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Full similarity matrix over the scanned rows (used by hybrid search),
+        filled shard by shard in parallel.
+        """
+        num_scanned = self._num_embeddings() if rows is None else len(rows)
+        out = np.empty((num_scanned, queries.shape[1]), dtype=np.float32)
+
+        def fill(shard: EmbeddingShard) -> None:
+            lo, hi, local = self._shard_rows(shard, rows)
+            if hi > lo:
+                out[lo:hi] = self._shard_similarities(shard, queries, top_k, local)
+
+        self._map(fill)
+        return out
+
+    def _top_k(self, queries: np.ndarray, top_k: int,
+               rows: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Merge the per-shard top-k of every query.
+
+        Returns:
+            (k, num_queries) global row ids and their similarities, best first
+        """
+        def scan(shard: EmbeddingShard) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+            lo, hi, local = self._shard_rows(shard, rows)
+            if hi <= lo:
+                return None
+            similarities = self._shard_similarities(shard, queries, top_k, local)
+            k = min(top_k, similarities.shape[0])
+            top = np.argpartition(-similarities, k - 1, axis=0)[:k]
+            positions = top if local is None else local[top]
+            return positions + shard.start, np.take_along_axis(similarities, top, axis=0)
+
+        parts = [part for part in self._map(scan) if part is not None]
+        if not parts or top_k <= 0:
+            return np.empty((0, queries.shape[1]), dtype=np.int64), np.empty((0, queries.shape[1]), dtype=np.float32)
+
+        candidate_rows = np.concatenate([part[0] for part in parts])
+        candidate_scores = np.concatenate([part[1] for part in parts])
+        k = min(top_k, candidate_scores.shape[0])
+        top = np.argpartition(-candidate_scores, k - 1, axis=0)[:k]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(candidate_scores, top, axis=0), axis=0), axis=0)
+        return np.take_along_axis(candidate_rows, top, axis=0), np.take_along_axis(candidate_scores, top, axis=0)
+
+    def _shard_rows(self, shard: EmbeddingShard,
+                    rows: Optional[np.ndarray]) -> Tuple[int, int, Optional[np.ndarray]]:
+        """
+        Where a shard's rows land in the scanned order.
+
+        Returns:
+            (lo, hi, local): output positions [lo, hi) and the shard-local row ids
+            to scan (None = all rows of the shard)
+        """
+        if rows is None:
+            return shard.start, shard.end, None
+        lo, hi = np.searchsorted(rows, [shard.start, shard.end])
+        return int(lo), int(hi), rows[lo:hi] - shard.start
+
+    def _shard_similarities(self, shard: EmbeddingShard, queries: np.ndarray, top_k: int,
+                            local: Optional[np.ndarray]) -> np.ndarray:
+        """Cosine similarities of one shard's rows; quantized modes re-rank the shard's best exactly."""
+        if self.storage == "float32":
+            normalized = shard.normalized()
+            return (normalized if local is None else normalized[local]) @ queries
+
+        similarities = shard.quantized(self.storage).scores(queries, local)
+        k = min(top_k * self.rerank_factor, similarities.shape[0])
+        if k > 0:
+            candidates = np.unique(np.argpartition(-similarities, k - 1, axis=0)[:k])
+            exact_rows = candidates if local is None else local[candidates]
+            similarities[candidates] = normalize_rows(shard.vectors[exact_rows]) @ queries
+        return similarities
+
+    def _gather(self, rows: np.ndarray) -> np.ndarray:
+        """Exact float32 embeddings of arbitrary global rows."""
+        starts = np.array([shard.start for shard in self.shards])
+        shard_ids = np.searchsorted(starts, rows, side="right") - 1
+        out = np.empty((len(rows), self._embedding_dimension()), dtype=np.float32)
+        for i, (shard_id, row) in enumerate(zip(shard_ids.tolist(), rows.tolist())):
+            shard = self.shards[shard_id]
+            out[i] = shard.vectors[row - shard.start]
+        return out
+
+    def _map(self, fn: Callable[[EmbeddingShard], Any]) -> List[Any]:
+        """Apply fn to every shard, in parallel when there is more than one."""
+        if len(self.shards) == 1 or self.max_workers <= 1:
+            return [fn(shard) for shard in self.shards]
+        return list(_get_executor(self.max_workers).map(fn, self.shards))
+
+
+def _normalize_queries(query_embeddings: List[List[float]]) -> np.ndarray:
+    """(dim, num_queries) normalized queries; zero vectors stay zero instead of becoming NaN."""
+    queries = np.asarray(query_embeddings, dtype=np.float32)
+    norms = np.linalg.norm(queries, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (queries / norms).T
+
+
+def create_vector_store(store_type: Optional[str] = None) -> VectorStore:
+    """
+    Build the configured vector store.
+
+    Args:
+        store_type: "simple" or "sharded" (defaults to VECTOR_STORE_TYPE)
+    """
+    store_type = (store_type or os.getenv("VECTOR_STORE_TYPE", "simple")).lower()
+    if store_type == "simple":
+        return SimpleVectorStore()
+    if store_type == "sharded":
+        return ShardedVectorStore()
+    raise ValueError(f"Unknown vector store type: {store_type}. Expected 'simple' or 'sharded'")
@@ -6,12 +6,17 @@ import os
 import json
 import pickle
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Union
 import numpy as np
 from pathlib import Path
 
 from .vector_store import VectorStore
 from .schemas import DocumentChunk
+from .bm25 import BM25Index
+from .chunk_store import ChunkStore, write_chunk_store, chunk_store_exists
+from .quantization import QuantizedEmbeddings, validate_storage_mode
+from .mmr import normalize_rows
+from .filters import MetadataFilter, MetadataFilterIndex
 
 logger = logging.getLogger(__name__)
 
@@ -19,30 +24,85 @@ logger = logging.getLogger(__name__)
 class SimpleVectorStore(VectorStore):
     """Simple vector store using numpy arrays and cosine similarity."""
     
-    def __init__(self):
-        self.chunks: List[DocumentChunk] = []
-        self.embeddings: List[List[float]] = []
+    def __init__(self, storage: Optional[str] = None, rerank_factor: Optional[int] = None):
+        """
+        Args:
+            storage: Embedding storage for scoring: "float32", "float16" or "int8"
+                (defaults to EMBEDDINGS_STORAGE)
+            rerank_factor: In quantized modes, top_k * rerank_factor candidates are
+                re-scored with exact float32 embeddings (defaults to EMBEDDINGS_RERANK_FACTOR)
+        """
+        self.storage = validate_storage_mode(storage or os.getenv("EMBEDDINGS_STORAGE", "float32"))
+        self.rerank_factor = max(1, rerank_factor or int(os.getenv("EMBEDDINGS_RERANK_FACTOR", "4")))
+        # A plain list while building; a lazily materialized ChunkStore after load()
+        self.chunks: Sequence[DocumentChunk] = []
+        # Empty list until documents are added; then a float32 matrix: a view of
+        # _embeddings_buffer while building, the (possibly memory-mapped) array after load()
+        self.embeddings: Union[List[List[float]], np.ndarray] = []
+        self._embeddings_buffer: Optional[np.ndarray] = None
         self._embeddings_array: Optional[np.ndarray] = None
+        self._normalized_array: Optional[np.ndarray] = None
+        self._quantized: Optional[QuantizedEmbeddings] = None
+        self.bm25 = BM25Index()
+        self.filter_index = MetadataFilterIndex()
         
     def add_documents(self, chunks: List[DocumentChunk], embeddings: List[List[float]]) -> None:
         """Add document chunks with their embeddings to the store."""
         if len(chunks) != len(embeddings):
             raise ValueError("Number of chunks must match number of embeddings")
+        if not chunks:
+            return
+        
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2:
+            raise ValueError(f"Embeddings must be a 2D array, got shape {vectors.shape}")
+        if self._num_embeddings() and vectors.shape[1] != self._embedding_dimension():
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match the store ({self._embedding_dimension()})"
+            )
             
+        # Loaded chunk stores are read-only; switch to an in-memory list to append
+        if not isinstance(self.chunks, list):
+            self.chunks = list(self.chunks)
+        
         # Add new chunks and embeddings
         self.chunks.extend(chunks)
-        self.embeddings.extend(embeddings)
+        for row, chunk in enumerate(chunks, start=len(self.chunks) - len(chunks)):
+            chunk._store_row = row
+        self._append_embeddings(vectors)
+        self._normalized_array = None
+        self._quantized = None
         
-        # Update numpy array for faster computation
-        self._embeddings_array = np.array(self.embeddings, dtype=np.float32)
+        # Keep the lexical and filter indexes in step with the chunks
+        self.bm25.add_documents([chunk.content for chunk in chunks])
+        self.filter_index.add_documents(chunks)
         
         logger.info(f"Added {len(chunks)} documents to vector store. Total: {len(self.chunks)}")
     
-    def search(self, query_embedding: List[float], top_k: int = 5) -> List[DocumentChunk]:
+    def _append_embeddings(self, vectors: np.ndarray) -> None:
+        """Append rows to a geometrically grown matrix, so adding in batches stays linear overall."""
+        count = self._num_embeddings()
+        needed = count + len(vectors)
+        buffer = self._embeddings_buffer
+        if buffer is None or len(buffer) < needed:
+            grown = np.empty((max(needed, 2 * count), vectors.shape[1]), dtype=np.float32)
+            if count:
+                # Copies a loaded (possibly memory-mapped) matrix once
+                grown[:count] = self.embeddings
+            self._embeddings_buffer = buffer = grown
+        buffer[count:needed] = vectors
+        self.embeddings = self._embeddings_array = buffer[:needed]
+    
+    def search(self, query_embedding: List[float], top_k: int = 5,
+               metadata_filter: Optional[MetadataFilter] = None) -> List[DocumentChunk]:
         """Search for similar documents using cosine similarity."""
         if not self.chunks:
             logger.warning("Vector store is empty. Returning empty results.")
             return []
+        
+        rows = self._filter_rows(metadata_filter)
+        if rows is not None and rows.size == 0:
+            return []
             
         if self._embeddings_array is None:
             self._embeddings_array = np.array(self.embeddings, dtype=np.float32)
@@ -72,74 +132,337 @@ class SimpleVectorStore(VectorStore):
                 logger.error(f"Invalid dimensions: num_chunks={num_chunks}, total_elements={total_elements}")
                 raise ValueError(f"Invalid embeddings array: num_chunks={num_chunks}, total_elements={total_elements}")
         
-        # Normalize vectors for cosine similarity
+        # Normalize query for cosine similarity
         query_norm = query_array / np.linalg.norm(query_array, axis=1, keepdims=True)
-        embeddings_norm = self._embeddings_array / np.linalg.norm(self._embeddings_array, axis=1, keepdims=True)
         
         # Compute cosine similarities
-        similarities = np.dot(embeddings_norm, query_norm.T).flatten()
+        similarities = self._cosine_similarities(query_norm.T, top_k, rows).flatten()
         
-        # Get top-k indices
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        # Get top-k indices (positions among the scanned rows, then store rows)
+        top_positions = np.argsort(similarities)[::-1][:top_k]
+        top_indices = top_positions if rows is None else rows[top_positions]
         
         # Log similarities for debugging
-        logger.info(f"Similarities for top {top_k} results: {similarities[top_indices]}")
+        logger.info(f"Similarities for top {top_k} results: {similarities[top_positions]}")
         logger.info(f"Top indices: {top_indices}")
         
         # Return corresponding chunks with scores
         results = []
-        for i, idx in enumerate(top_indices):
-            chunk = self.chunks[idx]
+        for position, idx in zip(top_positions, top_indices):
+            chunk = self._chunk_at(idx)
             # Add similarity score to chunk metadata
-            chunk.metadata["similarity_score"] = float(similarities[idx])
+            chunk.metadata["similarity_score"] = float(similarities[position])
             results.append(chunk)
         
         # Log the titles of returned chunks
         result_titles = [chunk.title for chunk in results]
         logger.info(f"Returned chunk titles: {result_titles}")
         
-        logger.debug(f"Search returned {len(results)} results with similarities: {similarities[top_indices]}")
+        logger.debug(f"Search returned {len(results)} results with similarities: {similarities[top_positions]}")
+        return results
+    
+    def search_batch(self, query_embeddings: List[List[float]], top_k: int = 5,
+                     metadata_filter: Optional[MetadataFilter] = None) -> List[List[DocumentChunk]]:
+        """
+        Search for several queries with one matrix product.
+        
+        Each returned chunk carries the best similarity it reached across
+        the batch in metadata["similarity_score"].
+        """
+        if not query_embeddings:
+            return []
+        if not self.chunks:
+            logger.warning("Vector store is empty. Returning empty results.")
+            return [[] for _ in query_embeddings]
+        
+        rows = self._filter_rows(metadata_filter)
+        
+        # Normalize queries; zero vectors stay zero instead of becoming NaN
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        query_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        query_norms[query_norms == 0] = 1.0
+        queries = queries / query_norms
+        
+        # (num_docs, num_queries) similarity matrix in a single pass
+        similarities = self._cosine_similarities(queries.T, top_k, rows)
+        
+        k = min(top_k, similarities.shape[0])
+        if k <= 0:
+            return [[] for _ in query_embeddings]
+        
+        # Partial sort per query column, then order the k candidates
+        candidates = np.argpartition(-similarities, k - 1, axis=0)[:k]
+        candidate_scores = np.take_along_axis(similarities, candidates, axis=0)
+        order = np.argsort(-candidate_scores, axis=0)
+        top_positions = np.take_along_axis(candidates, order, axis=0)
+        best_scores = similarities.max(axis=1)
+        
+        results = []
+        for column in range(top_positions.shape[1]):
+            hits = []
+            for position in top_positions[:, column]:
+                chunk = self._chunk_at(position if rows is None else rows[position])
+                chunk.metadata["similarity_score"] = float(best_scores[position])
+                hits.append(chunk)
+            results.append(hits)
+        
+        logger.debug(f"Batch search for {len(query_embeddings)} queries returned {k} results each")
+        return results
+    
+    def lexical_search(self, query_text: str, top_k: int = 5,
+                       metadata_filter: Optional[MetadataFilter] = None) -> List[DocumentChunk]:
+        """Search with BM25 only; used when no query embedding is available."""
+        if not self.chunks:
+            return []
+        
+        rows = self._filter_rows(metadata_filter)
+        if rows is None:
+            indices, scores = self.bm25.search(query_text, top_k=top_k)
+        else:
+            row_scores = self.bm25.score(query_text)[rows]
+            matched = np.flatnonzero(row_scores > 0)
+            matched = matched[np.argsort(-row_scores[matched])][:top_k]
+            indices, scores = rows[matched], row_scores[matched]
+        results = []
+        for idx, score in zip(indices, scores):
+            chunk = self._chunk_at(idx)
+            chunk.metadata["bm25_score"] = float(score)
+            results.append(chunk)
+        
+        logger.info(f"Lexical search returned {len(results)} results")
+        return results
+    
+    def hybrid_search(self, query_text: str, query_embedding: Optional[List[float]] = None,
+                      top_k: int = 5, alpha: float = 0.5,
+                      metadata_filter: Optional[MetadataFilter] = None) -> List[DocumentChunk]:
+        """
+        Rank by a weighted sum of min-max scaled cosine similarity and
+        max-scaled BM25. Degrades to lexical-only search when the query
+        embedding is missing or a zero vector.
+        """
+        if not self.chunks:
+            logger.warning("Vector store is empty. Returning empty results.")
+            return []
+        
+        query = None if query_embedding is None else np.asarray(query_embedding, dtype=np.float32)
+        if query is None or not np.any(query):
+            logger.info("No usable query embedding, using lexical-only search")
+            return self.lexical_search(query_text, top_k, metadata_filter)
+        
+        rows = self._filter_rows(metadata_filter)
+        if rows is not None and rows.size == 0:
+            return []
+        
+        query = (query / np.linalg.norm(query)).reshape(-1, 1)
+        similarities = self._cosine_similarities(query, top_k, rows)[:, 0]
+        results = self._hybrid_rank(query_text, similarities, rows, top_k, alpha)
+        logger.debug(f"Hybrid search returned {len(results)} results (alpha={alpha})")
+        return results
+    
+    def hybrid_search_batch(self, query_texts: List[str], query_embeddings: List[Optional[List[float]]],
+                            top_k: int = 5, alpha: float = 0.5,
+                            metadata_filter: Optional[MetadataFilter] = None) -> List[List[DocumentChunk]]:
+        """
+        hybrid_search for several queries with one similarity pass.
+        
+        The cosine similarities of all queries with usable embeddings come
+        from a single matrix product; BM25 and the score fusion run per query.
+        Queries without a usable embedding are searched lexically.
+        """
+        if not query_texts:
+            return []
+        if not self.chunks:
+            logger.warning("Vector store is empty. Returning empty results.")
+            return [[] for _ in query_texts]
+        
+        rows = self._filter_rows(metadata_filter)
+        if rows is not None and rows.size == 0:
+            return [[] for _ in query_texts]
+        
+        usable = [i for i, embedding in enumerate(query_embeddings)
+                  if embedding is not None and np.any(np.asarray(embedding, dtype=np.float32))]
+        similarities = None
+        if usable:
+            queries = np.asarray([query_embeddings[i] for i in usable], dtype=np.float32)
+            queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+            similarities = self._cosine_similarities(queries.T, top_k, rows)
+        
+        column_of = {query: column for column, query in enumerate(usable)}
+        results = []
+        for i, query_text in enumerate(query_texts):
+            if i in column_of:
+                results.append(self._hybrid_rank(query_text, similarities[:, column_of[i]], rows, top_k, alpha))
+            else:
+                results.append(self.lexical_search(query_text, top_k, metadata_filter))
+        
+        logger.debug(f"Hybrid batch search for {len(query_texts)} queries ({len(usable)} with embeddings, alpha={alpha})")
         return results
     
+    def _hybrid_rank(self, query_text: str, similarities: np.ndarray, rows: Optional[np.ndarray],
+                     top_k: int, alpha: float) -> List[DocumentChunk]:
+        """Top chunks by alpha * scaled cosine similarity + (1 - alpha) * scaled BM25."""
+        if not query_text:
+            lexical = np.zeros_like(similarities)
+        else:
+            lexical = self.bm25.score(query_text)
+            lexical = lexical if rows is None else lexical[rows]
+        
+        vector_part = _min_max_scale(similarities)
+        lexical_max = lexical.max() if lexical.size else 0.0
+        lexical_part = lexical / lexical_max if lexical_max > 0 else lexical
+        combined = alpha * vector_part + (1.0 - alpha) * lexical_part
+        
+        k = min(top_k, combined.shape[0])
+        top_positions = np.argpartition(-combined, k - 1)[:k]
+        top_positions = top_positions[np.argsort(-combined[top_positions])]
+        
+        results = []
+        for position in top_positions:
+            chunk = self._chunk_at(position if rows is None else rows[position])
+            chunk.metadata["similarity_score"] = float(similarities[position])
+            chunk.metadata["bm25_score"] = float(lexical[position])
+            chunk.metadata["hybrid_score"] = float(combined[position])
+            results.append(chunk)
+        return results
+    
+    def get_embeddings(self, chunks: List[DocumentChunk]) -> Optional[np.ndarray]:
+        """Return row-normalized float32 embeddings of the given chunks."""
+        if not chunks or not self._num_embeddings():
+            return None
+        
+        rows = self._lookup_rows(chunks)
+        if rows is None:
+            return None
+        
+        if self._embeddings_array is None:
+            self._embeddings_array = np.array(self.embeddings, dtype=np.float32)
+        return normalize_rows(self._embeddings_array[rows])
+    
+    def _chunk_at(self, row: int) -> DocumentChunk:
+        """Chunk of a row, tagged with the row so get_embeddings needs no id lookup."""
+        chunk = self.chunks[row]
+        chunk._store_row = int(row)
+        return chunk
+    
+    def _lookup_rows(self, chunks: List[DocumentChunk]) -> Optional[List[int]]:
+        """Row ids of the given chunks (from the search that returned them), or None if any is not in the store."""
+        rows = []
+        for chunk in chunks:
+            row = chunk._store_row
+            if row is None or row >= len(self.chunks) or self._chunk_id(row) != chunk.id:
+                logger.warning("Some chunks were not returned by this vector store; cannot look up embeddings")
+                return None
+            rows.append(row)
+        return rows
+    
+    def _chunk_id(self, row: int) -> str:
+        if isinstance(self.chunks, ChunkStore):
+            return self.chunks.chunk_id(row)
+        return self.chunks[row].id
+    
+    def _filter_rows(self, metadata_filter: Optional[MetadataFilter]) -> Optional[np.ndarray]:
+        """Sorted row ids eligible under the filter, or None to scan every row."""
+        if not metadata_filter:
+            return None
+        rows = self.filter_index.evaluate(metadata_filter)
+        logger.debug(f"Metadata filter {metadata_filter} selected {rows.size} of {len(self.chunks)} rows")
+        return rows
+    
+    def _cosine_similarities(self, queries: np.ndarray, top_k: int,
+                             rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Cosine similarity of every scanned document to every query.
+        
+        In quantized modes all documents are scored approximately and the
+        top_k * rerank_factor candidates of each query get exact float32 scores.
+        
+        Args:
+            queries: (dim, num_queries) array of normalized queries
+            top_k: Number of results the caller will keep
+            rows: Sorted row ids to scan (e.g. from a metadata filter); None scans all
+            
+        Returns:
+            (num_scanned, num_queries) similarity matrix, in the order of `rows`
+        """
+        if self.storage == "float32":
+            embeddings = self._get_normalized_embeddings()
+            return (embeddings if rows is None else embeddings[rows]) @ queries
+        
+        similarities = self._get_quantized().scores(queries, rows)
+        k = min(top_k * self.rerank_factor, similarities.shape[0])
+        if k <= 0:
+            return similarities
+        
+        # Sorted unique rows keep reads from a memory-mapped file sequential
+        candidates = np.unique(np.argpartition(-similarities, k - 1, axis=0)[:k])
+        exact_rows = candidates if rows is None else rows[candidates]
+        exact = normalize_rows(self._embeddings_array[exact_rows])
+        similarities[candidates] = exact @ queries
+        return similarities
+    
+    def _get_quantized(self) -> QuantizedEmbeddings:
+        """Return the quantized matrix, built once per index change."""
+        if self._quantized is None:
+            if self._embeddings_array is None:
+                self._embeddings_array = np.array(self.embeddings, dtype=np.float32)
+            self._quantized = QuantizedEmbeddings.from_embeddings(self._embeddings_array, self.storage)
+        return self._quantized
+    
+    def _get_normalized_embeddings(self) -> np.ndarray:
+        """Return row-normalized embeddings, computed once per index change."""
+        if self._normalized_array is None:
+            if self._embeddings_array is None:
+                self._embeddings_array = np.array(self.embeddings, dtype=np.float32)
+            embeddings = self._embeddings_array.astype(np.float32, copy=False)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._normalized_array = embeddings / norms
+        return self._normalized_array
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store."""
         return {
             "total_documents": len(self.chunks),
-            "total_embeddings": len(self.embeddings),
-            "embedding_dimension": len(self.embeddings[0]) if self.embeddings else 0,
-            "store_type": "SimpleVectorStore"
+            "total_embeddings": self._num_embeddings(),
+            "embedding_dimension": self._embedding_dimension(),
+            "embeddings_storage": self.storage,
+            "lexical_documents": self.bm25.num_documents,
+            "filter_index_rows": self.filter_index.num_rows,
+            "store_type": type(self).__name__
         }
     
+    def _num_embeddings(self) -> int:
+        return len(self.embeddings)
+    
+    def _embedding_dimension(self) -> int:
+        return len(self.embeddings[0]) if len(self.embeddings) else 0
+    
     def save(self, path: str) -> None:
         """Save the vector store to disk."""
         path = Path(path)
         path.mkdir(parents=True, exist_ok=True)
         
-        # Save chunks as JSON
-        chunks_file = path / "chunks.json"
-        chunks_data = [chunk.dict() for chunk in self.chunks]
-        
-        # Custom JSON encoder to handle datetime objects
-        class DateTimeEncoder(json.JSONEncoder):
-            def default(self, obj):
-                if hasattr(obj, 'isoformat'):
-                    return obj.isoformat()
-                return super().default(obj)
+        # Save chunks as a compact binary store (text blob + columnar metadata)
+        write_chunk_store(path, self.chunks)
         
-        with open(chunks_file, 'w', encoding='utf-8') as f:
-            json.dump(chunks_data, f, ensure_ascii=False, indent=2, cls=DateTimeEncoder)
+        # Save exact embeddings as float32 (half the size of the former float64)
+        self._save_embeddings(path)
         
-        # Save embeddings as numpy array
-        embeddings_file = path / "embeddings.npy"
-        if self.embeddings:
-            np.save(embeddings_file, np.array(self.embeddings))
+        # Save lexical and metadata filter indexes next to the embeddings
+        self.bm25.save(path)
+        self.filter_index.save(path)
         
         # Save metadata
         metadata = {
-            "version": "1.0",
-            "store_type": "SimpleVectorStore",
+            "version": "2.0",
+            "store_type": type(self).__name__,
+            "chunk_format": "binary",
             "total_documents": len(self.chunks),
-            "embedding_dimension": len(self.embeddings[0]) if self.embeddings else 0
+            "embedding_dimension": self._embedding_dimension(),
+            "embeddings_dtype": "float32",
+            "embeddings_storage": self.storage,
+            "lexical_index": "bm25",
+            "filter_index": "postings"
         }
         
         metadata_file = path / "metadata.json"
@@ -148,6 +471,13 @@ class SimpleVectorStore(VectorStore):
         
         logger.info(f"Saved vector store to {path}")
     
+    def _save_embeddings(self, path: Path) -> None:
+        """Write embeddings.npy (and the quantized matrix) into the index directory."""
+        if len(self.embeddings):
+            np.save(path / "embeddings.npy", np.asarray(self.embeddings, dtype=np.float32))
+            if self.storage != "float32":
+                self._get_quantized().save(path)
+    
     def load(self, path: str) -> None:
         """Load the vector store from disk."""
         path = Path(path)
@@ -155,40 +485,92 @@ class SimpleVectorStore(VectorStore):
         if not path.exists():
             raise FileNotFoundError(f"Vector store path does not exist: {path}")
         
-        # Load chunks
+        # Load chunks: binary store if present, legacy chunks.json otherwise
         chunks_file = path / "chunks.json"
-        if chunks_file.exists():
+        self._close_chunk_store()
+        if chunk_store_exists(path):
+            self.chunks = ChunkStore(path)
+        elif chunks_file.exists():
             with open(chunks_file, 'r', encoding='utf-8') as f:
                 chunks_data = json.load(f)
             self.chunks = [DocumentChunk(**chunk_data) for chunk_data in chunks_data]
         
         # Load embeddings
-        embeddings_file = path / "embeddings.npy"
-        if embeddings_file.exists():
-            embeddings_array = np.load(embeddings_file)
-            logger.info(f"Loaded embeddings array shape: {embeddings_array.shape}")
-            
-            # Ensure embeddings array is 2D
-            if len(embeddings_array.shape) == 1:
-                num_chunks = len(self.chunks)
-                total_elements = embeddings_array.size
-                if num_chunks > 0 and total_elements > 0:
-                    embedding_dim = total_elements // num_chunks
-                    if embedding_dim > 0 and embedding_dim * num_chunks == total_elements:
-                        embeddings_array = embeddings_array.reshape(num_chunks, embedding_dim)
-                        logger.info(f"Reshaped embeddings array to: {embeddings_array.shape}")
-                    else:
-                        logger.error(f"Cannot reshape embeddings: {embeddings_array.shape}")
-                        raise ValueError(f"Invalid embeddings array shape")
-            
-            self.embeddings = embeddings_array.tolist()
+        embeddings_array = self._read_embeddings(path)
+        if embeddings_array is not None:
+            self.embeddings = embeddings_array
+            self._embeddings_buffer = None
             self._embeddings_array = embeddings_array
+            self._normalized_array = None
+            self._quantized = None
+            if self.storage != "float32":
+                quantized = QuantizedEmbeddings.load(path, self.storage)
+                if quantized is not None and len(quantized) == len(embeddings_array):
+                    self._quantized = quantized
+        
+        # Load lexical index; indexes built before it existed get one built from the chunks
+        if not self.bm25.load(path) or self.bm25.num_documents != len(self.chunks):
+            logger.info(f"Building BM25 index from {len(self.chunks)} loaded chunks")
+            self.bm25.clear()
+            if isinstance(self.chunks, ChunkStore):
+                self.bm25.add_documents(list(self.chunks.iter_contents()))
+            else:
+                self.bm25.add_documents([chunk.content for chunk in self.chunks])
+        
+        # Load filter index; rebuild it for indexes saved before it existed
+        if not self.filter_index.load(path) or self.filter_index.num_rows != len(self.chunks):
+            logger.info(f"Building metadata filter index from {len(self.chunks)} loaded chunks")
+            self.filter_index.clear()
+            self.filter_index.add_documents(self.chunks)
         
         logger.info(f"Loaded vector store from {path}: {len(self.chunks)} documents")
     
+    def _read_embeddings(self, path: Path) -> Optional[np.ndarray]:
+        """Read embeddings.npy as a 2D array, or None if the index has no embeddings."""
+        embeddings_file = path / "embeddings.npy"
+        if not embeddings_file.exists():
+            return None
+        
+        # Quantized modes only read exact rows for re-ranking; keep them on disk
+        embeddings_array = np.load(embeddings_file, mmap_mode="r" if self.storage != "float32" else None)
+        logger.info(f"Loaded embeddings array shape: {embeddings_array.shape}")
+        
+        # Ensure embeddings array is 2D
+        if len(embeddings_array.shape) == 1:
+            num_chunks = len(self.chunks)
+            total_elements = embeddings_array.size
+            if num_chunks > 0 and total_elements > 0:
+                embedding_dim = total_elements // num_chunks
+                if embedding_dim > 0 and embedding_dim * num_chunks == total_elements:
+                    embeddings_array = embeddings_array.reshape(num_chunks, embedding_dim)
+                    logger.info(f"Reshaped embeddings array to: {embeddings_array.shape}")
+                else:
+                    logger.error(f"Cannot reshape embeddings: {embeddings_array.shape}")
+                    raise ValueError(f"Invalid embeddings array shape")
+        return embeddings_array
+    
     def clear(self) -> None:
         """Clear all data from the store."""
-        self.chunks.clear()
-        self.embeddings.clear()
+        self._close_chunk_store()
+        self.chunks = []
+        self.embeddings = []
+        self._embeddings_buffer = None
         self._embeddings_array = None
+        self._normalized_array = None
+        self._quantized = None
+        self.bm25.clear()
+        self.filter_index.clear()
         logger.info("Cleared vector store")
+    
+    def _close_chunk_store(self) -> None:
+        """Release the memory map of a previously loaded chunk store."""
+        if isinstance(self.chunks, ChunkStore):
+            self.chunks.close()
+
+
+def _min_max_scale(values: np.ndarray) -> np.ndarray:
+    """Scale scores to [0, 1]; constant inputs map to zeros."""
+    low, high = values.min(), values.max()
+    if high - low <= 0:
+        return np.zeros_like(values)
+    return (values - low) / (high - low)
@@ -4,6 +4,7 @@ Abstract interface for vector storage and search.
 
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
+import numpy as np
 from .schemas import DocumentChunk
 
 
@@ -22,19 +23,102 @@ class VectorStore(ABC):
         pass
     
     @abstractmethod
-    def search(self, query_embedding: List[float], top_k: int = 5) -> List[DocumentChunk]:
+    def search(self, query_embedding: List[float], top_k: int = 5,
+               metadata_filter: Optional[Dict[str, Any]] = None) -> List[DocumentChunk]:
         """
         Search for similar documents using cosine similarity.
         
         Args:
             query_embedding: Query embedding vector
             top_k: Number of top results to return
+            metadata_filter: Only consider chunks matching this filter
+                (see filters.py for the expression format)
             
         Returns:
             List of most similar document chunks
         """
         pass
     
+    def search_batch(self, query_embeddings: List[List[float]], top_k: int = 5,
+                     metadata_filter: Optional[Dict[str, Any]] = None) -> List[List[DocumentChunk]]:
+        """
+        Search for several query embeddings at once.
+        
+        Implementations should override this with a single vectorized pass;
+        the default falls back to one search() call per query.
+        
+        Args:
+            query_embeddings: List of query embedding vectors
+            top_k: Number of top results to return per query
+            metadata_filter: Only consider chunks matching this filter
+            
+        Returns:
+            One list of most similar document chunks per query
+        """
+        return [self.search(query_embedding, top_k=top_k, metadata_filter=metadata_filter)
+                for query_embedding in query_embeddings]
+    
+    def hybrid_search(self, query_text: str, query_embedding: Optional[List[float]] = None,
+                      top_k: int = 5, alpha: float = 0.5,
+                      metadata_filter: Optional[Dict[str, Any]] = None) -> List[DocumentChunk]:
+        """
+        Search combining lexical and vector relevance.
+        
+        Stores without a lexical index fall back to plain vector search and
+        return no results when the query embedding is missing.
+        
+        Args:
+            query_text: Raw query text for lexical matching
+            query_embedding: Query embedding vector, or None if unavailable
+            top_k: Number of top results to return
+            alpha: Weight of the vector score (1.0 = vector only, 0.0 = lexical only)
+            metadata_filter: Only consider chunks matching this filter
+            
+        Returns:
+            List of most relevant document chunks
+        """
+        if query_embedding is None or not any(query_embedding):
+            return []
+        return self.search(query_embedding, top_k=top_k, metadata_filter=metadata_filter)
+    
+    def hybrid_search_batch(self, query_texts: List[str], query_embeddings: List[Optional[List[float]]],
+                            top_k: int = 5, alpha: float = 0.5,
+                            metadata_filter: Optional[Dict[str, Any]] = None) -> List[List[DocumentChunk]]:
+        """
+        hybrid_search for several queries at once.
+        
+        Implementations should compute the vector side in a single pass;
+        the default falls back to one hybrid_search() call per query.
+        
+        Args:
+            query_texts: Raw query texts for lexical matching
+            query_embeddings: Query embedding vectors (entries may be None)
+            top_k: Number of top results to return per query
+            alpha: Weight of the vector score (1.0 = vector only, 0.0 = lexical only)
+            metadata_filter: Only consider chunks matching this filter
+            
+        Returns:
+            One list of most relevant document chunks per query
+        """
+        return [self.hybrid_search(query_text, query_embedding, top_k=top_k, alpha=alpha,
+                                   metadata_filter=metadata_filter)
+                for query_text, query_embedding in zip(query_texts, query_embeddings)]
+    
+    def get_embeddings(self, chunks: List[DocumentChunk]) -> Optional[np.ndarray]:
+        """
+        Return the stored embeddings of the given chunks.
+        
+        Used to re-rank search results (e.g. MMR diversification). Stores
+        that cannot look embeddings up return None.
+        
+        Args:
+            chunks: Chunks previously returned by a search
+            
+        Returns:
+            (len(chunks), dim) row-normalized float32 array, or None
+        """
+        return None
+    
     @abstractmethod
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -0,0 +1,4 @@
+"""
+Load testing tools: an OpenAI-compatible mock LLM server and a load generator
+that drives full 12-week conversations against the API.
+"""
@@ -0,0 +1,325 @@
+"""
+Load generator driving realistic 12-week conversations against the API.
+
+Each virtual user creates a session, goes through onboarding on one of the
+four goal branches, then chats through weeks 1-12, polling /state, /goal and
+/topics like the frontend does. Latency is reported per endpoint and, for
+/chat, per graph node (taken from the session state before each turn).
+
+Usage (with the mock LLM from mock_llm.py serving OPENAI_BASE_URL):
+    # In-process: imports the app and accepts "Bearer <user id>" instead of
+    # Firebase tokens; MongoDB (MONGODB_URI) is still used
+    python -m mentor_ai.loadtest.load_generator --in-process --users 20
+
+    # Against a running app, one Firebase ID token per virtual user
+    python -m mentor_ai.loadtest.load_generator --base-url http://localhost:8000 --tokens-file tokens.txt
+"""
+
+import json
+import time
+import random
+import asyncio
+import argparse
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FINAL_NODE = "week12_chat"
+
+# What a user answers in each onboarding node
+ONBOARDING_MESSAGES = {
+    "collect_basic_info": "Hi, I'm Alex and I'm 32 years old.",
+    "improve_intro": "I'm an analyst and I've been in my role for three years.",
+    "improve_skills": "I'm good at analysis and writing, and I like design and running.",
+    "improve_obstacles": "I procrastinate and I rarely speak up in meetings.",
+    "change_intro": "I work in finance but I want to move into design.",
+    "change_skills": "I can analyse data and I sketch a lot in my free time.",
+    "change_obstacles": "I have no portfolio and I don't know anyone in design.",
+    "find_intro": "I studied biology and worked as a lab assistant.",
+    "find_skills": "I love nature and I listen to climate podcasts.",
+    "find_obstacles": "I lack confidence and I don't know where to start.",
+    "lost_intro": "Honestly I don't know what I want right now.",
+    "lost_skills": "Nothing at work feels meaningful to me anymore.",
+    "retrieve_reg": "Okay, sounds good.",
+    "generate_plan": "Great, let's see the plan.",
+}
+
+WEEK_MESSAGES = [
+    "I tried the exercise from last time and it went okay.",
+    "It was harder than I expected, I got distracted a lot.",
+    "I think I understand what holds me back now.",
+    "Can you give me one more idea to practise this week?",
+]
+
+
+class ConversationScript:
+    """Chooses the next user message from the node the session is in."""
+
+    def __init__(self, goal_option: str = "1", turns_per_week: int = 3, rng: Optional[random.Random] = None):
+        """
+        Args:
+            goal_option: Onboarding branch the user picks ("1" improve .. "4" lost)
+            turns_per_week: Messages per week before asking to move on
+            rng: Random source for message variety
+        """
+        self.goal_option = goal_option
+        self.turns_per_week = turns_per_week
+        self.rng = rng or random.Random()
+        self._turns_in_node: Dict[str, int] = defaultdict(int)
+
+    def next_message(self, node_id: str) -> Optional[str]:
+        """Message for the current node, or None once week 12 is done."""
+        turn = self._turns_in_node[node_id]
+        self._turns_in_node[node_id] += 1
+
+        if node_id == "classify_category":
+            return f"{self.goal_option}"
+        if node_id in ONBOARDING_MESSAGES:
+            return ONBOARDING_MESSAGES[node_id]
+        if node_id.startswith("week") and node_id.endswith("_chat"):
+            if turn < self.turns_per_week:
+                return self.rng.choice(WEEK_MESSAGES)
+            if node_id == FINAL_NODE:
+                return None
+            return "I'm ready, let's move to next week."
+        return "Could you say that again?"
+
+
+class LoadStats:
+    """Latency samples per endpoint and per graph node."""
+
+    def __init__(self):
+        self.endpoints: Dict[str, List[float]] = defaultdict(list)
+        self.nodes: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.completed_users = 0
+
+    def record(self, endpoint: str, seconds: float, ok: bool, node: Optional[str] = None) -> None:
+        self.endpoints[endpoint].append(seconds * 1000.0)
+        if node is not None:
+            self.nodes[node].append(seconds * 1000.0)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def report(self) -> Dict[str, Any]:
+        """Throughput and p50/p95/p99 latency per endpoint and per node."""
+        duration = (self.finished or time.perf_counter()) - self.started
+        total = sum(len(samples) for samples in self.endpoints.values())
+        return {
+            "duration_seconds": round(duration, 2),
+            "requests": total,
+            "throughput_rps": round(total / duration, 2) if duration > 0 else 0.0,
+            "completed_users": self.completed_users,
+            "endpoints": {name: self._summary(samples, duration, self.errors.get(name, 0))
+                          for name, samples in sorted(self.endpoints.items())},
+            "nodes": {name: self._summary(samples, duration) for name, samples in sorted(self.nodes.items())},
+        }
+
+    @staticmethod
+    def _summary(samples: List[float], duration: float, errors: int = 0) -> Dict[str, float]:
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        return {
+            "count": len(samples),
+            "errors": errors,
+            "rps": round(len(samples) / duration, 2) if duration > 0 else 0.0,
+            "p50_ms": round(float(p50), 1),
+            "p95_ms": round(float(p95), 1),
+            "p99_ms": round(float(p99), 1),
+            "max_ms": round(float(np.max(samples)), 1),
+        }
+
+
+async def _timed(client: httpx.AsyncClient, stats: LoadStats, method: str, url: str, endpoint: str,
+                 node: Optional[str] = None, **kwargs) -> httpx.Response:
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError as e:
+        stats.record(endpoint, time.perf_counter() - started, ok=False, node=node)
+        raise RuntimeError(f"{method} {url} failed: {e}") from e
+    stats.record(endpoint, time.perf_counter() - started, ok=response.status_code < 400, node=node)
+    return response
+
+
+async def run_user(client: httpx.AsyncClient, stats: LoadStats, token: str, script: ConversationScript,
+                   think_time: float = 0.0, max_turns: int = 200) -> bool:
+    """
+    Drive one user from session creation to the end of week 12.
+
+    Returns:
+        True if the conversation completed, False if it stopped on an error
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await _timed(client, stats, "POST", "/session", "POST /session", headers=headers)
+    if response.status_code >= 400:
+        logger.error(f"Session creation failed for {token[:12]}: {response.status_code} {response.text[:200]}")
+        return False
+    session_id = response.json()["session_id"]
+
+    node_id = "collect_basic_info"
+    for _ in range(max_turns):
+        message = script.next_message(node_id)
+        if message is None:
+            return True
+
+        response = await _timed(client, stats, "POST", f"/chat/{session_id}", "POST /chat/{id}", node=node_id,
+                                headers=headers, json={"message": message})
+        if response.status_code >= 400:
+            logger.error(f"Chat failed in {node_id}: {response.status_code} {response.text[:200]}")
+            return False
+
+        # The frontend refreshes the session after every reply
+        response = await _timed(client, stats, "GET", f"/state/{session_id}", "GET /state/{id}", headers=headers)
+        if response.status_code >= 400:
+            return False
+        next_node = response.json().get("state", {}).get("current_node", node_id)
+
+        if next_node != node_id and next_node.startswith("week"):
+            # Week screens show the goal and the plan
+            await _timed(client, stats, "GET", f"/goal/{session_id}", "GET /goal/{id}", headers=headers)
+            await _timed(client, stats, "GET", f"/topics/{session_id}", "GET /topics/{id}", headers=headers)
+        node_id = next_node
+
+        if think_time > 0:
+            await asyncio.sleep(script.rng.uniform(0, think_time))
+
+    logger.warning(f"Session {session_id} did not finish within {max_turns} turns (stuck in {node_id})")
+    return False
+
+
+async def run_load(client: httpx.AsyncClient, tokens: List[str], turns_per_week: int = 3,
+                   think_time: float = 0.0, ramp_up: float = 0.0, seed: int = 0) -> LoadStats:
+    """
+    Run one conversation per token concurrently.
+
+    Args:
+        client: Client bound to the app (remote URL or in-process transport)
+        tokens: Bearer token per virtual user
+        turns_per_week: Messages per week before moving on
+        think_time: Maximum random pause between a user's turns, in seconds
+        ramp_up: Seconds over which user start times are spread
+        seed: Seed for branch choice and message variety
+    """
+    stats = LoadStats()
+    rng = random.Random(seed)
+
+    async def user(index: int, token: str):
+        if ramp_up > 0:
+            await asyncio.sleep(ramp_up * index / max(1, len(tokens)))
+        script = ConversationScript(
+            goal_option=str(index % 4 + 1),
+            turns_per_week=turns_per_week,
+            rng=random.Random(rng.random()),
+        )
+        try:
+            if await run_user(client, stats, token, script, think_time=think_time):
+                stats.completed_users += 1
+        except Exception as e:
+            logger.error(f"Virtual user {index} failed: {e}")
+
+    await asyncio.gather(*(user(i, token) for i, token in enumerate(tokens)))
+    stats.finished = time.perf_counter()
+    return stats
+
+
+def in_process_app():
+    """
+    The FastAPI app with Firebase auth replaced by the bearer value as user id.
+
+    Only for load tests: any bearer value is accepted.
+    """
+    from fastapi import HTTPException, Request
+    from mentor_ai.app.main import app
+    from mentor_ai.app.endpoints import chat, session
+
+    async def load_test_user(request: Request) -> str:
+        auth_header = request.headers.get("Authorization", "")
+        if not auth_header.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail="Missing auth token")
+        return auth_header.split(" ", 1)[1]
+
+    for module in (chat, session):
+        app.dependency_overrides[module.get_current_user] = load_test_user
+    return app
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a report as two fixed-width tables."""
+    lines = [
+        f"Duration {report['duration_seconds']}s, {report['requests']} requests, "
+        f"{report['throughput_rps']} req/s, {report['completed_users']} users completed"
+    ]
+    for title in ("endpoints", "nodes"):
+        rows = report[title]
+        if not rows:
+            continue
+        width = max(len(name) for name in rows)
+        lines.append("")
+        lines.append(f"{title[:-1]:<{width}}  count  errors  rps      p50_ms   p95_ms   p99_ms   max_ms")
+        for name, row in rows.items():
+            lines.append(
+                f"{name:<{width}}  {row['count']:<5}  {row['errors']:<6}  {row['rps']:<7}  "
+                f"{row['p50_ms']:<7}  {row['p95_ms']:<7}  {row['p99_ms']:<7}  {row['max_ms']}"
+            )
+    return "\n".join(lines)
+
+
+async def _main(args) -> Dict[str, Any]:
+    if args.in_process:
+        app = in_process_app()
+        tokens = [f"loadtest-{args.seed}-{i}" for i in range(args.users)]
+        transport = httpx.ASGITransport(app=app)
+        await app.router.startup()
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+                stats = await run_load(client, tokens, args.turns_per_week, args.think_time, args.ramp_up, args.seed)
+        finally:
+            await app.router.shutdown()
+    else:
+        with open(args.tokens_file) as f:
+            tokens = [line.strip() for line in f if line.strip()][:args.users]
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+            stats = await run_load(client, tokens, args.turns_per_week, args.think_time, args.ramp_up, args.seed)
+
+    report = stats.report()
+    if args.mock_url:
+        async with httpx.AsyncClient(base_url=args.mock_url, timeout=args.timeout) as client:
+            report["mock_llm_nodes"] = (await client.get("/mock/stats")).json()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive 12-week conversations against the Mentor AI API")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--in-process", action="store_true", help="Run the app in this process with test auth")
+    target.add_argument("--base-url", help="URL of a running app")
+    parser.add_argument("--tokens-file", help="Firebase ID tokens, one per line (with --base-url)")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--turns-per-week", type=int, default=3)
+    parser.add_argument("--think-time", type=float, default=0.0, help="Max pause between turns (seconds)")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Spread user start over this many seconds")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Request timeout (seconds)")
+    parser.add_argument("--mock-url", help="Mock LLM base URL; adds its per-node stats to the report")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+    if args.base_url and not args.tokens_file:
+        parser.error("--base-url needs --tokens-file")
+
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(_main(args))
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
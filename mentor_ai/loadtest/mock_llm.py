@@ -0,0 +1,382 @@
+"""
+OpenAI-compatible mock LLM server for load testing.
+
+Serves /v1/chat/completions (plain and streamed), /v1/embeddings and
+/v1/models with simulated latency. Chat prompts are matched to their
+root_graph node through the "System: ..." line generate_llm_prompt puts
+first, and answered with canned JSON that moves the conversation forward, so
+a full onboarding + 12-week conversation runs without a real model.
+
+Usage:
+    python -m mentor_ai.loadtest.mock_llm --port 8001 --ttft-ms 400 --token-ms 15
+    OPENAI_BASE_URL=http://localhost:8001/v1 OPENAI_API_KEY=mock uvicorn mentor_ai.app.main:app
+"""
+
+import re
+import json
+import time
+import uuid
+import math
+import random
+import asyncio
+import argparse
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from mentor_ai.cursor.core.root_graph import root_graph
+from mentor_ai.cursor.modules.retrieval.chunking import count_tokens
+from mentor_ai.cursor.modules.retrieval.embeddings import HashingEmbeddingProvider, OPENAI_DIMENSIONS
+
+logger = logging.getLogger(__name__)
+
+# Node name used for prompts that do not come from a graph node (weekly/running summaries)
+SUMMARY_NODE = "summary"
+
+# Keyed by the first line of each system prompt (generate_plan's spans several lines)
+NODE_BY_SYSTEM_PROMPT = {
+    node.system_prompt.split("\n", 1)[0]: node_id for node_id, node in root_graph.items() if node.executor is None
+}
+
+# classify_category options as the user picks them in the onboarding question (1-4)
+GOAL_TYPES = {
+    "1": ("Improve in the current job: discover and develop your strongest qualities in your existing role, and grow where you already are.", "improve_intro"),
+    "2": ("Change the job: transition to a new role or field that better matches your talents and natural abilities.", "change_intro"),
+    "3": ("Find strengths without a job: explore your core strengths and interests first to choose a meaningful direction.", "find_intro"),
+    "4": ("Feel lost: clarify life and professional goals step by step and define a path forward.", "lost_intro"),
+}
+
+PLAN_TOPICS = [
+    "Clarifying your core values", "Mapping your strengths", "Setting a focused goal",
+    "Building a weekly routine", "Asking for feedback", "Managing energy, not time",
+    "Handling setbacks", "Growing your network", "Communicating with impact",
+    "Deep work habits", "Reviewing progress honestly", "Planning the next quarter",
+]
+
+_USER_MESSAGE_RE = re.compile(r'User message: "(.*?)"', re.DOTALL)
+_WEEK_RE = re.compile(r"^week(\d+)_chat$")
+_TOKEN_PIECE_RE = re.compile(r"\S+\s*|\s+")
+
+
+def detect_node(prompt: str) -> str:
+    """Map a prompt to the root_graph node that produced it."""
+    first_line = prompt.lstrip().split("\n", 1)[0]
+    if first_line.startswith("System: "):
+        return NODE_BY_SYSTEM_PROMPT.get(first_line[len("System: "):], "unknown")
+    return SUMMARY_NODE
+
+
+def canned_response(node_id: str, prompt: str) -> str:
+    """
+    Deterministic response content for a node's prompt.
+
+    Graph nodes get the JSON their StateManager branch expects with "next"
+    set to the following node; summary prompts get plain text.
+    """
+    match = _USER_MESSAGE_RE.search(prompt)
+    user_message = match.group(1) if match else ""
+
+    if node_id == SUMMARY_NODE:
+        return "The user reflected on this week's topic, named one concrete step and committed to trying it."
+
+    week = _WEEK_RE.match(node_id)
+    if week:
+        number = int(week.group(1))
+        if "wants to finish Week" in prompt and number < 12:
+            return _json({
+                "reply": f"Great work on Week {number}! Let's move to Week {number + 1}.",
+                "history": [],
+                "next": f"week{number + 1}_chat",
+            })
+        return _json({
+            "reply": "Thanks for sharing. What is one small step you can take on this week's topic before we talk again?",
+            "history": [],
+            "next": node_id,
+        })
+
+    if node_id == "classify_category":
+        option = next((digit for digit in user_message if digit in GOAL_TYPES), "1")
+        goal_type, next_node = GOAL_TYPES[option]
+        return _json({"reply": "Thanks, that helps. Tell me a bit more about your situation.",
+                      "goal_type": goal_type, "next": next_node})
+
+    responses = {
+        "collect_basic_info": {
+            "reply": "Nice to meet you, Alex! Which of these options suits you better: 1) improve in your role, 2) change career, 3) find your path, 4) feeling lost?",
+            "user_name": "Alex", "user_age": 32, "next": "classify_category",
+        },
+        "improve_intro": {"reply": "What does your current role look like day to day?",
+                          "job_circumstances": {"role": "analyst", "years": 3}, "next": "improve_skills"},
+        "improve_skills": {"reply": "What do you enjoy most outside of work?",
+                           "skills": ["analysis", "writing"], "interests": ["design"],
+                           "activities": ["running"], "exciting_topics": ["product"], "next": "improve_obstacles"},
+        "improve_obstacles": {"reply": "Let's turn those obstacles into goals.",
+                              "goals": ["Speak up in meetings", "Lead a project", "Build a portfolio"],
+                              "negative_qualities": ["procrastination"], "next": "retrieve_reg"},
+        "change_intro": {"reply": "What makes you want to change fields?",
+                         "career_change_circumstances": {"current_field": "finance", "target_field": "design"},
+                         "next": "change_skills"},
+        "change_skills": {"reply": "Which of your skills would carry over?",
+                          "skills": ["analysis"], "interests": ["design"], "activities": ["sketching"],
+                          "exciting_topics": ["ux"], "next": "change_obstacles"},
+        "change_obstacles": {"reply": "Let's turn those obstacles into goals.",
+                             "goals": ["Finish a UX course", "Ship two case studies", "Find a mentor"],
+                             "next": "retrieve_reg"},
+        "find_intro": {"reply": "Tell me about your background.",
+                       "background_circumstances": {"education": "biology", "last_role": "lab assistant"},
+                       "next": "find_skills"},
+        "find_skills": {"reply": "What could you talk about for hours?",
+                        "passions": ["nature"], "exciting_topics": ["climate"], "content_consumption": ["podcasts"],
+                        "next": "find_obstacles"},
+        "find_obstacles": {"reply": "Let's turn those obstacles into goals.",
+                           "goals": ["Volunteer weekly", "Talk to three professionals", "Pick a direction"],
+                           "next": "retrieve_reg"},
+        "lost_intro": {"reply": "It's okay not to know yet. What feels missing right now?", "next": "lost_skills"},
+        "lost_skills": {"reply": "That makes sense. Let's build from there.",
+                        "lost_skills": "Unsure which work feels meaningful", "next": "retrieve_reg"},
+        "generate_plan": {
+            "reply": "Here is your 12-week plan. You can now close this chat; 'My Coach' is available.",
+            "plan": {f"week_{i + 1}_topic": topic for i, topic in enumerate(PLAN_TOPICS)},
+            "onboarding_chat_summary": "Alex wants to grow at work, enjoys analysis and design, and struggles with procrastination.",
+            "next": "week1_chat",
+        },
+    }
+    if node_id in responses:
+        return _json(responses[node_id])
+    return _json({"reply": "Could you tell me a bit more?", "next": node_id})
+
+
+def _json(data: Dict[str, Any]) -> str:
+    return json.dumps(data, ensure_ascii=False)
+
+
+@dataclass
+class LatencyModel:
+    """
+    Simulated model latency: time to first token plus a fixed time per output token.
+
+    Time to first token is lognormal around its median (sigma 0 = constant);
+    per-node medians override the default, e.g. {"generate_plan": 1500}.
+    """
+    ttft_ms: float = 400.0
+    ttft_sigma: float = 0.4
+    token_ms: float = 15.0
+    node_ttft_ms: Dict[str, float] = field(default_factory=dict)
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def time_to_first_token(self, node_id: str) -> float:
+        """Sampled time to first token in seconds."""
+        median = self.node_ttft_ms.get(node_id, self.ttft_ms)
+        if median <= 0:
+            return 0.0
+        with self._lock:
+            sample = self._rng.lognormvariate(math.log(median), self.ttft_sigma) if self.ttft_sigma > 0 else median
+        return sample / 1000.0
+
+
+class MockLLM:
+    """Produces node-aware completions and records per-node statistics."""
+
+    def __init__(self, latency: Optional[LatencyModel] = None):
+        self.latency = latency or LatencyModel()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, List[float]]] = {}
+
+    def complete(self, messages: List[Dict[str, Any]], max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Build a completion for an OpenAI-style message list.
+
+        Returns:
+            Dict with node, pieces (output tokens), finish_reason, usage and sampled ttft
+        """
+        prompt = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        node_id = detect_node(prompt)
+        pieces = _TOKEN_PIECE_RE.findall(canned_response(node_id, prompt))
+
+        finish_reason = "stop"
+        if max_tokens is not None and len(pieces) > max_tokens:
+            # Like the real API: cut the output, which usually breaks the JSON
+            pieces, finish_reason = pieces[:max_tokens], "length"
+
+        prompt_tokens = sum(count_tokens(m.get("content") or "") for m in messages)
+        return {
+            "node": node_id,
+            "pieces": pieces,
+            "finish_reason": finish_reason,
+            "ttft": self.latency.time_to_first_token(node_id),
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(pieces),
+                "total_tokens": prompt_tokens + len(pieces),
+            },
+        }
+
+    def total_seconds(self, completion: Dict[str, Any]) -> float:
+        return completion["ttft"] + len(completion["pieces"]) * self.latency.token_ms / 1000.0
+
+    def record(self, completion: Dict[str, Any], seconds: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(completion["node"], {"latency_ms": [], "prompt_tokens": [], "completion_tokens": []})
+            stats["latency_ms"].append(seconds * 1000.0)
+            stats["prompt_tokens"].append(completion["usage"]["prompt_tokens"])
+            stats["completion_tokens"].append(completion["usage"]["completion_tokens"])
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-node call count, latency percentiles and mean token counts."""
+        with self._lock:
+            snapshot = {node: {key: list(values) for key, values in stats.items()} for node, stats in self._stats.items()}
+        report = {}
+        for node, stats in sorted(snapshot.items()):
+            p50, p95, p99 = np.percentile(stats["latency_ms"], [50, 95, 99])
+            report[node] = {
+                "calls": len(stats["latency_ms"]),
+                "p50_ms": round(float(p50), 1),
+                "p95_ms": round(float(p95), 1),
+                "p99_ms": round(float(p99), 1),
+                "mean_prompt_tokens": round(float(np.mean(stats["prompt_tokens"])), 1),
+                "mean_completion_tokens": round(float(np.mean(stats["completion_tokens"])), 1),
+            }
+        return report
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+
+
+def create_app(mock: Optional[MockLLM] = None) -> FastAPI:
+    """FastAPI app exposing the OpenAI-compatible endpoints of a MockLLM."""
+    mock = mock or MockLLM()
+    app = FastAPI(title="Mock LLM", description="OpenAI-compatible stand-in for load tests")
+    app.state.mock = mock
+    embedders: Dict[int, HashingEmbeddingProvider] = {}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        completion = mock.complete(body.get("messages", []), body.get("max_tokens"))
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model", "mock")
+
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream(mock, completion, completion_id, created, model),
+                media_type="text/event-stream",
+            )
+
+        started = time.perf_counter()
+        await asyncio.sleep(mock.total_seconds(completion))
+        mock.record(completion, time.perf_counter() - started)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(completion["pieces"])},
+                "finish_reason": completion["finish_reason"],
+            }],
+            "usage": completion["usage"],
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        texts = body.get("input", [])
+        texts = [texts] if isinstance(texts, str) else texts
+        model = body.get("model", "text-embedding-3-small")
+        dimension = int(body.get("dimensions") or OPENAI_DIMENSIONS.get(model, 1536))
+        embedder = embedders.setdefault(dimension, HashingEmbeddingProvider(dimension=dimension))
+        vectors = embedder.embed(texts)
+        tokens = sum(count_tokens(text) for text in texts)
+        return {
+            "object": "list",
+            "data": [{"object": "embedding", "index": i, "embedding": vector} for i, vector in enumerate(vectors)],
+            "model": model,
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "gpt-4", "object": "model", "created": 0, "owned_by": "mock"}]}
+
+    @app.get("/mock/stats")
+    async def stats():
+        return JSONResponse(mock.stats())
+
+    @app.post("/mock/reset")
+    async def reset():
+        mock.reset()
+        return {"status": "reset"}
+
+    return app
+
+
+async def _stream(mock: MockLLM, completion: Dict[str, Any], completion_id: str, created: int, model: str):
+    """Server-sent events in the OpenAI chat.completion.chunk format."""
+    started = time.perf_counter()
+
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    await asyncio.sleep(completion["ttft"])
+    yield chunk({"role": "assistant", "content": ""})
+    for piece in completion["pieces"]:
+        yield chunk({"content": piece})
+        await asyncio.sleep(mock.latency.token_ms / 1000.0)
+    yield chunk({}, completion["finish_reason"])
+    yield "data: [DONE]\n\n"
+    mock.record(completion, time.perf_counter() - started)
+
+
+def _parse_node_latency(values: List[str]) -> Dict[str, float]:
+    overrides = {}
+    for value in values:
+        node_id, _, milliseconds = value.partition("=")
+        if node_id not in root_graph or not milliseconds:
+            raise argparse.ArgumentTypeError(f"Expected <node>=<ms> with a root_graph node, got {value!r}")
+        overrides[node_id] = float(milliseconds)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM server for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--ttft-ms", type=float, default=400.0, help="Median time to first token")
+    parser.add_argument("--ttft-sigma", type=float, default=0.4, help="Lognormal sigma of the time to first token (0 = fixed)")
+    parser.add_argument("--token-ms", type=float, default=15.0, help="Time per output token")
+    parser.add_argument("--node-ttft", nargs="*", default=[], metavar="NODE=MS", help="Per-node median time to first token")
+    parser.add_argument("--seed", type=int, help="Seed for the latency samples")
+    args = parser.parse_args()
+
+    import uvicorn
+    latency = LatencyModel(
+        ttft_ms=args.ttft_ms,
+        ttft_sigma=args.ttft_sigma,
+        token_ms=args.token_ms,
+        node_ttft_ms=_parse_node_latency(args.node_ttft),
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(MockLLM(latency)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import time
+import asyncio
+import threading
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from mentor_ai.app.main import app
+from mentor_ai.cursor.core import metrics
+from mentor_ai.cursor.core.admission import (
+    AdmissionController, AdmissionRejected, Priority, TokenBucket, admission_context, current_admission_context
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.registry.clear()
+    yield
+    metrics.registry.clear()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait_until_queued(controller, count):
+    for _ in range(500):
+        if sum(controller.stats()["queued"].values()) == count:
+            return
+        time.sleep(0.002)
+    raise AssertionError("requests were not queued")
+
+
+def run_queued(controller, requests):
+    """Queue (label, user, priority) requests behind a held slot and return the order they are admitted in."""
+    order = []
+    holder = controller.acquire(1, Priority.INTERACTIVE, "holder")
+    threads = []
+    for label, user_id, priority in requests:
+        def work(label=label, user_id=user_id, priority=priority):
+            with controller.admit(1, priority=priority, user_id=user_id, deadline=30):
+                order.append(label)
+        thread = threading.Thread(target=work)
+        thread.start()
+        threads.append(thread)
+        wait_until_queued(controller, len(threads))
+    controller.release(holder)
+    for thread in threads:
+        thread.join(5)
+    return order
+
+
+class TestTokenBucket:
+    """Test rate-limit buckets"""
+
+    def test_refill_and_clamp(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock=clock)
+        assert bucket.try_consume(60)
+        assert not bucket.try_consume(1)
+        assert bucket.wait_time(30) == pytest.approx(30.0)
+        clock.now = 30
+        assert bucket.try_consume(30)
+        assert bucket.wait_time(1000) == pytest.approx(60.0)  # Clamped to the capacity
+
+    def test_unlimited_until_provider_reports_limits(self):
+        controller = AdmissionController(clock=FakeClock())
+        assert not controller.requests.limited
+        controller.update_from_headers({
+            "x-ratelimit-limit-requests": "500", "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-limit-tokens": "40000", "x-ratelimit-remaining-tokens": "39000",
+        })
+        assert controller.requests.capacity == 500
+        assert controller.requests.wait_time(1) == pytest.approx(0.12)
+        assert controller.tokens.level == 39000
+
+
+class TestScheduling:
+    """Test priority and per-user fair queueing"""
+
+    def test_round_robin_between_users(self):
+        controller = AdmissionController(max_concurrency=1)
+        order = run_queued(controller, [
+            ("a1", "alice", Priority.INTERACTIVE), ("a2", "alice", Priority.INTERACTIVE),
+            ("a3", "alice", Priority.INTERACTIVE), ("b1", "bob", Priority.INTERACTIVE),
+        ])
+        assert order == ["a1", "b1", "a2", "a3"]
+
+    def test_interactive_before_background_and_test(self):
+        controller = AdmissionController(max_concurrency=1)
+        order = run_queued(controller, [
+            ("test", "script", Priority.TEST), ("summary", "alice", Priority.BACKGROUND),
+            ("chat", "bob", Priority.INTERACTIVE),
+        ])
+        assert order == ["chat", "summary", "test"]
+        assert metrics.LLM_ADMISSION_WAIT.count(priority="test") == 1
+
+    def test_context_sets_user_and_priority(self):
+        assert current_admission_context().priority == Priority.TEST
+        with admission_context("alice"):
+            assert current_admission_context().user_id == "alice"
+            assert current_admission_context().priority == Priority.INTERACTIVE
+        assert current_admission_context().user_id == "anonymous"
+
+
+class TestRejection:
+    """Test load shedding when the queue wait exceeds the deadline"""
+
+    def test_rejected_when_estimated_wait_too_long(self):
+        controller = AdmissionController(max_concurrency=1)
+        holder = controller.acquire(1, user_id="holder")
+        with pytest.raises(AdmissionRejected) as error:
+            controller.acquire(1, Priority.INTERACTIVE, "alice", deadline=0.5)
+        assert error.value.retry_after == pytest.approx(2.0)
+        assert metrics.LLM_ADMISSION_REJECTIONS.value(priority="interactive", reason="queue_full") == 1
+        assert controller.stats()["queued"]["interactive"] == 0
+        controller.release(holder)
+
+    def test_rejected_at_deadline(self):
+        controller = AdmissionController(max_concurrency=1)
+        controller._avg_request_seconds = 0.01
+        holder = controller.acquire(1, user_id="holder")
+        with pytest.raises(AdmissionRejected):
+            controller.acquire(1, Priority.INTERACTIVE, "alice", deadline=0.1)
+        assert metrics.LLM_ADMISSION_REJECTIONS.value(priority="interactive", reason="deadline") == 1
+        controller.release(holder)
+
+    def test_rate_limit_wait_counts_toward_deadline(self):
+        clock = FakeClock()
+        controller = AdmissionController(requests_per_minute=60, clock=clock)
+        controller.requests.level = 0
+        with pytest.raises(AdmissionRejected) as error:
+            controller.acquire(1, deadline=0.5)
+        assert error.value.retry_after == pytest.approx(1.0)
+
+    def test_disabled(self):
+        controller = AdmissionController(max_concurrency=1, enabled=False)
+        with controller.admit(1) as first, controller.admit(1) as second:
+            assert first is None and second is None
+
+
+class TestChatEndpoint:
+    """Test the 429 response and the context of chat turns"""
+
+    @patch('mentor_ai.app.endpoints.chat.auth.verify_id_token')
+    @patch('mentor_ai.app.storage.mongodb.mongodb_manager.get_session', new_callable=AsyncMock)
+    @patch('mentor_ai.app.storage.mongodb.mongodb_manager.update_session', new_callable=AsyncMock)
+    @patch('mentor_ai.cursor.core.graph_processor.GraphProcessor.process_node')
+    def test_chat_turn_is_interactive_and_429_on_rejection(self, mock_process_node, mock_update_session,
+                                                           mock_get_session, mock_verify_token):
+        mock_verify_token.return_value = {"uid": "test_user"}
+        mock_get_session.return_value = {"session_id": "s1", "user_id": "test_user", "history": []}
+        contexts = []
+
+        def process_node(**kwargs):
+            contexts.append(current_admission_context())
+            return "Hello!", {"session_id": "s1", "history": []}, "classify_category"
+
+        mock_process_node.side_effect = process_node
+        client = TestClient(app)
+        response = client.post("/chat/s1", json={"message": "Hi"}, headers={"Authorization": "Bearer token"})
+        assert response.status_code == 200
+        assert contexts[0].user_id == "test_user" and contexts[0].priority == Priority.INTERACTIVE
+
+        mock_process_node.side_effect = AdmissionRejected("LLM capacity exhausted", retry_after=4.2)
+        response = client.post("/chat/s1", json={"message": "Hi again"}, headers={"Authorization": "Bearer token"})
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "5"
+
+    @patch('mentor_ai.cursor.core.graph_processor.GraphProcessor.process_node')
+    def test_rag_test_endpoints_wait_off_the_event_loop(self, mock_process_node):
+        loops = []
+
+        def process_node(*args, **kwargs):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return "", {"retrieved_chunks": [], "plan": {}}, "generate_plan"
+
+        mock_process_node.side_effect = process_node
+        response = TestClient(app).post("/api/rag/test/chat")
+        assert response.status_code == 200 and response.json()["success"]
+        assert loops == [None, None]  # Ran in worker threads
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from mentor_ai.cursor.modules.retrieval.benchmark import (
+    exact_neighbours, format_results, make_corpus, recall_at_k, run_benchmark
+)
+
+
+class TestRetrievalBenchmark:
+    """Test the offline retrieval benchmark"""
+
+    def test_corpus_is_deterministic(self):
+        first = make_corpus(50, 8, num_queries=5, seed=3)
+        second = make_corpus(50, 8, num_queries=5, seed=3)
+        np.testing.assert_array_equal(first.embeddings, second.embeddings)
+        np.testing.assert_array_equal(first.queries, second.queries)
+        assert [c.content for c in first.chunks] == [c.content for c in second.chunks]
+
+    def test_recall_at_k(self):
+        truth = np.array([[0, 1], [2, 3]])
+        assert recall_at_k([[0, 1], [3, 9]], truth) == 0.75
+
+    def test_exact_store_has_full_recall(self):
+        results = run_benchmark(sizes=[120], dim=16, stores=["exact", "int8"], top_k=5, num_queries=10)
+
+        assert [r.store for r in results] == ["exact", "int8"]
+        exact = results[0]
+        assert exact.recall_at_k == 1.0
+        assert exact.num_docs == 120
+        assert exact.p50_ms <= exact.p95_ms <= exact.p99_ms
+        assert exact.index_mb > 0
+        assert "recall_at_k" in format_results(results)
+
+    def test_exact_neighbours_shape(self):
+        corpus = make_corpus(30, 8, num_queries=4)
+        assert exact_neighbours(corpus, 3).shape == (4, 3)
+
+    def test_unknown_store(self):
+        with pytest.raises(ValueError):
+            run_benchmark(sizes=[10], dim=4, stores=["faiss"])
@@ -0,0 +1,110 @@
+import pytest
+from unittest.mock import patch
+from mentor_ai.cursor.modules.retrieval.bm25 import BM25Index, tokenize
+from mentor_ai.cursor.modules.retrieval.simple_store import SimpleVectorStore
+from mentor_ai.cursor.modules.retrieval.retriever import RegRetriever
+from mentor_ai.cursor.modules.retrieval.schemas import DocumentChunk
+
+TEXTS = [
+    "Setting clear goals helps the team stay focused on outcomes.",
+    "Giving feedback with empathy builds trust between managers and creatives.",
+    "Procrastination often comes from perfectionism and fear of failure.",
+    "Active listening and powerful questions are core coaching skills.",
+]
+
+
+def make_store():
+    store = SimpleVectorStore()
+    chunks = [
+        DocumentChunk(id=f"doc_{i}", content=text, title=f"Section {i}", source="handbook.pdf",
+                      chunk_index=i, start_char=0, end_char=len(text))
+        for i, text in enumerate(TEXTS)
+    ]
+    embeddings = [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]]
+    store.add_documents(chunks, embeddings)
+    return store
+
+
+class TestBM25Index:
+    """Test lexical BM25 index"""
+
+    def test_tokenize_drops_stopwords(self):
+        assert tokenize("The Goals of a team") == ["goals", "team"]
+
+    def test_search_ranks_matching_document_first(self):
+        index = BM25Index()
+        index.add_documents(TEXTS)
+
+        indices, scores = index.search("fear of failure and procrastination", top_k=2)
+
+        assert indices[0] == 2
+        assert scores[0] > 0
+
+    def test_search_no_match(self):
+        index = BM25Index()
+        index.add_documents(TEXTS)
+        indices, _ = index.search("quantum chromodynamics")
+        assert len(indices) == 0
+
+    def test_save_load_roundtrip_and_append(self, tmp_path):
+        index = BM25Index()
+        index.add_documents(TEXTS)
+        index.save(str(tmp_path))
+
+        loaded = BM25Index()
+        assert loaded.load(str(tmp_path)) is True
+        assert loaded.num_documents == len(TEXTS)
+        assert list(loaded.search("feedback empathy")[0]) == list(index.search("feedback empathy")[0])
+
+        loaded.add_documents(["Empathy and feedback for remote teams."])
+        assert loaded.num_documents == len(TEXTS) + 1
+        assert 4 in loaded.search("remote teams")[0]
+
+    def test_load_missing_file(self, tmp_path):
+        assert BM25Index().load(str(tmp_path)) is False
+
+
+class TestHybridSearch:
+    """Test hybrid and degraded lexical search in SimpleVectorStore"""
+
+    def test_zero_embedding_degrades_to_lexical(self):
+        store = make_store()
+        results = store.hybrid_search("active listening questions", [0.0] * 4, top_k=2)
+        assert results[0].id == "doc_3"
+        assert results[0].metadata["bm25_score"] > 0
+
+    def test_hybrid_combines_scores(self):
+        store = make_store()
+        # Vector points at doc_0, text matches doc_2; full lexical weight picks doc_2
+        assert store.hybrid_search("procrastination perfectionism", [1.0, 0, 0, 0], top_k=1, alpha=0.0)[0].id == "doc_2"
+        assert store.hybrid_search("procrastination perfectionism", [1.0, 0, 0, 0], top_k=1, alpha=1.0)[0].id == "doc_0"
+
+    def test_save_load_persists_bm25(self, tmp_path):
+        store = make_store()
+        store.save(str(tmp_path))
+        assert (tmp_path / "bm25.npz").exists()
+
+        loaded = SimpleVectorStore()
+        loaded.load(str(tmp_path))
+        assert loaded.lexical_search("feedback empathy", top_k=1)[0].id == "doc_1"
+
+    def test_load_builds_bm25_for_old_index(self, tmp_path):
+        store = make_store()
+        store.save(str(tmp_path))
+        (tmp_path / "bm25.npz").unlink()
+
+        loaded = SimpleVectorStore()
+        loaded.load(str(tmp_path))
+        assert loaded.get_stats()["lexical_documents"] == len(TEXTS)
+
+
+class TestRetrieverDegradedMode:
+    """Test retriever falls back to lexical search without embeddings"""
+
+    def test_retrieve_without_api_key_uses_lexical(self):
+        retriever = RegRetriever(vector_store=make_store())
+        with patch.dict('os.environ', {'OPENAI_API_KEY': '', 'RETRIEVAL_MODE': 'hybrid'}), \
+                patch('dotenv.load_dotenv'):
+            result = retriever.retrieve({"goals": ["overcome procrastination and perfectionism"]})
+
+        assert result.chunks[0].id == "doc_2"
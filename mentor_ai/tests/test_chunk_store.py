@@ -0,0 +1,114 @@
+import json
+import pytest
+from mentor_ai.cursor.modules.retrieval.chunk_store import ChunkStore, write_chunk_store, chunk_store_exists
+from mentor_ai.cursor.modules.retrieval.simple_store import SimpleVectorStore
+from mentor_ai.cursor.modules.retrieval.schemas import DocumentChunk
+
+
+def make_chunks():
+    metadata = {"title": "Handbook", "tags": ["coaching"], "similarity_score": 0.9}
+    return [
+        DocumentChunk(id="handbook.pdf_0", content="Coaching is goal-focused.", title="Handbook",
+                      source="handbook.pdf", chunk_index=0, start_char=0, end_char=25, metadata=metadata),
+        DocumentChunk(id="handbook.pdf_1", content="Émpathy — listening first.", title="Handbook",
+                      source="handbook.pdf", chunk_index=1, start_char=20, end_char=47, metadata=metadata),
+        DocumentChunk(id="notes.txt_0", content="Feedback loops.", title="Notes",
+                      source="notes.txt", chunk_index=0, start_char=0, end_char=15),
+    ]
+
+
+class TestChunkStore:
+    """Test binary chunk storage"""
+
+    def test_roundtrip(self, tmp_path):
+        chunks = make_chunks()
+        write_chunk_store(tmp_path, chunks)
+        assert chunk_store_exists(tmp_path)
+
+        store = ChunkStore(tmp_path)
+        assert len(store) == 3
+        for original, loaded in zip(chunks, store):
+            assert loaded.id == original.id
+            assert loaded.content == original.content
+            assert loaded.title == original.title
+            assert loaded.source == original.source
+            assert (loaded.start_char, loaded.end_char) == (original.start_char, original.end_char)
+        assert store[-1].id == "notes.txt_0"
+        store.close()
+
+    def test_scores_are_not_persisted(self, tmp_path):
+        write_chunk_store(tmp_path, make_chunks())
+        store = ChunkStore(tmp_path)
+        assert store[0].metadata == {"title": "Handbook", "tags": ["coaching"]}
+        store.close()
+
+    def test_string_table_is_deduplicated(self, tmp_path):
+        write_chunk_store(tmp_path, make_chunks())
+        strings = json.loads((tmp_path / "chunks_strings.json").read_text(encoding="utf-8"))
+        assert strings.count("Handbook") == 1
+        assert strings.count("handbook.pdf") == 1
+
+    def test_each_access_returns_fresh_chunk(self, tmp_path):
+        write_chunk_store(tmp_path, make_chunks())
+        store = ChunkStore(tmp_path)
+        store[0].metadata["similarity_score"] = 1.0
+        assert "similarity_score" not in store[0].metadata
+        store.close()
+
+    def test_index_out_of_range(self, tmp_path):
+        write_chunk_store(tmp_path, make_chunks())
+        store = ChunkStore(tmp_path)
+        with pytest.raises(IndexError):
+            store[3]
+        store.close()
+
+    def test_empty_store(self, tmp_path):
+        write_chunk_store(tmp_path, [])
+        store = ChunkStore(tmp_path)
+        assert len(store) == 0
+        store.close()
+
+
+class TestSimpleVectorStorePersistence:
+    """Test SimpleVectorStore save/load with the binary chunk store"""
+
+    def test_save_load_and_search(self, tmp_path):
+        store = SimpleVectorStore()
+        store.add_documents(make_chunks(), [[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]])
+        store.save(str(tmp_path))
+        assert not (tmp_path / "chunks.json").exists()
+
+        loaded = SimpleVectorStore()
+        loaded.load(str(tmp_path))
+        results = loaded.search([0.0, 1.0], top_k=1)
+        assert results[0].id == "handbook.pdf_1"
+
+        # Appending after load still works
+        loaded.add_documents(make_chunks()[:1], [[1.0, 0.0]])
+        assert len(loaded.chunks) == 4
+
+    def test_batches_append_into_grown_matrix(self):
+        store = SimpleVectorStore()
+        chunks = make_chunks()
+        for chunk, embedding in zip(chunks, [[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]]):
+            store.add_documents([chunk], [embedding])
+        buffer = store._embeddings_buffer
+        assert store.embeddings.shape == (3, 2)
+        assert store.embeddings[2].tolist() == pytest.approx([0.7, 0.7])
+        assert store.search([0.0, 1.0], top_k=1)[0].id == "handbook.pdf_1"
+
+        # Fits in the grown buffer: no new matrix
+        store.add_documents(make_chunks()[:1], [[1.0, 0.0]])
+        assert store._embeddings_buffer is buffer
+        assert store.get_stats()["total_embeddings"] == 4
+        with pytest.raises(ValueError, match="dimension"):
+            store.add_documents(make_chunks()[:1], [[1.0, 0.0, 0.0]])
+
+    def test_load_legacy_json(self, tmp_path):
+        chunks = make_chunks()
+        with open(tmp_path / "chunks.json", "w", encoding="utf-8") as f:
+            json.dump([chunk.model_dump(mode="json") for chunk in chunks], f)
+
+        loaded = SimpleVectorStore()
+        loaded.load(str(tmp_path))
+        assert [chunk.id for chunk in loaded.chunks] == [chunk.id for chunk in chunks]
@@ -0,0 +1,94 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from mentor_ai.cursor.modules.retrieval.chunking import SentenceChunker, iter_sentences
+from mentor_ai.cursor.modules.retrieval.ingest import DocumentIngester
+
+TEXT = (
+    "Set a goal. Why? Because focus matters!  Coaching helps people grow, "
+    "and feedback keeps them on track.\n\nA new paragraph starts here. Ok."
+)
+
+
+def stream(text, size=7):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+
+class TestIterSentences:
+    """Test streaming sentence splitting"""
+
+    def test_keeps_short_sentences_and_punctuation(self):
+        sentences = [span.text.strip() for span in iter_sentences([TEXT])]
+        assert sentences[:3] == ["Set a goal.", "Why?", "Because focus matters!"]
+        assert sentences[-1] == "Ok."
+
+    def test_offsets_are_exact_across_segments(self):
+        spans = list(iter_sentences(stream(TEXT)))
+        assert [span.text for span in spans] == [span.text for span in iter_sentences([TEXT])]
+        assert "".join(span.text for span in spans) == TEXT
+        for span in spans:
+            assert TEXT[span.start:span.end] == span.text
+
+    def test_force_splits_text_without_sentence_end(self):
+        text = "word " * 100
+        spans = list(iter_sentences(stream(text, 13), max_sentence_chars=50))
+        assert max(len(span.text) for span in spans) <= 50
+        assert "".join(span.text for span in spans) == text
+
+
+class TestSentenceChunker:
+    """Test sentence-aware chunking"""
+
+    @pytest.mark.parametrize("chunk_size", [20, 40, 80])
+    def test_chunks_respect_size_and_offsets(self, chunk_size):
+        chunks = list(SentenceChunker(chunk_size=chunk_size).chunk(stream(TEXT)))
+        assert chunks
+        for chunk in chunks:
+            assert TEXT[chunk.start:chunk.end] == chunk.text
+            assert len(chunk.text) <= chunk_size
+
+    def test_overlap_repeats_whole_sentences(self):
+        chunks = list(SentenceChunker(chunk_size=40, overlap=25).chunk([TEXT]))
+        assert chunks[1].start < chunks[0].end
+        assert chunks[1].text == "Why? Because focus matters!"
+
+    def test_token_unit(self):
+        chunker = SentenceChunker(chunk_size=8, unit="tokens", length_function=lambda text: len(text.split()))
+        chunks = list(chunker.chunk([TEXT]))
+        assert all(len(chunk.text.split()) <= 8 for chunk in chunks)
+        assert chunks[-1].text.endswith("Ok.")
+
+    def test_is_lazy(self):
+        def segments():
+            yield "First sentence here. Second sentence here. Third"
+            raise AssertionError("consumed more input than needed")
+
+        first = next(SentenceChunker(chunk_size=25, overlap=0).chunk(segments()))
+        assert first.text == "First sentence here."
+
+    def test_invalid_unit(self):
+        with pytest.raises(ValueError):
+            SentenceChunker(unit="words")
+
+
+class TestDocumentIngesterChunking:
+    """Test DocumentIngester streaming ingest"""
+
+    def test_text_file_is_indexed_in_batches(self, tmp_path):
+        txt_file = tmp_path / "notes.txt"
+        txt_file.write_text(TEXT * 50, encoding="utf-8")
+        store = MagicMock()
+        ingester = DocumentIngester(vector_store=store)
+        ingester.deduplicator = None
+
+        with patch("mentor_ai.cursor.modules.retrieval.ingest.READ_BLOCK_CHARS", 100), \
+                patch("mentor_ai.cursor.modules.retrieval.ingest.INDEX_BATCH_SIZE", 4), \
+                patch.object(ingester, "_get_embeddings", side_effect=lambda texts: [[1.0]] * len(texts)), \
+                patch.object(ingester, "_get_document_metadata", return_value={}):
+            ingester._process_text_file(txt_file)
+
+        assert store.add_documents.call_count > 1
+        chunks = [chunk for call in store.add_documents.call_args_list for chunk in call.args[0]]
+        assert [chunk.chunk_index for chunk in chunks] == list(range(len(chunks)))
+        full_text = TEXT * 50
+        for chunk in chunks:
+            assert full_text[chunk.start_char:chunk.end_char] == chunk.content
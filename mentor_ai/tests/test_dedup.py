@@ -0,0 +1,68 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from mentor_ai.cursor.modules.retrieval.dedup import NearDuplicateDetector
+from mentor_ai.cursor.modules.retrieval.ingest import DocumentIngester
+from mentor_ai.cursor.modules.retrieval.schemas import DocumentChunk
+
+BASE = (
+    "Effective managers give feedback regularly, set clear expectations for "
+    "every project and check in with their creative team members each week "
+    "to remove blockers and celebrate progress on shared goals."
+)
+
+
+class TestNearDuplicateDetector:
+    """Test MinHash near-duplicate detection"""
+
+    def test_exact_and_near_duplicates_are_rejected(self):
+        detector = NearDuplicateDetector(threshold=0.8)
+        assert detector.add(BASE) is True
+        assert detector.add(BASE) is False
+        # Whitespace, case and a trailing word do not make a new chunk
+        assert detector.add("  " + BASE.upper() + " Indeed") is False
+        assert detector.num_duplicates == 2
+        assert len(detector) == 1
+
+    def test_different_text_is_kept(self):
+        detector = NearDuplicateDetector(threshold=0.8)
+        detector.add(BASE)
+        assert detector.add("Procrastination often hides perfectionism and a fear of failing in public.") is True
+        assert detector.find_duplicate(BASE) == 0
+
+    def test_overlapping_chunks_are_kept(self):
+        words = BASE.split()
+        detector = NearDuplicateDetector(threshold=0.85)
+        # Consecutive chunks sharing a 25% overlap are not near-duplicates
+        assert detector.add(" ".join(words[:20])) is True
+        assert detector.add(" ".join(words[15:])) is True
+
+    def test_clear(self):
+        detector = NearDuplicateDetector()
+        detector.add(BASE)
+        detector.clear()
+        assert detector.add(BASE) is True
+
+    def test_invalid_threshold(self):
+        with pytest.raises(ValueError):
+            NearDuplicateDetector(threshold=0)
+
+
+class TestIngestDeduplication:
+    """Test duplicates are dropped before embedding"""
+
+    def test_duplicates_skip_embedding(self):
+        store = MagicMock()
+        ingester = DocumentIngester(vector_store=store)
+        ingester.deduplicator = NearDuplicateDetector(threshold=0.85)
+        chunks = [
+            DocumentChunk(id=f"doc_{i}", content=content, title="Doc", source="doc.txt",
+                          chunk_index=i, start_char=0, end_char=len(content))
+            for i, content in enumerate([BASE, "Something else entirely about time management.", BASE])
+        ]
+
+        with patch.object(ingester, "_get_embeddings", side_effect=lambda texts: [[1.0]] * len(texts)) as mock_embed:
+            indexed = ingester._index_chunks(chunks)
+
+        assert indexed == 2
+        assert [c.id for c in store.add_documents.call_args.args[0]] == ["doc_0", "doc_1"]
+        assert len(mock_embed.call_args.args[0]) == 2
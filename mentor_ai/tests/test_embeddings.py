@@ -0,0 +1,112 @@
+import asyncio
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from mentor_ai.cursor.modules.retrieval.embeddings import (
+    HashingEmbeddingProvider, OpenAIEmbeddingProvider, create_embedding_provider
+)
+from mentor_ai.cursor.modules.retrieval.retriever import RegRetriever
+from mentor_ai.cursor.modules.retrieval.ingest import DocumentIngester
+from mentor_ai.cursor.modules.retrieval.simple_store import SimpleVectorStore
+
+
+def cosine(a, b):
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+class TestHashingEmbeddingProvider:
+    """Test the local hashed n-gram embeddings"""
+
+    def setup_method(self):
+        self.provider = HashingEmbeddingProvider(dimension=256)
+
+    def test_deterministic_and_normalized(self):
+        texts = ["Give specific feedback", "Delegate ownership, not tasks", ""]
+        first = np.array(self.provider.embed(texts))
+        second = np.array(HashingEmbeddingProvider(dimension=256).embed(texts))
+
+        assert first.shape == (3, 256)
+        np.testing.assert_array_equal(first, second)
+        np.testing.assert_allclose(np.linalg.norm(first[:2], axis=1), 1.0, atol=1e-5)
+        assert not first[2].any()
+
+    def test_batch_matches_single(self):
+        texts = ["weekly review habit", "career growth plan"]
+        batch = self.provider.embed(texts)
+        for text, vector in zip(texts, batch):
+            np.testing.assert_allclose(self.provider.embed([text])[0], vector, atol=1e-6)
+
+    def test_similar_texts_are_closer(self):
+        query, related, unrelated = self.provider.embed([
+            "how to give feedback to my team",
+            "giving constructive feedback to a team member",
+            "morning running routine for marathon training",
+        ])
+        assert cosine(query, related) > cosine(query, unrelated)
+
+    def test_seed_changes_vectors(self):
+        other = HashingEmbeddingProvider(dimension=256, seed=1)
+        assert self.provider.embed(["feedback"]) != other.embed(["feedback"])
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            HashingEmbeddingProvider(dimension=0)
+        with pytest.raises(ValueError):
+            HashingEmbeddingProvider(ngram_range=(4, 2))
+
+
+class TestOpenAIEmbeddingProvider:
+    """Test the OpenAI provider without network access"""
+
+    def test_restores_input_order(self):
+        provider = OpenAIEmbeddingProvider(api_key="sk-test")
+        response = MagicMock(data=[MagicMock(index=1, embedding=[0.0, 1.0]), MagicMock(index=0, embedding=[1.0, 0.0])])
+        client = MagicMock()
+        client.embeddings.create.return_value = response
+
+        with patch.object(provider, "_make_client", return_value=client) as make_client:
+            assert provider.embed(["a", "b"]) == [[1.0, 0.0], [0.0, 1.0]]
+            provider.embed(["c"])
+
+        make_client.assert_called_once()
+        client.embeddings.create.assert_called_with(model="text-embedding-3-small", input=["c"])
+
+    def test_missing_key_raises(self):
+        with pytest.raises(ValueError):
+            OpenAIEmbeddingProvider(api_key="").embed(["feedback"])
+
+
+class TestProviderWiring:
+    """Test provider selection and use by the ingester and retriever"""
+
+    def test_create_embedding_provider(self, monkeypatch):
+        monkeypatch.setenv("EMBEDDINGS_PROVIDER", "hashing")
+        monkeypatch.setenv("EMBEDDINGS_DIMENSION", "64")
+        provider = create_embedding_provider()
+        assert isinstance(provider, HashingEmbeddingProvider)
+        assert provider.dimension == 64
+        assert isinstance(create_embedding_provider("openai"), OpenAIEmbeddingProvider)
+        with pytest.raises(ValueError):
+            create_embedding_provider("word2vec")
+
+    def test_retriever_falls_back_to_zero_vectors(self):
+        retriever = RegRetriever(embedding_provider=OpenAIEmbeddingProvider(api_key=""))
+        assert retriever._get_embedding("feedback") == [0.0] * 1536
+        assert asyncio.run(retriever._aget_embeddings(["a", "b"])) == [[0.0] * 1536] * 2
+
+    def test_offline_index_and_search(self, tmp_path):
+        provider = HashingEmbeddingProvider(dimension=128)
+        corpus = tmp_path / "corpus"
+        (corpus / "txt").mkdir(parents=True)
+        (corpus / "txt" / "feedback.txt").write_text("Give specific, timely feedback. Praise effort in public.")
+        (corpus / "txt" / "running.txt").write_text("Build a running routine. Increase mileage slowly each week.")
+
+        ingester = DocumentIngester(vector_store=SimpleVectorStore(storage="float32"), embedding_provider=provider)
+        ingester.deduplicator = None
+        ingester.ingest_corpus(str(corpus), str(tmp_path / "index"))
+
+        retriever = RegRetriever(vector_store=SimpleVectorStore(storage="float32"), embedding_provider=provider)
+        retriever.initialize(str(tmp_path / "index"))
+        results = retriever.vector_store.search(retriever._get_embedding("timely feedback"), top_k=1)
+
+        assert results[0].source.endswith("feedback.txt")
@@ -0,0 +1,126 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+from fastapi.testclient import TestClient
+from mentor_ai.app.conditional import etag_matches, session_etag
+from mentor_ai.app.main import app
+from mentor_ai.app.storage.mongodb import SessionVersionCache, mongodb_manager
+
+client = TestClient(app)
+HEADERS = {"Authorization": "Bearer token"}
+
+
+def session(version=3, user_id="test_user"):
+    return {
+        "session_id": "s1", "user_id": user_id, "version": version, "current_node": "week1_chat",
+        "plan": {"week_1_topic": "Delegation"}, "lost_skills": "public speaking practice every week",
+        "history": [], "prompt_context": {"recent_messages": [], "important_facts": []},
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_version_cache():
+    mongodb_manager.version_cache.clear()
+    yield
+    mongodb_manager.version_cache.clear()
+
+
+class TestETagHelpers:
+    """Test ETag formatting and If-None-Match comparison"""
+
+    def test_etag_matches(self):
+        etag = session_etag(4)
+        assert etag == 'W/"4"'
+        assert etag_matches('W/"4"', etag)
+        assert etag_matches('"4"', etag)  # Weak comparison
+        assert etag_matches('W/"2", W/"4"', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('W/"3"', etag)
+        assert not etag_matches(None, etag)
+
+
+class TestSessionVersionCache:
+    """Test the TTL/LRU session version cache"""
+
+    def test_ttl_and_lru(self):
+        cache = SessionVersionCache(ttl_seconds=10, max_entries=2)
+        cache.set("a", 1, "u")
+        cache.set("b", 1, "u")
+        assert cache.get("a") == (1, "u")  # a is now most recent
+        cache.set("c", 1, "u")
+        assert cache.get("b") is None and cache.get("a") == (1, "u")
+
+        with patch("mentor_ai.app.storage.mongodb.time.monotonic", return_value=1e12):
+            assert cache.get("a") is None
+
+    def test_zero_ttl_disables(self):
+        cache = SessionVersionCache(ttl_seconds=0)
+        cache.set("a", 1, "u")
+        assert cache.get("a") is None
+
+
+class TestVersionedWrites:
+    """Test that writes increment the version and invalidate the cache"""
+
+    def test_update_session_increments_version(self):
+        collection = Mock()
+        collection.update_one = AsyncMock(return_value=Mock(modified_count=1))
+        mongodb_manager.version_cache.set("s1", 3, "test_user")
+        with patch.object(mongodb_manager, "sessions_collection", collection):
+            assert asyncio.run(mongodb_manager.update_session("s1", {"history": [], "version": 3}))
+        update = collection.update_one.call_args.args[1]
+        assert update["$inc"] == {"version": 1}
+        assert "version" not in update["$set"] and "updated_at" in update["$set"]
+        assert mongodb_manager.version_cache.get("s1") is None
+
+    def test_version_lookup_is_projected_and_cached(self):
+        collection = Mock()
+        collection.find_one = AsyncMock(return_value={"version": 5, "user_id": "test_user"})
+        with patch.object(mongodb_manager, "sessions_collection", collection):
+            assert asyncio.run(mongodb_manager.get_session_version("s1")) == (5, "test_user")
+            assert asyncio.run(mongodb_manager.get_session_version("s1")) == (5, "test_user")
+        collection.find_one.assert_awaited_once_with({"session_id": "s1"}, {"_id": 0, "version": 1, "user_id": 1})
+
+
+@patch('mentor_ai.app.endpoints.chat.auth.verify_id_token', return_value={"uid": "test_user"})
+@patch('mentor_ai.app.endpoints.session.auth.verify_id_token', return_value={"uid": "test_user"})
+class TestConditionalGet:
+    """Test ETag / If-None-Match on the session read endpoints"""
+
+    @pytest.mark.parametrize("path", ["/state/s1", "/topics/s1", "/goal/s1", "/chat/s1/memory-stats"])
+    def test_unchanged_session_is_not_fetched(self, mock_session_auth, mock_chat_auth, path):
+        collection = Mock()
+        collection.find_one = AsyncMock(return_value=session())
+        with patch.object(mongodb_manager, "sessions_collection", collection):
+            first = client.get(path, headers=HEADERS)
+            assert first.status_code == 200
+            assert first.headers["etag"] == 'W/"3"'
+            collection.find_one.reset_mock()
+
+            # Version cached by the first read: no MongoDB access at all
+            second = client.get(path, headers={**HEADERS, "If-None-Match": first.headers["etag"]})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == 'W/"3"'
+        collection.find_one.assert_not_awaited()
+
+    def test_changed_session_is_sent_again(self, mock_session_auth, mock_chat_auth):
+        with patch.object(mongodb_manager, "get_session_version", AsyncMock(return_value=(4, "test_user"))), \
+             patch.object(mongodb_manager, "get_session", AsyncMock(return_value=session(version=4))):
+            response = client.get("/topics/s1", headers={**HEADERS, "If-None-Match": 'W/"3"'})
+        assert response.status_code == 200
+        assert response.headers["etag"] == 'W/"4"'
+        assert response.json()["topics"] == {"week_1_topic": "Delegation"}
+
+    def test_other_users_session_is_denied(self, mock_session_auth, mock_chat_auth):
+        with patch.object(mongodb_manager, "get_session_version", AsyncMock(return_value=(3, "other_user"))), \
+             patch.object(mongodb_manager, "get_session", AsyncMock()) as get_session:
+            response = client.get("/state/s1", headers={**HEADERS, "If-None-Match": 'W/"3"'})
+        assert response.status_code == 403
+        get_session.assert_not_awaited()
+
+    def test_unknown_session_is_not_found(self, mock_session_auth, mock_chat_auth):
+        with patch.object(mongodb_manager, "get_session_version", AsyncMock(return_value=None)), \
+             patch.object(mongodb_manager, "get_session", AsyncMock(return_value=None)):
+            response = client.get("/goal/s1", headers={**HEADERS, "If-None-Match": 'W/"3"'})
+        assert response.status_code == 404
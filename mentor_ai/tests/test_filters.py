@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from mentor_ai.cursor.modules.retrieval.filters import MetadataFilterIndex
+from mentor_ai.cursor.modules.retrieval.simple_store import SimpleVectorStore
+from mentor_ai.cursor.modules.retrieval.schemas import DocumentChunk
+
+METADATA = [
+    {"topic": "feedback", "audience": ["managers"], "goal_type": "career", "file_type": ".pdf"},
+    {"topic": "feedback", "audience": ["creatives", "managers"], "goal_type": "self_growth", "file_type": ".txt"},
+    {"topic": "delegation", "audience": ["managers"], "goal_type": "career", "file_type": ".pdf"},
+    {"topic": "procrastination", "goal_type": "self_growth", "file_type": ".md"},
+]
+
+
+def make_chunks():
+    return [
+        DocumentChunk(id=f"doc_{i}", content=f"{meta['topic']} advice for teams", title=f"Section {i}",
+                      source="handbook.pdf", chunk_index=i, start_char=0, end_char=10, metadata=meta)
+        for i, meta in enumerate(METADATA)
+    ]
+
+
+def make_store():
+    store = SimpleVectorStore()
+    store.add_documents(make_chunks(), [[1.0, 0.0], [0.9, 0.1], [0.8, 0.2], [0.0, 1.0]])
+    return store
+
+
+class TestMetadataFilterIndex:
+    """Test filter expression evaluation"""
+
+    @pytest.mark.parametrize("metadata_filter,expected", [
+        ({"topic": "feedback"}, [0, 1]),
+        ({"audience": "creatives"}, [1]),
+        ({"goal_type": {"$in": ["career", "no_goal"]}}, [0, 2]),
+        ({"goal_type": "career", "topic": "delegation"}, [2]),
+        ({"$or": [{"topic": "delegation"}, {"file_type": ".md"}]}, [2, 3]),
+        ({"$and": [{"topic": "feedback"}, {"file_type": {"$ne": ".pdf"}}]}, [1]),
+        ({"audience": {"$nin": ["managers"]}}, [3]),
+        ({"title": "Section 3"}, [3]),
+        ({"topic": "unknown"}, []),
+    ])
+    def test_evaluate(self, metadata_filter, expected):
+        index = MetadataFilterIndex()
+        index.add_documents(make_chunks())
+        assert index.evaluate(metadata_filter).tolist() == expected
+
+    def test_unsupported_operator(self):
+        index = MetadataFilterIndex()
+        index.add_documents(make_chunks())
+        with pytest.raises(ValueError):
+            index.evaluate({"topic": {"$regex": "feed"}})
+
+    def test_save_load_and_append(self, tmp_path):
+        index = MetadataFilterIndex()
+        index.add_documents(make_chunks())
+        index.save(tmp_path)
+
+        loaded = MetadataFilterIndex()
+        assert loaded.load(tmp_path) is True
+        assert loaded.evaluate({"goal_type": "self_growth"}).tolist() == [1, 3]
+
+        loaded.add_documents(make_chunks()[:1])
+        assert loaded.evaluate({"topic": "feedback"}).tolist() == [0, 1, 4]
+        assert loaded.values("goal_type") == ["career", "self_growth"]
+
+
+class TestFilteredSearch:
+    """Test SimpleVectorStore searches restricted by metadata"""
+
+    def test_vector_search_scans_only_matching_rows(self):
+        store = make_store()
+        results = store.search([1.0, 0.0], top_k=3, metadata_filter={"goal_type": "self_growth"})
+        assert [chunk.id for chunk in results] == ["doc_1", "doc_3"]
+
+    def test_batch_lexical_and_hybrid_search(self):
+        store = make_store()
+        metadata_filter = {"audience": "managers"}
+
+        batch = store.search_batch([[0.0, 1.0]], top_k=1, metadata_filter=metadata_filter)
+        assert batch[0][0].id == "doc_2"
+
+        lexical = store.lexical_search("procrastination advice", top_k=4, metadata_filter=metadata_filter)
+        assert "doc_3" not in [chunk.id for chunk in lexical]
+
+        hybrid = store.hybrid_search("feedback", [0.0, 1.0], top_k=2, metadata_filter={"topic": "feedback"})
+        assert {chunk.id for chunk in hybrid} == {"doc_0", "doc_1"}
+
+    def test_no_matching_rows(self):
+        store = make_store()
+        assert store.search([1.0, 0.0], metadata_filter={"topic": "unknown"}) == []
+        assert store.hybrid_search("feedback", [1.0, 0.0], metadata_filter={"topic": "unknown"}) == []
+
+    def test_quantized_filtered_search(self):
+        store = SimpleVectorStore(storage="int8")
+        store.add_documents(make_chunks(), [[1.0, 0.0], [0.9, 0.1], [0.8, 0.2], [0.0, 1.0]])
+        results = store.search([0.0, 1.0], top_k=1, metadata_filter={"file_type": ".pdf"})
+        assert results[0].id == "doc_2"
+        assert results[0].metadata["similarity_score"] == pytest.approx(0.2 / np.linalg.norm([0.8, 0.2]))
+
+    def test_filter_index_persists(self, tmp_path):
+        make_store().save(str(tmp_path))
+        assert (tmp_path / "filter_index.npz").exists()
+
+        loaded = SimpleVectorStore()
+        loaded.load(str(tmp_path))
+        results = loaded.search([1.0, 0.0], top_k=5, metadata_filter={"topic": "delegation"})
+        assert [chunk.id for chunk in results] == ["doc_2"]
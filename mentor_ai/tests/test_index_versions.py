@@ -0,0 +1,142 @@
+import pytest
+from unittest.mock import MagicMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mentor_ai.cursor.modules.retrieval.index_versions import (
+    IndexWatcher, current_version, publish_version, read_manifest, resolve_index_path,
+    staging_dir, verify_manifest
+)
+from mentor_ai.cursor.modules.retrieval.prefetch import RetrievalPrefetcher
+from mentor_ai.cursor.modules.retrieval.simple_store import SimpleVectorStore
+from mentor_ai.cursor.modules.retrieval.schemas import DocumentChunk
+
+
+def build_version(index_root, version, contents):
+    store = SimpleVectorStore()
+    chunks = [
+        DocumentChunk(id=f"{version}_{i}", content=content, title="Handbook", source="handbook.pdf",
+                      chunk_index=i, start_char=0, end_char=len(content))
+        for i, content in enumerate(contents)
+    ]
+    store.add_documents(chunks, [[1.0, float(i)] for i in range(len(contents))])
+    path = staging_dir(index_root, version)
+    store.save(str(path))
+    return publish_version(index_root, path, version, {"total_documents": len(contents)})
+
+
+class TestIndexVersions:
+    """Test versioned index directories"""
+
+    def test_legacy_flat_index(self, tmp_path):
+        assert resolve_index_path(tmp_path) == (tmp_path, "legacy")
+
+    def test_publish_switches_current(self, tmp_path):
+        build_version(tmp_path, "v1", ["goal setting"])
+        version_dir = build_version(tmp_path, "v2", ["feedback", "delegation"])
+
+        assert current_version(tmp_path) == "v2"
+        assert resolve_index_path(tmp_path) == (version_dir, "v2")
+        manifest = read_manifest(version_dir)
+        assert manifest["total_documents"] == 2
+        assert "embeddings.npy" in manifest["files"]
+        verify_manifest(version_dir, check_hashes=True)
+
+    def test_publish_existing_version_fails(self, tmp_path):
+        build_version(tmp_path, "v1", ["goal setting"])
+        with pytest.raises(ValueError):
+            build_version(tmp_path, "v1", ["goal setting"])
+
+    def test_verify_detects_truncated_file(self, tmp_path):
+        version_dir = build_version(tmp_path, "v1", ["goal setting"])
+        (version_dir / "chunks.bin").write_bytes(b"")
+        with pytest.raises(ValueError):
+            verify_manifest(version_dir)
+
+    def test_watcher_calls_back_on_change(self, tmp_path):
+        build_version(tmp_path, "v1", ["goal setting"])
+        on_change = MagicMock()
+        watcher = IndexWatcher(tmp_path, on_change)
+
+        assert watcher.check() is False
+        build_version(tmp_path, "v2", ["feedback"])
+        assert watcher.check() is True
+        on_change.assert_called_once_with("v2")
+        assert watcher.check() is False
+
+
+class TestHotReload:
+    """Test atomic swap of the shared retriever"""
+
+    def test_reload_swaps_retriever(self, tmp_path):
+        build_version(tmp_path, "v1", ["goal setting"])
+        prefetcher = RetrievalPrefetcher()
+        old_retriever = prefetcher.get_retriever(str(tmp_path))
+        assert old_retriever.index_version == "v1"
+
+        build_version(tmp_path, "v2", ["feedback", "delegation"])
+        result = prefetcher.reload_index(str(tmp_path))
+
+        assert result == {"version": "v2", "previous_version": "v1", "total_documents": 2}
+        new_retriever = prefetcher.get_retriever(str(tmp_path))
+        assert new_retriever is not old_retriever
+        assert prefetcher.index_version == "v2"
+        # Requests still holding the old retriever keep working on the old index
+        assert old_retriever.vector_store.get_stats()["total_documents"] == 1
+
+    def test_failed_reload_keeps_old_index(self, tmp_path):
+        build_version(tmp_path, "v1", ["goal setting"])
+        prefetcher = RetrievalPrefetcher()
+        old_retriever = prefetcher.get_retriever(str(tmp_path))
+
+        version_dir = build_version(tmp_path, "v2", ["feedback"])
+        (version_dir / "embeddings.npy").unlink()
+        with pytest.raises(ValueError):
+            prefetcher.reload_index(str(tmp_path))
+
+        assert prefetcher.get_retriever(str(tmp_path)) is old_retriever
+
+
+class TestReloadEndpoint:
+    """Test the admin reload endpoint"""
+
+    def make_client(self, monkeypatch, token):
+        from mentor_ai.app.endpoints import rag_test
+        monkeypatch.setattr(rag_test.settings, "RAG_ADMIN_TOKEN", token)
+        app = FastAPI()
+        app.include_router(rag_test.router, prefix="/api")
+        return TestClient(app)
+
+    def test_disabled_without_token(self, monkeypatch):
+        client = self.make_client(monkeypatch, "")
+        assert client.post("/api/rag/reload").status_code == 403
+
+    def test_rejects_wrong_token(self, monkeypatch):
+        client = self.make_client(monkeypatch, "secret")
+        assert client.post("/api/rag/reload", headers={"X-Admin-Token": "nope"}).status_code == 401
+
+    def test_index_info_requires_token(self, monkeypatch):
+        client = self.make_client(monkeypatch, "secret")
+        assert client.get("/api/rag/index").status_code == 401
+        assert client.get("/api/rag/index", headers={"X-Admin-Token": "nope"}).status_code == 401
+
+    def test_reloads_with_token(self, monkeypatch):
+        from mentor_ai.cursor.modules.retrieval import prefetch
+        client = self.make_client(monkeypatch, "secret")
+        reload_index = MagicMock(return_value={"version": "v2", "previous_version": "v1", "total_documents": 3})
+        monkeypatch.setattr(prefetch.retrieval_prefetcher, "reload_index", reload_index)
+
+        response = client.post("/api/rag/reload", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == 200
+        assert response.json()["version"] == "v2"
+
+    def test_debug_lists_current_version(self, monkeypatch, tmp_path):
+        client = self.make_client(monkeypatch, "")
+        monkeypatch.setattr("mentor_ai.app.endpoints.rag_test.settings.RAG_INDEX_PATH", str(tmp_path))
+        version_dir = build_version(tmp_path, "v1", ["goal setting"])
+
+        info = client.get("/api/rag/debug").json()
+
+        assert info["index_version"] == "v1"
+        assert info["index_files"]["embeddings.npy"]["path"] == str(version_dir / "embeddings.npy")
+        assert info["index_files"]["embeddings.npy"]["exists"]
@@ -0,0 +1,186 @@
+import time
+import threading
+import pytest
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+from mentor_ai.cursor.core import metrics
+from mentor_ai.cursor.core.graph_processor import GraphProcessor
+from mentor_ai.cursor.core.llm_cache import (
+    InMemoryResponseCache, SingleFlight, create_response_cache, make_cache_key
+)
+from mentor_ai.cursor.core.llm_client import LLMClient, llm_client
+from mentor_ai.cursor.core.metrics import instrument_turn
+from mentor_ai.cursor.core.root_graph import root_graph
+
+
+class TestCacheKey:
+    """Test cache key construction"""
+
+    def test_key_covers_model_params_and_prompt(self):
+        params = {"temperature": 0.7, "max_tokens": 500}
+        key = make_cache_key("gpt-4", params, "prompt")
+        assert key == make_cache_key("gpt-4", {"max_tokens": 500, "temperature": 0.7}, "prompt")
+        assert key != make_cache_key("gpt-4o", params, "prompt")
+        assert key != make_cache_key("gpt-4", {"temperature": 0.0, "max_tokens": 500}, "prompt")
+        assert key != make_cache_key("gpt-4", params, "prompt ")
+
+
+class TestInMemoryResponseCache:
+    """Test TTL and LRU eviction"""
+
+    def test_ttl_expiry(self):
+        cache = InMemoryResponseCache()
+        with patch("mentor_ai.cursor.core.llm_cache.time.monotonic", return_value=100.0):
+            cache.set("k", "v", ttl=10)
+            assert cache.get("k") == "v"
+        with patch("mentor_ai.cursor.core.llm_cache.time.monotonic", return_value=110.0):
+            assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        cache = InMemoryResponseCache(max_entries=2)
+        cache.set("a", "1", ttl=60)
+        cache.set("b", "2", ttl=60)
+        assert cache.get("a") == "1"  # a is now most recently used
+        cache.set("c", "3", ttl=60)
+        assert cache.get("b") is None
+        assert cache.get("a") == "1" and cache.get("c") == "3"
+
+    def test_factory(self):
+        assert isinstance(create_response_cache("memory"), InMemoryResponseCache)
+        assert create_response_cache("none") is None
+        with pytest.raises(ValueError):
+            create_response_cache("redis")
+
+
+class TestSingleFlight:
+    """Test deduplication of concurrent calls"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "response"
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            leader = pool.submit(flight.do, "key", slow)
+            started.wait(5)
+            followers = [pool.submit(flight.do, "key", slow) for _ in range(3)]
+            time.sleep(0.1)
+            release.set()
+            results = [leader.result()] + [f.result() for f in followers]
+
+        assert len(calls) == 1
+        assert results[0] == ("response", False)
+        assert results[1:] == [("response", True)] * 3
+        assert flight.in_flight() == 0
+
+    def test_errors_propagate_to_waiters_and_are_not_kept(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def failing():
+            started.set()
+            release.wait(5)
+            raise ValueError("upstream down")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "key", failing)
+            started.wait(5)
+            follower = pool.submit(flight.do, "key", failing)
+            time.sleep(0.05)
+            release.set()
+            for future in (leader, follower):
+                with pytest.raises(ValueError):
+                    future.result()
+
+        assert flight.do("key", lambda: "recovered") == ("recovered", False)
+
+
+class TestLLMClientCaching:
+    """Test the cache and single-flight in call_llm"""
+
+    @pytest.fixture(autouse=True)
+    def clear_metrics(self):
+        metrics.registry.clear()
+        yield
+        metrics.registry.clear()
+
+    def test_cache_is_opt_in(self):
+        client = LLMClient()
+        client.cache = InMemoryResponseCache()
+        with patch.object(client, "_complete", side_effect=["first", "second", "third"]) as complete:
+            assert client.call_llm("prompt") == "first"
+            assert client.call_llm("prompt") == "second"
+            assert client.call_llm("prompt", cache_ttl=60) == "third"
+            assert client.call_llm("prompt", cache_ttl=60) == "third"
+        assert complete.call_count == 3
+
+    def test_cache_disabled_backend(self):
+        client = LLMClient()
+        client.cache = None
+        with patch.object(client, "_complete", side_effect=["first", "second"]):
+            client.call_llm("prompt", cache_ttl=60)
+            assert client.call_llm("prompt", cache_ttl=60) == "second"
+
+    def test_failures_are_not_cached(self):
+        client = LLMClient()
+        client.cache = InMemoryResponseCache()
+        with patch.object(client, "_complete", side_effect=[ValueError("timeout"), "ok"]):
+            with pytest.raises(ValueError):
+                client.call_llm("prompt", cache_ttl=60)
+            assert client.call_llm("prompt", cache_ttl=60) == "ok"
+
+    def test_concurrent_identical_calls_share_a_request(self):
+        client = LLMClient()
+        client.cache = None
+        release = threading.Event()
+        calls = []
+
+        def complete(prompt, *args):
+            calls.append(prompt)
+            release.wait(5)
+            return "shared response"
+
+        with patch.object(client, "_complete", side_effect=complete):
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                futures = [pool.submit(client.call_llm, "same prompt") for _ in range(3)]
+                while client.single_flight.in_flight() == 0:
+                    time.sleep(0.01)
+                time.sleep(0.05)
+                release.set()
+                assert [f.result() for f in futures] == ["shared response"] * 3
+
+        assert calls == ["same prompt"]
+        assert metrics.LLM_CACHE.value(node=metrics.NO_NODE, result="shared") == 2
+
+    def test_cache_results_counted_per_node(self):
+        client = LLMClient()
+        client.cache = InMemoryResponseCache()
+        with patch.object(client, "_complete", return_value="{}"):
+            with instrument_turn("classify_category"):
+                client.call_llm("prompt", cache_ttl=60)
+                client.call_llm("prompt", cache_ttl=60)
+        assert metrics.LLM_CACHE.value(node="classify_category", result="miss") == 1
+        assert metrics.LLM_CACHE.value(node="classify_category", result="hit") == 1
+
+
+class TestNodeCachePolicy:
+    """Test the per-node opt-in"""
+
+    def test_node_ttl_passed_to_llm_client(self):
+        assert root_graph["classify_category"].cache_ttl == 3600
+        assert root_graph["week1_chat"].cache_ttl is None
+
+        response = '{"reply": "Got it.", "goal_type": "career_improve", "next": "improve_intro"}'
+        with patch.object(llm_client, "call_llm", return_value=response) as call_llm:
+            GraphProcessor.process_node("classify_category", "1", {"session_id": "s1", "history": []})
+        assert call_llm.call_args.kwargs["cache_ttl"] == 3600
+        assert call_llm.call_args.kwargs["node_id"] == "classify_category"
@@ -0,0 +1,276 @@
+import threading
+import httpx
+import openai
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from mentor_ai.app.main import app
+from mentor_ai.cursor.core import metrics
+from mentor_ai.cursor.core.admission import AdmissionController, AdmissionRejected
+from mentor_ai.cursor.core.llm_client import LLMClient
+from mentor_ai.cursor.core.llm_transport import (
+    CircuitBreaker, HedgePolicy, LLMTransport, LLMUnavailableError, RetryPolicy, is_retryable
+)
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def status_error(status, headers=None):
+    response = httpx.Response(status, request=REQUEST, headers=headers or {})
+    error_type = {429: openai.RateLimitError, 400: openai.BadRequestError}.get(status, openai.InternalServerError)
+    return error_type(f"HTTP {status}", response=response, body=None)
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.registry.clear()
+    yield
+    metrics.registry.clear()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetries:
+    """Test backoff and error classification"""
+
+    def test_retryable_errors(self):
+        assert is_retryable(openai.APIConnectionError(request=REQUEST))
+        assert is_retryable(openai.APITimeoutError(request=REQUEST))
+        assert is_retryable(status_error(429))
+        assert is_retryable(status_error(503))
+        assert not is_retryable(status_error(400))
+        assert not is_retryable(ValueError("bad prompt"))
+
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+        delays = [policy.delay(attempt) for attempt in range(1, 10) for _ in range(20)]
+        assert all(0 <= delay <= 4.0 for delay in delays)
+        assert len(set(delays)) > 1
+        assert policy.delay(1, status_error(429, {"retry-after": "3"})) == 3.0
+
+    def test_retries_until_success(self):
+        sleeps = []
+        transport = LLMTransport(RetryPolicy(max_attempts=3), sleep=sleeps.append)
+        outcomes = [status_error(503), openai.APIConnectionError(request=REQUEST), "ok"]
+
+        def fn():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        assert transport.call(fn, "week1_chat") == "ok"
+        assert len(sleeps) == 2
+        assert metrics.LLM_RETRIES.value(node=metrics.NO_NODE, reason="InternalServerError") == 1
+        assert metrics.LLM_RETRIES.value(node=metrics.NO_NODE, reason="APIConnectionError") == 1
+
+    def test_non_retryable_error_raised_immediately(self):
+        transport = LLMTransport(sleep=lambda _: None)
+        calls = []
+
+        def fn():
+            calls.append(1)
+            raise status_error(400)
+
+        with pytest.raises(openai.BadRequestError):
+            transport.call(fn)
+        assert len(calls) == 1
+
+    def test_exhausted_retries(self):
+        transport = LLMTransport(RetryPolicy(max_attempts=2), sleep=lambda _: None)
+        with pytest.raises(LLMUnavailableError, match="after 2 attempts"):
+            transport.call(lambda: (_ for _ in ()).throw(status_error(502)))
+
+
+class TestCircuitBreaker:
+    """Test fail-fast during provider incidents"""
+
+    def test_open_half_open_closed(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30, clock=clock)
+        for _ in range(2):
+            assert breaker.allow()
+            breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+        assert breaker.retry_after() == 30
+        assert metrics.LLM_CIRCUIT_STATE.value() == 2
+
+        clock.now = 30
+        assert breaker.allow()  # One probe
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert metrics.LLM_CIRCUIT_REJECTIONS.value() == 2
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.retry_after() == 10
+
+    def test_transport_fails_fast_when_open(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        transport = LLMTransport(RetryPolicy(max_attempts=1), breaker=breaker, sleep=lambda _: None)
+        with pytest.raises(LLMUnavailableError):
+            transport.call(lambda: (_ for _ in ()).throw(status_error(500)))
+
+        calls = []
+        with pytest.raises(LLMUnavailableError, match="circuit is open") as error:
+            transport.call(lambda: calls.append(1))
+        assert calls == []
+        assert error.value.retry_after > 59
+
+
+    def test_local_error_leaves_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        transport = LLMTransport(RetryPolicy(max_attempts=1), breaker=breaker, sleep=lambda _: None)
+        with pytest.raises(LLMUnavailableError):
+            transport.call(lambda: (_ for _ in ()).throw(status_error(500)))
+        with pytest.raises(ValueError, match="API key"):
+            transport.call(lambda: (_ for _ in ()).throw(ValueError("OpenAI API key not found")))
+        with pytest.raises(LLMUnavailableError):
+            transport.call(lambda: (_ for _ in ()).throw(status_error(500)))
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_provider_error_response_counts_as_healthy(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        transport = LLMTransport(RetryPolicy(max_attempts=1), breaker=breaker, sleep=lambda _: None)
+        with pytest.raises(LLMUnavailableError):
+            transport.call(lambda: (_ for _ in ()).throw(status_error(500)))
+        with pytest.raises(openai.BadRequestError):
+            transport.call(lambda: (_ for _ in ()).throw(status_error(400)))
+        with pytest.raises(LLMUnavailableError):
+            transport.call(lambda: (_ for _ in ()).throw(status_error(500)))
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestHedging:
+    """Test hedged requests after the p95 latency"""
+
+    def test_slow_attempt_is_hedged(self):
+        transport = LLMTransport(hedge=HedgePolicy(enabled=True, min_samples=5, min_delay=0.05))
+        for _ in range(5):
+            transport.latencies.observe("week1_chat", 0.01)
+        assert transport.hedge_delay("week1_chat") == 0.05
+        assert transport.hedge_delay("generate_plan") is None
+
+        calls = []
+        release = threading.Event()
+
+        def fn():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(5)  # First attempt is stuck
+                return "slow"
+            return "fast"
+
+        try:
+            assert transport.call(fn, "week1_chat") == "fast"
+        finally:
+            release.set()
+            transport.shutdown()
+        assert metrics.LLM_HEDGES.value(node=metrics.NO_NODE, result="sent") == 1
+        assert metrics.LLM_HEDGES.value(node=metrics.NO_NODE, result="won") == 1
+
+    def test_fast_attempt_is_not_hedged(self):
+        transport = LLMTransport(hedge=HedgePolicy(enabled=True, min_samples=1, min_delay=1.0))
+        transport.latencies.observe("week1_chat", 0.01)
+        assert transport.call(lambda: "ok", "week1_chat") == "ok"
+        assert metrics.LLM_HEDGES.value(node=metrics.NO_NODE, result="sent") == 0
+        transport.shutdown()
+
+
+class TestAdmissionPerRequest:
+    """Test that every provider request is admitted on its own"""
+
+    def test_each_retry_takes_a_slot_and_backoff_holds_none(self):
+        controller = AdmissionController(max_concurrency=1, requests_per_minute=10)
+        in_flight_during_sleep = []
+        transport = LLMTransport(RetryPolicy(max_attempts=3),
+                                 sleep=lambda _: in_flight_during_sleep.append(controller.stats()["in_flight"]))
+        outcomes = [status_error(429), status_error(503), "ok"]
+
+        def fn():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        assert transport.call(fn, admit=lambda hedged: controller.admit(100)) == "ok"
+        assert in_flight_during_sleep == [0, 0]
+        assert controller.requests.level < 8  # Three requests charged
+
+    def test_hedge_is_not_sent_without_a_free_slot(self):
+        controller = AdmissionController(max_concurrency=1)
+        transport = LLMTransport(hedge=HedgePolicy(enabled=True, min_samples=1, min_delay=0.05))
+        transport.latencies.observe("week1_chat", 0.01)
+        calls = []
+
+        def fn():
+            calls.append(1)
+            threading.Event().wait(0.2)
+            return "slow"
+
+        def admit(hedged):
+            return controller.admit(1, deadline=0 if hedged else None)
+
+        try:
+            assert transport.call(fn, "week1_chat", admit=admit) == "slow"
+        finally:
+            transport.shutdown()
+        assert len(calls) == 1
+        assert metrics.LLM_HEDGES.value(node=metrics.NO_NODE, result="not_admitted") == 1
+
+    def test_rejected_probe_does_not_block_the_circuit(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        transport = LLMTransport(breaker=breaker, sleep=lambda _: None)
+
+        def rejected(hedged):
+            raise AdmissionRejected("LLM capacity exhausted", retry_after=1)
+
+        with pytest.raises(AdmissionRejected):
+            transport.call(lambda: "ok", admit=rejected)
+        assert transport.call(lambda: "ok") == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestUnavailableEndpoint:
+    """Test the 503 returned during outages"""
+
+    @patch('mentor_ai.app.endpoints.chat.auth.verify_id_token')
+    @patch('mentor_ai.app.storage.mongodb.mongodb_manager.get_session', new_callable=AsyncMock)
+    @patch('mentor_ai.cursor.core.graph_processor.GraphProcessor.process_node')
+    def test_chat_returns_503_with_retry_after(self, mock_process_node, mock_get_session, mock_verify_token):
+        mock_verify_token.return_value = {"uid": "test_user"}
+        mock_get_session.return_value = {"session_id": "s1", "user_id": "test_user", "history": []}
+        mock_process_node.side_effect = LLMUnavailableError("circuit is open", retry_after=12.5)
+
+        response = TestClient(app).post("/chat/s1", json={"message": "Hi"},
+                                        headers={"Authorization": "Bearer token"})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "13"
+
+    def test_llm_client_keeps_value_error_for_other_failures(self):
+        client = LLMClient()
+        client.cache = None
+        client.transport = LLMTransport(RetryPolicy(max_attempts=1), sleep=lambda _: None)
+        with patch.object(client, "_complete", side_effect=status_error(400)):
+            with pytest.raises(ValueError, match="Failed to get response from LLM"):
+                client.call_llm("prompt")
+        with patch.object(client, "_complete", side_effect=status_error(503)):
+            with pytest.raises(LLMUnavailableError):
+                client.call_llm("prompt")
@@ -0,0 +1,147 @@
+import json
+import copy
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from mentor_ai.cursor.core.graph_processor import GraphProcessor
+from mentor_ai.cursor.core.llm_client import llm_client
+from mentor_ai.app.storage.mongodb import mongodb_manager
+from mentor_ai.loadtest.mock_llm import LatencyModel, MockLLM, canned_response, create_app, detect_node
+from mentor_ai.loadtest.load_generator import ConversationScript, format_report, in_process_app, run_load
+
+
+def mock_call_llm(prompt, **kwargs):
+    return canned_response(detect_node(prompt), prompt)
+
+
+def instant_mock():
+    return MockLLM(LatencyModel(ttft_ms=0, token_ms=0))
+
+
+class TestMockLLM:
+    """Test the OpenAI-compatible mock server"""
+
+    @pytest.mark.parametrize("goal_option", ["1", "2", "3", "4"])
+    def test_canned_responses_walk_the_whole_graph(self, goal_option):
+        script = ConversationScript(goal_option=goal_option, turns_per_week=1)
+        state = {"session_id": "load", "history": [], "current_week": 1}
+        node_id = "collect_basic_info"
+        visited = [node_id]
+
+        with patch.object(llm_client, "call_llm", side_effect=mock_call_llm):
+            for _ in range(60):
+                message = script.next_message(node_id)
+                if message is None:
+                    break
+                _, state, node_id = GraphProcessor.process_node(node_id, message, state)
+                visited.append(node_id)
+
+        assert node_id == "week12_chat"
+        assert message is None
+        assert "retrieve_reg" in visited and "generate_plan" in visited
+        assert len(state["plan"]) == 12
+        assert state["current_week"] == 12
+
+    def test_chat_completion(self):
+        mock = instant_mock()
+        client = TestClient(create_app(mock))
+        prompt = "System: You are collecting the user's basic personal data through natural conversation.\n..."
+
+        response = client.post("/v1/chat/completions", json={
+            "model": "gpt-4", "max_tokens": 500,
+            "messages": [{"role": "system", "content": "rules"}, {"role": "user", "content": prompt}],
+        })
+
+        body = response.json()
+        assert body["choices"][0]["finish_reason"] == "stop"
+        assert json.loads(body["choices"][0]["message"]["content"])["next"] == "classify_category"
+        assert body["usage"]["completion_tokens"] > 0
+        assert mock.stats()["collect_basic_info"]["calls"] == 1
+
+    def test_max_tokens_truncates(self):
+        client = TestClient(create_app(instant_mock()))
+        response = client.post("/v1/chat/completions", json={
+            "max_tokens": 3, "messages": [{"role": "user", "content": "Summarize this week."}],
+        })
+        choice = response.json()["choices"][0]
+        assert choice["finish_reason"] == "length"
+        assert response.json()["usage"]["completion_tokens"] == 3
+
+    def test_streaming(self):
+        client = TestClient(create_app(instant_mock()))
+        response = client.post("/v1/chat/completions", json={
+            "stream": True, "messages": [{"role": "user", "content": "Summarize this week."}],
+        })
+
+        events = [line[len("data: "):] for line in response.text.splitlines() if line.startswith("data: ")]
+        assert events[-1] == "[DONE]"
+        chunks = [json.loads(event) for event in events[:-1]]
+        content = "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks)
+        assert content == canned_response("summary", "Summarize this week.")
+        assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+
+    def test_embeddings(self):
+        client = TestClient(create_app(instant_mock()))
+        response = client.post("/v1/embeddings", json={"model": "text-embedding-3-small", "input": ["a", "b"]})
+        data = response.json()["data"]
+        assert [item["index"] for item in data] == [0, 1]
+        assert len(data[0]["embedding"]) == 1536
+
+    def test_latency_model(self):
+        latency = LatencyModel(ttft_ms=100, ttft_sigma=0, node_ttft_ms={"generate_plan": 900})
+        assert latency.time_to_first_token("week1_chat") == pytest.approx(0.1)
+        assert latency.time_to_first_token("generate_plan") == pytest.approx(0.9)
+
+
+class InMemorySessions:
+    """Just enough of mongodb_manager for the session and chat endpoints"""
+
+    def __init__(self):
+        self.sessions = {}
+
+    async def create_session(self, session_id, user_id):
+        self.sessions[session_id] = {"session_id": session_id, "user_id": user_id, "history": [],
+                                     "current_node": "collect_basic_info", "current_week": 1}
+        return True
+
+    async def get_user_session(self, user_id):
+        return next((copy.deepcopy(s) for s in self.sessions.values() if s["user_id"] == user_id), None)
+
+    async def get_session(self, session_id):
+        return copy.deepcopy(self.sessions.get(session_id))
+
+    async def update_session(self, session_id, data):
+        # $set semantics: chat turns write only the fields they changed
+        self.sessions[session_id].update(copy.deepcopy(data))
+        return True
+
+
+class TestLoadGenerator:
+    """Test the load generator against the in-process app"""
+
+    def test_run_load(self):
+        app = in_process_app()
+        store = InMemorySessions()
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                return await run_load(client, ["user-a", "user-b"], turns_per_week=1)
+
+        try:
+            with patch.object(llm_client, "call_llm", side_effect=mock_call_llm), \
+                 patch.multiple(mongodb_manager, create_session=store.create_session,
+                                get_user_session=store.get_user_session, get_session=store.get_session,
+                                update_session=store.update_session):
+                stats = asyncio.run(run())
+        finally:
+            app.dependency_overrides.clear()
+
+        report = stats.report()
+        assert report["completed_users"] == 2
+        assert report["endpoints"]["POST /session"]["count"] == 2
+        assert report["endpoints"]["POST /chat/{id}"]["errors"] == 0
+        assert report["nodes"]["week12_chat"]["count"] == 2
+        assert "GET /topics/{id}" in format_report(report)
@@ -0,0 +1,165 @@
+import json
+import pytest
+from unittest.mock import Mock, patch, AsyncMock
+from fastapi.testclient import TestClient
+from mentor_ai.app.main import app
+from mentor_ai.cursor.core.graph_processor import GraphProcessor
+from mentor_ai.cursor.core.llm_client import LLMClient, llm_client
+from mentor_ai.cursor.core import metrics
+from mentor_ai.cursor.core.metrics import (
+    Counter, Histogram, MetricsRegistry, TurnUsage, accumulate_session_usage, estimate_cost,
+    instrument_turn, model_prices, record_llm_usage, registry
+)
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    registry.clear()
+    yield
+    registry.clear()
+
+
+class TestMetricTypes:
+    """Test the Prometheus text rendering"""
+
+    def test_counter_render(self):
+        counter = Counter("requests_total", "Requests", ["node"])
+        counter.inc(node="a")
+        counter.inc(2, node='say "hi"\n')
+
+        lines = counter.render()
+        assert lines[:2] == ["# HELP requests_total Requests", "# TYPE requests_total counter"]
+        assert 'requests_total{node="a"} 1.0' in lines
+        assert 'requests_total{node="say \\"hi\\"\\n"} 2.0' in lines
+        with pytest.raises(ValueError):
+            counter.inc(-1, node="a")
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("latency_seconds", "Latency", ["stage"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value, stage="llm_call")
+
+        lines = histogram.render()
+        assert 'latency_seconds_bucket{stage="llm_call",le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{stage="llm_call",le="1.0"} 3' in lines
+        assert 'latency_seconds_bucket{stage="llm_call",le="+Inf"} 4' in lines
+        assert 'latency_seconds_count{stage="llm_call"} 4' in lines
+        assert 'latency_seconds_sum{stage="llm_call"} 4.25' in lines
+        assert histogram.count(stage="llm_call") == 4
+
+    def test_registry_rejects_duplicates(self):
+        local = MetricsRegistry()
+        local.counter("x_total", "X")
+        with pytest.raises(ValueError):
+            local.histogram("x_total", "X")
+
+
+class TestUsageAccounting:
+    """Test token and cost attribution"""
+
+    def test_model_prices(self):
+        assert model_prices("gpt-4") == (0.03, 0.06)
+        assert model_prices("gpt-4o-mini-2024-07-18") == (0.00015, 0.0006)
+        assert model_prices("local-model") == (0.0, 0.0)
+        with patch.dict("os.environ", {"LLM_PRICE_PROMPT_PER_1K": "1", "LLM_PRICE_COMPLETION_PER_1K": "2"}):
+            assert estimate_cost("gpt-4", 1000, 500) == pytest.approx(2.0)
+
+    def test_usage_attributed_to_running_turn(self):
+        with instrument_turn("week1_chat") as turn:
+            record_llm_usage("gpt-4", 1000, 100)
+            record_llm_usage("gpt-4", 500, 50)
+
+        assert turn.usage == TurnUsage(llm_calls=2, prompt_tokens=1500, completion_tokens=150,
+                                       cost_usd=pytest.approx(0.054))
+        assert metrics.LLM_TOKENS.value(node="week1_chat", model="gpt-4", type="prompt") == 1500
+        assert metrics.LLM_CALLS.value(node="week1_chat", model="gpt-4") == 2
+        assert metrics.NODE_TURNS.value(node="week1_chat", status="ok") == 1
+        assert metrics.NODE_STAGE_SECONDS.count(node="week1_chat", stage="total") == 1
+
+        record_llm_usage("gpt-4", 10, 10)
+        assert metrics.LLM_CALLS.value(node=metrics.NO_NODE, model="gpt-4") == 1
+
+    def test_failed_turn_counted_as_error(self):
+        with pytest.raises(RuntimeError):
+            with instrument_turn("generate_plan"):
+                raise RuntimeError("boom")
+        assert metrics.NODE_TURNS.value(node="generate_plan", status="error") == 1
+
+    def test_session_usage_accumulates(self):
+        state = {}
+        accumulate_session_usage(state, TurnUsage(1, 100, 10, 0.0036))
+        accumulate_session_usage(state, TurnUsage(2, 200, 20, 0.0072))
+        assert state["usage"] == {"llm_calls": 3, "prompt_tokens": 300, "completion_tokens": 30, "cost_usd": 0.0108}
+        assert metrics.SESSION_COST.count() == 2
+
+    @patch('mentor_ai.cursor.core.llm_client.OpenAI')
+    def test_llm_client_records_response_usage(self, mock_openai):
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = '{"reply": "Hi", "next": "test"}'
+        mock_response.usage = Mock(prompt_tokens=120, completion_tokens=30)
+        mock_openai.return_value.chat.completions.create.return_value = mock_response
+
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test_key'}):
+            with instrument_turn("collect_basic_info") as turn:
+                LLMClient().call_llm("Test prompt")
+
+        assert turn.usage.prompt_tokens == 120
+        assert metrics.LLM_TOKENS.value(node="collect_basic_info", model="gpt-4", type="completion") == 30
+
+
+class TestGraphProcessorInstrumentation:
+    """Test stage timing and session usage in process_node"""
+
+    def test_process_node_records_stages_and_usage(self):
+        def fake_call_llm(prompt, **kwargs):
+            record_llm_usage("gpt-4", 400, 40)
+            return json.dumps({"reply": "Tell me more.", "next": "week1_chat"})
+
+        state = {"session_id": "s1", "history": [], "current_week": 1,
+                 "plan": {f"week_{i}_topic": f"Topic {i}" for i in range(1, 13)}}
+        with patch.object(llm_client, "call_llm", side_effect=fake_call_llm):
+            _, state, _ = GraphProcessor.process_node("week1_chat", "Hello", state)
+            _, state, _ = GraphProcessor.process_node("week1_chat", "Still here", state)
+
+        for stage in ("prompt_build", "llm_call", "parse", "state_update", "total"):
+            assert metrics.NODE_STAGE_SECONDS.count(node="week1_chat", stage=stage) == 2
+        assert state["usage"]["llm_calls"] == 2
+        assert state["usage"]["prompt_tokens"] == 800
+        assert state["usage"]["cost_usd"] == pytest.approx(0.0288)
+
+
+class TestMetricsEndpoint:
+    """Test GET /metrics"""
+
+    @patch('mentor_ai.app.endpoints.chat.auth.verify_id_token')
+    @patch('mentor_ai.app.storage.mongodb.mongodb_manager.get_session', new_callable=AsyncMock)
+    @patch('mentor_ai.app.storage.mongodb.mongodb_manager.update_session', new_callable=AsyncMock)
+    @patch('mentor_ai.cursor.core.graph_processor.GraphProcessor.process_node')
+    def test_metrics_after_chat_turn(self, mock_process_node, mock_update_session, mock_get_session,
+                                     mock_verify_token):
+        mock_verify_token.return_value = {"uid": "test_user"}
+        mock_get_session.return_value = {"session_id": "test123", "user_id": "test_user", "history": [],
+                                         "current_node": "collect_basic_info"}
+        mock_process_node.return_value = ("Hello!", {"session_id": "test123", "history": []}, "classify_category")
+
+        response = client.post("/chat/test123", json={"message": "Hi"}, headers={"Authorization": "Bearer token"})
+        assert response.status_code == 200
+
+        with patch('mentor_ai.app.main.settings.METRICS_TOKEN', "secret"):
+            response = client.get("/metrics", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'mentor_node_stage_seconds_count{node="collect_basic_info",stage="mongo_write"} 1' in response.text
+        assert "# TYPE mentor_llm_cost_usd_total counter" in response.text
+
+    def test_metrics_disabled_without_token(self):
+        with patch('mentor_ai.app.main.settings.METRICS_TOKEN', ""):
+            assert client.get("/metrics").status_code == 403
+
+    def test_metrics_rejects_wrong_token(self):
+        with patch('mentor_ai.app.main.settings.METRICS_TOKEN', "secret"):
+            assert client.get("/metrics").status_code == 401
+            assert client.get("/metrics", headers={"X-Admin-Token": "nope"}).status_code == 401
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+from mentor_ai.cursor.modules.retrieval.mmr import mmr_select, normalize_rows
+from mentor_ai.cursor.modules.retrieval.retriever import RegRetriever
+from mentor_ai.cursor.modules.retrieval.chunk_store import ChunkStore
+from mentor_ai.cursor.modules.retrieval.simple_store import SimpleVectorStore
+from mentor_ai.cursor.modules.retrieval.schemas import DocumentChunk
+
+EMBEDDINGS = [[1.0, 0.0, 0.0], [0.99, 0.1, 0.0], [0.6, 0.0, 0.8], [0.0, 1.0, 0.0]]
+
+
+def make_store():
+    store = SimpleVectorStore()
+    chunks = [
+        DocumentChunk(id=f"doc_{i}", content=f"content {i}", title="Handbook", source="handbook.pdf",
+                      chunk_index=i, start_char=0, end_char=9)
+        for i in range(len(EMBEDDINGS))
+    ]
+    store.add_documents(chunks, EMBEDDINGS)
+    return store
+
+
+class TestMMRSelect:
+    """Test vectorized MMR selection"""
+
+    def test_lambda_one_is_relevance_order(self):
+        relevance = np.array([0.2, 0.9, 0.5, 0.7])
+        embeddings = normalize_rows(np.array(EMBEDDINGS))
+        assert mmr_select(relevance, embeddings, 4, lambda_mult=1.0) == [1, 3, 2, 0]
+
+    def test_near_duplicate_is_pushed_down(self):
+        relevance = np.array([1.0, 0.98, 0.7, 0.0])
+        embeddings = normalize_rows(np.array(EMBEDDINGS))
+        assert mmr_select(relevance, embeddings, 2, lambda_mult=0.5) == [0, 2]
+
+    def test_k_larger_than_candidates(self):
+        assert len(mmr_select(np.ones(2), np.eye(2), 5)) == 2
+        assert mmr_select(np.array([]), np.zeros((0, 2)), 3) == []
+
+
+class TestRetrieverDiversify:
+    """Test MMR stage in RegRetriever"""
+
+    def test_diversify_uses_best_query_similarity(self):
+        store = make_store()
+        retriever = RegRetriever(vector_store=store)
+        query = [1.0, 0.0, 0.3]
+        candidates = store.search(query, top_k=4)
+
+        with patch.dict('os.environ', {'MMR_ENABLED': 'True', 'MMR_LAMBDA': '0.5'}):
+            selected = retriever._diversify(candidates, [query, None], top_k=2)
+
+        # doc_1 is more relevant than doc_2 but nearly identical to doc_0
+        assert [chunk.id for chunk in candidates[:3]] == ["doc_0", "doc_1", "doc_2"]
+        assert [chunk.id for chunk in selected] == ["doc_0", "doc_2"]
+        assert selected[0].metadata["mmr_score"] == pytest.approx(candidates[0].metadata["similarity_score"])
+
+    def test_disabled_keeps_order(self):
+        store = make_store()
+        retriever = RegRetriever(vector_store=store)
+        candidates = store.search([1.0, 0.0, 0.0], top_k=4)
+
+        with patch.dict('os.environ', {'MMR_ENABLED': 'False'}):
+            selected = retriever._diversify(candidates, [[1.0, 0.0, 0.0]], top_k=2)
+
+            fetch_k = retriever._get_fetch_k(5)
+
+        assert [chunk.id for chunk in selected] == ["doc_0", "doc_1"]
+        assert fetch_k == 5
+
+    def test_get_embeddings_after_load(self, tmp_path):
+        make_store().save(str(tmp_path))
+        loaded = SimpleVectorStore()
+        loaded.load(str(tmp_path))
+
+        embeddings = loaded.get_embeddings([loaded.chunks[2], loaded.chunks[0]])
+
+        np.testing.assert_allclose(embeddings, normalize_rows(np.array([EMBEDDINGS[2], EMBEDDINGS[0]])), rtol=1e-6)
+
+    def test_get_embeddings_uses_hit_rows_without_scanning_ids(self, tmp_path):
+        make_store().save(str(tmp_path))
+        loaded = SimpleVectorStore()
+        loaded.load(str(tmp_path))
+        hits = loaded.search([0.0, 1.0, 0.0], top_k=2)
+
+        with patch.object(ChunkStore, "chunk_id", autospec=True, side_effect=ChunkStore.chunk_id) as mock_chunk_id:
+            embeddings = loaded.get_embeddings(hits)
+
+        assert mock_chunk_id.call_count == len(hits)  # One id check per hit, not one per stored row
+        np.testing.assert_allclose(embeddings, normalize_rows(np.array([EMBEDDINGS[3], EMBEDDINGS[1]])), rtol=1e-6)
+
+        stranger = DocumentChunk(id="other", content="x", title="t", source="s", chunk_index=0, start_char=0, end_char=1)
+        assert loaded.get_embeddings([stranger]) is None
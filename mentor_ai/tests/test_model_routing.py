@@ -0,0 +1,121 @@
+import pytest
+from unittest.mock import Mock, patch
+from mentor_ai.cursor.core import metrics
+from mentor_ai.cursor.core.llm_cache import InMemoryResponseCache
+from mentor_ai.cursor.core.llm_client import LLMClient
+from mentor_ai.cursor.core.model_routing import (
+    SUMMARY_NODE, GenerationProfile, ModelRouter, OutputLengthTracker, default_profiles
+)
+
+
+@pytest.fixture
+def router():
+    with patch.dict("os.environ", {"LLM_MODEL": "gpt-4", "LLM_FAST_MODEL": "gpt-4o-mini"}):
+        return ModelRouter(enabled=True, adaptive=True)
+
+
+class TestRouting:
+    """Test the node -> profile table"""
+
+    def test_profiles_per_node(self, router):
+        assert router.profile_for("collect_basic_info").model == "gpt-4o-mini"
+        assert router.profile_for("classify_category").temperature == 0.0
+        assert router.profile_for("generate_plan").max_tokens == 1500
+        assert router.profile_for(SUMMARY_NODE).name == "summary"
+        assert router.profile_for("week3_chat") == default_profiles()["conversation"]
+        assert router.profile_for(None).name == "conversation"
+
+    def test_routing_disabled(self):
+        router = ModelRouter(enabled=False)
+        assert router.profile_for("classify_category").name == "conversation"
+
+
+class TestLearnedMaxTokens:
+    """Test max_tokens learned from completion lengths"""
+
+    def test_budget_follows_p99(self, router):
+        base = router.profile_for("week1_chat")
+        for _ in range(19):
+            router.observe("week1_chat", base, 160, "stop")
+        assert router.profile_for("week1_chat").max_tokens == 500  # Not enough samples yet
+
+        router.observe("week1_chat", base, 160, "stop")
+        learned = router.profile_for("week1_chat")
+        assert learned.max_tokens == 200  # p99 (160) * 1.25
+        assert learned.model == base.model
+
+    def test_budget_clamped_to_profile_bounds(self, router):
+        profile = router.profile_for("collect_basic_info")
+        for _ in range(20):
+            router.observe("collect_basic_info", profile, 10, "stop")
+        assert router.profile_for("collect_basic_info").max_tokens == profile.min_tokens
+
+    def test_truncation_grows_budget(self, router):
+        profile = router.profile_for("generate_plan")
+        for _ in range(20):
+            router.observe("generate_plan", profile, 1500, "length")
+        assert router.profile_for("generate_plan").max_tokens == 3000
+        assert router.lengths.stats()["generate_plan"]["truncations"] == 20
+
+    def test_not_adaptive(self):
+        router = ModelRouter(adaptive=False)
+        profile = router.profile_for("week1_chat")
+        for _ in range(50):
+            router.observe("week1_chat", profile, 50, "stop")
+        assert router.profile_for("week1_chat").max_tokens == 500
+
+    def test_tracker_window(self):
+        tracker = OutputLengthTracker(window=3)
+        for tokens in (1000, 10, 20, 30):
+            tracker.observe("n", tokens, 500, truncated=False)
+        assert tracker.percentile("n", 100, min_samples=3) == 30
+
+
+class TestLLMClientRouting:
+    """Test that call_llm sends the node's profile"""
+
+    @patch('mentor_ai.cursor.core.llm_client.OpenAI')
+    def test_profile_sent_and_truncation_observed(self, mock_openai, router):
+        mock_response = Mock()
+        mock_response.choices = [Mock(finish_reason="length")]
+        mock_response.choices[0].message.content = '{"reply": "Hi", "next": "classify_category"}'
+        mock_response.usage = Mock(prompt_tokens=200, completion_tokens=300)
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = mock_response
+        metrics.registry.clear()
+
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test_key'}):
+            client = LLMClient()
+            client.router = router
+            client.cache = None
+            client.call_llm("Test prompt", node_id="collect_basic_info")
+
+        assert create.call_args.kwargs["model"] == "gpt-4o-mini"
+        assert create.call_args.kwargs["max_tokens"] == 300
+        assert create.call_args.kwargs["temperature"] == 0.2
+        assert router.lengths.stats()["collect_basic_info"]["truncations"] == 1
+        assert metrics.LLM_TRUNCATIONS.value(node=metrics.NO_NODE, model="gpt-4o-mini") == 1
+        metrics.registry.clear()
+
+    @patch('mentor_ai.cursor.core.llm_client.OpenAI')
+    def test_cache_hit_survives_learned_budget(self, mock_openai, router):
+        mock_response = Mock()
+        mock_response.choices = [Mock(finish_reason="stop")]
+        mock_response.choices[0].message.content = '{"reply": "Hi", "next": "week1_chat"}'
+        mock_response.usage = Mock(prompt_tokens=200, completion_tokens=160)
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = mock_response
+
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test_key'}):
+            client = LLMClient()
+            client.router = router
+            client.cache = InMemoryResponseCache()
+            client.call_llm("Test prompt", cache_ttl=60, node_id="week1_chat")
+            base = router.profile_for("week1_chat")
+            for _ in range(20):
+                router.observe("week1_chat", base, 160, "stop")
+            assert router.profile_for("week1_chat").max_tokens != base.max_tokens
+            client.call_llm("Test prompt", cache_ttl=60, node_id="week1_chat")
+
+        assert create.call_count == 1
+        metrics.registry.clear()
@@ -0,0 +1,110 @@
+import json
+import pytest
+from unittest.mock import Mock, patch
+from mentor_ai.cursor.core import metrics
+from mentor_ai.cursor.core.llm_client import LLMClient
+from mentor_ai.cursor.core.output_schema import (
+    get_validator, node_json_schema, output_fields, response_format
+)
+from mentor_ai.cursor.core.root_graph import root_graph
+from mentor_ai.cursor.core.state_manager import StateManager
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.registry.clear()
+    yield
+    metrics.registry.clear()
+
+
+class TestNodeSchemas:
+    """Test schemas derived from Node.outputs"""
+
+    def test_every_llm_node_has_a_schema(self):
+        for node in root_graph.values():
+            if node.executor:
+                continue
+            schema = node_json_schema(node)
+            assert schema["type"] == "object"
+            assert "reply" in schema["required"], node.node_id
+
+    def test_fields_derived_from_outputs(self):
+        assert output_fields(root_graph["lost_skills"]) == {"reply": str, "lost_skills": str, "next": str}
+        properties = node_json_schema(root_graph["improve_skills"])["properties"]
+        assert {"type": "array", "items": {}} in properties["skills"]["anyOf"]
+
+    def test_validators_are_cached(self):
+        node = root_graph["week1_chat"]
+        assert get_validator(node) is get_validator(node)
+
+    def test_response_format_by_model(self):
+        schema = node_json_schema(root_graph["week1_chat"])
+        constrained = response_format("gpt-4o-mini", schema, "week1_chat", mode="auto")
+        assert constrained["type"] == "json_schema"
+        assert constrained["json_schema"]["schema"] is schema
+        assert response_format("gpt-4-turbo", schema, "week1_chat", mode="auto") == {"type": "json_object"}
+        assert response_format("gpt-4", schema, "week1_chat", mode="auto") is None
+        assert response_format("gpt-4o", None, "week1_chat", mode="auto") is None
+        with pytest.raises(ValueError):
+            response_format("gpt-4o", schema, "week1_chat", mode="xml")
+
+
+class TestParseValidation:
+    """Test validation in StateManager.parse_llm_response"""
+
+    def test_valid_response_keeps_raw_shape(self):
+        node = root_graph["improve_skills"]
+        response = '{"reply": "Great!", "skills": ["python"], "next": "improve_skills", "mood": "good"}'
+        assert StateManager.parse_llm_response(response, node) == json.loads(response)
+        assert metrics.LLM_OUTPUT_VALIDATION.value(node="improve_skills", result="ok") == 1
+
+    def test_invalid_optional_field_dropped(self):
+        node = root_graph["improve_skills"]
+        response = '{"reply": "Great!", "skills": "python", "interests": ["chess"], "next": "improve_skills"}'
+        result = StateManager.parse_llm_response(response, node)
+        assert result == {"reply": "Great!", "interests": ["chess"], "next": "improve_skills"}
+        assert metrics.LLM_OUTPUT_VALIDATION.value(node="improve_skills", result="repaired") == 1
+
+    def test_missing_reply_falls_back(self):
+        node = root_graph["week3_chat"]
+        result = StateManager.parse_llm_response('{"next": "week3_chat"}', node)
+        assert result["next"] == "week4_chat"
+        assert metrics.LLM_OUTPUT_VALIDATION.value(node="week3_chat", result="fallback") == 1
+
+    @pytest.mark.parametrize("node_id", ["week3_chat", "improve_intro"])
+    def test_reply_without_next_stays_on_node(self, node_id):
+        node = root_graph[node_id]
+        result = StateManager.parse_llm_response('{"reply": "Let us talk about delegation"}', node)
+        assert result == {"reply": "Let us talk about delegation"}
+        assert StateManager.get_next_node(result, node, {"history": []}) == node_id
+        assert metrics.LLM_OUTPUT_VALIDATION.value(node=node_id, result="ok") == 1
+
+    def test_single_quoted_json_repaired(self):
+        node = root_graph["lost_intro"]
+        result = StateManager.parse_llm_response("Sure! {'reply': 'Hello', 'next': 'lost_skills'}", node)
+        assert result == {"reply": "Hello", "next": "lost_skills"}
+
+
+class TestLLMClientResponseFormat:
+    """Test the schema sent with the request"""
+
+    @patch('mentor_ai.cursor.core.llm_client.OpenAI')
+    def test_schema_sent_to_capable_model(self, mock_openai):
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = '{"reply": "Hi", "goal_type": "career_improve", "next": "improve_intro"}'
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = mock_response
+
+        node = root_graph["classify_category"]
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test_key', 'LLM_RESPONSE_FORMAT': 'auto',
+                                       'LLM_FAST_MODEL': 'gpt-4o-mini'}):
+            client = LLMClient()
+            client.cache = None
+            client.router = type(client.router)(enabled=True, adaptive=False)
+            client.call_llm("Test prompt", node_id="classify_category", json_schema=node_json_schema(node))
+            client.call_llm("Test prompt", node_id="week1_chat", json_schema=node_json_schema(root_graph["week1_chat"]))
+
+        first, second = create.call_args_list
+        assert first.kwargs["response_format"]["json_schema"]["name"] == "classify_category"
+        assert "response_format" not in second.kwargs  # gpt-4 has no JSON mode
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from mentor_ai.cursor.modules.retrieval.quantization import QuantizedEmbeddings, validate_storage_mode
+from mentor_ai.cursor.modules.retrieval.simple_store import SimpleVectorStore
+from mentor_ai.cursor.modules.retrieval.schemas import DocumentChunk
+
+
+def make_embeddings(num_docs=300, dim=64, seed=7):
+    return np.random.default_rng(seed).normal(size=(num_docs, dim)).astype(np.float32)
+
+
+def make_store(embeddings, storage):
+    chunks = [
+        DocumentChunk(id=f"doc_{i}", content=f"chunk number {i}", title="Handbook", source="handbook.pdf",
+                      chunk_index=i, start_char=0, end_char=10)
+        for i in range(len(embeddings))
+    ]
+    store = SimpleVectorStore(storage=storage)
+    store.add_documents(chunks, embeddings.tolist())
+    return store
+
+
+class TestQuantizedEmbeddings:
+    """Test float16 and int8 quantization"""
+
+    @pytest.mark.parametrize("mode,tolerance", [("float16", 1e-3), ("int8", 2e-2)])
+    def test_scores_approximate_cosine(self, mode, tolerance):
+        embeddings = make_embeddings()
+        normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        query = normalized[:2].T
+
+        quantized = QuantizedEmbeddings.from_embeddings(embeddings, mode)
+
+        assert quantized.mode == mode
+        assert quantized.nbytes < normalized.nbytes / 1.9
+        np.testing.assert_allclose(quantized.scores(query), normalized @ query, atol=tolerance)
+
+    def test_save_load_roundtrip(self, tmp_path):
+        quantized = QuantizedEmbeddings.from_embeddings(make_embeddings(), "int8")
+        quantized.save(tmp_path)
+
+        loaded = QuantizedEmbeddings.load(tmp_path, "int8")
+        np.testing.assert_array_equal(loaded.codes, quantized.codes)
+        np.testing.assert_array_equal(loaded.scales, quantized.scales)
+        assert QuantizedEmbeddings.load(tmp_path, "float16") is None
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            validate_storage_mode("int4")
+
+
+class TestQuantizedSearch:
+    """Test SimpleVectorStore scoring in quantized modes"""
+
+    @pytest.mark.parametrize("storage", ["float16", "int8"])
+    def test_matches_exact_search(self, storage):
+        embeddings = make_embeddings()
+        exact = make_store(embeddings, "float32")
+        quantized = make_store(embeddings, storage)
+        query = (embeddings[10] + 0.3 * embeddings[20]).tolist()
+
+        expected = [(c.id, c.metadata["similarity_score"]) for c in exact.search(query, top_k=5)]
+        actual = [(c.id, c.metadata["similarity_score"]) for c in quantized.search(query, top_k=5)]
+
+        # Candidates are re-scored with float32 rows, so ids and scores match
+        assert [i for i, _ in actual] == [i for i, _ in expected]
+        np.testing.assert_allclose([s for _, s in actual], [s for _, s in expected], rtol=1e-5)
+
+    def test_save_load_memory_maps_exact_rows(self, tmp_path):
+        embeddings = make_embeddings()
+        make_store(embeddings, "int8").save(str(tmp_path))
+        assert np.load(tmp_path / "embeddings.npy").dtype == np.float32
+        assert (tmp_path / "embeddings_int8.npz").exists()
+
+        loaded = SimpleVectorStore(storage="int8")
+        loaded.load(str(tmp_path))
+
+        assert isinstance(loaded._embeddings_array, np.memmap)
+        assert loaded._quantized is not None
+        assert loaded.search(embeddings[42].tolist(), top_k=1)[0].id == "doc_42"
+        assert loaded.hybrid_search("chunk number", embeddings[7].tolist(), top_k=1, alpha=1.0)[0].id == "doc_7"
+        assert loaded.get_stats()["embedding_dimension"] == embeddings.shape[1]
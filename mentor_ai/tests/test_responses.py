@@ -0,0 +1,105 @@
+import gzip
+import json
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mentor_ai.app import responses
+from mentor_ai.app.benchmark import format_results, json_render, make_session, run_benchmark
+from mentor_ai.app.main import app
+from mentor_ai.app.responses import CompressionMiddleware, ORJSONResponse, choose_encoding, dumps
+from mentor_ai.cursor.core.session_state import SessionState
+
+
+def compressed_app(minimum_size=100):
+    test_app = FastAPI(default_response_class=ORJSONResponse)
+    test_app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+
+    @test_app.get("/big")
+    async def big():
+        return ORJSONResponse({"history": [{"content": "message " * 20}] * 50})
+
+    @test_app.get("/small")
+    async def small():
+        return {"status": "ok"}
+
+    return TestClient(test_app)
+
+
+class TestORJSONResponse:
+    """Test orjson serialization of session documents"""
+
+    def test_matches_previous_serialization(self):
+        content = {"session_id": "s1", "state": make_session(20)}
+        assert json.loads(dumps(content)) == json.loads(json_render(content))
+
+    def test_native_and_custom_types(self):
+        oid = ObjectId()
+        created = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        body = ORJSONResponse({"_id": oid, "created_at": created, "weekly_summaries": {1: "week one"},
+                               "state": SessionState({"message_count": 2})}).body
+        assert json.loads(body) == {
+            "_id": str(oid),
+            "created_at": created.isoformat(),
+            "weekly_summaries": {"1": "week one"},
+            "state": {"message_count": 2},
+        }
+
+
+class TestCompression:
+    """Test size-threshold response compression"""
+
+    def test_large_response_is_gzipped(self):
+        response = compressed_app().get("/big", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert len(response.json()["history"]) == 50
+
+    def test_small_or_unaccepted_responses_are_not_compressed(self):
+        client = compressed_app()
+        assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+        assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+    def test_choose_encoding(self):
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("gzip;q=0, deflate") is None
+        assert choose_encoding("") is None
+        with patch.object(responses, "BROTLI_AVAILABLE", True):
+            assert choose_encoding("gzip, br") == "br"
+        with patch.object(responses, "BROTLI_AVAILABLE", False):
+            assert choose_encoding("gzip, br") == "gzip"
+
+    def test_gzip_round_trip(self):
+        body = dumps(make_session(10))
+        assert gzip.decompress(responses.compress(body, "gzip")) == body
+
+
+class TestSessionEndpoints:
+    """Test the state endpoint with a raw Mongo document"""
+
+    @patch('mentor_ai.app.endpoints.session.auth.verify_id_token')
+    @patch('mentor_ai.app.storage.mongodb.mongodb_manager.get_session', new_callable=AsyncMock)
+    def test_state_serializes_mongo_types(self, mock_get_session, mock_verify_token):
+        mock_verify_token.return_value = {"uid": "benchmark-user"}
+        mock_get_session.return_value = make_session(200)
+        response = TestClient(app).get("/state/s1", headers={"Authorization": "Bearer token",
+                                                             "Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        state = response.json()["state"]
+        assert state["_id"] == str(mock_get_session.return_value["_id"])
+        assert state["created_at"] == "2025-01-01T00:00:00+00:00"
+        assert len(state["history"]) == 200
+
+
+class TestSerializationBenchmark:
+    """Test the serialization benchmark"""
+
+    def test_run_benchmark(self):
+        results = run_benchmark(history_lengths=[5, 50], repeats=2)
+        assert [result.history_length for result in results] == [5, 50]
+        assert results[1].raw_kb > results[0].raw_kb
+        assert all(result.gzip_kb < result.raw_kb for result in results)
+        assert "orjson_ms" in format_results(results)
@@ -0,0 +1,138 @@
+import time
+import pytest
+from unittest.mock import Mock, patch
+from mentor_ai.cursor.modules.retrieval.prefetch import RetrievalPrefetcher
+from mentor_ai.cursor.modules.retrieval.retriever import RegRetriever
+from mentor_ai.cursor.modules.retrieval.schemas import DocumentChunk, RetrievalResult
+from mentor_ai.cursor.core.graph_processor import GraphProcessor
+from mentor_ai.cursor.core.root_graph import root_graph
+
+
+def make_result(content="Coaching builds confidence through small wins."):
+    chunk = DocumentChunk(
+        id="doc_0", content=content, title="Coaching Handbook", source="handbook.pdf",
+        chunk_index=0, start_char=0, end_char=len(content)
+    )
+    return RetrievalResult(chunks=[chunk], query="q", total_results=1, search_time_ms=1.0)
+
+
+def make_prefetcher(result=None, delay=0.0):
+    retriever = RegRetriever()
+    retriever.initialize = Mock()
+
+    async def slow_retrieve(state, user_message=""):
+        time.sleep(delay)
+        return result or make_result()
+
+    retriever.aretrieve = Mock(side_effect=slow_retrieve)
+    return RetrievalPrefetcher(retriever=retriever), retriever
+
+
+class TestRetrievalPrefetcher:
+    """Test speculative retrieval caching"""
+
+    def test_schedule_and_get(self):
+        prefetcher, retriever = make_prefetcher()
+        state = {"session_id": "s1", "goals": ["Build confidence"]}
+
+        assert prefetcher.schedule("s1", state, "index") is True
+        result = prefetcher.get("s1", state, timeout=5)
+
+        assert result is not None
+        assert result.chunks[0].title == "Coaching Handbook"
+        retriever.aretrieve.assert_called_once()
+
+    def test_schedule_same_inputs_is_deduplicated(self):
+        prefetcher, retriever = make_prefetcher()
+        state = {"session_id": "s1", "goals": ["Build confidence"]}
+
+        assert prefetcher.schedule("s1", state, "index") is True
+        assert prefetcher.schedule("s1", dict(state), "index") is False
+        prefetcher.get("s1", state, timeout=5)
+
+        retriever.aretrieve.assert_called_once()
+
+    def test_get_ignores_stale_prefetch(self):
+        prefetcher, _ = make_prefetcher()
+        prefetcher.schedule("s1", {"goals": ["Build confidence"]}, "index")
+
+        result = prefetcher.get("s1", {"goals": ["Find a new career"]}, timeout=5)
+
+        assert result is None
+        assert prefetcher.get("s1", {"goals": ["Build confidence"]}, timeout=5) is None
+
+    def test_get_times_out_while_running(self):
+        prefetcher, _ = make_prefetcher(delay=0.5)
+        state = {"goals": ["Build confidence"]}
+        prefetcher.schedule("s1", state, "index")
+
+        assert prefetcher.get("s1", state, timeout=0.01) is None
+        assert prefetcher.get("s1", state, timeout=5) is not None
+
+    def test_get_waits_for_running_prefetch_without_timeout(self):
+        prefetcher, retriever = make_prefetcher(delay=0.2)
+        state = {"goals": ["Build confidence"]}
+        prefetcher.schedule("s1", state, "index")
+
+        assert prefetcher.get("s1", state, timeout=None) is not None
+        retriever.aretrieve.assert_called_once()
+
+    def test_get_unknown_session(self):
+        prefetcher, _ = make_prefetcher()
+        assert prefetcher.get("missing", {}, timeout=0) is None
+
+
+class TestGraphProcessorPrefetch:
+    """Test prefetch wiring in GraphProcessor"""
+
+    @patch('mentor_ai.cursor.core.graph_processor._get_settings')
+    @patch('mentor_ai.cursor.modules.retrieval.prefetch.retrieval_prefetcher')
+    def test_schedules_after_goals_collected(self, mock_prefetcher, mock_settings):
+        mock_settings.return_value = Mock(REG_ENABLED=True, RAG_PREFETCH_ENABLED=True, RAG_INDEX_PATH="index")
+        state = {"session_id": "s1", "goals": ["Build confidence"]}
+
+        GraphProcessor._schedule_retrieval_prefetch(root_graph["improve_obstacles"], state, "generate_plan")
+
+        mock_prefetcher.schedule.assert_called_once_with("s1", state, "index")
+
+    @patch('mentor_ai.cursor.core.graph_processor._get_settings')
+    @patch('mentor_ai.cursor.modules.retrieval.prefetch.retrieval_prefetcher')
+    def test_does_not_schedule_while_clarifying(self, mock_prefetcher, mock_settings):
+        mock_settings.return_value = Mock(REG_ENABLED=True, RAG_PREFETCH_ENABLED=True, RAG_INDEX_PATH="index")
+
+        GraphProcessor._schedule_retrieval_prefetch(root_graph["improve_obstacles"], {"session_id": "s1"}, "improve_obstacles")
+
+        mock_prefetcher.schedule.assert_not_called()
+
+    @patch('mentor_ai.cursor.core.graph_processor._get_settings')
+    @patch('mentor_ai.cursor.modules.retrieval.prefetch.retrieval_prefetcher')
+    def test_attach_prefetched_chunks(self, mock_prefetcher, mock_settings):
+        mock_settings.return_value = Mock(REG_ENABLED=True, RAG_PREFETCH_ENABLED=True,
+                                          RAG_PREFETCH_WAIT_SECONDS=1, MAX_CONTEXT_CHARS=3000)
+        mock_prefetcher.get.return_value = make_result()
+        state = {"session_id": "s1", "goals": ["Build confidence"]}
+
+        updated = GraphProcessor._attach_prefetched_chunks(state)
+
+        assert updated["retrieved_chunks"][0]["title"] == "Coaching Handbook"
+        assert "retrieved_chunks" not in state
+        mock_prefetcher.discard.assert_called_once_with("s1")
+
+
+class TestRetrieveRegPrefetch:
+    """Test prefetch reuse in the retrieve_reg executor"""
+
+    def test_waits_for_slow_prefetch_instead_of_retrieving_again(self):
+        from mentor_ai.app.config import settings
+        prefetcher, retriever = make_prefetcher(delay=0.3)
+        retriever.retrieve = Mock(side_effect=AssertionError("retrieved again"))
+        state = {"session_id": "s1", "goals": ["Build confidence"]}
+        prefetcher.schedule("s1", state, "index")
+
+        with patch('mentor_ai.cursor.modules.retrieval.prefetch.retrieval_prefetcher', prefetcher), \
+             patch.object(settings, "REG_ENABLED", True), patch.object(settings, "RAG_PREFETCH_ENABLED", True), \
+             patch.object(settings, "RAG_PREFETCH_WAIT_SECONDS", 0.01):
+            result = root_graph["retrieve_reg"].executor("Sounds good", state)
+
+        assert result["retrieved_chunks"][0]["title"] == "Coaching Handbook"
+        retriever.aretrieve.assert_called_once()
@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from mentor_ai.cursor.modules.retrieval.retriever import RegRetriever
+from mentor_ai.cursor.modules.retrieval.simple_store import SimpleVectorStore
+from mentor_ai.cursor.modules.retrieval.schemas import DocumentChunk
+
+
+def make_chunk(idx, content):
+    return DocumentChunk(
+        id=f"doc_{idx}", content=content, title=f"Section {idx}", source="handbook.pdf",
+        chunk_index=idx, start_char=0, end_char=len(content)
+    )
+
+
+def make_store():
+    store = SimpleVectorStore()
+    chunks = [
+        make_chunk(0, "Setting goals that are specific and measurable."),
+        make_chunk(1, "Giving feedback to team members with empathy."),
+        make_chunk(2, "Managing time and avoiding procrastination."),
+    ]
+    embeddings = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+    store.add_documents(chunks, embeddings)
+    return store
+
+
+class TestSearchBatch:
+    """Test vectorized multi-query search"""
+
+    def test_search_batch_matches_search(self):
+        store = make_store()
+        queries = [[0.9, 0.1, 0.0], [0.0, 0.2, 0.8]]
+
+        batch = store.search_batch(queries, top_k=2)
+
+        assert [c.id for c in batch[0]] == [c.id for c in store.search(queries[0], top_k=2)]
+        assert [c.id for c in batch[1]] == [c.id for c in store.search(queries[1], top_k=2)]
+
+    def test_search_batch_zero_query_does_not_fail(self):
+        store = make_store()
+        batch = store.search_batch([[0.0, 0.0, 0.0]], top_k=5)
+        assert len(batch[0]) == 3
+
+    def test_search_batch_empty_store(self):
+        assert SimpleVectorStore().search_batch([[1.0, 0.0]], top_k=3) == [[]]
+
+    def test_hybrid_search_batch_matches_hybrid_search(self):
+        store = make_store()
+        texts = ["specific goals", "feedback for the team", "time management"]
+        embeddings = [[0.9, 0.1, 0.0], [0.0, 0.2, 0.8], None]
+
+        batch = store.hybrid_search_batch(texts, embeddings, top_k=2, alpha=0.7)
+
+        for text, embedding, hits in zip(texts, embeddings, batch):
+            expected = store.hybrid_search(text, embedding, top_k=2, alpha=0.7)
+            assert [c.id for c in hits] == [c.id for c in expected]
+
+
+class TestReciprocalRankFusion:
+    """Test merging of per-query rankings"""
+
+    def test_shared_hits_rank_first(self):
+        retriever = RegRetriever()
+        a, b, c = make_chunk(0, "a" * 20), make_chunk(1, "b" * 20), make_chunk(2, "c" * 20)
+
+        fused = retriever._reciprocal_rank_fusion([[a, b], [c, b]])
+
+        assert fused[0].id == b.id
+        assert {chunk.id for chunk in fused} == {a.id, b.id, c.id}
+        assert fused[0].metadata["rrf_score"] > fused[1].metadata["rrf_score"]
+
+
+class TestAretrieve:
+    """Test async batched retrieval"""
+
+    def test_aretrieve_embeds_once_and_fuses(self):
+        retriever = RegRetriever(vector_store=make_store())
+        state = {"goals": ["Set better goals"], "skills": ["feedback"], "passions": ["time"]}
+        embeddings = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+
+        async def fake_embeddings(texts):
+            assert len(texts) == 3
+            return embeddings
+
+        with patch.object(retriever, "_aget_embeddings", side_effect=fake_embeddings) as mock_embed:
+            result = asyncio.run(retriever.aretrieve(state))
+
+        mock_embed.assert_called_once()
+        assert result.total_results == 3
+        assert result.metadata["fusion"] == "rrf"
+        # Each query's best hit is ranked first for its query, so all three surface
+        assert {chunk.id for chunk in result.chunks} == {"doc_0", "doc_1", "doc_2"}
+
+    def test_aretrieve_hybrid_uses_one_batched_search(self, monkeypatch):
+        monkeypatch.setenv("RETRIEVAL_MODE", "hybrid")
+        store = make_store()
+        retriever = RegRetriever(vector_store=store)
+        state = {"goals": ["Set better goals"], "skills": ["feedback"], "passions": ["time"]}
+
+        async def fake_embeddings(texts):
+            return [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+
+        with patch.object(retriever, "_aget_embeddings", side_effect=fake_embeddings), \
+             patch.object(store, "hybrid_search_batch", wraps=store.hybrid_search_batch) as mock_batch, \
+             patch.object(store, "hybrid_search", wraps=store.hybrid_search) as mock_single:
+            result = asyncio.run(retriever.aretrieve(state))
+
+        mock_batch.assert_called_once()
+        mock_single.assert_not_called()
+        assert {chunk.id for chunk in result.chunks} == {"doc_0", "doc_1", "doc_2"}
+
+    def test_aretrieve_survives_embedding_failure(self):
+        retriever = RegRetriever(vector_store=make_store())
+
+        async def failing_embeddings(texts):
+            raise RuntimeError("boom")
+
+        with patch.object(retriever, "_aget_embeddings", side_effect=failing_embeddings):
+            result = asyncio.run(retriever.aretrieve({"goals": ["Set better goals"]}))
+
+        assert result.chunks == []
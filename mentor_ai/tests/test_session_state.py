@@ -0,0 +1,132 @@
+import copy
+import pytest
+from mentor_ai.cursor.core.memory_manager import MemoryManager
+from mentor_ai.cursor.core.root_graph import root_graph
+from mentor_ai.cursor.core.session_state import SessionState
+from mentor_ai.cursor.core.state_manager import StateManager
+
+
+def session():
+    return {
+        "_id": "abc",
+        "session_id": "s1",
+        "current_node": "week1_chat",
+        "history": [{"role": "user", "content": "Hi"}],
+        "prompt_context": MemoryManager.initialize_prompt_context(),
+        "message_count": 0,
+        "custom_field": {"a": 1},
+    }
+
+
+class TestSessionState:
+    """Test the mapping, copy-on-write and dirty tracking behaviour"""
+
+    def test_behaves_like_the_session_dict(self):
+        data = session()
+        state = SessionState(data)
+        assert state == data
+        assert state.to_dict() == data
+        assert len(state) == len(data)
+        assert state["custom_field"] == {"a": 1} and state.current_node == "week1_chat"
+        assert "user_name" not in state and state.get("user_name") is None
+        with pytest.raises(KeyError):
+            state["user_name"]
+        assert not hasattr(state, "__dict__")
+
+    def test_copy_shares_until_changed(self):
+        state = SessionState(session())
+        clone = state.copy()
+        assert clone["history"] is state["history"]
+
+        clone.mutable("history").append({"role": "assistant", "content": "Hello"})
+        clone.mutable("prompt_context")["recent_messages"].append({"role": "user", "content": "Hi"})
+        assert len(state["history"]) == 1 and len(clone["history"]) == 2
+        assert state["prompt_context"]["recent_messages"] == []
+        assert clone["prompt_context"]["recent_messages"] == [{"role": "user", "content": "Hi"}]
+
+        # Owned after the first write: no further copies
+        history = clone["history"]
+        assert clone.mutable("history") is history
+
+    def test_plain_dict_is_not_modified(self):
+        data = session()
+        original = copy.deepcopy(data)
+        state = SessionState(data)
+        state.mutable("prompt_context")["recent_messages"].append({"role": "user", "content": "Hi"})
+        state.mutable("custom_field")["a"] = 2
+        state["message_count"] = 5
+        del state["current_node"]
+        assert data == original
+
+    def test_dirty_tracking(self):
+        state = SessionState(session())
+        state["current_node"] = "week1_chat"  # Same value
+        state.merge({"session_id": "s1", "history": [{"role": "user", "content": "Hi"}]})  # Equal values
+        assert state.dirty == frozenset()
+
+        state["message_count"] = 1
+        state.mutable("history").append({"role": "assistant", "content": "Hello"})
+        state.merge({"goals": ["g"]})
+        assert state.dirty == {"message_count", "history", "goals"}
+        assert state.changes() == {
+            "message_count": 1,
+            "history": [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}],
+            "goals": ["g"],
+        }
+
+        clone = state.copy()
+        clone["phase"] = "week1"
+        assert clone.dirty == {"message_count", "history", "goals", "phase"}
+        assert "phase" not in state.dirty
+
+        state.mark_clean()
+        assert state.changes() == {}
+
+    def test_deepcopy_keeps_dirty_fields(self):
+        state = SessionState(session())
+        state["message_count"] = 3
+        clone = copy.deepcopy(state)
+        assert clone == state and clone.dirty == {"message_count"}
+        assert clone["history"] is not state["history"]
+
+
+class TestTurnUpdates:
+    """Test that turn updates copy-on-write instead of sharing nested state"""
+
+    def test_update_prompt_context_leaves_input_unchanged(self):
+        data = session()
+        updated = MemoryManager.update_prompt_context(data, {"role": "user", "content": "Hi"})
+        assert data["prompt_context"]["recent_messages"] == []
+        assert data["message_count"] == 0
+        assert updated["prompt_context"]["recent_messages"] == [{"role": "user", "content": "Hi"}]
+        assert updated["message_count"] == 1
+
+    def test_update_state_with_memory_reports_changed_fields(self):
+        data = session()
+        original = copy.deepcopy(data)
+        llm_data = {"reply": "Great!", "next": "week1_chat"}
+        updated = StateManager.update_state_with_memory(
+            data, llm_data, root_graph["week1_chat"], user_message="Hi", assistant_reply="Great!"
+        )
+        assert data == original
+        assert isinstance(updated, SessionState)
+        assert {"prompt_context", "message_count", "updated_at"} <= updated.dirty
+        assert "session_id" not in updated.dirty and "custom_field" not in updated.dirty
+        assert updated["message_count"] == 2
+        assert [msg["content"] for msg in updated["prompt_context"]["recent_messages"]] == ["Hi", "Great!"]
+
+    def test_update_state_with_memory_records_facts_in_place(self, monkeypatch):
+        data = session()
+        fact = {"fact": "Leads a team of 8", "week": 1, "importance_score": 0.9}
+        monkeypatch.setattr(MemoryManager, "evaluate_important_facts", staticmethod(lambda state, msg: [fact]))
+        copies = []
+        copy_of = SessionState.copy_of
+        monkeypatch.setattr(SessionState, "copy_of", classmethod(lambda cls, state: copies.append(state) or copy_of(state)))
+
+        updated = StateManager.update_state_with_memory(
+            data, {"reply": "Great!", "next": "week1_chat"}, root_graph["week1_chat"], user_message="I lead a team of 8"
+        )
+
+        assert len(copies) == 1
+        assert updated["prompt_context"]["important_facts"][0]["fact"] == "Leads a team of 8"
+        assert data["prompt_context"]["important_facts"] == []
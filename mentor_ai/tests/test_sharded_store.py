@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from mentor_ai.cursor.modules.retrieval.schemas import DocumentChunk
+from mentor_ai.cursor.modules.retrieval.simple_store import SimpleVectorStore
+from mentor_ai.cursor.modules.retrieval.sharded_store import ShardedVectorStore, create_vector_store
+
+TOPICS = ["feedback", "delegation", "career"]
+
+
+def make_corpus(num_docs=50, dim=16, seed=0):
+    rng = np.random.RandomState(seed)
+    chunks = [
+        DocumentChunk(id=f"doc_{i}", content=f"{TOPICS[i % 3]} advice number {i}", title=f"Doc {i}",
+                      source="handbook.pdf", chunk_index=i, start_char=0, end_char=10,
+                      metadata={"topic": TOPICS[i % 3]})
+        for i in range(num_docs)
+    ]
+    return chunks, rng.randn(num_docs, dim).astype(np.float32)
+
+
+def fill(store, chunks, embeddings, batch_size=7):
+    # Batches that do not line up with the shard size
+    for start in range(0, len(chunks), batch_size):
+        store.add_documents(chunks[start:start + batch_size], embeddings[start:start + batch_size].tolist())
+    return store
+
+
+def ids(results):
+    return [chunk.id for chunk in results]
+
+
+class TestShardedVectorStore:
+    """Test the sharded store against SimpleVectorStore"""
+
+    def setup_method(self):
+        self.chunks, self.embeddings = make_corpus()
+        self.simple = fill(SimpleVectorStore(storage="float32"), self.chunks, self.embeddings)
+        self.sharded = fill(ShardedVectorStore(shard_size=8, max_workers=4, storage="float32"),
+                            self.chunks, self.embeddings)
+        self.queries = np.random.RandomState(1).randn(3, 16).tolist()
+
+    def test_appends_into_fixed_size_shards(self):
+        assert [shard.size for shard in self.sharded.shards] == [8] * 6 + [2]
+        assert self.sharded.get_stats()["num_shards"] == 7
+        assert self.sharded.get_stats()["total_embeddings"] == 50
+
+    def test_search_matches_simple_store(self):
+        for query in self.queries:
+            assert ids(self.sharded.search(query, top_k=5)) == ids(self.simple.search(query, top_k=5))
+
+    def test_search_batch_matches_simple_store(self):
+        sharded = self.sharded.search_batch(self.queries, top_k=4)
+        simple = self.simple.search_batch(self.queries, top_k=4)
+        assert [ids(hits) for hits in sharded] == [ids(hits) for hits in simple]
+
+    def test_metadata_filter(self):
+        results = self.sharded.search(self.queries[0], top_k=5, metadata_filter={"topic": "career"})
+        expected = self.simple.search(self.queries[0], top_k=5, metadata_filter={"topic": "career"})
+        assert ids(results) == ids(expected)
+        assert all(chunk.metadata["topic"] == "career" for chunk in results)
+        assert self.sharded.search(self.queries[0], metadata_filter={"topic": "missing"}) == []
+
+    def test_hybrid_search_matches_simple_store(self):
+        query = self.queries[0]
+        sharded = self.sharded.hybrid_search("delegation advice", query, top_k=5, alpha=0.5)
+        simple = self.simple.hybrid_search("delegation advice", query, top_k=5, alpha=0.5)
+        assert ids(sharded) == ids(simple)
+
+    def test_get_embeddings(self):
+        chunks = [self.chunks[3], self.chunks[42]]
+        np.testing.assert_allclose(self.sharded.get_embeddings(chunks), self.simple.get_embeddings(chunks), atol=1e-6)
+
+    def test_dimension_mismatch(self):
+        with pytest.raises(ValueError):
+            self.sharded.add_documents(self.chunks[:1], [[1.0, 0.0]])
+
+    def test_save_load_roundtrip(self, tmp_path):
+        self.sharded.save(str(tmp_path))
+        loaded = ShardedVectorStore(shard_size=16, max_workers=2, storage="float32")
+        loaded.load(str(tmp_path))
+        assert [shard.size for shard in loaded.shards] == [16, 16, 16, 2]
+        assert ids(loaded.search(self.queries[0])) == ids(self.simple.search(self.queries[0]))
+
+        # Indexes are interchangeable with SimpleVectorStore
+        simple = SimpleVectorStore(storage="float32")
+        simple.load(str(tmp_path))
+        assert ids(simple.search(self.queries[1])) == ids(self.simple.search(self.queries[1]))
+
+        # A loaded store keeps accepting documents in a new shard
+        extra_chunks, extra_embeddings = make_corpus(num_docs=3, seed=2)
+        for chunk in extra_chunks:
+            chunk.id = f"extra_{chunk.id}"
+        loaded.add_documents(extra_chunks, extra_embeddings.tolist())
+        assert loaded.search(extra_embeddings[1].tolist(), top_k=1)[0].id == "extra_doc_1"
+
+    def test_quantized_storage(self, tmp_path):
+        store = fill(ShardedVectorStore(shard_size=8, max_workers=4, storage="int8", rerank_factor=4),
+                     self.chunks, self.embeddings)
+        assert ids(store.search(self.queries[0], top_k=5)) == ids(self.simple.search(self.queries[0], top_k=5))
+
+        store.save(str(tmp_path))
+        loaded = ShardedVectorStore(shard_size=8, storage="int8", rerank_factor=4)
+        loaded.load(str(tmp_path))
+        assert ids(loaded.search(self.queries[0], top_k=5)) == ids(self.simple.search(self.queries[0], top_k=5))
+
+    def test_create_vector_store(self, monkeypatch):
+        monkeypatch.setenv("VECTOR_STORE_TYPE", "sharded")
+        assert isinstance(create_vector_store(), ShardedVectorStore)
+        assert type(create_vector_store("simple")) is SimpleVectorStore
+        with pytest.raises(ValueError):
+            create_vector_store("faiss")
@@ -0,0 +1,287 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from langgraph.checkpoint.memory import MemorySaver
+from mentor_ai.app.main import app
+from mentor_ai.app.storage.checkpointer import AsyncMongoDBSaver
+from mentor_ai.cursor.core import state_graph
+from mentor_ai.cursor.core.state_graph import (
+    SessionGraphRunner, from_graph_state, session_changes, to_graph_state
+)
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(doc, option) for option in condition):
+                return False
+        elif isinstance(condition, dict) and "$lt" in condition:
+            if key not in doc or not doc[key] < condition["$lt"]:
+                return False
+        elif isinstance(condition, dict) and "$in" in condition:
+            if doc.get(key) not in condition["$in"]:
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+def _sorted(docs, sort):
+    for key, direction in reversed(sort):
+        docs = sorted(docs, key=lambda doc: doc[key], reverse=direction < 0)
+    return docs
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction=1):
+        self.docs = _sorted(self.docs, key if isinstance(key, list) else [(key, direction)])
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    """Just enough of a motor collection for AsyncMongoDBSaver"""
+
+    def __init__(self):
+        self.docs = []
+        self.upserts = 0
+
+    async def create_index(self, keys, unique=False):
+        return None
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(doc) for doc in self.docs if _matches(doc, query)])
+
+    async def find_one(self, query, sort=None):
+        docs = _sorted([doc for doc in self.docs if _matches(doc, query)], sort or [])
+        return dict(docs[0]) if docs else None
+
+    async def update_one(self, query, update, upsert=False):
+        self.upserts += 1
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(update["$set"])
+                return
+        if upsert:
+            self.docs.append({**query, **update["$set"]})
+
+    async def delete_many(self, query):
+        self.docs = [doc for doc in self.docs if not _matches(doc, query)]
+
+    async def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            await self.update_one(request._filter, request._doc, upsert=request._upsert)
+
+
+class FakeDB(dict):
+    def __missing__(self, name):
+        collection = self[name] = FakeCollection()
+        return collection
+
+
+def fake_process_node(node_id, user_message, current_state):
+    """Onboarding -> retrieve_reg (no reply) -> generate_plan -> week1_chat"""
+    state = dict(current_state)
+    if node_id == "retrieve_reg":
+        state["retrieved_chunks"] = ["chunk"]
+        return "", state, "generate_plan"
+    if node_id == "generate_plan":
+        assert user_message == ""
+        state["plan"] = {"topics": ["t1"]}
+        return "Here is your plan", state, "week1_chat"
+    state["history"] = state.get("history", []) + [{"role": "user", "content": user_message}]
+    state["message_count"] = state.get("message_count", 0) + 1
+    return f"reply to {user_message}", state, "retrieve_reg" if user_message == "done" else node_id
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestStateConversion:
+    """Test session <-> graph state conversion"""
+
+    def test_round_trip_keeps_unknown_fields_and_drops_bookkeeping(self):
+        session = {"_id": "x", "updated_at": 1, "session_id": "s1", "goals": ["g"], "custom": 3}
+        state = to_graph_state(session)
+        assert state == {"session_id": "s1", "goals": ["g"], "extra": {"custom": 3}}
+        assert from_graph_state(state) == {"session_id": "s1", "goals": ["g"], "custom": 3}
+
+    def test_session_changes(self):
+        before = {"a": 1, "b": [1], "_id": "x"}
+        after = {"a": 1, "b": [1, 2], "c": None, "_id": "y"}
+        assert session_changes(before, after) == {"b": [1, 2], "c": None}
+
+
+class TestSessionGraph:
+    """Test turns through the compiled session graph"""
+
+    @patch('mentor_ai.cursor.core.graph_processor.GraphProcessor.process_node', side_effect=fake_process_node)
+    def test_turn_enters_at_current_node(self, mock_process_node):
+        runner = SessionGraphRunner(MemorySaver())
+        session = {"session_id": "s1", "current_node": "collect_basic_info", "history": []}
+        reply, updated, next_node = run(runner.run_turn("s1", "Hi", session))
+        assert reply == "reply to Hi"
+        assert next_node == "collect_basic_info"
+        assert mock_process_node.call_args.kwargs["node_id"] == "collect_basic_info"
+        assert updated["history"][-1] == {"role": "assistant", "content": "reply to Hi"}
+
+    @patch('mentor_ai.cursor.core.graph_processor.GraphProcessor.process_node', side_effect=fake_process_node)
+    def test_step_without_reply_continues_in_same_turn(self, mock_process_node):
+        runner = SessionGraphRunner(MemorySaver())
+        session = {"session_id": "s1", "current_node": "retrieve_reg", "history": []}
+        reply, updated, next_node = run(runner.run_turn("s1", "ok", session))
+        assert [call.kwargs["node_id"] for call in mock_process_node.call_args_list] == ["retrieve_reg", "generate_plan"]
+        assert reply == "Here is your plan"
+        assert next_node == updated["current_node"] == "week1_chat"
+        assert updated["retrieved_chunks"] == ["chunk"] and updated["plan"] == {"topics": ["t1"]}
+
+    @patch('mentor_ai.cursor.core.graph_processor.GraphProcessor.process_node', side_effect=fake_process_node)
+    def test_only_changed_channels_get_new_versions(self, mock_process_node):
+        saver = MemorySaver()
+        runner = SessionGraphRunner(saver)
+        session = {"session_id": "s1", "current_node": "collect_basic_info", "history": [], "goals": ["g"]}
+        run(runner.run_turn("s1", "Hi", session))
+        config = {"configurable": {"thread_id": "s1"}}
+        before = run(saver.aget_tuple(config)).checkpoint["channel_versions"]
+
+        _, updated, _ = run(runner.run_turn("s1", "Again", {**session, **from_graph_state(
+            run(runner.graph.aget_state(config)).values)}))
+        after = run(saver.aget_tuple(config)).checkpoint["channel_versions"]
+        assert after["goals"] == before["goals"]
+        assert after["session_id"] == before["session_id"]
+        assert after["history"] != before["history"]
+        assert updated["message_count"] == 2
+
+
+class TestAsyncMongoDBSaver:
+    """Test the MongoDB checkpointer against a fake motor database"""
+
+    @patch('mentor_ai.cursor.core.graph_processor.GraphProcessor.process_node', side_effect=fake_process_node)
+    def test_turns_resume_from_mongo_checkpoints(self, mock_process_node):
+        db = FakeDB()
+        saver = AsyncMongoDBSaver(db)
+        run(saver.setup())
+        session = {"session_id": "s1", "current_node": "collect_basic_info", "history": []}
+        _, updated, next_node = run(SessionGraphRunner(saver).run_turn("s1", "done", session))
+        assert next_node == "retrieve_reg"
+
+        # A new runner (e.g. another worker) resumes from the stored checkpoint
+        reply, updated, next_node = run(SessionGraphRunner(saver).run_turn("s1", "ok", updated))
+        assert reply == "Here is your plan" and next_node == "week1_chat"
+        assert updated["message_count"] == 1
+        assert [msg["content"] for msg in updated["history"]] == ["done", "reply to done", "Here is your plan"]
+
+        latest = run(saver.aget_tuple({"configurable": {"thread_id": "s1"}}))
+        assert latest.checkpoint["channel_values"]["plan"] == {"topics": ["t1"]}
+        assert latest.parent_config["configurable"]["checkpoint_id"] < latest.config["configurable"]["checkpoint_id"]
+
+    @patch('mentor_ai.cursor.core.graph_processor.GraphProcessor.process_node', side_effect=fake_process_node)
+    def test_unchanged_channels_are_not_rewritten(self, mock_process_node):
+        db = FakeDB()
+        saver = AsyncMongoDBSaver(db)
+        runner = SessionGraphRunner(saver)
+        session = {"session_id": "s1", "current_node": "collect_basic_info", "history": [],
+                   "goals": ["g"], "plan": {"topics": ["big"]}}
+        _, updated, _ = run(runner.run_turn("s1", "Hi", session))
+        blobs = {(doc["channel"], doc["version"]) for doc in db["checkpoint_blobs"].docs}
+        run(runner.run_turn("s1", "Again", updated))
+        new_blobs = {(doc["channel"], doc["version"]) for doc in db["checkpoint_blobs"].docs} - blobs
+        channels = {channel for channel, _ in new_blobs}
+        assert "history" in channels and "turn" in channels
+        assert "plan" not in channels and "goals" not in channels
+
+    @patch('mentor_ai.cursor.core.graph_processor.GraphProcessor.process_node', side_effect=fake_process_node)
+    def test_list_newest_first_with_before_and_limit(self, mock_process_node):
+        saver = AsyncMongoDBSaver(FakeDB())
+        session = {"session_id": "s1", "current_node": "collect_basic_info", "history": []}
+        run(SessionGraphRunner(saver).run_turn("s1", "Hi", session))
+        config = {"configurable": {"thread_id": "s1"}}
+
+        async def collect(**kwargs):
+            return [item async for item in saver.alist(config, **kwargs)]
+
+        checkpoints = run(collect())
+        ids = [item.config["configurable"]["checkpoint_id"] for item in checkpoints]
+        assert len(ids) >= 3 and ids == sorted(ids, reverse=True)
+        assert [item.config for item in run(collect(limit=1))] == [checkpoints[0].config]
+        assert [item.config["configurable"]["checkpoint_id"] for item in run(collect(before=checkpoints[0].config))] == ids[1:]
+        assert all(item.metadata["source"] == "input" for item in run(collect(filter={"source": "input"})))
+
+    @patch('mentor_ai.cursor.core.graph_processor.GraphProcessor.process_node', side_effect=fake_process_node)
+    def test_keep_last_prunes_checkpoints_writes_and_blobs(self, mock_process_node):
+        db = FakeDB()
+        saver = AsyncMongoDBSaver(db, keep_last=2)
+        runner = SessionGraphRunner(saver)
+        session = {"session_id": "s1", "current_node": "collect_basic_info", "history": []}
+        for message in ["one", "two", "three", "four"]:
+            _, session, _ = run(runner.run_turn("s1", message, session))
+
+        assert len(db["checkpoints"].docs) == 2
+        kept_ids = {doc["checkpoint_id"] for doc in db["checkpoints"].docs}
+        assert {doc["checkpoint_id"] for doc in db["checkpoint_writes"].docs} <= kept_ids
+        history_versions = [doc["version"] for doc in db["checkpoint_blobs"].docs if doc["channel"] == "history"]
+        assert len(history_versions) <= 2
+
+        # The kept state is complete: the next turn resumes from it
+        reply, updated, _ = run(SessionGraphRunner(saver).run_turn("s1", "five", session))
+        assert reply == "reply to five"
+        assert [msg["content"] for msg in updated["history"] if msg["role"] == "user"] == [
+            "one", "two", "three", "four", "five"]
+
+    @patch('mentor_ai.cursor.core.graph_processor.GraphProcessor.process_node', side_effect=fake_process_node)
+    def test_sync_api_runs_on_the_saver_loop(self, mock_process_node):
+        saver = AsyncMongoDBSaver(FakeDB())
+        config = {"configurable": {"thread_id": "s1"}}
+
+        async def scenario():
+            await saver.setup()
+            session = {"session_id": "s1", "current_node": "collect_basic_info", "history": []}
+            await SessionGraphRunner(saver).run_turn("s1", "Hi", session)
+            latest = await saver.aget_tuple(config)
+            # From a worker thread the sync API is served by the saver's loop
+            assert (await asyncio.to_thread(saver.get_tuple, config)).config == latest.config
+            listed = await asyncio.to_thread(lambda: list(saver.list(config, limit=2)))
+            assert [item.config for item in listed][0] == latest.config and len(listed) == 2
+            # On the loop itself it would deadlock
+            with pytest.raises(asyncio.InvalidStateError):
+                saver.get_tuple(config)
+
+        run(scenario())
+
+
+class TestChatEndpoint:
+    """Test that chat turns write only changed fields"""
+
+    @patch('mentor_ai.app.endpoints.chat.auth.verify_id_token')
+    @patch('mentor_ai.app.storage.mongodb.mongodb_manager.get_session', new_callable=AsyncMock)
+    @patch('mentor_ai.app.storage.mongodb.mongodb_manager.update_session', new_callable=AsyncMock)
+    @patch('mentor_ai.cursor.core.graph_processor.GraphProcessor.process_node', side_effect=fake_process_node)
+    def test_chat_writes_changed_fields(self, mock_process_node, mock_update_session, mock_get_session,
+                                        mock_verify_token):
+        mock_verify_token.return_value = {"uid": "test_user"}
+        mock_get_session.return_value = {
+            "session_id": "s1", "user_id": "test_user", "history": [], "current_node": "collect_basic_info",
+            "prompt_context": {"recent_messages": []}, "message_count": 0, "current_week": 1, "plan": {"big": True},
+        }
+        client = TestClient(app)
+        for runner in (None, SessionGraphRunner(MemorySaver())):
+            with patch.object(state_graph, "session_graph", runner):
+                response = client.post("/chat/s1", json={"message": "Hi"}, headers={"Authorization": "Bearer token"})
+            assert response.status_code == 200
+            written = mock_update_session.call_args[0][1]
+            assert set(written) == {"history", "message_count"}
+            assert written["history"][-1] == {"role": "assistant", "content": "reply to Hi"}
@@ -252,19 +252,13 @@ class TestStateManagerMemory:
         assert updated_state["message_count"] == 0
     
     @patch('mentor_ai.cursor.core.state_manager.MemoryManager.evaluate_important_facts')
-    @patch('mentor_ai.cursor.core.state_manager.MemoryManager.add_important_fact')
-    def test_update_state_with_memory_important_facts(self, mock_add_fact, mock_evaluate_facts):
+    @patch('mentor_ai.cursor.core.state_manager.MemoryManager.record_important_fact')
+    def test_update_state_with_memory_important_facts(self, mock_record_fact, mock_evaluate_facts):
         """Test updating state with important facts evaluation"""
         mock_evaluate_facts.return_value = [
             {"fact": "User wants to be CTO", "week": 1, "importance_score": 0.9}
         ]
-        mock_add_fact.side_effect = lambda state, fact: {
-            **state,
-            "prompt_context": {
-                **state["prompt_context"],
-                "important_facts": state["prompt_context"]["important_facts"] + [fact]
-            }
-        }
+        mock_record_fact.side_effect = lambda state, fact: state["prompt_context"]["important_facts"].append(fact)
         
         current_state = {"session_id": "test123"}
         llm_data = {
@@ -280,7 +274,7 @@ class TestStateManagerMemory:
         
         # Verify important facts evaluation was called
         mock_evaluate_facts.assert_called_once()
-        mock_add_fact.assert_called_once()
+        mock_record_fact.assert_called_once()
         
         # Verify the fact was added (via mock)
         assert len(updated_state["prompt_context"]["important_facts"]) == 1
@@ -0,0 +1,189 @@
+import json
+import asyncio
+import pytest
+from unittest.mock import Mock, patch, AsyncMock
+from fastapi.testclient import TestClient
+from mentor_ai.app.main import app
+from mentor_ai.app.storage.mongodb import mongodb_manager
+from mentor_ai.cursor.core.llm_client import llm_client
+from mentor_ai.cursor.core import tracing
+from mentor_ai.cursor.core.tracing import (
+    FileSpanExporter, InMemorySpanExporter, OTLPHttpSpanExporter, SpanContext, Tracer,
+    format_traceparent, load_spans, format_trace, parse_traceparent, tracer
+)
+from mentor_ai.loadtest.mock_llm import canned_response
+
+client = TestClient(app)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    tracer.configure(exporter, batch=False)
+    yield exporter
+    tracer.configure(None)
+
+
+class TestTraceContext:
+    """Test W3C traceparent handling"""
+
+    def test_parse_and_format(self):
+        context = parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01")
+        assert context == SpanContext(TRACE_ID, PARENT_ID, True)
+        assert format_traceparent(context) == f"00-{TRACE_ID}-{PARENT_ID}-01"
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00").sampled is False
+
+    @pytest.mark.parametrize("header", [None, "", "garbage", f"00-{'0' * 32}-{PARENT_ID}-01",
+                                        f"00-{TRACE_ID}-xyz-01", f"ff-{TRACE_ID}-{PARENT_ID}-01"])
+    def test_invalid_headers(self, header):
+        assert parse_traceparent(header) is None
+
+
+class TestTracer:
+    """Test span creation, nesting and export"""
+
+    def test_disabled_tracer_is_noop(self):
+        local = Tracer()
+        with local.start_span("work") as span:
+            span.set_attribute("key", "value")
+            assert not span.is_recording
+        assert span is tracing.NOOP_SPAN
+        assert span.attributes == {}
+
+    def test_nested_spans_and_errors(self, exporter):
+        with pytest.raises(ValueError):
+            with tracer.start_span("parent", {"graph.node_id": "week1_chat"}) as parent:
+                with tracer.start_span("child") as child:
+                    child.set_attribute("count", 3)
+                raise ValueError("bad json")
+
+        child_data, parent_data = [span.to_dict() for span in exporter.spans]
+        assert child_data["parent_span_id"] == parent.context.span_id
+        assert child_data["trace_id"] == parent_data["trace_id"]
+        assert child_data["attributes"] == {"count": 3}
+        assert parent_data["status"] == "ERROR"
+        assert parent_data["attributes"]["exception.type"] == "ValueError"
+        assert parent_data["duration_ms"] >= child_data["duration_ms"]
+
+    def test_remote_parent_and_sampling(self, exporter):
+        with tracer.start_span("remote", parent=SpanContext(TRACE_ID, PARENT_ID, True)) as span:
+            pass
+        assert span.context.trace_id == TRACE_ID and span.parent_id == PARENT_ID
+
+        with tracer.start_span("unsampled", parent=SpanContext(TRACE_ID, PARENT_ID, False)):
+            with tracer.start_span("unsampled child") as child:
+                assert not child.is_recording
+        assert [span.name for span in exporter.spans] == ["remote"]
+
+        tracer.configure(exporter, batch=False, sample_ratio=0.0)
+        with tracer.start_span("dropped"):
+            pass
+        assert len(exporter.spans) == 1
+
+    def test_trace_decorator(self, exporter):
+        @tracer.trace("sync.work", {"static": True}, result_attributes=lambda result: {"size": len(result)})
+        def work():
+            return [1, 2, 3]
+
+        @tracer.trace("async.work")
+        async def async_work():
+            with tracer.start_span("inner"):
+                await asyncio.sleep(0)
+            return "done"
+
+        assert work() == [1, 2, 3]
+        assert asyncio.run(async_work()) == "done"
+
+        sync_span, inner, async_span = exporter.spans
+        assert sync_span.attributes == {"static": True, "size": 3}
+        assert inner.parent_id == async_span.context.span_id
+
+    def test_file_exporter_and_trace_report(self, tmp_path, capsys):
+        path = tmp_path / "traces" / "spans.jsonl"
+        local = Tracer()
+        local.configure(FileSpanExporter(str(path)))
+        for message in ("fast", "slow"):
+            with local.start_span("POST /chat/{session_id}", kind="server"):
+                with local.start_span("graph.node", {"graph.node_id": message}):
+                    pass
+        local.shutdown()
+
+        traces = load_spans(str(path))
+        assert len(traces) == 2
+        assert all(len(spans) == 2 for spans in traces.values())
+        rendered = format_trace(next(iter(traces.values())))
+        assert rendered.splitlines()[1].startswith("  graph.node")
+
+        tracing.main([str(path), "--top", "1"])
+        assert capsys.readouterr().out.startswith("trace ")
+
+    def test_otlp_payload(self):
+        exporter = OTLPHttpSpanExporter(service_name="mentor-test")
+        local = Tracer()
+        memory = InMemorySpanExporter()
+        local.configure(memory, batch=False)
+        with local.start_span("llm.chat_completion", {"llm.prompt_tokens": 12, "llm.model": "gpt-4", "ok": True}):
+            pass
+
+        payload = exporter.to_otlp(memory.spans)
+        resource_spans = payload["resourceSpans"][0]
+        assert resource_spans["resource"]["attributes"][0]["value"] == {"stringValue": "mentor-test"}
+        span = resource_spans["scopeSpans"][0]["spans"][0]
+        assert "parentSpanId" not in span
+        assert {"key": "llm.prompt_tokens", "value": {"intValue": "12"}} in span["attributes"]
+        assert {"key": "ok", "value": {"boolValue": True}} in span["attributes"]
+        exporter.shutdown()
+
+
+class TestChatTurnTrace:
+    """Test one chat request traced end to end"""
+
+    @patch('mentor_ai.app.endpoints.chat.auth.verify_id_token')
+    def test_chat_turn_spans(self, mock_verify_token, exporter):
+        mock_verify_token.return_value = {"uid": "test_user"}
+        collection = Mock()
+        collection.find_one = AsyncMock(return_value={
+            "session_id": "test123", "user_id": "test_user", "history": [], "current_node": "collect_basic_info"
+        })
+        collection.update_one = AsyncMock(return_value=Mock(modified_count=1))
+
+        def create_completion(**kwargs):
+            prompt = kwargs["messages"][-1]["content"]
+            response = Mock()
+            response.choices = [Mock()]
+            response.choices[0].message.content = canned_response("collect_basic_info", prompt)
+            response.usage = Mock(prompt_tokens=321, completion_tokens=45)
+            return response
+
+        openai_client = Mock()
+        openai_client.chat.completions.create.side_effect = create_completion
+
+        with patch.object(mongodb_manager, "sessions_collection", collection), \
+             patch.object(llm_client, "_ensure_initialized"), \
+             patch.object(llm_client, "client", openai_client, create=True):
+            response = client.post("/chat/test123", json={"message": "I'm Alex, 32"},
+                                   headers={"Authorization": "Bearer token",
+                                            "traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+
+        assert response.status_code == 200
+        assert parse_traceparent(response.headers["traceparent"]).trace_id == TRACE_ID
+
+        spans = {span.name: span for span in exporter.spans}
+        assert {span.context.trace_id for span in exporter.spans} == {TRACE_ID}
+        request_span = spans["POST /chat/{session_id}"]
+        assert request_span.parent_id == PARENT_ID
+        assert request_span.attributes["http.status_code"] == 200
+
+        for name in ("auth.verify_id_token", "mongodb.get_session", "graph.node", "mongodb.update_session"):
+            assert spans[name].parent_id == request_span.context.span_id, name
+
+        node_span = spans["graph.node"]
+        assert node_span.attributes["graph.node_id"] == "collect_basic_info"
+        assert node_span.attributes["graph.next_node"] == "classify_category"
+        assert node_span.attributes["llm.prompt_tokens"] == 321
+        assert spans["graph.prompt_build"].parent_id == node_span.context.span_id
+        assert spans["llm.chat_completion"].parent_id == spans["graph.llm_call"].context.span_id
+        assert spans["llm.chat_completion"].attributes["llm.completion_tokens"] == 45
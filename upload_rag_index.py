@@ -8,18 +8,22 @@ import requests
 import json
 from pathlib import Path
 
-def upload_index_files():
-    """Upload RAG index files to Railway server."""
+from mentor_ai.cursor.modules.retrieval.index_versions import MANIFEST_FILENAME, resolve_index_path
+
+def upload_index_files(index_root: str = "RAG/index"):
+    """Upload the live RAG index version (CURRENT, or a flat legacy index) to Railway server."""
     print("🚀 Uploading RAG index to Railway...")
     
     # Railway API endpoint (you'll need to create this endpoint)
     base_url = "https://spotted-mom-production.up.railway.app"
     
-    # Files to upload
+    # Files to upload, from RAG/index/versions/<CURRENT>/ for a versioned index
+    index_dir, version = resolve_index_path(index_root)
+    print(f"📦 Index version: {version} ({index_dir})")
     index_files = [
-        "RAG/index/chunks.json",
-        "RAG/index/embeddings.npy", 
-        "RAG/index/metadata.json"
+        str(index_dir / filename)
+        for filename in ["chunks.bin", "chunks_meta.npz", "chunks_strings.json", "embeddings.npy",
+                         "bm25.npz", "filter_index.npz", "metadata.json", MANIFEST_FILENAME]
     ]
     
     for file_path in index_files: